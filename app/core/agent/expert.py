@@ -1,9 +1,12 @@
+import time
 import traceback
 from typing import List, cast
 
 from app.core.agent.agent import Agent
+from app.core.common.cancellation import JobCancelledError
 from app.core.common.system_env import SystemEnv
 from app.core.common.type import JobStatus, WorkflowStatus
+from app.core.dal.database import unit_of_work
 from app.core.model.job import SubJob
 from app.core.model.message import AgentMessage, MessageType, WorkflowMessage
 
@@ -78,6 +81,7 @@ class Expert(Agent):
             )
         job_result.status = JobStatus.RUNNING
         self._job_service.save_job_result(job_result=job_result)
+        start_time = time.time()
 
         # get the workflow messages from the agent message
         workflow_messages: List[WorkflowMessage] = agent_message.get_workflow_messages()
@@ -90,6 +94,12 @@ class Expert(Agent):
                 workflow_messages=workflow_messages,
                 lesson=agent_message.get_lesson(),
             )
+        except JobCancelledError:
+            # the job graph is stopped (or failed), so neither retry nor save the result, and give
+            # back the worker to the scheduler as soon as possible
+            # color: orange
+            print(f"\033[38;5;208m[Warning]: Job {job.id} is cancelled.\033[0m")
+            raise
         except Exception as e:
             workflow_message = WorkflowMessage(
                 payload={
@@ -101,26 +111,37 @@ class Expert(Agent):
                 },
             )
 
-        # save the workflow message in the database
-        self._message_service.save_message(message=workflow_message)
-
         if workflow_message.status == WorkflowStatus.SUCCESS:
             # (1) WorkflowStatus.SUCCESS
-            # (1.1) save the expert message in the database
-            expert_message = self.save_output_agent_message(
-                job=job, workflow_message=workflow_message
-            )
+            # the messages and the result of the job are committed in a single transaction, so
+            # that the finished job is never seen without its output (and the buffered messages
+            # of the job are written before it)
+            self._message_service.flush()
+            with unit_of_work():
+                # save the workflow message in the database
+                self._message_service.save_message(message=workflow_message)
+
+                # (1.1) save the expert message in the database
+                expert_message = self.save_output_agent_message(
+                    job=job, workflow_message=workflow_message
+                )
 
-            # (1.2) save the job result in the database
-            job_result = self._job_service.get_job_result(job_id=job.id)
-            if not job_result.has_result():
-                job_result.status = JobStatus.FINISHED
-                self._job_service.save_job_result(job_result=job_result)
+                # (1.2) save the job result in the database
+                # the duration is used to estimate the critical path of the job graphs
+                job_result = self._job_service.get_job_result(job_id=job.id)
+                if not job_result.has_result():
+                    job_result.status = JobStatus.FINISHED
+                    job_result.duration = time.time() - start_time
+                    self._job_service.save_job_result(job_result=job_result)
 
-                # color: bright green
-                print(f"\033[38;5;46m[Success]: Job {job.id} completed successfully.\033[0m")
+                    # color: bright green
+                    print(f"\033[38;5;46m[Success]: Job {job.id} completed successfully.\033[0m")
 
             return expert_message
+
+        # save the workflow message in the database
+        self._message_service.save_message(message=workflow_message)
+
         if workflow_message.status == WorkflowStatus.EXECUTION_ERROR:
             # (2) WorkflowStatus.EXECUTION_ERROR
 
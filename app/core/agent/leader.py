@@ -1,7 +1,9 @@
-from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+import heapq
+import itertools
 import json
 import time
-from typing import Dict, List, Optional, Set, Union
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 import networkx as nx  # type: ignore
 
@@ -9,9 +11,10 @@ from app.core.agent.agent import Agent, AgentConfig
 from app.core.agent.builtin_leader_state import BuiltinLeaderState
 from app.core.agent.expert import Expert
 from app.core.agent.leader_state import LeaderState
-from app.core.common.async_func import run_in_thread
+from app.core.common.cancellation import CancellationToken, JobCancelledError
+from app.core.common.job_scheduler import JobScheduler
 from app.core.common.system_env import SystemEnv
-from app.core.common.type import ChatMessageRole, JobStatus, WorkflowStatus
+from app.core.common.type import ChatMessageRole, JobPriority, JobStatus, WorkflowStatus
 from app.core.common.util import parse_jsons
 from app.core.model.job import Job, SubJob
 from app.core.model.job_graph import JobGraph
@@ -21,6 +24,10 @@ from app.core.prompt.job_decomposition import (
     TASK_AND_PROFILE_PROMPT,
     subjob_required_keys,
 )
+from app.core.service.decomposition_cache_service import DecompositionCacheService
+from app.core.service.expert_router_service import ExpertRouterService
+from app.core.service.job_queue_service import JobQueueService
+from app.core.service.reexecution_service import ReexecutionService
 
 
 class Leader(Agent):
@@ -31,17 +38,35 @@ class Leader(Agent):
         agent_config: AgentConfig,
         id: Optional[str] = None,
         leader_state: Optional[LeaderState] = None,
+        job_scheduler: Optional[JobScheduler] = None,
+        original_job_scheduler: Optional[JobScheduler] = None,
     ):
         super().__init__(agent_config=agent_config, id=id)
         # self._workflow of the leader is used to decompose the job
         self._leader_state: LeaderState = leader_state or BuiltinLeaderState()
+        self._reexecution_service: ReexecutionService = ReexecutionService.instance
 
-    def execute(self, agent_message: AgentMessage, retry_count: int = 0) -> JobGraph:
+        # the schedulers are shared by the process when the leader is managed by the agent service
+        self._job_scheduler: JobScheduler = job_scheduler or JobScheduler(
+            max_workers=SystemEnv.MAX_SUBJOB_WORKERS, name="subjob_scheduler"
+        )
+        self._original_job_scheduler: JobScheduler = original_job_scheduler or JobScheduler(
+            max_workers=SystemEnv.MAX_ORIGINAL_JOB_WORKERS, name="original_job_scheduler"
+        )
+
+    def execute(
+        self,
+        agent_message: AgentMessage,
+        retry_count: int = 0,
+        priority: JobPriority = JobPriority.INTERACTIVE,
+    ) -> JobGraph:
         """Decompose the original job into subjobs.
 
         Args:
             agent_message (AgentMessage): The agent message including the job to be decomposed.
             retry_count (int): The number of retries.
+            priority (JobPriority): The priority class of the hedged decomposition attempts in the
+                job scheduler.
 
         Returns:
             JobGraph: The job graph of the subjobs.
@@ -61,25 +86,44 @@ class Leader(Agent):
         # check if the job is already assigned to an expert
         assigned_expert_name: Optional[str] = job.assigned_expert_name
         if assigned_expert_name:
-            expert = self.state.get_expert_by_name(assigned_expert_name)
-            subjob = SubJob(
+            return self._assign_to_expert(
+                job=job,
                 original_job_id=original_job_id,
-                session_id=job.session_id,
-                goal=job.goal,
-                context=job.goal + "\n" + job.context,
-                expert_id=expert.get_id(),
-                life_cycle=life_cycle or SystemEnv.LIFE_CYCLE,
-                assigned_expert_name=assigned_expert_name,
+                expert_name=assigned_expert_name,
+                life_cycle=life_cycle,
             )
-            self._job_service.save_job(job=subjob)
-            job_graph: JobGraph = JobGraph()
-            job_graph.add_vertex(subjob.id)
-            return job_graph
 
         # else, the job is not assigned to an expert, then decompose the job
         # get the expert list
         expert_profiles = [e.get_profile() for e in self.state.list_experts()]
         expert_names = [p.name for p in expert_profiles]  # get list of names for validation
+
+        # route the simple original job to a single expert directly (the fast path), without the
+        # decomposition by the reasoner
+        expert_router: Optional[ExpertRouterService] = (
+            ExpertRouterService.instance if life_cycle is None else None
+        )
+        routing_latency: float = 0.0
+        routing_confidence: float = 0.0
+        if expert_router and expert_router.enabled:
+            start_time = time.time()
+            routed_expert_name, routing_confidence = expert_router.route(
+                goal=job.goal, expert_profiles=expert_profiles
+            )
+            routing_latency = time.time() - start_time
+            if routed_expert_name:
+                expert_router.record(
+                    job_id=job_id,
+                    expert_name=routed_expert_name,
+                    confidence=routing_confidence,
+                    routing_latency=routing_latency,
+                )
+                return self._assign_to_expert(
+                    job=job,
+                    original_job_id=original_job_id,
+                    expert_name=routed_expert_name,
+                    life_cycle=life_cycle,
+                )
         role_list = "\n".join(
             [
                 f"Expert name: {profile.name}\nDescription: {profile.description}"
@@ -95,97 +139,45 @@ class Leader(Agent):
             context=job.context + f"\n\n{job_decomp_prompt}",
         )
 
+        # look up the decomposition of the same request, only for the original job, since the
+        # subjob is re-decomposed when it failed with the previous decomposition
+        decomposition_cache: Optional[DecompositionCacheService] = (
+            DecompositionCacheService.instance if life_cycle is None else None
+        )
+        decomposition_key: Optional[str] = None
         job_dict: Optional[Dict[str, Dict[str, str]]] = None
-
-        try:
-            # decompose the job by the reasoner in the workflow
-            workflow_message = self._workflow.execute(job=decomp_job, reasoner=self._reasoner)
-
-            # extract the subjobs from the json block
-            results: List[Union[Dict[str, Dict[str, str]], json.JSONDecodeError]] = parse_jsons(
-                text=workflow_message.scratchpad,
-                start_marker=r"^\s*<decomposition>\s*",
-                end_marker="</decomposition>",
-            )
-
-            if len(results) == 0:
-                raise ValueError("The job decomposition result is empty.")
-            result = results[0]
-
-            # if parse_jsons returns a JSONDecodeError directly, raise it
-            if isinstance(result, json.JSONDecodeError):
-                raise result
-
-            # validate the parsed dictionary
-            self._validate_job_dict(result, expert_names)
-            job_dict = result
-
-        except (ValueError, json.JSONDecodeError, Exception) as e:
-            # color: red
-            print(
-                f"\033[38;5;196m[WARNING]: Initial decomposition failed or validation error: "
-                f"{e}\033[0m"
+        if decomposition_cache and decomposition_cache.enabled:
+            decomposition_key = decomposition_cache.make_key(
+                goal=job.goal, context=job.context, expert_profiles=expert_profiles
             )
-
-            # check if it's a validation/parsing error eligible for retry
-            if isinstance(e, ValueError | json.JSONDecodeError):
-                # retry to decompose the job with the new lesson
-                # color: orange
-                print("\033[38;5;208m[INFO]: Retrying decomposition with lesson...\033[0m")
-                lesson = (
-                    "LLM output format (<decomposition> format) specification is crucial "
-                    "for reliable parsing and validation. Ensure the JSON structure is correct, "
-                    f"all required keys are present: {subjob_required_keys}, dependencies are "
-                    f"valid task IDs, and assigned_expert is one of {expert_names}. Do not forget "
-                    " <decomposition> prefix and </decomposition> suffix when you generate the "
-                    "subtasks dict block in <final_output>...</final_output>.\nExpected format: "
-                    f"{JOB_DECOMPOSITION_OUTPUT_SCHEMA}\nError info: " + str(e)
-                )
+            job_dict = decomposition_cache.get(key=decomposition_key)
+            if job_dict:
                 try:
-                    workflow_message = self._workflow.execute(
-                        job=decomp_job,
-                        reasoner=self._reasoner,
-                        lesson=lesson,
-                    )
-                    # extract the subjobs from the json block after retry
-                    results = parse_jsons(
-                        text=workflow_message.scratchpad,
-                        start_marker=r"^\s*<decomposition>\s*",
-                        end_marker="</decomposition>",
-                    )
-                    if len(results) == 0:
-                        raise ValueError(
-                            "The job decomposition result is empty after retry."
-                        ) from e
-                    result = results[0]
-                    # if parse_jsons returns a JSONDecodeError directly, raise it
-                    if isinstance(result, json.JSONDecodeError):
-                        raise result from e
-
-                    # validate the parsed dictionary after retry
-                    self._validate_job_dict(result, expert_names)
-                    job_dict = result
+                    self._validate_job_dict(job_dict, expert_names)
+                except ValueError:
+                    decomposition_cache.invalidate(key=decomposition_key)
+                    job_dict = None
 
-                except (ValueError, json.JSONDecodeError) as retry_e:
-                    self.fail_job_graph(
-                        job_id=job_id,
-                        error_info=(
-                            f"The job `{original_job_id}` could not be decomposed correctly "
-                            f"after retry. Please try again.\nError info: {retry_e}"
-                        ),
-                    )
-                    job_dict = {}
-            else:
-                # handle non-retryable exceptions (e.g., network errors during _workflow.execute)
-                # stop the job graph
-                self.fail_job_graph(
-                    job_id=job_id,
-                    error_info=(
-                        f"The job `{original_job_id}` could not be executed due to an "
-                        f"unexpected error during leader task decomposition. Error info: {e}"
-                    ),
-                )
-                job_dict = {}
+        cache_hit = bool(job_dict)
+        decomposition_latency: Optional[float] = None
+        if not job_dict:
+            start_time = time.time()
+            job_dict = self._decompose(
+                job_id=job_id,
+                original_job_id=original_job_id,
+                decomp_job=decomp_job,
+                expert_names=expert_names,
+                priority=priority,
+            )
+            decomposition_latency = time.time() - start_time
+        if expert_router and expert_router.enabled:
+            expert_router.record(
+                job_id=job_id,
+                expert_name=None,
+                confidence=routing_confidence,
+                routing_latency=routing_latency,
+                decomposition_latency=decomposition_latency,
+            )
 
         # if decomposition failed and wasn't retried or retry failed, job_dict might be {}
         if not job_dict:  # check if job_dict is empty or None
@@ -267,9 +259,270 @@ class Leader(Agent):
             )
             return JobGraph()
 
+        if decomposition_cache and decomposition_key and not cache_hit:
+            decomposition_cache.put(key=decomposition_key, job_dict=job_dict)
+
+        return job_graph
+
+    def _assign_to_expert(
+        self, job: Job, original_job_id: str, expert_name: str, life_cycle: Optional[int]
+    ) -> JobGraph:
+        """Create the job graph of a single subjob, which is assigned to the expert."""
+        expert = self.state.get_expert_by_name(expert_name)
+        subjob = SubJob(
+            original_job_id=original_job_id,
+            session_id=job.session_id,
+            goal=job.goal,
+            context=job.goal + "\n" + job.context,
+            expert_id=expert.get_id(),
+            life_cycle=life_cycle or SystemEnv.LIFE_CYCLE,
+            assigned_expert_name=expert_name,
+        )
+        self._job_service.save_job(job=subjob)
+        job_graph: JobGraph = JobGraph()
+        job_graph.add_vertex(subjob.id)
         return job_graph
 
-    def execute_original_job(self, original_job: Job) -> None:
+    def _decompose(
+        self,
+        job_id: str,
+        original_job_id: str,
+        decomp_job: Job,
+        expert_names: List[str],
+        priority: JobPriority,
+    ) -> Dict[str, Dict[str, str]]:
+        """Decompose the job into the subjob dict by the reasoner, and retry once with the lesson
+        if the result is invalid.
+
+        If DECOMPOSITION_HEDGE_COUNT > 1, the attempts are hedged instead of the sequential retry.
+
+        Returns:
+            Dict[str, Dict[str, str]]: The validated subjob dict, or {} if the decomposition failed
+                (the job graph has been failed).
+        """
+        if SystemEnv.DECOMPOSITION_HEDGE_COUNT > 1:
+            return self._decompose_hedged(
+                job_id=job_id,
+                original_job_id=original_job_id,
+                decomp_job=decomp_job,
+                expert_names=expert_names,
+                priority=priority,
+            )
+
+        job_dict: Dict[str, Dict[str, str]] = {}
+
+        try:
+            # decompose the job by the reasoner in the workflow
+            job_dict = self._decompose_once(decomp_job=decomp_job, expert_names=expert_names)
+
+        except (ValueError, json.JSONDecodeError, Exception) as e:
+            # color: red
+            print(
+                f"\033[38;5;196m[WARNING]: Initial decomposition failed or validation error: "
+                f"{e}\033[0m"
+            )
+
+            # check if it's a validation/parsing error eligible for retry
+            if isinstance(e, ValueError | json.JSONDecodeError):
+                # retry to decompose the job with the new lesson
+                # color: orange
+                print("\033[38;5;208m[INFO]: Retrying decomposition with lesson...\033[0m")
+                lesson = (
+                    "LLM output format (<decomposition> format) specification is crucial "
+                    "for reliable parsing and validation. Ensure the JSON structure is correct, "
+                    f"all required keys are present: {subjob_required_keys}, dependencies are "
+                    f"valid task IDs, and assigned_expert is one of {expert_names}. Do not forget "
+                    " <decomposition> prefix and </decomposition> suffix when you generate the "
+                    "subtasks dict block in <final_output>...</final_output>.\nExpected format: "
+                    f"{JOB_DECOMPOSITION_OUTPUT_SCHEMA}\nError info: " + str(e)
+                )
+                try:
+                    job_dict = self._decompose_once(
+                        decomp_job=decomp_job, expert_names=expert_names, lesson=lesson
+                    )
+
+                except (ValueError, json.JSONDecodeError) as retry_e:
+                    self.fail_job_graph(
+                        job_id=job_id,
+                        error_info=(
+                            f"The job `{original_job_id}` could not be decomposed correctly "
+                            f"after retry. Please try again.\nError info: {retry_e}"
+                        ),
+                    )
+                    job_dict = {}
+            else:
+                # handle non-retryable exceptions (e.g., network errors during _workflow.execute)
+                # stop the job graph
+                self.fail_job_graph(
+                    job_id=job_id,
+                    error_info=(
+                        f"The job `{original_job_id}` could not be executed due to an "
+                        f"unexpected error during leader task decomposition. Error info: {e}"
+                    ),
+                )
+                job_dict = {}
+
+        return job_dict
+
+    def _decompose_hedged(
+        self,
+        job_id: str,
+        original_job_id: str,
+        decomp_job: Job,
+        expert_names: List[str],
+        priority: JobPriority,
+    ) -> Dict[str, Dict[str, str]]:
+        """Launch the decomposition attempts concurrently with the spread temperatures, and take
+        the first valid one, so that the latency tracks the fastest valid sample instead of the sum
+        of the sequential retries. The other attempts are cancelled once a winner is found.
+
+        The attempts are submitted to the job scheduler shared with the subjobs, under the
+        concurrency key of the leader, so that the hedging is bounded by the workers (and the
+        concurrency limit of the leader) instead of multiplying the LLM calls under load. The
+        decomposition itself runs in the original job scheduler, so it never waits for a worker
+        it occupies.
+
+        Returns:
+            Dict[str, Dict[str, str]]: The validated subjob dict, or {} if all the attempts failed
+                (the job graph has been failed).
+        """
+        attempt_count: int = SystemEnv.DECOMPOSITION_HEDGE_COUNT
+        job_cancellation_token: Optional[CancellationToken] = (
+            self._job_service.get_cancellation_token(original_job_id=original_job_id)
+        )
+
+        attempts: Dict[Future, CancellationToken] = {}
+        for temperature in self._get_hedge_temperatures(attempt_count):
+            # the attempt is cancelled as well, if the job graph is stopped
+            attempt_cancellation_token = CancellationToken(parent=job_cancellation_token)
+            attempt_job = Job(
+                id=decomp_job.id,
+                session_id=decomp_job.session_id,
+                goal=decomp_job.goal,
+                context=decomp_job.context,
+                temperature=temperature,
+                cancellation_token=attempt_cancellation_token,
+            )
+            future = self._job_scheduler.submit(
+                self._decompose_once,
+                session_id=decomp_job.session_id,
+                priority=priority,
+                concurrency_key=self.get_profile().name,
+                decomp_job=attempt_job,
+                expert_names=expert_names,
+            )
+            attempts[future] = attempt_cancellation_token
+
+        job_dict: Dict[str, Dict[str, str]] = {}
+        errors: List[str] = []
+        pending: Set[Future] = set(attempts.keys())
+        try:
+            while pending and not job_dict:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        job_dict = job_dict or future.result()
+                    except JobCancelledError:
+                        continue
+                    except Exception as e:
+                        # color: red
+                        print(
+                            "\033[38;5;196m[WARNING]: Hedged decomposition attempt failed: "
+                            f"{e}\033[0m"
+                        )
+                        errors.append(str(e))
+        finally:
+            # cancel the slower attempts, including the in-flight LLM requests, and drop the
+            # attempts still queued in the job scheduler
+            for future in pending:
+                attempts[future].cancel(reason="Another decomposition attempt has won.")
+                future.cancel()
+
+        if not job_dict and not (job_cancellation_token and job_cancellation_token.is_cancelled()):
+            self.fail_job_graph(
+                job_id=job_id,
+                error_info=(
+                    f"The job `{original_job_id}` could not be decomposed correctly by "
+                    f"{attempt_count} attempts. Please try again.\nError info: " + "\n".join(errors)
+                ),
+            )
+        return job_dict
+
+    def _get_hedge_temperatures(self, attempt_count: int) -> List[float]:
+        """Get the temperatures of the hedged attempts, spread evenly from TEMPERATURE up to
+        TEMPERATURE + DECOMPOSITION_HEDGE_TEMPERATURE_SPREAD, so that the first attempt samples as
+        the non-hedged decomposition does."""
+        base: float = SystemEnv.TEMPERATURE
+        spread: float = SystemEnv.DECOMPOSITION_HEDGE_TEMPERATURE_SPREAD
+        if attempt_count <= 1:
+            return [base]
+        return [
+            min(max(base + spread * i / (attempt_count - 1), 0.0), 2.0)
+            for i in range(attempt_count)
+        ]
+
+    def _decompose_once(
+        self, decomp_job: Job, expert_names: List[str], lesson: Optional[str] = None
+    ) -> Dict[str, Dict[str, str]]:
+        """Decompose the job by the reasoner in the workflow once, and validate the subjob dict.
+
+        Raises:
+            ValueError | json.JSONDecodeError: If the result is empty, invalid, or not a DAG.
+        """
+        workflow_message = self._workflow.execute(
+            job=decomp_job, reasoner=self._reasoner, lesson=lesson
+        )
+
+        # extract the subjobs from the json block
+        results: List[Union[Dict[str, Dict[str, str]], json.JSONDecodeError]] = parse_jsons(
+            text=workflow_message.scratchpad,
+            start_marker=r"^\s*<decomposition>\s*",
+            end_marker="</decomposition>",
+        )
+
+        if len(results) == 0:
+            raise ValueError("The job decomposition result is empty.")
+        result = results[0]
+
+        # if parse_jsons returns a JSONDecodeError directly, raise it
+        if isinstance(result, json.JSONDecodeError):
+            raise result
+
+        # validate the parsed dictionary
+        self._validate_job_dict(result, expert_names)
+
+        # the dependencies of the subjobs should be a directed acyclic graph (DAG)
+        dependency_graph = nx.DiGraph()
+        dependency_graph.add_nodes_from(result.keys())
+        for subjob_id, subjob_dict in result.items():
+            for dep_id in subjob_dict.get("dependencies", []):
+                dependency_graph.add_edge(dep_id, subjob_id)
+        if not nx.is_directed_acyclic_graph(dependency_graph):
+            raise ValueError("The dependencies of the decomposed subtasks contain a cycle.")
+
+        return result
+
+    def set_job_schedulers(
+        self, job_scheduler: JobScheduler, original_job_scheduler: JobScheduler
+    ) -> None:
+        """Set the schedulers of the subjobs and the original jobs."""
+        self._job_scheduler = job_scheduler
+        self._original_job_scheduler = original_job_scheduler
+
+    def submit_original_job(
+        self, original_job: Job, priority: JobPriority = JobPriority.INTERACTIVE
+    ) -> Future:
+        """Queue the execution of the original job, and return without waiting for it."""
+        return self._original_job_scheduler.submit(
+            self.execute_original_job,
+            session_id=original_job.session_id,
+            priority=priority,
+            original_job=original_job,
+        )
+
+    def execute_original_job(
+        self, original_job: Job, priority: JobPriority = JobPriority.INTERACTIVE
+    ) -> None:
         """Execute the job."""
         # update the job status to running
         original_job_result = self._job_service.get_job_result(job_id=original_job.id)
@@ -284,172 +537,293 @@ class Leader(Agent):
                 f"{original_job_result.status.value}."
             )
 
-        # decompose the job into decomposed job graph
-        decomposed_job_graph: JobGraph = self.execute(
-            agent_message=AgentMessage(
-                job_id=original_job.id,
+        # the decomposition can be cancelled as well as the subjobs
+        self._job_service.register_cancellation_token(original_job_id=original_job.id)
+        try:
+            # decompose the job into decomposed job graph
+            decomposed_job_graph: JobGraph = self.execute(
+                agent_message=AgentMessage(
+                    job_id=original_job.id,
+                ),
+                priority=priority,
             )
-        )
 
-        # update the decomposed job graph in the job service
-        self._job_service.replace_subgraph(
-            original_job_id=original_job.id, new_subgraph=decomposed_job_graph
-        )
+            # update the decomposed job graph in the job service
+            self._job_service.replace_subgraph(
+                original_job_id=original_job.id, new_subgraph=decomposed_job_graph
+            )
 
-        # execute the decomposed job graph
-        self.execute_job_graph(original_job_id=original_job.id)
+            # execute the decomposed job graph
+            self.execute_job_graph(original_job_id=original_job.id, priority=priority)
+        finally:
+            self._job_service.release_cancellation_token(original_job_id=original_job.id)
 
-    def execute_job_graph(self, original_job_id: str) -> None:
+    def execute_job_graph(
+        self, original_job_id: str, priority: JobPriority = JobPriority.INTERACTIVE
+    ) -> None:
         """Execute the job graph with dependency-based parallel execution.
 
         Jobs are represented in a directed graph (job_graph) where edges define dependencies.
         Please make sure the job graph is a directed acyclic graph (DAG).
 
+        The scheduler is driven by the completion of the subjobs: it blocks until at least one
+        running subjob finishes, and keeps the count of unfinished predecessors for every waiting
+        subjob, so that the subjobs which become ready are found without scanning the graph.
+
+        The subjobs are executed by the job scheduler shared by the process, which bounds the
+        number of the concurrent subjobs and queues them fairly across the sessions. The ready
+        subjobs are submitted (and ranked in the scheduler) by their remaining critical path
+        length, estimated by the historical durations of the experts, so that the long chains of
+        the job graph start first.
+
+        Once the job graph is stopped (or failed), the queued subjobs are dropped from the job
+        scheduler, and the running subjobs stop at their next cancellation check.
+
         Args:
             original_job_id (str): The original job id.
+            priority (JobPriority): The priority class of the subjobs in the job scheduler.
         """
+        cancellation_token = self._job_service.register_cancellation_token(
+            original_job_id=original_job_id
+        )
+        try:
+            self._execute_job_graph(
+                original_job_id=original_job_id,
+                priority=priority,
+                cancellation_token=cancellation_token,
+            )
+        finally:
+            self._job_service.release_cancellation_token(original_job_id=original_job_id)
+            self._reexecution_service.clear(original_job_id=original_job_id)
+
+    def _execute_job_graph(
+        self, original_job_id: str, priority: JobPriority, cancellation_token: CancellationToken
+    ) -> None:
+        """Execute the job graph, until all the subjobs are completed or it is cancelled."""
         # TODO: move the router functionality to the experts, and make the experts be able to
         # dispatch the agent messages to the corresponding agents. The objective is to make the
         # multi-agent system more flexible, scalable, and distributed.
 
         job_graph: JobGraph = self._job_service.get_job_graph(original_job_id)
-        pending_job_ids: Set[str] = set(job_graph.vertices())
-        running_jobs: Dict[str, Future] = {}  # job_id -> Concurrent Future
         expert_results: Dict[str, WorkflowMessage] = {}  # job_id -> WorkflowMessage (expert result)
         job_inputs: Dict[str, AgentMessage] = {}  # job_id -> AgentMessage (input)
+        reexecution_counts: Dict[str, int] = {}  # job_id -> times re-executed for INPUT_DATA_ERROR
 
-        with ThreadPoolExecutor() as executor:
-            while pending_job_ids or running_jobs:
-                # find jobs that are ready to execute (all dependencies completed)
-                ready_job_ids: Set[str] = set()
-                for job_id in pending_job_ids:
-                    # check if all predecessors are completed
-                    all_predecessors_completed = all(
-                        pred not in pending_job_ids and pred not in running_jobs
-                        for pred in job_graph.predecessors(job_id)
-                    )
-                    if all_predecessors_completed:
-                        # form the agent message to the agent
-                        job: SubJob = self._job_service.get_subjob(job_id)
-                        pred_messages: List[WorkflowMessage] = [
-                            expert_results[pred_id] for pred_id in job_graph.predecessors(job_id)
-                        ]
-                        job_inputs[job.id] = AgentMessage(
-                            job_id=job.id, workflow_messages=pred_messages
-                        )
-                        ready_job_ids.add(job_id)
-
-                # execute ready jobs
-                for job_id in ready_job_ids:
-                    expert_id = self._job_service.get_subjob(job_id).expert_id
-                    assert expert_id, "The subjob is not assigned to an expert."
-                    expert = self.state.get_expert_by_id(expert_id=expert_id)
-                    # submit the job to the executor
-                    running_jobs[job_id] = executor.submit(
-                        self._execute_job, expert, job_inputs[job_id]
-                    )
-                    pending_job_ids.remove(job_id)
+        # job_id -> number of the predecessors which have not been completed yet
+        waiting_jobs: Dict[str, int] = {}
+        # heap of (-critical path length, sequence, job_id), the longest critical path first
+        ready_job_ids: List[Tuple[float, int, str]] = []
+        running_jobs: Dict[Future, str] = {}  # Concurrent Future -> job_id
+
+        # job_id -> remaining critical path length
+        critical_path_lengths: Dict[str, float] = self._job_service.get_critical_path_lengths(
+            original_job_id=original_job_id, job_graph=job_graph
+        )
+        sequence = itertools.count()
+
+        def push_ready_job(ready_job_id: str) -> None:
+            """Add the job to the ready jobs, ranked by its remaining critical path length."""
+            rank = critical_path_lengths.get(ready_job_id, 0.0)
+            heapq.heappush(ready_job_ids, (-rank, next(sequence), ready_job_id))
+
+        for job_id in job_graph.vertices():
+            indegree = len(job_graph.predecessors(job_id))
+            if indegree == 0:
+                push_ready_job(job_id)
+            else:
+                waiting_jobs[job_id] = indegree
+
+        def reset_waiting_jobs() -> None:
+            """Recount the uncompleted predecessors of the waiting jobs, after rewiring."""
+            for waiting_job_id in list(waiting_jobs.keys()):
+                if not job_graph.has_vertex(waiting_job_id):
+                    del waiting_jobs[waiting_job_id]
+                    continue
+                waiting_jobs[waiting_job_id] = sum(
+                    1
+                    for pred_id in job_graph.predecessors(waiting_job_id)
+                    if pred_id not in expert_results
+                )
+                if waiting_jobs[waiting_job_id] == 0:
+                    del waiting_jobs[waiting_job_id]
+                    push_ready_job(waiting_job_id)
+
+        while ready_job_ids or running_jobs:
+            if cancellation_token.is_cancelled():
+                # drop the queued subjobs, and wait for the running subjobs which abort at their
+                # next cancellation check (between the reasoning rounds / tool calls / operators)
+                for future in running_jobs:
+                    future.cancel()
+                wait(running_jobs.keys())
+                break
+
+            # execute ready jobs (all dependencies completed)
+            while ready_job_ids:
+                neg_rank, _, job_id = heapq.heappop(ready_job_ids)
+                job: SubJob = self._job_service.get_subjob(job_id)
+
+                # form the agent message to the agent, and keep the lessons of the
+                # re-executed jobs
+                pred_messages: List[WorkflowMessage] = [
+                    expert_results[pred_id] for pred_id in job_graph.predecessors(job_id)
+                ]
+                job_inputs[job_id] = AgentMessage(
+                    job_id=job.id,
+                    workflow_messages=pred_messages,
+                    lesson=job_inputs[job_id].get_lesson() if job_id in job_inputs else None,
+                )
 
-                # if there are no running jobs but still pending jobs, it may be a deadlock
-                if not running_jobs and pending_job_ids:
+                # submit the job to the executor (or the durable subjob queue)
+                future = self._submit_subjob(
+                    subjob=job, agent_message=job_inputs[job_id], priority=priority, rank=-neg_rank
+                )
+                running_jobs[future] = job_id
+
+            # if there are no running jobs but still waiting jobs, it may be a deadlock
+            if not running_jobs:
+                if waiting_jobs:
                     raise ValueError(
-                        "Deadlock detected or invalid job graph: some jobs cannot be executed due "
-                        "to dependencies."
+                        "Deadlock detected or invalid job graph: some jobs cannot be executed "
+                        "due to dependencies."
                     )
+                break
 
-                # check for completed jobs
-                completed_job_ids = []
-                for job_id, future in running_jobs.items():
-                    if future.done():
-                        completed_job_ids.append(job_id)
+            # block until at least one of the running jobs is completed
+            done_futures, _ = wait(running_jobs.keys(), return_when=FIRST_COMPLETED)
 
-                # process completed jobs
-                for completed_job_id in completed_job_ids:
-                    future = running_jobs[completed_job_id]
+            # process completed jobs
+            for future in done_futures:
+                completed_job_id = running_jobs.pop(future)
 
-                    # get the agent result
+                # get the agent result, the cancelled job graph will be stopped in the next loop
+                try:
                     agent_result: AgentMessage = future.result()
+                except JobCancelledError:
+                    continue
+                workflow_status = agent_result.get_workflow_result_message().status
+
+                if workflow_status == WorkflowStatus.INPUT_DATA_ERROR:
+                    # TODO: how to handle the concurrent situations?
+                    # re-execute only the predecessors whose outputs were consumed and blamed
+                    # by the subjob, and they resume from their last operator outputs
+                    consumed_job_ids = {
+                        message.get_job_id()
+                        for message in job_inputs[completed_job_id].get_workflow_messages()
+                    }
+                    predecessors = self._reexecution_service.plan_recovery(
+                        original_job_id=original_job_id,
+                        consumed_job_ids=[
+                            pred_id
+                            for pred_id in job_graph.predecessors(completed_job_id)
+                            if pred_id in consumed_job_ids
+                        ],
+                        faulty_job_ids=agent_result.get_workflow_result_message()
+                        .get_payload()
+                        .get("faulty_input_job_ids", []),
+                    )
 
-                    if (
-                        agent_result.get_workflow_result_message().status
-                        == WorkflowStatus.INPUT_DATA_ERROR
-                    ):
-                        # TODO: how to handle the concurrent situations?
-                        pending_job_ids.add(completed_job_id)
-                        predecessors = list(job_graph.predecessors(completed_job_id))
-
-                        # add the predecessors back to pending jobs
-                        pending_job_ids.update(predecessors)
-
-                        if predecessors:
-                            for pred_id in predecessors:
-                                # remove the job result
-                                if pred_id in expert_results:
-                                    del expert_results[pred_id]
-                                    # update the result in the job service
-                                    self._job_service.remove_subjob(
-                                        original_job_id=original_job_id, job_id=pred_id
-                                    )
-
-                                # update the lesson in the agent message
-                                input_agent_message = job_inputs[pred_id]
-                                lesson = agent_result.get_lesson()
-                                assert lesson is not None
-                                input_agent_message.add_lesson(lesson)
-                                job_inputs[pred_id] = input_agent_message
-
-                    elif (
-                        agent_result.get_workflow_result_message().status
-                        == WorkflowStatus.JOB_TOO_COMPLICATED_ERROR
-                    ):
-                        # TODO: how to handle the concurrent situations?
-                        old_job_graph: JobGraph = JobGraph()
-                        old_job_graph.add_vertex(completed_job_id)
-
-                        # reexecute the subjob with a new sub-subjob
-                        new_job_graqph: JobGraph = self.execute(agent_message=agent_result)
-                        self._job_service.replace_subgraph(
-                            original_job_id=original_job_id,
-                            new_subgraph=new_job_graqph,
-                            old_subgraph=old_job_graph,
+                    # the re-executions are bounded, so that the job graph does not loop forever,
+                    # and the subjob itself is re-executed if there is no predecessor to recover
+                    reexecuted_job_ids = predecessors or [completed_job_id]
+                    exhausted_job_ids = [
+                        reexecuted_job_id
+                        for reexecuted_job_id in reexecuted_job_ids
+                        if reexecution_counts.get(reexecuted_job_id, 0)
+                        >= SystemEnv.MAX_REEXECUTION_COUNT
+                    ]
+                    if exhausted_job_ids:
+                        self._reexecution_service.record_exhausted()
+                        self.fail_job_graph(
+                            job_id=completed_job_id,
+                            error_info=(
+                                f"The input of the job {completed_job_id} is still invalid, after "
+                                f"the jobs {exhausted_job_ids} were re-executed "
+                                f"{SystemEnv.MAX_REEXECUTION_COUNT} times.\n"
+                                f"Lesson: {agent_result.get_lesson()}"
+                            ),
                         )
+                        continue
 
-                        # get the newest job graph
-                        job_graph = self._job_service.get_job_graph(original_job_id)
-
-                        # remove the old subjob from the pending jobs
-                        del running_jobs[completed_job_id]
-
-                        # save the old subjob result
-                        expert_results[completed_job_id] = (
-                            agent_result.get_workflow_result_message()
+                    if not predecessors:
+                        reexecution_counts[completed_job_id] = (
+                            reexecution_counts.get(completed_job_id, 0) + 1
                         )
+                        lesson = agent_result.get_lesson()
+                        if lesson:
+                            job_inputs[completed_job_id].add_lesson(lesson)
+                        push_ready_job(completed_job_id)
+                        continue
+
+                    waiting_jobs[completed_job_id] = len(predecessors)
+                    for pred_id in predecessors:
+                        reexecution_counts[pred_id] = reexecution_counts.get(pred_id, 0) + 1
+
+                        # remove the job result
+                        if pred_id in expert_results:
+                            del expert_results[pred_id]
+                            # reset the result in the job service, so that the expert executes
+                            # the job again instead of returning the saved result
+                            pred_result = self._job_service.get_job_result(job_id=pred_id)
+                            pred_result.status = JobStatus.CREATED
+                            self._job_service.save_job_result(job_result=pred_result)
+
+                            # the waiting successors have to wait for the re-executed job
+                            for succ_id in job_graph.successors(pred_id):
+                                if succ_id in waiting_jobs and succ_id != completed_job_id:
+                                    waiting_jobs[succ_id] += 1
+
+                        # update the lesson in the agent message
+                        input_agent_message = job_inputs[pred_id]
+                        lesson = agent_result.get_lesson()
+                        assert lesson is not None
+                        input_agent_message.add_lesson(lesson)
+                        job_inputs[pred_id] = input_agent_message
+
+                        # add the predecessors back to ready jobs
+                        if pred_id not in running_jobs.values():
+                            push_ready_job(pred_id)
+
+                elif workflow_status == WorkflowStatus.JOB_TOO_COMPLICATED_ERROR:
+                    # TODO: how to handle the concurrent situations?
+                    old_job_graph: JobGraph = JobGraph()
+                    old_job_graph.add_vertex(completed_job_id)
+
+                    # reexecute the subjob with a new sub-subjob
+                    new_job_graph: JobGraph = self.execute(
+                        agent_message=agent_result, priority=priority
+                    )
+                    self._job_service.replace_subgraph(
+                        original_job_id=original_job_id,
+                        new_subgraph=new_job_graph,
+                        old_subgraph=old_job_graph,
+                    )
 
-                        for new_subjob_id in new_job_graqph.vertices():
-                            # add the new subjobs to the pending jobs
-                            pending_job_ids.add(new_subjob_id)
-                            # add the inputs for the new head subjobs
-                            if not job_graph.predecessors(new_subjob_id):
-                                pred_messages = [
-                                    expert_results[pred_id]
-                                    for pred_id in job_graph.predecessors(new_subjob_id)
-                                ]
-                                job_inputs[new_subjob_id] = AgentMessage(
-                                    job_id=new_subjob_id,
-                                    workflow_messages=pred_messages,
-                                )
-
-                    else:
-                        expert_results[completed_job_id] = (
-                            agent_result.get_workflow_result_message()
-                        )
+                    # get the newest job graph
+                    job_graph = self._job_service.get_job_graph(original_job_id)
 
-                    # remove from running jobs
-                    del running_jobs[completed_job_id]
+                    # save the old subjob result
+                    expert_results[completed_job_id] = agent_result.get_workflow_result_message()
 
-                # if no jobs are ready but some are pending, wait a bit
-                if not completed_job_ids and running_jobs:
-                    time.sleep(0.5)
+                    # add the new subjobs to the waiting jobs, and recount the dependencies
+                    # and the critical paths of the waiting jobs in the rewired job graph
+                    critical_path_lengths = self._job_service.get_critical_path_lengths(
+                        original_job_id=original_job_id, job_graph=job_graph
+                    )
+                    for new_subjob_id in new_job_graph.vertices():
+                        waiting_jobs[new_subjob_id] = 0
+                    reset_waiting_jobs()
+
+                else:
+                    expert_results[completed_job_id] = agent_result.get_workflow_result_message()
+
+                    # notify the successors, and release the ones without pending dependencies
+                    for succ_id in job_graph.successors(completed_job_id):
+                        if succ_id not in waiting_jobs:
+                            continue
+                        waiting_jobs[succ_id] -= 1
+                        if waiting_jobs[succ_id] == 0:
+                            del waiting_jobs[succ_id]
+                            push_ready_job(succ_id)
 
     def stop_job_graph(self, job_id: str, stop_info: str) -> None:
         """Stop the job graph.
@@ -458,8 +832,9 @@ class Leader(Agent):
         entire current job as `STOPPED`, while other jobs without results (including subjobs and
         original jobs) are marked as `STOPPED`.
 
-        Note that the running jobs are not stopped, since they are already set up in the
-        ThreadPoolExecutor. The running jobs will be marked as `STOPPED` when they are finished.
+        The cancellation token of the job graph is cancelled as well, so that the queued subjobs
+        are dropped from the job scheduler, and the running subjobs (including their in-flight LLM
+        requests) are aborted at their next cancellation check.
         """
         # get the original job
         try:
@@ -470,6 +845,9 @@ class Leader(Agent):
                 raise ValueError("The subjob is not assigned to an original job.") from e
             original_job = self._job_service.get_original_job(original_job_id=job.original_job_id)
 
+        # abort the running subjobs, to give back their workers as soon as possible
+        self._job_service.cancel_job_graph(original_job_id=original_job.id, reason=stop_info)
+
         # save the final system message with the error information
         self._save_failed_or_stopped_message(original_job=original_job, message_payload=stop_info)
 
@@ -504,6 +882,9 @@ class Leader(Agent):
                     original_job_id=job.original_job_id
                 )
 
+            # abort the other running subjobs, since the job graph can not be completed any more
+            self._job_service.cancel_job_graph(original_job_id=original_job.id, reason=error_info)
+
             # save the final system message with the error information
             self._save_failed_or_stopped_message(
                 original_job=original_job, message_payload=error_info
@@ -540,7 +921,7 @@ class Leader(Agent):
                 self._job_service.save_job_result(job_result=original_job_result)
 
                 # start to execute the original job
-                run_in_thread(self.execute_original_job, original_job=original_job)
+                self.submit_original_job(original_job=original_job)
 
             else:
                 # if there are subjobs, it means leader decomposed the original job,
@@ -555,7 +936,57 @@ class Leader(Agent):
                         self._job_service.save_job_result(job_result=sub_job_result)
 
                 # start to execute the job graph
-                run_in_thread(self.execute_job_graph, original_job_id=original_job_id)
+                self._original_job_scheduler.submit(
+                    self.execute_job_graph,
+                    session_id=original_job.session_id,
+                    original_job_id=original_job_id,
+                )
+
+    def _submit_subjob(
+        self, subjob: SubJob, agent_message: AgentMessage, priority: JobPriority, rank: float
+    ) -> Future:
+        """Submit the ready subjob to the job scheduler, or queue it in the durable subjob queue to
+        be claimed by the expert workers (`python -m app.worker`), if the queue is enabled."""
+        assert subjob.expert_id, "The subjob is not assigned to an expert."
+        if SystemEnv.SUBJOB_QUEUE_ENABLED:
+            job_queue_service: JobQueueService = JobQueueService.instance
+            return job_queue_service.enqueue(
+                agent_message=agent_message, priority=priority, rank=rank
+            )
+
+        expert = self.state.get_expert_by_id(expert_id=subjob.expert_id)
+        return self._job_scheduler.submit(
+            self._execute_job,
+            expert,
+            agent_message,
+            session_id=subjob.session_id,
+            priority=priority,
+            rank=rank,
+            concurrency_key=expert.get_profile().name,
+        )
+
+    def execute_subjob(self, agent_message: AgentMessage) -> AgentMessage:
+        """Execute the subjob claimed from the durable subjob queue by the expert worker.
+
+        The experts are identified by their names, so the worker process which loads the same
+        agentic config resolves the same expert as the leader does.
+
+        The cancellation tokens are per process, so a stop of the job graph reaches the subjobs
+        running in the worker by its next heartbeat (every SUBJOB_QUEUE_LEASE_DURATION / 3
+        seconds). The status of the original job is checked before the subjob is executed, so
+        the subjob claimed after the stop is not executed at all.
+        """
+        subjob: SubJob = self._job_service.get_subjob(subjob_id=agent_message.get_job_id())
+        original_job_result = self._job_service.get_job_result(job_id=subjob.original_job_id)
+        if original_job_result.status in (JobStatus.STOPPED, JobStatus.FAILED):
+            reason = f"The job graph of {subjob.original_job_id} has been stopped."
+            self._job_service.cancel_job_graph(
+                original_job_id=subjob.original_job_id, reason=reason
+            )
+            raise JobCancelledError(reason)
+        assert subjob.expert_id, "The subjob is not assigned to an expert."
+        expert = self.state.get_expert_by_id(expert_id=subjob.expert_id)
+        return self._execute_job(expert=expert, agent_message=agent_message)
 
     def _stop_running_subjobs(self, original_job_id: str) -> None:
         """Stop all running jobs for the given original job."""
@@ -564,7 +995,7 @@ class Leader(Agent):
         for subjob_id in subjob_ids:
             # get the subjob result
             subjob_result = self._job_service.get_job_result(job_id=subjob_id)
-            if subjob_result.status == JobStatus.RUNNING:
+            if subjob_result.status in (JobStatus.RUNNING, JobStatus.QUEUED):
                 # mark the subjob as stopped
                 subjob_result.status = JobStatus.STOPPED
                 self._job_service.save_job_result(job_result=subjob_result)
@@ -635,17 +1066,9 @@ class Leader(Agent):
                     f"(initial life cycle: {SystemEnv.LIFE_CYCLE})"
                 )
 
-            # construct the job graph which will be replaced by the new sub job graph
-            replaced_job_graph: JobGraph = JobGraph()
-            replaced_job_graph.add_vertex(subjob.id)
-
-            # reexecute the subjob with a new sub-subjob
-            new_job_graqph: JobGraph = self.execute(agent_message=agent_result_message)
-            self._job_service.replace_subgraph(
-                original_job_id=subjob.id,
-                new_subgraph=new_job_graqph,
-                old_subgraph=replaced_job_graph,
-            )
+            # the job graph scheduler will decompose the subjob into a new sub-subjob graph,
+            # and rewire it into the job graph
+            return agent_result_message
 
         raise ValueError(
             f"Job {agent_message.get_job_id()} failed with an unexpected status: "
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+from typing import Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class JobCancelledError(Exception):
+    """Raised when the job graph, which the running job belongs to, is stopped or failed."""
+
+
+class CancellationToken:
+    """The cooperative cancellation token of an original job (and all of its subjobs).
+
+    The token is cancelled by the leader when the job graph is stopped or failed, and checked by
+    the running experts at the safe points (between the operators of the workflow, between the
+    rounds of the reasoner, and before the tool calls), so that a stopped job gives back its worker
+    without finishing the remaining reasoning rounds.
+
+    A token can be linked to a parent token (e.g. the token of an attempt linked to the token of
+    the job graph), so that it is cancelled once either of them is cancelled.
+
+    Attributes:
+        _event (threading.Event): Set when the token is cancelled.
+        _reason (Optional[str]): The reason of the cancellation.
+        _poll_interval (float): The interval (in seconds) to check the token, while awaiting a
+            cancellable coroutine.
+        _parent (Optional[CancellationToken]): The parent token.
+    """
+
+    def __init__(self, poll_interval: float = 0.1, parent: Optional["CancellationToken"] = None):
+        self._event: threading.Event = threading.Event()
+        self._reason: Optional[str] = None
+        self._poll_interval: float = poll_interval
+        self._parent: Optional[CancellationToken] = parent
+
+    @property
+    def reason(self) -> Optional[str]:
+        """Get the reason of the cancellation."""
+        if not self._event.is_set() and self._parent and self._parent.is_cancelled():
+            return self._parent.reason
+        return self._reason
+
+    def cancel(self, reason: Optional[str] = None) -> None:
+        """Cancel the token. It is thread-safe and idempotent."""
+        if not self._event.is_set():
+            self._reason = reason
+            self._event.set()
+
+    def is_cancelled(self) -> bool:
+        """Check whether the token (or its parent) is cancelled."""
+        return self._event.is_set() or bool(self._parent and self._parent.is_cancelled())
+
+    def raise_if_cancelled(self) -> None:
+        """Raise JobCancelledError if the token is cancelled."""
+        if self.is_cancelled():
+            raise JobCancelledError(self.reason or "The job has been cancelled.")
+
+    async def run(self, awaitable: Awaitable[T]) -> T:
+        """Await the awaitable (e.g. an LLM request), and cancel it once the token is cancelled.
+
+        Returns:
+            T: The result of the awaitable.
+
+        Raises:
+            JobCancelledError: If the token is cancelled before the awaitable is done.
+        """
+        self.raise_if_cancelled()
+
+        future = asyncio.ensure_future(awaitable)
+        while not future.done():
+            await asyncio.wait({future}, timeout=self._poll_interval)
+            if not future.done() and self.is_cancelled():
+                # cancel the in-flight request, e.g. close the HTTP connection to the LLM
+                future.cancel()
+                try:
+                    await future
+                except asyncio.CancelledError:
+                    pass
+                self.raise_if_cancelled()
+        return future.result()
@@ -0,0 +1,380 @@
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, cast
+
+from app.core.common.type import JobPriority
+
+DEFAULT_SESSION_ID = "__default_session__"
+
+
+@dataclass
+class JobSchedulerStats:
+    """The snapshot of the job scheduler metrics.
+
+    Attributes:
+        max_workers (int): The worker cap of the scheduler.
+        worker_count (int): The number of the started worker threads.
+        running_count (int): The number of the jobs which are being executed.
+        queue_depth (int): The number of the queued jobs (including the throttled ones).
+        queue_depth_by_priority (Dict[str, int]): The number of the queued jobs per priority class.
+        queue_depth_by_session (Dict[str, int]): The number of the queued jobs per session.
+        submitted_count (int): The number of the submitted jobs.
+        completed_count (int): The number of the completed (or failed) jobs.
+        avg_wait_time (float): The average queueing time (in seconds) of the started jobs.
+        max_wait_time (float): The max queueing time (in seconds) of the started jobs.
+        concurrency_limits (Dict[str, int]): The max number of the running jobs per concurrency
+            key (e.g. the expert name).
+        running_count_by_key (Dict[str, int]): The number of the running jobs per concurrency key.
+        throttled_count_by_key (Dict[str, int]): The number of the jobs waiting for a free slot
+            of their concurrency keys.
+    """
+
+    max_workers: int
+    worker_count: int
+    running_count: int
+    queue_depth: int
+    queue_depth_by_priority: Dict[str, int] = field(default_factory=dict)
+    queue_depth_by_session: Dict[str, int] = field(default_factory=dict)
+    submitted_count: int = 0
+    completed_count: int = 0
+    avg_wait_time: float = 0.0
+    max_wait_time: float = 0.0
+    concurrency_limits: Dict[str, int] = field(default_factory=dict)
+    running_count_by_key: Dict[str, int] = field(default_factory=dict)
+    throttled_count_by_key: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class _ScheduledJob:
+    """A queued callable."""
+
+    future: Future
+    func: Callable[..., Any]
+    args: Tuple[Any, ...]
+    kwargs: Dict[str, Any]
+    session_id: str
+    submitted_at: float
+    concurrency_key: Optional[str] = None
+
+
+@dataclass
+class _SessionQueue:
+    """The queued jobs of a session.
+
+    The virtual start tags are consumed in FIFO order to share the workers fairly across the
+    sessions, while the jobs of the session are dispatched by their ranks (the higher the earlier,
+    FIFO for the same rank).
+    """
+
+    start_tags: Deque[float] = field(default_factory=deque)
+    jobs: List[Tuple[float, int, _ScheduledJob]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.jobs)
+
+
+class JobScheduler:
+    """A bounded executor with weighted-fair queuing across sessions and priority classes.
+
+    The jobs are queued per priority class and per session. A queued job is dispatched to one of
+    at most `max_workers` worker threads (started lazily), following the rules:
+        1. The jobs of the INTERACTIVE class are always dispatched before the BATCH ones.
+        2. In the same priority class, the sessions share the workers in proportion to their
+            weights (start-time fair queuing), so that a session submitting a burst of jobs can not
+            starve the other sessions.
+        3. In the same session, the jobs are dispatched by their ranks (e.g. the remaining
+            critical path length of the subjob in the job graph), and in FIFO order for the same
+            rank.
+        4. A job with a concurrency key (e.g. the expert name) is throttled, if the running jobs of
+            the key reach its concurrency limit: it waits in the throttled queue of the key without
+            holding a worker, and it is dispatched (before the queued jobs) once a job of the key
+            completes. So a burst of heavy jobs of one key can not starve the other keys.
+
+    The `submit` method returns a `concurrent.futures.Future` immediately.
+
+    Attributes:
+        _max_workers (int): The worker cap.
+        _condition (threading.Condition): The condition to guard the queues and wake the workers.
+        _queues (Dict[JobPriority, Dict[str, _SessionQueue]]): priority -> session_id -> the
+            queued jobs of the session.
+        _virtual_times (Dict[JobPriority, float]): The virtual time of each priority class.
+        _finish_tags (Dict[JobPriority, Dict[str, float]]): The virtual finish tag of the latest
+            queued job of each session.
+        _session_weights (Dict[str, float]): session_id -> weight (1.0 by default).
+        _concurrency_limits (Dict[str, int]): concurrency key -> the max number of running jobs.
+        _running_count_by_key (Dict[str, int]): concurrency key -> the number of running jobs.
+        _throttled_jobs (Dict[str, Deque[_ScheduledJob]]): concurrency key -> the jobs waiting for
+            a free slot of the key, in the dispatching order.
+    """
+
+    def __init__(self, max_workers: int, name: str = "job_scheduler"):
+        if max_workers <= 0:
+            raise ValueError("The max workers of the job scheduler must be positive.")
+        self._max_workers: int = max_workers
+        self._name: str = name
+
+        self._condition: threading.Condition = threading.Condition()
+        self._queues: Dict[JobPriority, Dict[str, _SessionQueue]] = {
+            priority: {} for priority in JobPriority
+        }
+        self._sequence = itertools.count()
+        self._virtual_times: Dict[JobPriority, float] = dict.fromkeys(JobPriority, 0.0)
+        self._finish_tags: Dict[JobPriority, Dict[str, float]] = {
+            priority: {} for priority in JobPriority
+        }
+        self._session_weights: Dict[str, float] = {}
+        self._concurrency_limits: Dict[str, int] = {}
+        self._running_count_by_key: Dict[str, int] = {}
+        self._throttled_jobs: Dict[str, Deque[_ScheduledJob]] = {}
+
+        self._workers: List[threading.Thread] = []
+        self._idle_worker_count: int = 0
+        self._running_count: int = 0
+
+        # metrics
+        self._submitted_count: int = 0
+        self._completed_count: int = 0
+        self._started_count: int = 0
+        self._total_wait_time: float = 0.0
+        self._max_wait_time: float = 0.0
+
+    @property
+    def max_workers(self) -> int:
+        """Get the worker cap of the scheduler."""
+        return self._max_workers
+
+    def set_session_weight(self, session_id: str, weight: float) -> None:
+        """Set the share of the workers of the session, relative to the other sessions."""
+        if weight <= 0:
+            raise ValueError("The weight of the session must be positive.")
+        with self._condition:
+            self._session_weights[session_id] = weight
+
+    def set_concurrency_limit(self, key: str, limit: Optional[int]) -> None:
+        """Set the max number of the running jobs of the concurrency key, or remove the limit if
+        it is None."""
+        if limit is not None and limit <= 0:
+            raise ValueError("The concurrency limit must be positive.")
+        with self._condition:
+            if limit is None:
+                self._concurrency_limits.pop(key, None)
+            else:
+                self._concurrency_limits[key] = limit
+            # the throttled jobs may be admitted by the raised (or removed) limit
+            self._condition.notify_all()
+
+    def submit(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        session_id: Optional[str] = None,
+        priority: JobPriority = JobPriority.INTERACTIVE,
+        rank: float = 0.0,
+        concurrency_key: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Future:
+        """Queue the callable, and return its future without waiting for a free worker.
+
+        Args:
+            func (Callable[..., Any]): The callable to execute.
+            *args (Any): The positional arguments of the callable.
+            session_id (Optional[str]): The session which the job belongs to, used for the fair
+                queuing across sessions.
+            priority (JobPriority): The priority class of the job.
+            rank (float): The rank of the job among the queued jobs of the same session, the
+                higher the earlier.
+            concurrency_key (Optional[str]): The key (e.g. the expert name) whose concurrency limit
+                bounds the job.
+            **kwargs (Any): The keyword arguments of the callable.
+
+        Returns:
+            Future: The future of the result of the callable.
+        """
+        future: Future = Future()
+        session_id = session_id or DEFAULT_SESSION_ID
+
+        with self._condition:
+            # start-time fair queuing: the job starts (in virtual time) after the previous job of
+            # the same session finishes, and the job costs 1/weight of the virtual time
+            start_tag = max(
+                self._virtual_times[priority],
+                self._finish_tags[priority].get(session_id, 0.0),
+            )
+            weight = self._session_weights.get(session_id, 1.0)
+            self._finish_tags[priority][session_id] = start_tag + 1.0 / weight
+
+            session_queues = self._queues[priority]
+            if session_id not in session_queues:
+                session_queues[session_id] = _SessionQueue()
+            session_queue = session_queues[session_id]
+            session_queue.start_tags.append(start_tag)
+            heapq.heappush(
+                session_queue.jobs,
+                (
+                    -rank,
+                    next(self._sequence),
+                    _ScheduledJob(
+                        future=future,
+                        func=func,
+                        args=args,
+                        kwargs=kwargs,
+                        session_id=session_id,
+                        submitted_at=time.time(),
+                        concurrency_key=concurrency_key,
+                    ),
+                ),
+            )
+            self._submitted_count += 1
+
+            # start a new worker lazily, if all the started workers are busy
+            if self._idle_worker_count == 0 and len(self._workers) < self._max_workers:
+                worker = threading.Thread(
+                    target=self._work,
+                    name=f"{self._name}_worker_{len(self._workers)}",
+                    daemon=True,
+                )
+                self._workers.append(worker)
+                worker.start()
+            else:
+                self._condition.notify()
+
+        return future
+
+    def queue_depth(self) -> int:
+        """Get the number of the queued jobs."""
+        with self._condition:
+            return self._queue_depth()
+
+    def get_stats(self) -> JobSchedulerStats:
+        """Get the snapshot of the scheduler metrics."""
+        with self._condition:
+            queue_depth_by_session: Dict[str, int] = {}
+            for session_queues in self._queues.values():
+                for session_id, queue in session_queues.items():
+                    queue_depth_by_session[session_id] = queue_depth_by_session.get(
+                        session_id, 0
+                    ) + len(queue)
+            return JobSchedulerStats(
+                max_workers=self._max_workers,
+                worker_count=len(self._workers),
+                running_count=self._running_count,
+                queue_depth=self._queue_depth(),
+                queue_depth_by_priority={
+                    priority.value: sum(len(queue) for queue in session_queues.values())
+                    for priority, session_queues in self._queues.items()
+                },
+                queue_depth_by_session=queue_depth_by_session,
+                submitted_count=self._submitted_count,
+                completed_count=self._completed_count,
+                avg_wait_time=(
+                    self._total_wait_time / self._started_count if self._started_count else 0.0
+                ),
+                max_wait_time=self._max_wait_time,
+                concurrency_limits=dict(self._concurrency_limits),
+                running_count_by_key={
+                    key: count for key, count in self._running_count_by_key.items() if count
+                },
+                throttled_count_by_key={
+                    key: len(jobs) for key, jobs in self._throttled_jobs.items()
+                },
+            )
+
+    def _queue_depth(self) -> int:
+        """Get the number of the queued jobs, the caller must hold the lock."""
+        return sum(
+            len(queue)
+            for session_queues in self._queues.values()
+            for queue in session_queues.values()
+        ) + sum(len(jobs) for jobs in self._throttled_jobs.values())
+
+    def _is_saturated(self, key: Optional[str]) -> bool:
+        """Check whether the running jobs of the key reach its limit, the caller must hold the
+        lock."""
+        if key is None or key not in self._concurrency_limits:
+            return False
+        return self._running_count_by_key.get(key, 0) >= self._concurrency_limits[key]
+
+    def _pop_next_job(self) -> Optional[_ScheduledJob]:
+        """Pop the next job to execute, and take a slot of its concurrency key, the caller must
+        hold the lock."""
+        # the throttled jobs were dispatched before the queued ones, so they go first
+        key = next(
+            (key for key in self._throttled_jobs if not self._is_saturated(key)),
+            None,
+        )
+        if key is not None:
+            scheduled_job: Optional[_ScheduledJob] = self._throttled_jobs[key].popleft()
+            if not self._throttled_jobs[key]:
+                del self._throttled_jobs[key]
+        else:
+            scheduled_job = self._pop_queued_job()
+            while scheduled_job and self._is_saturated(scheduled_job.concurrency_key):
+                key = cast(str, scheduled_job.concurrency_key)
+                self._throttled_jobs.setdefault(key, deque()).append(scheduled_job)
+                scheduled_job = self._pop_queued_job()
+
+        if scheduled_job and scheduled_job.concurrency_key is not None:
+            key = scheduled_job.concurrency_key
+            self._running_count_by_key[key] = self._running_count_by_key.get(key, 0) + 1
+        return scheduled_job
+
+    def _pop_queued_job(self) -> Optional[_ScheduledJob]:
+        """Pop the next queued job by the fair queuing, the caller must hold the lock."""
+        for priority in JobPriority:  # INTERACTIVE is declared before BATCH
+            session_queues = self._queues[priority]
+            if not session_queues:
+                continue
+
+            # pick the session whose head job has the smallest virtual start tag
+            session_id = min(session_queues, key=lambda s: session_queues[s].start_tags[0])
+            session_queue = session_queues[session_id]
+            start_tag = session_queue.start_tags.popleft()
+            _, _, scheduled_job = heapq.heappop(session_queue.jobs)
+            if not session_queue:
+                del session_queues[session_id]
+            self._virtual_times[priority] = start_tag
+
+            if not session_queues:
+                # the priority class is idle, so reset its virtual clock
+                self._virtual_times[priority] = 0.0
+                self._finish_tags[priority].clear()
+            return scheduled_job
+        return None
+
+    def _work(self) -> None:
+        """The loop of the worker thread."""
+        while True:
+            with self._condition:
+                scheduled_job = self._pop_next_job()
+                while scheduled_job is None:
+                    self._idle_worker_count += 1
+                    self._condition.wait()
+                    self._idle_worker_count -= 1
+                    scheduled_job = self._pop_next_job()
+
+                wait_time = time.time() - scheduled_job.submitted_at
+                self._started_count += 1
+                self._total_wait_time += wait_time
+                self._max_wait_time = max(self._max_wait_time, wait_time)
+                self._running_count += 1
+
+            try:
+                # the job may be cancelled while it was queued
+                if scheduled_job.future.set_running_or_notify_cancel():
+                    try:
+                        result = scheduled_job.func(*scheduled_job.args, **scheduled_job.kwargs)
+                    except BaseException as e:
+                        scheduled_job.future.set_exception(e)
+                    else:
+                        scheduled_job.future.set_result(result)
+            finally:
+                with self._condition:
+                    self._running_count -= 1
+                    self._completed_count += 1
+                    if scheduled_job.concurrency_key is not None:
+                        self._running_count_by_key[scheduled_job.concurrency_key] -= 1
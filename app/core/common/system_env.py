@@ -27,7 +27,40 @@ _env_vars: Dict[str, Tuple[Type, Any]] = {
     "PRINT_REASONER_OUTPUT": (bool, True),
     "LIFE_CYCLE": (int, 3),
     "MAX_RETRY_COUNT": (int, 3),
+    "MAX_REEXECUTION_COUNT": (int, 3),  # re-executions of a subjob for INPUT_DATA_ERROR
+    "MAX_SUBJOB_WORKERS": (int, 16),
+    "MAX_ORIGINAL_JOB_WORKERS": (int, 8),
+    "JOB_GRAPH_CACHE_SIZE": (int, 1024),
+    "CONVERSATION_VIEW_CACHE_SIZE": (int, 1024),  # the views of the finished original jobs
+    "SESSION_HISTORY_TOKEN_BUDGET": (int, 4096),  # the recent turns in the job context
+    "SESSION_HISTORY_SUMMARY_TOKEN_BUDGET": (int, 1024),  # the compacted earlier turns
+    "JOB_EVENT_BUFFER_SIZE": (int, 4096),  # the latest events kept for the progress streams
+    "JOB_EVENT_POLL_TIMEOUT": (float, 25.0),  # seconds, the max wait of a long-poll request
+    "DECOMPOSITION_CACHE_ENABLED": (bool, False),
+    "DECOMPOSITION_CACHE_SIZE": (int, 256),
+    "DECOMPOSITION_CACHE_TTL": (int, 86400),  # seconds, 0 means never expire
+    "DECOMPOSITION_HEDGE_COUNT": (int, 1),  # concurrent decomposition attempts, 1 means no hedging
+    "DECOMPOSITION_HEDGE_TEMPERATURE_SPREAD": (float, 0.3),
+    "EXPERT_ROUTER_ENABLED": (bool, False),  # route the simple requests to an expert directly
+    "EXPERT_ROUTER_CONFIDENCE_THRESHOLD": (float, 0.6),
+    "EXPERT_ROUTER_MAX_GOAL_LENGTH": (int, 200),  # the longer requests are always decomposed
+    "SUBJOB_QUEUE_ENABLED": (bool, False),  # dispatch the subjobs to the workers (app.worker)
+    "SUBJOB_QUEUE_POLL_INTERVAL": (float, 0.5),  # seconds
+    "SUBJOB_QUEUE_LEASE_DURATION": (float, 60.0),  # seconds, renewed by the worker heartbeats
+    "MESSAGE_WRITE_BEHIND_ENABLED": (bool, False),  # write the messages in batches
+    "MESSAGE_WRITE_BEHIND_INTERVAL": (float, 0.05),  # seconds, the max time a message is buffered
+    "MESSAGE_WRITE_BEHIND_SIZE": (int, 64),  # the buffered messages to write without waiting
     "DATABASE_URL": (str, f"sqlite:///{os.path.expanduser('~')}/.chat2graph/system/chat2graph.db"),
+    "TOTAL_COUNT_CACHE_TTL": (float, 10.0),  # seconds, the cached totals of the paged listings
+    "DAO_CACHE_ENABLED": (bool, True),  # disable it, if the database is written by other processes
+    "DAO_CACHE_SIZE": (int, 4096),  # the parsed rows of each kind cached by their ids
+    "RESPONSE_COMPRESSION_MIN_SIZE": (int, 1024),  # bytes, the smaller responses are not compressed
+    "RESPONSE_COMPRESSION_LEVEL": (int, 5),  # the gzip level (1-9) or the brotli quality (0-11)
+    "ASYNC_DATABASE_ENABLED": (bool, False),  # the async engine, `poetry install -E async` first
+    "SQLITE_TUNING_ENABLED": (bool, True),  # WAL and a single writer connection (see database.py)
+    "SQLITE_BUSY_TIMEOUT": (float, 30.0),  # seconds, the wait for the write lock of the others
+    "SQLITE_CACHE_SIZE": (int, 65536),  # KiB, the page cache of each connection
+    "SQLITE_MMAP_SIZE": (int, 268435456),  # bytes, the memory-mapped I/O of each connection
     "DATABASE_POOL_SIZE": (int, 50),
     "DATABASE_MAX_OVERFLOW": (int, 50),
     "DATABASE_POOL_TIMEOUT": (int, 60),
@@ -77,7 +110,7 @@ class SystemEnvMeta(type):
 
         # get value from .env
         val = _env_values.get(key, None)
-        if val:
+        if val is not None:
             return val
 
         # get value from system env
@@ -67,12 +67,20 @@ class JobStatus(Enum):
     """Job status type."""
 
     CREATED = "CREATED"
+    QUEUED = "QUEUED"  # queued in the durable subjob queue, waiting for a worker
     RUNNING = "RUNNING"
     FINISHED = "FINISHED"
     FAILED = "FAILED"
     STOPPED = "STOPPED"
 
 
+class JobPriority(Enum):
+    """Job priority class, used by the job scheduler to order the queued jobs."""
+
+    INTERACTIVE = "INTERACTIVE"
+    BATCH = "BATCH"
+
+
 class FunctionCallStatus(Enum):
     """Status of a function call."""
 
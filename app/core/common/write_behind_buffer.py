@@ -0,0 +1,101 @@
+import atexit
+import threading
+from typing import Callable, Dict, Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class WriteBehindBuffer(Generic[T]):
+    """The buffer of the pending writes, which are written in batches by a background flusher.
+
+    The items are written once the oldest of them has been buffered for the flush interval, or
+    once the buffer holds the flush size of them, whichever comes first, so that the writes of the
+    concurrent jobs are coalesced into a few transactions. An item put again (by the same key)
+    before it is written replaces the buffered one, and it is written once.
+
+    The buffer is flushed at once by `flush`, e.g. before the state of a job is changed, and at
+    exit of the process.
+
+    Attributes:
+        _write (Callable[[List[T]], None]): Write a batch of the items in a single transaction.
+        _flush_interval (float): The max time (in seconds) an item is buffered.
+        _flush_size (int): The number of the items to write a batch without waiting.
+        _items (Dict[str, T]): key -> the buffered item, in the order they are put.
+        _condition (threading.Condition): Notified when an item is put.
+        _flush_lock (threading.Lock): Held while a batch is written, so that a flush returns after
+            the batch taken by the flusher is written as well.
+        _flusher (Optional[threading.Thread]): The background flusher, started by the first put.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[List[T]], None],
+        flush_interval: float,
+        flush_size: int,
+        name: str = "write_behind_flusher",
+    ):
+        self._write: Callable[[List[T]], None] = write
+        self._flush_interval: float = flush_interval
+        self._flush_size: int = max(flush_size, 1)
+        self._name: str = name
+
+        self._items: Dict[str, T] = {}
+        self._condition: threading.Condition = threading.Condition()
+        self._flush_lock: threading.Lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+
+    def put(self, key: str, item: T) -> None:
+        """Buffer the item to write, which replaces the buffered item of the same key."""
+        with self._condition:
+            self._items[key] = item
+            if not self._flusher:
+                self._flusher = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._flusher.start()
+                atexit.register(self.flush)
+            self._condition.notify()
+
+    def discard(self, key: str) -> None:
+        """Drop the buffered item of the key, e.g. it is written by the caller directly."""
+        with self._condition:
+            self._items.pop(key, None)
+
+    def pending_count(self) -> int:
+        """Get the number of the buffered items."""
+        with self._condition:
+            return len(self._items)
+
+    def flush(self) -> None:
+        """Write the buffered items at once, and wait for the batch being written by the flusher.
+
+        If the write fails, the items are buffered again (unless they are put again in the
+        meantime), and the error is raised.
+        """
+        with self._flush_lock:
+            with self._condition:
+                batch = self._items
+                self._items = {}
+            if not batch:
+                return
+
+            try:
+                self._write(list(batch.values()))
+            except BaseException:
+                with self._condition:
+                    batch.update(self._items)
+                    self._items = batch
+                raise
+
+    def _run(self) -> None:
+        """Write the buffered items in batches, by the flush interval or the flush size."""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: bool(self._items))
+                self._condition.wait_for(
+                    lambda: len(self._items) >= self._flush_size, timeout=self._flush_interval
+                )
+            try:
+                self.flush()
+            except Exception as e:
+                # color: orange
+                print(f"\033[38;5;208m[Warning]: Failed to flush the buffered writes: {e}\033[0m")
+                threading.Event().wait(self._flush_interval)
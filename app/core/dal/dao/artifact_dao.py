@@ -26,15 +26,10 @@ class ArtifactDao(Dao[ArtifactDo]):
             c.name: getattr(artifact_do, c.name) for c in artifact_do.__table__.columns
         }
 
-        try:
-            self.create(**artifact_dict)
-        except Exception:
-            # if creation fails (likely due to duplicate ID), update instead, and increment version
-            artifact_dict.pop("id", None)
-            artifact_dict["metadata_version"] = artifact.metadata.version + 1
-            self.update(id=str(artifact_do.id), **artifact_dict)
-
-        return artifact_do
+        # if the artifact exists, update it instead, and increment the version
+        update_values = {key: value for key, value in artifact_dict.items() if key != "id"}
+        update_values["metadata_version"] = artifact.metadata.version + 1
+        return self.upsert(update_values=update_values, **artifact_dict)
 
     def get_artifact(self, id: str) -> Artifact:
         """Get an artifact by ID.
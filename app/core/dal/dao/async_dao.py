@@ -0,0 +1,60 @@
+from typing import Any, Callable, Dict, Generic, List, Optional, TypeVar
+
+from sqlalchemy.orm import DeclarativeBase
+
+from app.core.dal.dao.dao import Dao
+from app.core.dal.database import run_async
+
+T = TypeVar("T", bound=DeclarativeBase)
+R = TypeVar("R")
+
+
+class AsyncDao(Generic[T]):
+    """The async variant of a DAO, with the same interface, whose calls are awaited by the async
+    code (e.g. the operators and the reasoners) without blocking the event loop. The queries are
+    executed by the async engine of the database, or in a thread if it is not available (see
+    `run_async`).
+
+    Attributes:
+        _dao (Dao[T]): The DAO, whose statements, caches and invalidations are shared.
+    """
+
+    def __init__(self, dao: Dao[T]):
+        self._dao: Dao[T] = dao
+
+    async def run(self, function: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+        """Await a method of the DAO, e.g. `await async_dao.run(message_dao.get_message, id=id)`,
+        in a single transaction."""
+        return await run_async(function, *args, **kwargs)
+
+    async def create(self, **kwargs: Any) -> T:
+        """Create a new object."""
+        return await run_async(self._dao.create, **kwargs)
+
+    async def upsert(self, update_values: Optional[Dict[str, Any]] = None, **kwargs: Any) -> T:
+        """Create a new object, or update the existing object with the same id."""
+        return await run_async(self._dao.upsert, update_values=update_values, **kwargs)
+
+    async def get_by_id(self, id: str) -> Optional[T]:
+        """Get an object by ID."""
+        return await run_async(self._dao.get_by_id, id=id)
+
+    async def filter_by(self, **kwargs: Any) -> List[T]:
+        """Filter objects."""
+        return await run_async(self._dao.filter_by, **kwargs)
+
+    async def get_all(self) -> List[T]:
+        """Get all objects."""
+        return await run_async(self._dao.get_all)
+
+    async def count(self) -> int:
+        """Count objects."""
+        return await run_async(self._dao.count)
+
+    async def update(self, id: str, **kwargs: Any) -> T:
+        """Update an object."""
+        return await run_async(self._dao.update, id=id, **kwargs)
+
+    async def delete(self, id: str) -> None:
+        """Delete an object."""
+        await run_async(self._dao.delete, id=id)
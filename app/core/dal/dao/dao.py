@@ -1,57 +1,213 @@
+import base64
 from contextlib import contextmanager
-from typing import Any, Generator, Generic, List, Optional, Type, TypeVar
+import json
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    cast,
+)
 
-from sqlalchemy.orm import DeclarativeBase, Session as SqlAlchemySession
+from sqlalchemy import Insert, bindparam, insert, inspect, or_
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import DeclarativeBase, Session as SqlAlchemySession, scoped_session
 
 from app.core.common.singleton import Singleton
-from app.core.dal.database import DbSession
+from app.core.common.system_env import SystemEnv
+from app.core.dal.database import get_async_session, unit_of_work
+from app.core.dal.read_through_cache import ReadThroughCache
 
 T = TypeVar("T", bound=DeclarativeBase)
 
+# the INSERT statements of the dialects, which support the upsert clauses
+_DIALECT_INSERTS: Dict[str, Callable[..., Insert]] = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+    "mysql": mysql.insert,
+    "mariadb": mysql.insert,
+}
+_UPSERT_DIALECTS = set(_DIALECT_INSERTS.keys())
+# the prefix of the bound parameters of the columns to update by the upsert
+_UPDATE_PARAM_PREFIX = "update_"
+
 
 class Dao(Generic[T], metaclass=Singleton):
     """Data Access Object"""
 
-    def __init__(self, model: Type[T], session: SqlAlchemySession):
+    def __init__(self, model: Type[T], session: scoped_session):
         self._model: Type[T] = model
-        self._session: SqlAlchemySession = session
+        self._session: scoped_session = session
+
+        # the filters -> (the time when it is counted, the total count)
+        self._total_counts: Dict[Tuple[Tuple[str, Any], ...], Tuple[float, int]] = {}
+        self._total_count_lock = threading.Lock()
+
+        # (the dialect, the columns to insert, the columns to update) -> the INSERT statement
+        self._statements: Dict[Tuple[str, Tuple[str, ...], Optional[Tuple[str, ...]]], Insert] = {}
+
+        # the cache of the objects parsed from the rows by their ids, which is set by the DAOs of
+        # the rarely updated rows, and invalidated by the writes of the DAO (see _invalidate)
+        self._cache: Optional[ReadThroughCache[Any]] = None
 
     @property
     def session(self) -> SqlAlchemySession:
-        """Get the session."""
-        return self._session
+        """Get the session of the current thread, or of the unit of work awaited by the coroutine
+        (see `run_async`)."""
+        return get_async_session() or self._session()
 
     @contextmanager
     def new_session(self) -> Generator[SqlAlchemySession, None, None]:
-        """Create a new session."""
-        session = DbSession()
-        try:
+        """Get the session of the current thread to write. The writes are committed once the
+        context exits, or together with the enclosing unit of work (see `unit_of_work`)."""
+        with unit_of_work() as session:
             yield session
-            session.commit()
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
 
     def create(self, **kwargs: Any) -> T:
         """Create a new object."""
-        with self.new_session() as s:
-            obj = self._model(**kwargs)
-            s.add(obj)
-            s.commit()
-
-            assert hasattr(obj, "id") and obj.id is not None, (
-                "Object ID should not be None after commit"
+        if self._returns_saved_row():
+            # the created row is returned by the INSERT statement, with the defaults
+            values = self._get_values(**kwargs)
+            result = self._execute_returning(
+                statement=self._get_statement(insert_columns=values.keys()), params=values
             )
-            result = self.get_by_id(obj.id)
+        else:
+            with self.new_session() as s:
+                obj = self._model(**kwargs)
+                s.add(obj)
+                s.flush()
+
+                assert hasattr(obj, "id") and obj.id is not None, (
+                    "Object ID should not be None after flush"
+                )
+                id = obj.id
+
+            # reload the object for the server side defaults (e.g. the timestamp)
+            result = self.get_by_id(id)
             if result is None:
                 raise ValueError(f"Failed to create {self._model.__name__}")
-            return result
+        self._clear_total_counts()
+        return result
+
+    def upsert(self, update_values: Optional[Dict[str, Any]] = None, **kwargs: Any) -> T:
+        """Create a new object, or update the existing object with the same id, by a single
+        statement (INSERT ... ON CONFLICT DO UPDATE of SQLite and PostgreSQL, or INSERT ... ON
+        DUPLICATE KEY UPDATE of MySQL), which returns the saved row if the dialect supports it.
+
+        Args:
+            update_values (Optional[Dict[str, Any]]): The columns to update if the object exists,
+                defaults to the columns to create the object with (except the id).
+            **kwargs: The columns to create the object with, including the id.
+
+        Returns:
+            T: The created or updated object.
+        """
+        values = self._get_values(**kwargs)
+        if update_values is None:
+            update_values = {key: value for key, value in values.items() if key != "id"}
+        if "id" in values:
+            self._invalidate(values["id"])
+
+        if self.session.get_bind().dialect.name not in _UPSERT_DIALECTS:
+            if self.get_by_id(values["id"]) is None:
+                return self.create(**kwargs)
+            return self.update(id=values["id"], **update_values)
+
+        statement = self._get_statement(
+            insert_columns=values.keys(), update_columns=update_values.keys()
+        )
+        params = {
+            **values,
+            **{f"{_UPDATE_PARAM_PREFIX}{key}": value for key, value in update_values.items()},
+        }
+        if self._returns_saved_row():
+            result = self._execute_returning(statement=statement, params=params)
+        else:
+            with self.new_session() as s:
+                s.execute(statement, params)
+            result = cast(T, self.get_by_id(values["id"]))
+        self._clear_total_counts()
+        return result
+
+    def _get_values(self, **kwargs: Any) -> Dict[str, Any]:
+        """Get the values of the columns to insert, converted by the constructor of the model
+        (e.g. the enums of the artifact). The columns not given (or given None, if they have
+        defaults) are left to their defaults, as the ORM does."""
+        obj = self._model(**kwargs)
+        columns = self._model.__table__.columns  # type: ignore
+        return {
+            key: value
+            for key, value in inspect(obj).dict.items()
+            if key in columns
+            and (
+                value is not None
+                or (columns[key].default is None and columns[key].server_default is None)
+            )
+        }
+
+    def _get_statement(
+        self, insert_columns: Iterable[str], update_columns: Optional[Iterable[str]] = None
+    ) -> Insert:
+        """Get the INSERT statement (or the upsert statement, if the columns to update are given)
+        of the dialect, with the bound parameters of the columns. The statements are cached by the
+        columns, since building them costs more than executing them (e.g. in SQLite)."""
+        dialect_name = self.session.get_bind().dialect.name
+        key = (
+            dialect_name,
+            tuple(sorted(insert_columns)),
+            tuple(sorted(update_columns)) if update_columns is not None else None,
+        )
+        statement = self._statements.get(key)
+        if statement is not None:
+            return statement
+
+        columns = self._model.__table__.columns  # type: ignore
+        insert_stmt = _DIALECT_INSERTS.get(dialect_name, insert)(self._model).values(
+            {name: bindparam(name, type_=columns[name].type) for name in key[1]}
+        )
+        update_params = {
+            name: bindparam(f"{_UPDATE_PARAM_PREFIX}{name}", type_=columns[name].type)
+            for name in key[2] or []
+        }
+        if key[2] is None:
+            statement = insert_stmt
+        elif dialect_name in ("mysql", "mariadb"):
+            statement = insert_stmt.on_duplicate_key_update(update_params)  # type: ignore
+        else:
+            statement = insert_stmt.on_conflict_do_update(  # type: ignore
+                index_elements=["id"], set_=update_params
+            )
+        if self._returns_saved_row():
+            statement = statement.returning(self._model)
+
+        self._statements[key] = statement
+        return statement
+
+    def _returns_saved_row(self) -> bool:
+        """Whether the saved row is returned by the INSERT (and the upsert) statement."""
+        dialect = self.session.get_bind().dialect
+        # the upsert of MySQL (and MariaDB) does not support RETURNING
+        return dialect.insert_returning and dialect.name in ("sqlite", "postgresql")
+
+    def _execute_returning(self, statement: Insert, params: Dict[str, Any]) -> T:
+        """Execute the INSERT statement, and return the saved row as the object."""
+        with self.new_session() as s:
+            # the object loaded by the session is refreshed by the returned row
+            return s.scalars(statement, params, execution_options={"populate_existing": True}).one()
 
     def get_by_id(self, id: str) -> Optional[T]:
         """Get an object by ID."""
-        return self.session.query(self._model).get(id)
+        # the object loaded by the session is refreshed, since it may be updated by the others
+        return self.session.get(self._model, id, populate_existing=True)
 
     def filter_by(self, **kwargs: Any) -> List[T]:
         """Filter objects."""
@@ -65,10 +221,90 @@ class Dao(Generic[T], metaclass=Singleton):
         """Get count."""
         return self.session.query(self._model).count()
 
+    def get_total_count(self, **kwargs: Any) -> int:
+        """Get the count of the filtered objects, which is cached for the total of the paged
+        listings, and refreshed once the objects are created or deleted by the DAO, or the count
+        expires (since the objects can be inserted by the other sessions as well)."""
+        key = tuple(sorted(kwargs.items()))
+        with self._total_count_lock:
+            cached = self._total_counts.get(key)
+        if cached and time.time() - cached[0] < SystemEnv.TOTAL_COUNT_CACHE_TTL:
+            return cached[1]
+
+        counted_at = time.time()
+        total_count = self.session.query(self._model).filter_by(**kwargs).count()
+        with self._total_count_lock:
+            self._total_counts[key] = (counted_at, total_count)
+        return total_count
+
+    def _clear_total_counts(self) -> None:
+        """Clear the cached total counts, since the objects are created or deleted."""
+        with self._total_count_lock:
+            self._total_counts.clear()
+
+    def get_page(
+        self,
+        size: int,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        order_by: str = "timestamp",
+        descending: bool = True,
+        **kwargs: Any,
+    ) -> Tuple[List[T], Optional[str]]:
+        """Get a page of the filtered objects in the order of (order_by, id).
+
+        The page after the cursor is fetched by the keyset condition in SQL, so that the cost of
+        a page does not grow with its position (as the offset does), given an index on
+        (order_by, id) after the equality filters.
+
+        Args:
+            size (int): The max number of the objects in the page.
+            cursor (Optional[str]): The cursor returned with the previous page, or None to fetch
+                the first page.
+            offset (int): The number of the objects to skip after the cursor (the page number
+                based pagination, which is kept for compatibility).
+            order_by (str): The column to sort the objects by, e.g. the creation time.
+            descending (bool): Whether to fetch the latest objects first.
+            **kwargs: The equality filters of the objects.
+
+        Returns:
+            Tuple[List[T], Optional[str]]: The objects of the page, and the cursor of the next page
+                (None if it is the last page).
+        """
+        order_column = getattr(self._model, order_by)
+        id_column = self._model.id  # type: ignore
+        query = self.session.query(self._model).filter_by(**kwargs)
+        if cursor:
+            # the redundant range condition on the order column makes the keyset condition seek
+            # the index, instead of scanning it
+            order_value, id = _decode_cursor(cursor)
+            if descending:
+                query = query.filter(
+                    order_column <= order_value,
+                    or_(order_column < order_value, id_column < id),
+                )
+            else:
+                query = query.filter(
+                    order_column >= order_value,
+                    or_(order_column > order_value, id_column > id),
+                )
+        if descending:
+            query = query.order_by(order_column.desc(), id_column.desc())
+        else:
+            query = query.order_by(order_column.asc(), id_column.asc())
+
+        # fetch one more object to know whether there is a next page
+        objs = query.offset(offset).limit(size + 1).all()
+        if len(objs) <= size:
+            return objs, None
+        objs = objs[:size]
+        return objs, _encode_cursor(getattr(objs[-1], order_by), objs[-1].id)  # type: ignore
+
     def update(self, id: str, **kwargs: Any) -> T:
         """Update an object."""
         kwargs.pop("id", None)
         if len(kwargs) != 0:
+            self._invalidate(id)
             with self.new_session() as s:
                 # add synchronize_session parameter to satisfy type checker
                 s.query(self._model).filter_by(id=id).update(kwargs, synchronize_session=False)  # type: ignore[arg-type]
@@ -76,11 +312,30 @@ class Dao(Generic[T], metaclass=Singleton):
         result = self.get_by_id(id)
         if result is None:
             raise ValueError(f"{self._model.__name__} with id {id} not found")
-
-        self.session.refresh(result)
         return result
 
     def delete(self, id: str):
         """Delete an object."""
+        self._invalidate(id)
         with self.new_session() as s:
             s.query(self._model).filter_by(id=id).delete()
+        self._clear_total_counts()
+
+    def _invalidate(self, id: str) -> None:
+        """Drop the cached object of the row, since the row is written."""
+        if self._cache:
+            self._cache.invalidate(id)
+
+
+def _encode_cursor(order_value: Any, id: Any) -> str:
+    """Encode the keyset of the last object of a page into an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps([order_value, id]).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    """Decode the cursor into the keyset of the last object of the previous page."""
+    try:
+        order_value, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    return order_value, id
@@ -3,7 +3,7 @@ import inspect
 from pathlib import Path
 import pkgutil
 
-from sqlalchemy.orm import Session as SqlAlchemySession
+from sqlalchemy.orm import scoped_session
 
 from app.core.dal.dao.dao import Dao
 
@@ -12,11 +12,12 @@ class DaoFactory:
     """Automatically discover and initialize all DAO classes"""
 
     @classmethod
-    def initialize(cls, session: SqlAlchemySession) -> None:
+    def initialize(cls, session: scoped_session) -> None:
         """Discover and initialize all DAO classes using dynamic import
 
         Args:
-            session: SQLAlchemy session to be used for all DAOs
+            session: SQLAlchemy scoped session to be used for all DAOs, which provides the session
+                of each thread (e.g. ScopedDbSession)
         """
         # get package name without the module
         current_dir = Path(__file__).parent
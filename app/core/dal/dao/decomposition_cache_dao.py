@@ -0,0 +1,46 @@
+import time
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session as SqlAlchemySession
+
+from app.core.dal.dao.dao import Dao
+from app.core.dal.do.decomposition_cache_do import DecompositionCacheDo
+
+
+class DecompositionCacheDao(Dao[DecompositionCacheDo]):
+    """Decomposition Cache Data Access Object"""
+
+    def __init__(self, session: SqlAlchemySession):
+        super().__init__(DecompositionCacheDo, session)
+
+    def get_unexpired(self, key: str, ttl: int) -> Optional[DecompositionCacheDo]:
+        """Get the cached decomposition by the key, or None if it is not found or expired."""
+        # populate the existing object, in case the row is changed by the other sessions
+        result = self.session.query(self._model).populate_existing().filter_by(id=key).first()
+        if not result:
+            return None
+        if ttl > 0 and int(result.timestamp) + ttl < time.time():
+            self.delete(id=key)
+            return None
+        return result
+
+    def save_job_dict(self, key: str, job_dict: Dict[str, Dict[str, str]]) -> None:
+        """Save the decomposition by the key, and restart its time to live."""
+        with self.new_session() as s:
+            s.merge(self._model(id=key, job_dict=job_dict, hit_count=0, timestamp=int(time.time())))
+
+    def increase_hit_count(self, key: str) -> None:
+        """Increase the hit count of the cached decomposition."""
+        with self.new_session() as s:
+            s.query(self._model).filter_by(id=key).update(
+                {"hit_count": self._model.hit_count + 1}, synchronize_session=False
+            )
+
+    def delete_expired(self, ttl: int) -> None:
+        """Delete the expired decompositions."""
+        if ttl <= 0:
+            return
+        with self.new_session() as s:
+            s.query(self._model).filter(self._model.timestamp < int(time.time()) - ttl).delete(
+                synchronize_session=False
+            )
@@ -1,8 +1,13 @@
+import copy
+from typing import List, Optional
+
 from sqlalchemy.orm import Session as SqlAlchemySession
 
+from app.core.common.system_env import SystemEnv
 from app.core.common.type import FileStorageType, KnowledgeStoreFileStatus
 from app.core.dal.dao.dao import Dao
 from app.core.dal.do.file_descriptor_do import FileDescriptorDo
+from app.core.dal.read_through_cache import ReadThroughCache
 from app.core.model.file_descriptor import FileDescriptor
 
 
@@ -12,17 +17,41 @@ class FileDescriptorDao(Dao[FileDescriptorDo]):
     def __init__(self, session: SqlAlchemySession):
         super().__init__(FileDescriptorDo, session)
 
+        self._file_descriptors: ReadThroughCache[FileDescriptor] = ReadThroughCache(
+            name="file_descriptor", capacity=SystemEnv.DAO_CACHE_SIZE, copy_object=copy.copy
+        )
+        self._cache = self._file_descriptors
+
     def get_file_descriptor_by_id(self, id: str) -> FileDescriptor:
         """Get a file descriptor by ID."""
-        file_descriptor_do = self.get_by_id(id=id)
-        if not file_descriptor_do:
+
+        def load() -> Optional[FileDescriptor]:
+            file_descriptor_do = self.get_by_id(id=id)
+            if not file_descriptor_do:
+                return None
+            return self.parse_into_file_descriptor(file_descriptor_do)
+
+        file_descriptor = self._file_descriptors.get(key=id, load=load)
+        if not file_descriptor:
             raise ValueError(f"File descriptor with ID {id} not found")
+        return file_descriptor
+
+    def get_file_descriptors_by_ids(self, ids: List[str]) -> List[FileDescriptor]:
+        """Get the file descriptors by the IDs in one query, the missing IDs are ignored."""
+        if not ids:
+            return []
+        results = self.session.query(self._model).filter(self._model.id.in_(ids)).all()
+        return [self.parse_into_file_descriptor(result) for result in results]
+
+    def parse_into_file_descriptor(self, file_descriptor_do: FileDescriptorDo) -> FileDescriptor:
+        """Create a file descriptor instance from the file descriptor model."""
         return FileDescriptor(
             id=str(file_descriptor_do.id),
             name=str(file_descriptor_do.name),
             path=str(file_descriptor_do.path),
             type=FileStorageType(str(file_descriptor_do.type)),
             size=str(file_descriptor_do.size),
-            status=KnowledgeStoreFileStatus.SUCCESS,  # TODO: fix this (file_descriptor_do.status)
+            # TODO: fix this (file_descriptor_do.status)
+            status=KnowledgeStoreFileStatus.SUCCESS,
             timestamp=int(file_descriptor_do.timestamp),
         )
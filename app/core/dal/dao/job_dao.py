@@ -1,9 +1,16 @@
-from typing import Optional, cast
+import copy
+import time
+from typing import Any, Dict, List, Optional, Tuple, cast
 
+from sqlalchemy import case, func, or_
 from sqlalchemy.orm import Session as SqlAlchemySession
+from sqlalchemy.orm.util import identity_key
 
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import JobPriority, JobStatus
 from app.core.dal.dao.dao import Dao
 from app.core.dal.do.job_do import JobDo
+from app.core.dal.read_through_cache import ReadThroughCache
 from app.core.model.job import Job, JobType, SubJob
 from app.core.model.job_result import JobResult
 
@@ -14,61 +21,80 @@ class JobDao(Dao[JobDo]):
     def __init__(self, session: SqlAlchemySession):
         super().__init__(JobDo, session)
 
-    def save_job(self, job: Job) -> JobDo:
-        """Create a new job model."""
-        try:
-            self.get_job_by_id(id=job.id)
-            return self._update_job(job=job)
-        except ValueError:
-            if isinstance(job, SubJob):
-                return self.create(
-                    category=JobType.SUB_JOB.value,
-                    id=job.id,
-                    goal=job.goal,
-                    context=job.context,
-                    session_id=job.session_id,
-                    original_job_id=job.original_job_id,
-                    expert_id=job.expert_id,
-                    output_schema=job.output_schema,
-                    life_cycle=job.life_cycle,
-                    is_legacy=job.is_legacy,
-                    thinking=job.thinking,
-                    assigned_expert_name=job.assigned_expert_name,
-                )
-            return self.create(
-                category=JobType.JOB.value,
-                id=job.id,
-                goal=job.goal,
-                context=job.context,
-                session_id=job.session_id,
-                assigned_expert_name=job.assigned_expert_name,
-            )
+        # the cached job definitions (the jobs do not hold their states), which are not changed by
+        # the queue updates of the subjobs (e.g. the leases)
+        self._jobs: ReadThroughCache[Job] = ReadThroughCache(
+            name="job", capacity=SystemEnv.DAO_CACHE_SIZE, copy_object=copy.copy
+        )
+        self._cache = self._jobs
 
-    def _update_job(self, job: Job) -> JobDo:
-        """Update a job model."""
+    def save_job(self, job: Job) -> JobDo:
+        """Create a new job model, or update the existing job model (but not its result)."""
         if isinstance(job, SubJob):
-            return self.update(
+            return self.upsert(
+                update_values=self._subjob_columns(job),
+                category=JobType.SUB_JOB.value,
                 id=job.id,
-                goal=job.goal,
-                context=job.context,
-                session_id=job.session_id,
-                original_job_id=job.original_job_id,
-                expert_id=job.expert_id,
-                output_schema=job.output_schema,
-                life_cycle=job.life_cycle,
-                is_legacy=job.is_legacy,
-                thinking=job.thinking,
-                assigned_expert_name=job.assigned_expert_name,
+                **self._subjob_columns(job),
             )
-        return self.update(
+        return self.upsert(
+            update_values={
+                "goal": job.goal,
+                "context": job.context,
+                "session_id": job.session_id,
+                "assigned_expert_name": job.assigned_expert_name,
+                "dag": job.dag,
+            },
+            category=JobType.JOB.value,
             id=job.id,
             goal=job.goal,
             context=job.context,
             session_id=job.session_id,
             assigned_expert_name=job.assigned_expert_name,
-            dag=job.dag,
         )
 
+    def update_job_graph(self, original_job_id: str, dag: str, subjobs: List[SubJob]) -> None:
+        """Update the DAG of the original job and the changed subjobs in one transaction.
+
+        Args:
+            original_job_id (str): The id of the original job.
+            dag (str): The serialized job graph.
+            subjobs (List[SubJob]): The subjobs (vertices of the job graph) which are changed.
+        """
+        with self.new_session() as s:
+            s.query(self._model).filter_by(id=original_job_id).update(
+                {"dag": dag}, synchronize_session=False
+            )
+            for subjob in subjobs:
+                s.query(self._model).filter_by(id=subjob.id).update(
+                    self._subjob_columns(subjob),  # type: ignore[arg-type]
+                    synchronize_session=False,
+                )
+        for id in [original_job_id] + [subjob.id for subjob in subjobs]:
+            self._invalidate(id)
+
+        # expire the rows loaded by the session of the thread, so that the objects held by the
+        # callers are reloaded on next access
+        for id in [original_job_id] + [subjob.id for subjob in subjobs]:
+            job_do = self.session.identity_map.get(identity_key(self._model, id))
+            if job_do is not None:
+                self.session.expire(job_do)
+
+    def _subjob_columns(self, subjob: SubJob) -> Dict[str, Any]:
+        """Get the updatable columns of the subjob."""
+        return {
+            "goal": subjob.goal,
+            "context": subjob.context,
+            "session_id": subjob.session_id,
+            "original_job_id": subjob.original_job_id,
+            "expert_id": subjob.expert_id,
+            "output_schema": subjob.output_schema,
+            "life_cycle": subjob.life_cycle,
+            "is_legacy": subjob.is_legacy,
+            "thinking": subjob.thinking,
+            "assigned_expert_name": subjob.assigned_expert_name,
+        }
+
     def save_job_result(self, job_result: JobResult) -> JobDo:
         """Update a job model with the job result."""
         return self.update(
@@ -78,36 +104,220 @@ class JobDao(Dao[JobDo]):
             tokens=job_result.tokens,
         )
 
+    def get_average_durations_by_expert(self) -> Dict[str, float]:
+        """Get the average duration of the finished subjobs of each expert."""
+        results = (
+            self.session.query(self._model.expert_id, func.avg(self._model.duration))
+            .filter(
+                self._model.category == JobType.SUB_JOB.value,
+                self._model.status == JobStatus.FINISHED.value,
+                self._model.expert_id.isnot(None),
+                self._model.duration > 0,
+            )
+            .group_by(self._model.expert_id)
+            .all()
+        )
+        return {str(expert_id): float(duration) for expert_id, duration in results}
+
+    def enqueue_subjob(
+        self, job_id: str, payload: Dict[str, Any], priority: JobPriority, rank: float
+    ) -> bool:
+        """Queue the subjob in the durable subjob queue. Returns False if the subjob has been
+        stopped or failed, so that it can not be queued any more."""
+        with self.new_session() as s:
+            updated_count = (
+                s.query(self._model)
+                .filter(
+                    self._model.id == job_id,
+                    self._model.status.notin_([JobStatus.FAILED.value, JobStatus.STOPPED.value]),
+                )
+                .update(
+                    {
+                        "status": JobStatus.QUEUED.value,
+                        "queue_priority": priority.value,
+                        "queue_rank": rank,
+                        "queued_at": time.time(),
+                        "queue_payload": payload,
+                        "lease_owner": None,
+                        "lease_expires_at": None,
+                    },
+                    synchronize_session=False,
+                )
+            )
+        return updated_count > 0
+
+    def claim_subjobs(self, worker_id: str, lease_duration: float, limit: int) -> List[JobDo]:
+        """Claim the queued subjobs with a lease, the interactive ones and the higher ranked ones
+        first. A subjob is claimed by only one worker, even if the workers claim concurrently."""
+        candidate_ids = [
+            str(job_id)
+            for (job_id,) in self.session.query(self._model.id)
+            .filter(self._model.status == JobStatus.QUEUED.value)
+            .order_by(
+                case((self._model.queue_priority == JobPriority.BATCH.value, 1), else_=0),
+                self._model.queue_rank.desc(),
+                self._model.queued_at,
+            )
+            .limit(limit)
+            .all()
+        ]
+
+        claimed_ids: List[str] = []
+        now = time.time()
+        with self.new_session() as s:
+            for job_id in candidate_ids:
+                # the conditional update is the claim, the other workers get 0 updated rows
+                updated_count = (
+                    s.query(self._model)
+                    .filter(self._model.id == job_id, self._model.status == JobStatus.QUEUED.value)
+                    .update(
+                        {
+                            "status": JobStatus.RUNNING.value,
+                            "lease_owner": worker_id,
+                            "lease_expires_at": now + lease_duration,
+                            "heartbeat_at": now,
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                if updated_count > 0:
+                    claimed_ids.append(job_id)
+                s.commit()
+        return self.get_queue_states(job_ids=claimed_ids)
+
+    def renew_leases(self, worker_id: str, job_ids: List[str], lease_duration: float) -> None:
+        """Extend the leases held by the worker (the heartbeat of the worker)."""
+        if not job_ids:
+            return
+        now = time.time()
+        with self.new_session() as s:
+            s.query(self._model).filter(
+                self._model.id.in_(job_ids), self._model.lease_owner == worker_id
+            ).update(
+                {"lease_expires_at": now + lease_duration, "heartbeat_at": now},
+                synchronize_session=False,
+            )
+
+    def complete_subjob(self, job_id: str, worker_id: str, output: Dict[str, Any]) -> None:
+        """Save the output of the dispatch in the queue payload, and release the lease."""
+        result = self.get_queue_states(job_ids=[job_id])
+        if not result:
+            raise ValueError(f"Job with ID {job_id} not found")
+        payload: Dict[str, Any] = dict(result[0].queue_payload or {})
+        payload.update(output)
+        with self.new_session() as s:
+            s.query(self._model).filter(
+                self._model.id == job_id, self._model.lease_owner == worker_id
+            ).update(
+                {"queue_payload": payload, "lease_owner": None, "lease_expires_at": None},
+                synchronize_session=False,
+            )
+
+    def requeue_expired_leases(self) -> int:
+        """Queue the running subjobs again, whose workers have stopped the heartbeats (e.g. the
+        worker crashed). The leases of the finished subjobs are released without re-queueing, so
+        that their results are kept. Returns the number of the re-queued subjobs."""
+        now = time.time()
+        with self.new_session() as s:
+            expired = (self._model.lease_owner.isnot(None), self._model.lease_expires_at < now)
+            requeued_count = (
+                s.query(self._model)
+                .filter(*expired, self._model.status == JobStatus.RUNNING.value)
+                .update(
+                    {
+                        "status": JobStatus.QUEUED.value,
+                        "lease_owner": None,
+                        "lease_expires_at": None,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            s.query(self._model).filter(
+                *expired, self._model.status != JobStatus.RUNNING.value
+            ).update({"lease_owner": None, "lease_expires_at": None}, synchronize_session=False)
+        return requeued_count
+
+    def get_queue_states(self, job_ids: List[str]) -> List[JobDo]:
+        """Get the jobs in one query, and refresh them in the session, since they are updated by
+        the other processes (e.g. the workers)."""
+        if not job_ids:
+            return []
+        return (
+            self.session.query(self._model)
+            .populate_existing()
+            .filter(self._model.id.in_(job_ids))
+            .all()
+        )
+
+    def filter_by_original_job_ids(self, original_job_ids: List[str]) -> List[JobDo]:
+        """Get the subjobs of the original jobs in one query."""
+        if not original_job_ids:
+            return []
+        return (
+            self.session.query(self._model)
+            .filter(self._model.original_job_id.in_(original_job_ids))
+            .all()
+        )
+
+    def get_statuses(
+        self, session_id: Optional[str] = None, original_job_id: Optional[str] = None
+    ) -> List[Tuple[str, str]]:
+        """Get the ids and the statuses of the jobs of the session, or of the original job and its
+        subjobs, in one query."""
+        if session_id:
+            condition = self._model.session_id == session_id
+        else:
+            condition = or_(
+                self._model.id == original_job_id, self._model.original_job_id == original_job_id
+            )
+        rows = self.session.query(self._model.id, self._model.status).filter(condition).all()
+        return [(str(id), str(status)) for id, status in rows]
+
+    def filter_by_ids(self, ids: List[str]) -> List[JobDo]:
+        """Get the jobs by the ids in one query."""
+        if not ids:
+            return []
+        return self.session.query(self._model).filter(self._model.id.in_(ids)).all()
+
     def get_job_by_id(self, id: str) -> Job:
         """Get a job by ID."""
-        result = self.get_by_id(id=id)
-        if not result:
+
+        def load() -> Optional[Job]:
+            result = self.get_by_id(id=id)
+            return self.parse_into_job(job_do=result) if result else None
+
+        job = self._jobs.get(key=id, load=load)
+        if not job:
             raise ValueError(f"Job with ID {id} not found")
-        if result.category == JobType.JOB.value:
+        return job
+
+    def parse_into_job(self, job_do: JobDo) -> Job:
+        """Create a job (original job / subjob) instance from the job model."""
+        if job_do.category == JobType.JOB.value:
             return Job(
-                id=cast(str, result.id),
-                goal=cast(str, result.goal),
-                context=cast(str, result.context),
-                session_id=cast(str, result.session_id),
-                assigned_expert_name=cast(Optional[str], result.assigned_expert_name),
-                dag=cast(Optional[str], result.dag),
+                id=cast(str, job_do.id),
+                goal=cast(str, job_do.goal),
+                context=cast(str, job_do.context),
+                session_id=cast(str, job_do.session_id),
+                assigned_expert_name=cast(Optional[str], job_do.assigned_expert_name),
+                dag=cast(Optional[str], job_do.dag),
             )
         return SubJob(
-            id=cast(str, result.id),
-            goal=cast(str, result.goal),
-            context=cast(str, result.context),
-            session_id=cast(str, result.session_id),
-            original_job_id=cast(str, result.original_job_id),
-            expert_id=cast(str, result.expert_id),
-            output_schema=cast(str, result.output_schema),
-            life_cycle=cast(int, result.life_cycle),
-            is_legacy=cast(bool, result.is_legacy),
+            id=cast(str, job_do.id),
+            goal=cast(str, job_do.goal),
+            context=cast(str, job_do.context),
+            session_id=cast(str, job_do.session_id),
+            original_job_id=cast(str, job_do.original_job_id),
+            expert_id=cast(str, job_do.expert_id),
+            output_schema=cast(str, job_do.output_schema),
+            life_cycle=cast(int, job_do.life_cycle),
+            is_legacy=cast(bool, job_do.is_legacy),
             thinking=cast(
                 Optional[str],
-                str(result.thinking) if result.thinking else None,
+                str(job_do.thinking) if job_do.thinking else None,
             ),
             assigned_expert_name=cast(
                 Optional[str],
-                str(result.assigned_expert_name) if result.assigned_expert_name else None,
+                str(job_do.assigned_expert_name) if job_do.assigned_expert_name else None,
             ),
         )
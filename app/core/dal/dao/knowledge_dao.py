@@ -1,7 +1,11 @@
+from typing import Any, List, Optional
+
 from sqlalchemy.orm import Session as SqlAlchemySession
 
+from app.core.common.system_env import SystemEnv
 from app.core.dal.dao.dao import Dao
 from app.core.dal.do.knowledge_do import FileKbMappingDo, KnowledgeBaseDo
+from app.core.dal.read_through_cache import ReadThroughCache
 
 
 class KnowledgeBaseDao(Dao[KnowledgeBaseDo]):
@@ -10,9 +14,40 @@ class KnowledgeBaseDao(Dao[KnowledgeBaseDo]):
     def __init__(self, session: SqlAlchemySession):
         super().__init__(KnowledgeBaseDo, session)
 
+        # session id -> the id of the knowledge base of the session, which is looked up by the
+        # operators of each job, and dropped by the writes of any knowledge base
+        self._session_kb_ids: ReadThroughCache[str] = ReadThroughCache(
+            name="session_knowledge_base", capacity=SystemEnv.DAO_CACHE_SIZE
+        )
+
+    def create(self, **kwargs: Any) -> KnowledgeBaseDo:
+        """Create a new knowledge base."""
+        self._session_kb_ids.clear()
+        return super().create(**kwargs)
+
+    def get_id_by_session_id(self, session_id: str) -> Optional[str]:
+        """Get the id of the knowledge base of the session, None if the session does not have
+        exactly one knowledge base."""
+
+        def load() -> Optional[str]:
+            kbs = self.filter_by(session_id=session_id)
+            return str(kbs[0].id) if len(kbs) == 1 else None
+
+        return self._session_kb_ids.get(key=session_id, load=load)
+
+    def _invalidate(self, id: str) -> None:
+        """Drop the cached knowledge bases of the sessions, since a knowledge base is written."""
+        self._session_kb_ids.clear()
+
 
 class FileKbMappingDao(Dao[FileKbMappingDo]):
     """File to Knowledge Base Data Access Object"""
 
     def __init__(self, session: SqlAlchemySession):
         super().__init__(FileKbMappingDo, session)
+
+    def filter_by_kb_ids(self, kb_ids: List[str]) -> List[FileKbMappingDo]:
+        """Get the file mappings of the knowledge bases in one query."""
+        if not kb_ids:
+            return []
+        return self.session.query(self._model).filter(self._model.kb_id.in_(kb_ids)).all()
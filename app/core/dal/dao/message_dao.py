@@ -1,7 +1,10 @@
-from typing import List, cast
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple, cast
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session as SqlAlchemySession
 
+from app.core.common.system_env import SystemEnv
 from app.core.common.type import ChatMessageRole
 from app.core.dal.dao.dao import Dao
 from app.core.dal.dao.file_descriptor_dao import FileDescriptorDao
@@ -15,6 +18,8 @@ from app.core.dal.do.message_do import (
     TextMessageDo,
     WorkflowMessageDo,
 )
+from app.core.dal.read_through_cache import ReadThroughCache
+from app.core.model.file_descriptor import FileDescriptor
 from app.core.model.message import (
     AgentMessage,
     FileMessage,
@@ -28,30 +33,109 @@ from app.core.model.message import (
 )
 
 
+@dataclass
+class _RelatedRows:
+    """The rows related by the messages to parse, which are loaded level by level.
+
+    Attributes:
+        message_dos (Dict[str, MessageDo]): id -> the model of the message or related message.
+        file_descriptors (Dict[str, FileDescriptor]): file id -> the descriptor of the file
+            messages.
+        instruction_results (Dict[Tuple[str, str], List[TextMessageDo]]): (job id, role) -> the
+            text messages, which are the instruction messages of the hybrid messages.
+    """
+
+    message_dos: Dict[str, MessageDo] = field(default_factory=dict)
+    file_descriptors: Dict[str, FileDescriptor] = field(default_factory=dict)
+    instruction_results: Dict[Tuple[str, str], List[TextMessageDo]] = field(default_factory=dict)
+
+
 class MessageDao(Dao[MessageDo]):
     """Message dao"""
 
     def __init__(self, session: SqlAlchemySession):
         super().__init__(MessageDo, session)
 
+        # the cached messages, except the ones holding the other rows (e.g. the workflow messages
+        # of the agent messages), which are not invalidated with them
+        self._messages: ReadThroughCache[Message] = ReadThroughCache(
+            name="message",
+            capacity=SystemEnv.DAO_CACHE_SIZE,
+            copy_object=lambda message: message.copy(),
+            cacheable=lambda message: not isinstance(
+                message, AgentMessage | FileMessage | HybridMessage
+            ),
+        )
+        self._cache = self._messages
+
     def save_message(self, message: Message) -> MessageDo:
-        """Create a new message."""
+        """Create a new message, or update the existing message with the same id."""
+        return self.upsert(**self.get_message_row(message))
+
+    def get_message_row(self, message: Message) -> Dict[str, Any]:
+        """Get the column values of the message to save."""
         message_do = self.parse_into_message_do(message)
-        message_dict = {c.name: getattr(message_do, c.name) for c in message_do.__table__.columns}
-        try:
-            self.create(**message_dict)
-        except Exception:
-            message_dict.pop("id", None)
-            self.update(id=str(message_do.id), **message_dict)
-        return message_do
+        return {c.name: getattr(message_do, c.name) for c in message_do.__table__.columns}
 
     def get_message(self, id: str) -> Message:
         """Get a message by ID."""
-        # fetch the message
-        result = self.get_by_id(id=id)
-        if not result:
+
+        def load() -> Optional[Message]:
+            result = self.get_by_id(id=id)
+            return self.parse_into_message(message_do=result) if result else None
+
+        message = self._messages.get(key=id, load=load)
+        if not message:
             raise ValueError(f"Message with ID {id} not found")
-        return self.parse_into_message(message_do=result)
+        return message
+
+    def get_messages_by_ids(self, ids: List[str]) -> List[Message]:
+        """Get the messages by the IDs in one query, the missing IDs are ignored."""
+        if not ids:
+            return []
+        return self.parse_into_messages(message_dos=self._filter_by_ids(ids))
+
+    def _filter_by_ids(self, ids: List[str]) -> List[MessageDo]:
+        """Get the message models by the IDs in one query."""
+        if not ids:
+            return []
+        return self.session.query(self._model).filter(self._model.id.in_(ids)).all()
+
+    def filter_by_job_ids(self, job_ids: List[str], message_type: MessageType) -> List[MessageDo]:
+        """Get the messages of the jobs by the message type in one query."""
+        if not job_ids:
+            return []
+        return (
+            self.session.query(self._model)
+            .filter(
+                self._model.type == message_type.value,
+                self._model.job_id.in_(job_ids),
+            )
+            .all()
+        )
+
+    def get_count_and_latest_timestamp(self, job_ids: List[str]) -> Tuple[int, int]:
+        """Get the number and the latest timestamp of the messages of the jobs in one query."""
+        if not job_ids:
+            return 0, 0
+        count, timestamp = (
+            self.session.query(func.count(self._model.id), func.max(self._model.timestamp))
+            .filter(self._model.job_id.in_(job_ids))
+            .one()
+        )
+        return int(count), int(timestamp or 0)
+
+    def get_hybrid_messages_by_job_ids(self, job_ids: List[str]) -> List[HybridMessage]:
+        """Get the hybrid messages of the jobs, with their instruction messages and attached
+        messages, in a constant number of queries (see parse_into_messages)."""
+        return cast(
+            List[HybridMessage],
+            self.parse_into_messages(
+                message_dos=self.filter_by_job_ids(
+                    job_ids=job_ids, message_type=MessageType.HYBRID_MESSAGE
+                )
+            ),
+        )
 
     def get_text_message_by_job_id_and_role(
         self, job_id: str, role: ChatMessageRole
@@ -152,8 +236,100 @@ class MessageDao(Dao[MessageDo]):
             )
         raise ValueError(f"Unsupported message type: {type(message)}")
 
-    def parse_into_message(self, message_do: MessageDo) -> Message:
-        """Create a message model instance."""
+    def parse_into_message(
+        self, message_do: MessageDo, load_workflow_messages: bool = True
+    ) -> Message:
+        """Create a message model instance.
+
+        Args:
+            message_do (MessageDo): The message model.
+            load_workflow_messages (bool): Whether to load the workflow messages linked by the
+                agent message. Set it False, if only the output (payload, artifacts and lesson) of
+                the agent message is needed.
+        """
+        return self.parse_into_messages(
+            message_dos=[message_do], load_workflow_messages=load_workflow_messages
+        )[0]
+
+    def parse_into_messages(
+        self, message_dos: List[MessageDo], load_workflow_messages: bool = True
+    ) -> List[Message]:
+        """Create the message instances, with the messages and the files they relate to: the
+        workflow messages of the agent messages, the instruction messages and the attached
+        messages of the hybrid messages, and the file descriptors of the file messages.
+
+        The related rows are collected level by level (e.g. the hybrid messages -> the attached
+        file messages -> the file descriptors), and each level is loaded by one IN query of each
+        kind of the rows, instead of a query per related row.
+
+        Args:
+            message_dos (List[MessageDo]): The message models.
+            load_workflow_messages (bool): Whether to load the workflow messages linked by the
+                agent messages. Set it False, if only the outputs of the agents are needed.
+        """
+        file_descriptor_dao: FileDescriptorDao = FileDescriptorDao.instance
+        related_rows = _RelatedRows()
+        instruction_job_ids: Set[str] = set()
+
+        level: List[MessageDo] = list(message_dos)
+        while level:
+            related_message_ids: Set[str] = set()
+            file_ids: Set[str] = set()
+            job_ids: Set[str] = set()
+            for message_do in level:
+                related_rows.message_dos[str(message_do.id)] = message_do
+                related_ids = [str(id) for id in list(message_do.related_message_ids or [])]
+                message_type = MessageType(str(message_do.type))
+                if message_type == MessageType.AGENT_MESSAGE and load_workflow_messages:
+                    related_message_ids.update(related_ids)
+                elif message_type == MessageType.HYBRID_MESSAGE:
+                    related_message_ids.update(related_ids)
+                    job_ids.add(str(message_do.job_id))
+                elif message_type == MessageType.FILE_MESSAGE:
+                    file_ids.update(related_ids)
+
+            for file_descriptor in file_descriptor_dao.get_file_descriptors_by_ids(
+                list(file_ids - related_rows.file_descriptors.keys())
+            ):
+                related_rows.file_descriptors[file_descriptor.id] = file_descriptor
+
+            # the instruction messages are the text messages of the same job and role
+            for text_message_do in self.filter_by_job_ids(
+                job_ids=list(job_ids - instruction_job_ids), message_type=MessageType.TEXT_MESSAGE
+            ):
+                related_rows.instruction_results.setdefault(
+                    (str(text_message_do.job_id), str(text_message_do.role)), []
+                ).append(cast(TextMessageDo, text_message_do))
+            instruction_job_ids.update(job_ids)
+
+            level = self._filter_by_ids(list(related_message_ids - related_rows.message_dos.keys()))
+
+        return [
+            self._build_message(
+                message_do=message_do,
+                related_rows=related_rows,
+                load_workflow_messages=load_workflow_messages,
+            )
+            for message_do in message_dos
+        ]
+
+    def _get_related_message(
+        self, id: str, related_rows: _RelatedRows, load_workflow_messages: bool = True
+    ) -> Message:
+        """Create the instance of the loaded related message."""
+        message_do = related_rows.message_dos.get(id)
+        if message_do is None:
+            raise ValueError(f"Message with ID {id} not found")
+        return self._build_message(
+            message_do=message_do,
+            related_rows=related_rows,
+            load_workflow_messages=load_workflow_messages,
+        )
+
+    def _build_message(
+        self, message_do: MessageDo, related_rows: _RelatedRows, load_workflow_messages: bool
+    ) -> Message:
+        """Create a message instance, with the loaded related rows."""
         message_type = MessageType(str(message_do.type))
 
         if message_type == MessageType.WORKFLOW_MESSAGE:
@@ -172,8 +348,12 @@ class MessageDao(Dao[MessageDo]):
                 payload=str(message_do.payload),
                 workflow_messages=cast(
                     List[WorkflowMessage],
-                    [self.get_message(wf_id) for wf_id in list(message_do.related_message_ids)]
-                    or [],
+                    [
+                        self._get_related_message(id=str(wf_id), related_rows=related_rows)
+                        for wf_id in list(message_do.related_message_ids)
+                    ]
+                    if load_workflow_messages
+                    else [],
                 ),
                 artifact_ids=list(message_do.artifact_ids),
                 lesson=str(message_do.lesson),
@@ -192,16 +372,17 @@ class MessageDao(Dao[MessageDo]):
             )
 
         if message_type == MessageType.FILE_MESSAGE:
-            file_descriptor_dao: FileDescriptorDao = FileDescriptorDao.instance
             assert len(list(message_do.related_message_ids)) == 1, (
                 f"File message {message_do.id} should have only one file id. "
                 f"File id(s) :{list(message_do.related_message_ids)}"
             )
-            file_id: str = list(message_do.related_message_ids)[0]
-            file_descriptor = file_descriptor_dao.get_file_descriptor_by_id(id=file_id)
+            file_id: str = str(list(message_do.related_message_ids)[0])
+            file_descriptor = related_rows.file_descriptors.get(file_id)
+            if file_descriptor is None:
+                raise ValueError(f"File descriptor with ID {file_id} not found")
             return FileMessage(
                 id=str(message_do.id),
-                file_id=str(list(message_do.related_message_ids)[0]),
+                file_id=file_id,
                 session_id=str(message_do.session_id),
                 timestamp=int(message_do.timestamp),
                 descriptor=file_descriptor,
@@ -218,31 +399,43 @@ class MessageDao(Dao[MessageDo]):
             )
 
         if message_type == MessageType.HYBRID_MESSAGE:
-            role = ChatMessageRole(str(message_do.role))
-            instruction_results: List[TextMessageDo] = self.get_text_message_by_job_id_and_role(
-                job_id=str(message_do.job_id), role=role
-            )
-            assert len(instruction_results) == 1, (
-                f"Hybrid message {message_do.id} should have exactly one instruction message, "
-                f"found {len(instruction_results)}. "
-            )
-            instruction_message: TextMessage = cast(
-                TextMessage,
-                self.parse_into_message(message_do=instruction_results[0]),
-            )
-
-            return HybridMessage(
-                id=str(message_do.id),
-                instruction_message=instruction_message,
-                job_id=str(message_do.job_id),
-                session_id=str(message_do.session_id),
-                # load the attached messages from the database
-                attached_messages=[
-                    cast(FileMessage, self.get_message(id=str(attached_id)))
-                    for attached_id in list(message_do.related_message_ids)
-                ],
-                timestamp=int(message_do.timestamp),
-                role=role,
-            )
+            return self._build_hybrid_message(message_do=message_do, related_rows=related_rows)
 
         raise ValueError(f"Unsupported message type: {message_type}")
+
+    def _build_hybrid_message(
+        self, message_do: MessageDo, related_rows: _RelatedRows
+    ) -> HybridMessage:
+        """Create a hybrid message instance with the loaded instruction message and attached
+        messages."""
+        instruction_results = related_rows.instruction_results.get(
+            (str(message_do.job_id), str(message_do.role)), []
+        )
+        assert len(instruction_results) == 1, (
+            f"Hybrid message {message_do.id} should have exactly one instruction message, "
+            f"found {len(instruction_results)}. "
+        )
+        instruction_message: TextMessage = cast(
+            TextMessage,
+            self._build_message(
+                message_do=instruction_results[0],
+                related_rows=related_rows,
+                load_workflow_messages=True,
+            ),
+        )
+
+        return HybridMessage(
+            id=str(message_do.id),
+            instruction_message=instruction_message,
+            job_id=str(message_do.job_id),
+            session_id=str(message_do.session_id),
+            attached_messages=[
+                cast(
+                    FileMessage,
+                    self._get_related_message(id=str(attached_id), related_rows=related_rows),
+                )
+                for attached_id in list(message_do.related_message_ids)
+            ],
+            timestamp=int(message_do.timestamp),
+            role=ChatMessageRole(str(message_do.role)),
+        )
@@ -1,7 +1,10 @@
+from typing import Optional
+
 from sqlalchemy.orm import Session as SqlAlchemySession
 
 from app.core.dal.dao.dao import Dao
 from app.core.dal.do.session_do import SessionDo
+from app.core.model.session import SessionHistory
 
 
 class SessionDao(Dao[SessionDo]):
@@ -9,3 +12,16 @@ class SessionDao(Dao[SessionDo]):
 
     def __init__(self, session: SqlAlchemySession):
         super().__init__(SessionDo, session)
+
+    def get_history(self, session_id: str) -> Optional[SessionHistory]:
+        """Get the rolling history of the session, or None if it is not built yet."""
+        session_do = self.get_by_id(id=session_id)
+        if not session_do:
+            raise ValueError(f"Session with ID {session_id} not found")
+        if session_do.history is None:
+            return None
+        return SessionHistory.from_dict(dict(session_do.history))
+
+    def save_history(self, session_id: str, history: SessionHistory) -> None:
+        """Save the rolling history of the session."""
+        self.update(id=session_id, history=history.to_dict())
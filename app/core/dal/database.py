@@ -1,11 +1,32 @@
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+import importlib.util
 from pathlib import Path
+import threading
+from typing import Any, Callable, Generator, List, Optional, Tuple, TypeVar
 
-from sqlalchemy import create_engine
+from sqlalchemy import Connection, Engine, create_engine, event
 from sqlalchemy.ext.declarative import DeclarativeMeta
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.orm import (
+    ORMExecuteState,
+    Session as SqlAlchemySession,
+    SessionTransaction,
+    declarative_base,
+    scoped_session,
+    sessionmaker,
+)
+from sqlalchemy.sql.dml import UpdateBase
 
 from app.core.common.system_env import SystemEnv
 
+try:
+    from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+except ImportError:  # greenlet is optional, and the DAOs are awaited in the threads without it
+    create_async_engine = None  # type: ignore
+
+R = TypeVar("R")
+
 # check if the system folder exists
 system_path = SystemEnv.APP_ROOT + SystemEnv.SYSTEM_PATH
 Path(system_path).mkdir(parents=True, exist_ok=True)
@@ -19,5 +40,251 @@ engine = create_engine(
     pool_recycle=SystemEnv.DATABASE_POOL_RECYCLE,
     pool_pre_ping=SystemEnv.DATABASE_POOL_PRE_PING,
 )
-DbSession = sessionmaker(autocommit=False, autoflush=True, bind=engine)
+
+# whether the SQLite tuning profile is applied (to the database file, not in memory): the WAL
+# journal, and a single writer connection besides the pooled reader connections (the engine)
+SQLITE_TUNED: bool = bool(
+    SystemEnv.SQLITE_TUNING_ENABLED
+    and engine.dialect.name == "sqlite"
+    and engine.url.database not in (None, "", ":memory:")
+)
+
+
+def _tune_sqlite_connection(dbapi_connection, _connection_record) -> None:
+    """Apply the SQLite tuning profile to the new connection. In the WAL journal, the readers do
+    not block the writer (and vice versa), and the commits are not synced to the disk until the
+    checkpoints (synchronous=NORMAL), which is still safe from the corruption."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {int(SystemEnv.SQLITE_BUSY_TIMEOUT * 1000)}")
+    cursor.execute("PRAGMA journal_mode = WAL")
+    cursor.execute("PRAGMA synchronous = NORMAL")
+    cursor.execute(f"PRAGMA cache_size = -{SystemEnv.SQLITE_CACHE_SIZE}")
+    cursor.execute(f"PRAGMA mmap_size = {SystemEnv.SQLITE_MMAP_SIZE}")
+    cursor.execute("PRAGMA temp_store = MEMORY")
+    cursor.close()
+
+
+def _tune_sqlite_writer_connection(dbapi_connection, connection_record) -> None:
+    """Apply the SQLite tuning profile to the writer connection, whose transactions are begun by
+    _begin_immediate, instead of the driver."""
+    dbapi_connection.isolation_level = None
+    _tune_sqlite_connection(dbapi_connection, connection_record)
+
+
+def _begin_immediate(connection: Connection) -> None:
+    """Take the write lock when the transaction begins. Otherwise, the deferred transaction, which
+    has read, fails at once by "database is locked" if it writes after the other processes."""
+    connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+# the single connection to write the SQLite database, so that the writers of the threads queue in
+# the pool, instead of failing by "database is locked" (it is the engine, if not tuned)
+writer_engine: Engine = engine
+if SQLITE_TUNED:
+    writer_engine = create_engine(
+        SystemEnv.DATABASE_URL,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=SystemEnv.DATABASE_POOL_TIMEOUT,
+        pool_recycle=SystemEnv.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=SystemEnv.DATABASE_POOL_PRE_PING,
+    )
+    event.listen(engine, "connect", _tune_sqlite_connection)
+    event.listen(writer_engine, "connect", _tune_sqlite_writer_connection)
+    event.listen(writer_engine, "begin", _begin_immediate)
+
+
+# the async drivers of the dialects, for the DAOs awaited by the async code (see run_async)
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg", "mysql": "aiomysql"}
+
+
+def _create_async_engine() -> Optional["AsyncEngine"]:
+    """Create the async engine of the database, None if it is disabled, or the async driver of the
+    dialect is not installed.
+
+    The async engine is opt-in (ASYNC_DATABASE_ENABLED), since the drivers (aiosqlite, asyncpg or
+    aiomysql) and greenlet are the optional dependencies (`poetry install -E async`). Without it,
+    the DAOs are awaited in the threads (see `run_async`).
+    """
+    if not SystemEnv.ASYNC_DATABASE_ENABLED or engine.url.database in (None, "", ":memory:"):
+        return None
+    driver = _ASYNC_DRIVERS.get(engine.dialect.name)
+    if create_async_engine is None or driver is None or importlib.util.find_spec(driver) is None:
+        # color: orange
+        print(
+            "\033[38;5;208m[Warning]: The async engine is enabled, but greenlet or the async "
+            f"driver of {engine.dialect.name} is not installed, so the DAOs are awaited in the "
+            "threads."
+            "\033[0m"
+        )
+        return None
+    created_engine = create_async_engine(
+        engine.url.set(drivername=f"{engine.dialect.name}+{driver}"),
+        pool_size=SystemEnv.DATABASE_POOL_SIZE,
+        max_overflow=SystemEnv.DATABASE_MAX_OVERFLOW,
+        pool_timeout=SystemEnv.DATABASE_POOL_TIMEOUT,
+        pool_recycle=SystemEnv.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=SystemEnv.DATABASE_POOL_PRE_PING,
+    )
+    if SQLITE_TUNED:
+        # the busy timeout waits for the writer connection in the thread of aiosqlite
+        event.listen(created_engine.sync_engine, "connect", _tune_sqlite_connection)
+    return created_engine
+
+
+# the async engine, whose queries do not block the event loop (None, if it is not available)
+async_engine: Optional["AsyncEngine"] = _create_async_engine()
+AsyncDbSession = async_sessionmaker(async_engine, expire_on_commit=False) if async_engine else None
+
+
+class RoutingSession(SqlAlchemySession):
+    """The session of the tuned SQLite database, which writes by the writer connection, and reads
+    by the pooled reader connections. Once it writes, it reads by the writer connection as well,
+    until the transaction ends, so that its own writes are read."""
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs) -> Engine:  # type: ignore[override]
+        if self._flushing or isinstance(clause, UpdateBase) or self.info.get("writing"):
+            self.info["writing"] = True
+            return writer_engine
+        return engine
+
+
+# the loaded objects are not expired by the commits, since the queries refresh them anyway (see
+# _populate_existing), and the objects held by the callers are kept readable
+DbSession = sessionmaker(
+    class_=RoutingSession if SQLITE_TUNED else SqlAlchemySession,
+    autocommit=False,
+    autoflush=True,
+    expire_on_commit=False,
+    bind=engine,
+)
+# the session of each thread, which is used by the DAOs (see DaoFactory)
+ScopedDbSession = scoped_session(DbSession)
 Do: DeclarativeMeta = declarative_base()
+
+# the unit of work of each thread: the callbacks to call once it is committed, None if there is
+# no unit of work in progress
+_unit_of_work = threading.local()
+
+# the unit of work of the DAOs awaited by the coroutine (see run_async): the session of the async
+# engine, and the callbacks to call once it is committed
+_async_unit_of_work: ContextVar[Optional[Tuple[SqlAlchemySession, List[Callable[[], None]]]]] = (
+    ContextVar("async_unit_of_work", default=None)
+)
+
+
+@event.listens_for(DbSession, "do_orm_execute")
+def _populate_existing(orm_execute_state: ORMExecuteState) -> None:
+    """Refresh the loaded objects by the rows of each query, since the objects are kept in the
+    session of each thread, while the rows are updated by the sessions of the other threads."""
+    if orm_execute_state.is_select:
+        orm_execute_state.update_execution_options(populate_existing=True)
+
+
+@event.listens_for(DbSession, "after_transaction_end")
+def _end_writing(session: SqlAlchemySession, transaction: SessionTransaction) -> None:
+    """Read by the reader connections again, once the transaction which has written ends."""
+    if transaction.parent is None:
+        session.info.pop("writing", None)
+
+
+@contextmanager
+def unit_of_work() -> Generator[SqlAlchemySession, None, None]:
+    """Commit the writes of the DAOs in the context in a single transaction, in the session of the
+    current thread. The writes are rolled back together if an exception is raised, and a nested
+    unit of work joins the enclosing one.
+
+    The unit of work holds the write lock (of SQLite) until it is committed, so it should enclose
+    the writes only, e.g. the status, the result and the messages of a subjob, but not the
+    execution of the subjob.
+    """
+    async_unit_of_work = _async_unit_of_work.get()
+    if async_unit_of_work is not None:
+        yield async_unit_of_work[0]
+        return
+
+    session = ScopedDbSession()
+    if in_unit_of_work():
+        yield session
+        return
+
+    callbacks: List[Callable[[], None]] = []
+    _unit_of_work.callbacks = callbacks
+    try:
+        yield session
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        _unit_of_work.callbacks = None
+
+    for callback in callbacks:
+        callback()
+
+
+def in_unit_of_work() -> bool:
+    """Whether a unit of work is in progress in the current thread (or coroutine)."""
+    return (
+        _async_unit_of_work.get() is not None
+        or getattr(_unit_of_work, "callbacks", None) is not None
+    )
+
+
+def get_async_session() -> Optional[SqlAlchemySession]:
+    """Get the session of the unit of work awaited by the coroutine (see run_async), None if the
+    DAOs run in the session of the current thread."""
+    async_unit_of_work = _async_unit_of_work.get()
+    return async_unit_of_work[0] if async_unit_of_work is not None else None
+
+
+async def run_async(function: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+    """Await the function of the DAOs or the services (e.g. `message_dao.get_message`), without
+    blocking the event loop, e.g. in the async operators and reasoners.
+
+    The function runs in a unit of work of the async engine (aiosqlite, asyncpg or aiomysql), whose
+    queries are awaited by the event loop, while the function itself runs as it is (see
+    `AsyncSession.run_sync`). If the async engine is not enabled (ASYNC_DATABASE_ENABLED, off by
+    default) or not available, the function runs in a unit of work in a thread of the event loop
+    instead.
+    """
+    if AsyncDbSession is None:
+
+        def run_in_thread() -> R:
+            with unit_of_work():
+                return function(*args, **kwargs)
+
+        return await asyncio.to_thread(run_in_thread)
+
+    callbacks: List[Callable[[], None]] = []
+
+    def run(session: SqlAlchemySession) -> R:
+        token = _async_unit_of_work.set((session, callbacks))
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _async_unit_of_work.reset(token)
+
+    async with AsyncDbSession() as async_session:
+        result = await async_session.run_sync(run)
+        await async_session.commit()
+
+    for callback in callbacks:
+        callback()
+    return result
+
+
+def after_commit(callback: Callable[[], None]) -> None:
+    """Call the callback once the unit of work of the current thread is committed (it is dropped
+    if the unit of work is rolled back), or at once if there is no unit of work in progress. It
+    is used to notify the changes (e.g. the job events), after they are visible to the readers."""
+    async_unit_of_work = _async_unit_of_work.get()
+    callbacks: Optional[List[Callable[[], None]]] = (
+        async_unit_of_work[1]
+        if async_unit_of_work is not None
+        else getattr(_unit_of_work, "callbacks", None)
+    )
+    if callbacks is None:
+        callback()
+    else:
+        callbacks.append(callback)
@@ -1,6 +1,6 @@
 from uuid import uuid4
 
-from sqlalchemy import JSON, BigInteger, Column, String, Text, func
+from sqlalchemy import JSON, BigInteger, Column, Index, String, Text, func
 
 from app.core.dal.database import Do
 from app.core.model.artifact import ArtifactMetadata, ArtifactStatus, ContentType
@@ -10,6 +10,12 @@ class ArtifactDo(Do):  # type: ignore
     """Database object for artifacts produced by agents"""
 
     __tablename__ = "artifact"
+    __table_args__ = (
+        # the artifacts of a job by the content type
+        Index("ix_artifact_job_id_content_type", "job_id", "content_type"),
+        # the artifacts of a session
+        Index("ix_artifact_session_id", "session_id"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))
     timestamp = Column(BigInteger, server_default=func.strftime("%s", "now"))
@@ -0,0 +1,14 @@
+from sqlalchemy import JSON, BigInteger, Column, Integer, String, func
+
+from app.core.dal.database import Do
+
+
+class DecompositionCacheDo(Do):  # type: ignore
+    """Decomposition cache table for storing the validated job decompositions of the leader"""
+
+    __tablename__ = "decomposition_cache"
+
+    id = Column(String(64), primary_key=True)  # the normalized hash of the decomposition request
+    job_dict = Column(JSON, nullable=False)  # the validated decomposition (subjob id -> subjob)
+    hit_count = Column(Integer, default=0)
+    timestamp = Column(BigInteger, server_default=func.strftime("%s", "now"))  # created at
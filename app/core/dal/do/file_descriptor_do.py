@@ -1,6 +1,6 @@
 from uuid import uuid4
 
-from sqlalchemy import BigInteger, Column, String, func
+from sqlalchemy import BigInteger, Column, Index, String, func
 
 from app.core.dal.database import Do
 
@@ -9,6 +9,10 @@ class FileDescriptorDo(Do):  # type: ignore
     """File descriptor to store file details."""
 
     __tablename__ = "file"
+    __table_args__ = (
+        # the descriptors sharing the same stored file
+        Index("ix_file_path", "path"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))
     name = Column(String(36), nullable=False)
@@ -1,6 +1,6 @@
 from uuid import uuid4
 
-from sqlalchemy import JSON, BigInteger, Boolean, Column, Integer, String, Text, func
+from sqlalchemy import JSON, BigInteger, Boolean, Column, Index, Integer, String, Text, func
 
 from app.core.dal.database import Do
 
@@ -9,6 +9,10 @@ class GraphDbDo(Do):  # type: ignore
     """GraphDB to store graph database details."""
 
     __tablename__ = "graph_db"
+    __table_args__ = (
+        # the keyset of the paged listing of the graph databases
+        Index("ix_graph_db_create_time_id", "create_time", "id"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))
     type = Column(String(36), nullable=False)
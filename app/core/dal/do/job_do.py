@@ -1,6 +1,6 @@
 from uuid import uuid4
 
-from sqlalchemy import JSON, Boolean, Column, Float, String, Text
+from sqlalchemy import JSON, Boolean, Column, Float, Index, String, Text
 from sqlalchemy.sql.sqltypes import Integer
 
 from app.core.common.system_env import SystemEnv
@@ -13,6 +13,16 @@ class JobDo(Do):  # type: ignore
     """Job table for storing job information"""
 
     __tablename__ = "job"
+    __table_args__ = (
+        # the subjobs of an original job, and their statuses
+        Index("ix_job_original_job_id_status", "original_job_id", "status"),
+        # the original jobs of a session
+        Index("ix_job_session_id_category", "session_id", "category"),
+        # the queued subjobs claimed by the workers
+        Index("ix_job_status_queued_at", "status", "queued_at"),
+        # the expired leases of the crashed workers
+        Index("ix_job_lease_expires_at", "lease_expires_at"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))
     goal = Column(Text, nullable=False)
@@ -39,3 +49,13 @@ class JobDo(Do):  # type: ignore
     message_id = Column(String(36), nullable=True)  # FK constraint
     duration = Column(Float, default=0.0)
     tokens = Column(Integer, default=0)
+
+    # durable subjob queue attributes, the subjob is claimed by a worker with a lease, which is
+    # extended by the heartbeats of the worker, and re-queued once the lease expires
+    queue_priority = Column(String(36), nullable=True)
+    queue_rank = Column(Float, nullable=True)
+    queued_at = Column(Float, nullable=True)
+    queue_payload = Column(JSON, nullable=True)  # the input and the output of the dispatch
+    lease_owner = Column(String(100), nullable=True)  # the worker id
+    lease_expires_at = Column(Float, nullable=True)
+    heartbeat_at = Column(Float, nullable=True)
@@ -1,6 +1,6 @@
 from uuid import uuid4
 
-from sqlalchemy import JSON, BigInteger, Column, String, Text, func
+from sqlalchemy import JSON, BigInteger, Column, Index, String, Text, func
 
 from app.core.dal.database import Do
 
@@ -9,6 +9,12 @@ class KnowledgeBaseDo(Do):  # type: ignore
     """Knowledge Base to store knowledge store details"""
 
     __tablename__ = "knowledge_base"
+    __table_args__ = (
+        # the keyset of the paged listing of the knowledge bases
+        Index("ix_knowledge_base_category_timestamp_id", "category", "timestamp", "id"),
+        # the knowledge bases of a session
+        Index("ix_knowledge_base_session_id", "session_id"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))
     name = Column(String(36), nullable=False)
@@ -23,6 +29,10 @@ class FileKbMappingDo(Do):  # type: ignore
     """File to knowledge base association model."""
 
     __tablename__ = "file_kb_mapping"
+    __table_args__ = (
+        # the files of the knowledge bases
+        Index("ix_file_kb_mapping_kb_id", "kb_id"),
+    )
 
     id = Column(String(36), primary_key=True)  # FK constraint
     name = Column(String(36))
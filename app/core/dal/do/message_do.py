@@ -1,6 +1,6 @@
 from uuid import uuid4
 
-from sqlalchemy import JSON, BigInteger, Column, String, Text, func
+from sqlalchemy import JSON, BigInteger, Column, Index, String, Text, func
 
 from app.core.dal.database import Do
 from app.core.model.message import MessageType
@@ -10,6 +10,22 @@ class MessageDo(Do):  # type: ignore
     """Base message class"""
 
     __tablename__ = "message"
+    __table_args__ = (
+        # the keyset of the paged listing of the messages of a session
+        Index("ix_message_session_id_timestamp_id", "session_id", "timestamp", "id"),
+        # the keyset of the paged questions (the user hybrid messages) of a session, and the text
+        # messages of a session
+        Index(
+            "ix_message_session_id_type_role_timestamp_id",
+            "session_id",
+            "type",
+            "role",
+            "timestamp",
+            "id",
+        ),
+        # the messages of the jobs by the type (and the role)
+        Index("ix_message_job_id_type_role", "job_id", "type", "role"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))
     timestamp = Column(BigInteger, server_default=func.strftime("%s", "now"))
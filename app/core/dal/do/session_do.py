@@ -1,6 +1,6 @@
 from uuid import uuid4
 
-from sqlalchemy import BigInteger, Column, String, func
+from sqlalchemy import JSON, BigInteger, Column, Index, String, func
 
 from app.core.dal.database import Do
 
@@ -9,9 +9,16 @@ class SessionDo(Do):  # type: ignore
     """Session to store session details."""
 
     __tablename__ = "session"
+    __table_args__ = (
+        # the keyset of the paged listing of the sessions
+        Index("ix_session_timestamp_id", "timestamp", "id"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid4()))
     timestamp = Column(BigInteger, server_default=func.strftime("%s", "now"))
     name = Column(String(80), nullable=True)
 
     latest_job_id = Column(String(36), nullable=True)  # FK constraint
+
+    # the rolling chat history of the session (see SessionHistory), None if not built yet
+    history = Column(JSON, nullable=True)
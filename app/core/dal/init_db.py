@@ -1,5 +1,9 @@
+from sqlalchemy import Table, inspect, text
+
 from app.core.common.system_env import SystemEnv
 from app.core.dal.database import Do, engine
+from app.core.dal.do.artifact_do import ArtifactDo
+from app.core.dal.do.decomposition_cache_do import DecompositionCacheDo
 from app.core.dal.do.file_descriptor_do import FileDescriptorDo
 from app.core.dal.do.graph_db_do import GraphDbDo
 from app.core.dal.do.job_do import JobDo
@@ -20,5 +24,39 @@ def init_db() -> None:
     SessionDo.__table__.create(engine, checkfirst=True)
     JobDo.__table__.create(engine, checkfirst=True)
     MessageDo.__table__.create(engine, checkfirst=True)
+    DecompositionCacheDo.__table__.create(engine, checkfirst=True)
+    ArtifactDo.__table__.create(engine, checkfirst=True)
 
     Do.metadata.create_all(bind=engine)
+
+    # add the new columns to the tables created by the previous versions
+    _add_missing_columns(JobDo.__table__)
+    _add_missing_columns(SessionDo.__table__)
+
+    # add the new indexes to the tables created by the previous versions
+    for table in Do.metadata.sorted_tables:
+        _add_missing_indexes(table)
+
+
+def _add_missing_columns(table: Table) -> None:
+    """Add the nullable columns declared by the model but missing in the existing table, since
+    `create_all` does not alter the existing tables. It is idempotent."""
+    existing_columns = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    with engine.begin() as connection:
+        for column in table.columns:
+            if column.name in existing_columns or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            connection.execute(
+                text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+            )
+
+
+def _add_missing_indexes(table: Table) -> None:
+    """Create the indexes declared by the model but missing in the existing table, since
+    `create_all` does not alter the existing tables. It is idempotent."""
+    existing_indexes = {index["name"] for index in inspect(engine).get_indexes(table.name)}
+    for index in table.indexes:
+        if index.name not in existing_indexes:
+            # checked again, since the server and the workers may migrate concurrently
+            index.create(bind=engine, checkfirst=True)
@@ -0,0 +1,168 @@
+from collections import OrderedDict
+import copy
+from dataclasses import dataclass
+import threading
+from typing import Callable, Dict, Generic, List, Optional, TypeVar
+
+from app.core.common.system_env import SystemEnv
+from app.core.dal.database import after_commit, in_unit_of_work
+
+T = TypeVar("T")
+
+
+@dataclass
+class ReadThroughCacheStats:
+    """The snapshot of the metrics of a read-through cache.
+
+    Attributes:
+        name (str): The name of the cache, e.g. the kind of the cached objects.
+        enabled (bool): Whether the cache is enabled.
+        size (int): The number of the cached objects.
+        capacity (int): The max number of the cached objects.
+        hit_count (int): The number of the lookups served by the cache.
+        miss_count (int): The number of the lookups loaded from the database.
+        invalidation_count (int): The number of the cached objects dropped by the writes.
+        hit_rate (float): hit_count / (hit_count + miss_count).
+    """
+
+    name: str
+    enabled: bool
+    size: int
+    capacity: int
+    hit_count: int = 0
+    miss_count: int = 0
+    invalidation_count: int = 0
+    hit_rate: float = 0.0
+
+
+# the read-through caches of the process, for the metrics
+_caches: List["ReadThroughCache"] = []
+
+
+class ReadThroughCache(Generic[T]):
+    """The bounded (LRU) read-through cache of the objects parsed from the rows, which are rarely
+    updated once written (e.g. the job definitions, the messages and the file descriptors), so
+    that the hot lookups by the keys skip the queries and the parsing of the payloads.
+
+    The cached objects are dropped by the writes of the same process (see `invalidate`), both when
+    the rows are written and when the writes are committed. The cache is bypassed in a unit of
+    work, whose uncommitted writes are not cached. Disable it (DAO_CACHE_ENABLED), if the database
+    is written by the other processes as well.
+
+    Attributes:
+        _name (str): The name of the cache.
+        _capacity (int): The max number of the cached objects.
+        _copy (Callable[[T], T]): Copy the cached object, so that the callers can change the
+            objects they get without changing the cached ones.
+        _cacheable (Callable[[T], bool]): Whether the loaded object is cached.
+        _values (OrderedDict[str, T]): key -> the cached object, in the LRU order.
+        _loads (Dict[str, object]): key -> the token of the load in progress, which is dropped
+            by the invalidation of the key, so that the object loaded before the invalidation
+            (which may be stale) is not cached.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        capacity: int,
+        copy_object: Callable[[T], T] = copy.deepcopy,
+        cacheable: Callable[[T], bool] = lambda _: True,
+    ):
+        self._name: str = name
+        self._capacity: int = capacity
+        self._copy: Callable[[T], T] = copy_object
+        self._cacheable: Callable[[T], bool] = cacheable
+
+        self._values: OrderedDict[str, T] = OrderedDict()
+        self._lock = threading.Lock()
+        self._loads: Dict[str, object] = {}
+        self._hit_count: int = 0
+        self._miss_count: int = 0
+        self._invalidation_count: int = 0
+        _caches.append(self)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache is enabled. The subjobs queued to the workers (app.worker) are written
+        by the other processes, so the cache is disabled as well."""
+        return bool(SystemEnv.DAO_CACHE_ENABLED and not SystemEnv.SUBJOB_QUEUE_ENABLED)
+
+    def get(self, key: str, load: Callable[[], Optional[T]]) -> Optional[T]:
+        """Get a copy of the cached object of the key, or load it from the database and cache it.
+
+        Args:
+            key (str): The key of the object, e.g. the id of the row.
+            load (Callable[[], Optional[T]]): Load the object from the database, None if it is
+                not found (which is not cached).
+        """
+        if not self.enabled or in_unit_of_work():
+            return load()
+
+        with self._lock:
+            cached = self._values.get(key)
+            if cached is not None:
+                self._values.move_to_end(key)
+                self._hit_count += 1
+            else:
+                self._miss_count += 1
+                token = self._loads[key] = object()
+        if cached is not None:
+            return self._copy(cached)
+
+        try:
+            value = load()
+            if value is not None and self._cacheable(value):
+                cached = self._copy(value)
+        finally:
+            with self._lock:
+                if self._loads.get(key) is token:
+                    del self._loads[key]
+                    if cached is not None:
+                        self._values[key] = cached
+                        while len(self._values) > self._capacity:
+                            self._values.popitem(last=False)
+        return value
+
+    def invalidate(self, key: str) -> None:
+        """Drop the cached object of the key, once the row is written, and again once the write is
+        committed (in case the row is loaded by the others before then)."""
+        self._drop(key)
+        after_commit(lambda: self._drop(key))
+
+    def clear(self) -> None:
+        """Drop all the cached objects, once a row is written, and again once the write is
+        committed."""
+        self._drop(None)
+        after_commit(lambda: self._drop(None))
+
+    def _drop(self, key: Optional[str]) -> None:
+        """Drop the cached object of the key, or all the cached objects if the key is None."""
+        with self._lock:
+            if key is None:
+                self._invalidation_count += len(self._values)
+                self._values.clear()
+                self._loads.clear()
+                return
+            self._loads.pop(key, None)
+            if self._values.pop(key, None) is not None:
+                self._invalidation_count += 1
+
+    def get_stats(self) -> ReadThroughCacheStats:
+        """Get the snapshot of the metrics of the cache."""
+        with self._lock:
+            lookup_count = self._hit_count + self._miss_count
+            return ReadThroughCacheStats(
+                name=self._name,
+                enabled=self.enabled,
+                size=len(self._values),
+                capacity=self._capacity,
+                hit_count=self._hit_count,
+                miss_count=self._miss_count,
+                invalidation_count=self._invalidation_count,
+                hit_rate=self._hit_count / lookup_count if lookup_count else 0.0,
+            )
+
+
+def get_read_through_cache_stats() -> List[ReadThroughCacheStats]:
+    """Get the metrics of the read-through caches of the process."""
+    return [cache.get_stats() for cache in _caches]
@@ -71,6 +71,7 @@ class ExpertConfig:
 
     profile: ProfileConfig
     workflow: List[List["OperatorConfig"]] = field(default_factory=list)
+    max_concurrency: Optional[int] = None  # the max number of the running subjobs of the expert
 
 
 @dataclass
@@ -255,7 +256,19 @@ class AgenticConfig:
                 if op_configs:
                     workflow_chains.append(op_configs)
 
-            experts.append(ExpertConfig(profile=profile, workflow=workflow_chains))
+            max_concurrency: Optional[int] = expert_dict.get("max_concurrency")
+            if max_concurrency is not None and (
+                not isinstance(max_concurrency, int) or max_concurrency <= 0
+            ):
+                raise ValueError(
+                    f"The max_concurrency of the expert '{profile.name}' must be positive."
+                )
+
+            experts.append(
+                ExpertConfig(
+                    profile=profile, workflow=workflow_chains, max_concurrency=max_concurrency
+                )
+            )
 
         return cls(
             app=app_config,
@@ -402,6 +415,8 @@ class AgenticConfig:
 
             if expert.profile.desc:
                 expert_dict["profile"]["desc"] = expert.profile.desc
+            if expert.max_concurrency is not None:
+                expert_dict["max_concurrency"] = expert.max_concurrency
 
             # workflow exportation
             if expert.workflow:
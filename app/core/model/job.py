@@ -3,6 +3,7 @@ from enum import Enum
 from typing import Optional
 from uuid import uuid4
 
+from app.core.common.cancellation import CancellationToken
 from app.core.common.system_env import SystemEnv
 
 
@@ -25,6 +26,10 @@ class Job:
         assigned_expert_name (str): The name of the assigned expert determined by the user.
         dag (Optional[str]): The directed acyclic graph (DAG) of the job, which describes the
             dependencies between the sub jobs. It is compressed as a json string.
+        temperature (Optional[float]): The sampling temperature of the LLM to execute the job,
+            overriding the TEMPERATURE of the system env. It is not persisted.
+        cancellation_token (Optional[CancellationToken]): The token to cancel the execution of
+            the job only, instead of the token of the job graph. It is not persisted.
     """
 
     goal: str
@@ -33,6 +38,8 @@ class Job:
     session_id: str = field(default_factory=lambda: str(uuid4()))
     assigned_expert_name: Optional[str] = None
     dag: Optional[str] = None
+    temperature: Optional[float] = field(default=None, compare=False)
+    cancellation_token: Optional[CancellationToken] = field(default=None, compare=False, repr=False)
 
     def __post_init__(self):
         """Post initialization to ensure the id and session_id are set correctly."""
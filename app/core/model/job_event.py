@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List
+
+
+class JobEventType(Enum):
+    """The types of the progress events of the jobs."""
+
+    JOB_STATUS = "JOB_STATUS"  # the status of the original job or the subjob is changed
+    MESSAGE = "MESSAGE"  # a chat message or an agent (thinking) message is saved
+    ARTIFACT = "ARTIFACT"  # an artifact is created or updated
+
+
+@dataclass
+class JobEvent:
+    """A progress event of a job, published once the change is saved.
+
+    Attributes:
+        cursor (int): The monotonically increasing sequence number of the event.
+        type (JobEventType): The type of the event.
+        session_id (str): The session of the job.
+        original_job_id (str): The original job, which is the job itself for an original job.
+        job_id (str): The original job or the subjob changed.
+        data (Dict[str, Any]): The delta, e.g. the new status or the serialized message.
+        timestamp (float): The time when the event is published.
+    """
+
+    cursor: int
+    type: JobEventType
+    session_id: str
+    original_job_id: str
+    job_id: str
+    data: Dict[str, Any]
+    timestamp: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the event."""
+        return {
+            "cursor": self.cursor,
+            "type": self.type.value,
+            "session_id": self.session_id,
+            "original_job_id": self.original_job_id,
+            "job_id": self.job_id,
+            "data": self.data,
+            "timestamp": self.timestamp,
+        }
+
+
+@dataclass
+class JobEventBatch:
+    """The events after a cursor.
+
+    Attributes:
+        events (List[JobEvent]): The matched events, in the publishing order.
+        cursor (int): The cursor to fetch the following events from.
+        reset (bool): Whether the events after the requested cursor are no longer (or not)
+            buffered, e.g. the buffer is overflowed or the server is restarted, so that the
+            client has to reload the full views before following the events.
+    """
+
+    events: List[JobEvent] = field(default_factory=list)
+    cursor: int = 0
+    reset: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the batch."""
+        return {
+            "events": [event.to_dict() for event in self.events],
+            "cursor": self.cursor,
+            "reset": self.reset,
+        }
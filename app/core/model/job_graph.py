@@ -61,3 +61,27 @@ class JobGraph(Graph):
         job_graph._graph = subgraph_view.copy()  # noqa: W0212
 
         return job_graph
+
+    def critical_path_lengths(
+        self, durations: Dict[str, float], default_duration: float = 1.0
+    ) -> Dict[str, float]:
+        """Get the remaining critical path length of each vertex.
+
+        The remaining critical path length of a vertex is the longest duration of the paths from
+        the vertex (included) to the tail vertices, which is the lower bound of the time to finish
+        the job graph once the vertex starts.
+
+        Args:
+            durations (Dict[str, float]): The estimated duration of each vertex.
+            default_duration (float): The duration of the vertices without estimation.
+
+        Returns:
+            Dict[str, float]: vertex id -> remaining critical path length.
+        """
+        lengths: Dict[str, float] = {}
+        for vertex in reversed(list(nx.topological_sort(self._graph))):
+            lengths[vertex] = durations.get(vertex, default_duration) + max(
+                (lengths[successor] for successor in self._graph.successors(vertex)),
+                default=0.0,
+            )
+        return lengths
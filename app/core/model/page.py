@@ -0,0 +1,19 @@
+from dataclasses import dataclass, field
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    """A page of a listing.
+
+    Attributes:
+        items (List[T]): The items of the page.
+        next_cursor (Optional[str]): The cursor to fetch the next page, None if it is the last page.
+        total (int): The total number of the items in the listing.
+    """
+
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    total: int = 0
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
 
 
 @dataclass
@@ -12,3 +12,53 @@ class Session:
 
     # the latest job id of the session
     latest_job_id: Optional[str] = None
+
+
+@dataclass
+class SessionHistoryTurn:
+    """A turn (the question, the thinking chain and the answer of a finished original job) in the
+    rolling history of the session.
+
+    Attributes:
+        job_id (str): The id of the original job.
+        content (str): The formatted turn, used as the context of the following jobs.
+        summary (str): The compacted turn, used once the turn is out of the token budget.
+        tokens (int): The estimated tokens of the content.
+    """
+
+    job_id: str
+    content: str
+    summary: str
+    tokens: int
+
+
+@dataclass
+class SessionHistory:
+    """The rolling history of the session, appended once per finished original job.
+
+    Attributes:
+        turns (List[SessionHistoryTurn]): The recent turns kept in full, in the chat order.
+        summary_lines (List[str]): The compacted earlier turns, in the chat order.
+        omitted_turn_count (int): The number of the earliest turns dropped from the summary.
+        pending_job_ids (List[str]): The submitted original jobs not appended yet, since they
+            were not finished.
+    """
+
+    turns: List[SessionHistoryTurn] = field(default_factory=list)
+    summary_lines: List[str] = field(default_factory=list)
+    omitted_turn_count: int = 0
+    pending_job_ids: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the history."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, history_dict: Dict[str, Any]) -> "SessionHistory":
+        """Deserialize the history."""
+        return cls(
+            turns=[SessionHistoryTurn(**turn) for turn in history_dict.get("turns", [])],
+            summary_lines=list(history_dict.get("summary_lines", [])),
+            omitted_turn_count=int(history_dict.get("omitted_turn_count", 0)),
+            pending_job_ids=list(history_dict.get("pending_job_ids", [])),
+        )
@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
 from typing import List, Optional
 
+from app.core.common.cancellation import CancellationToken
 from app.core.env.insight.insight import Insight
 from app.core.model.file_descriptor import FileDescriptor
 from app.core.model.job import Job
@@ -18,10 +19,12 @@ class ToolCallContext:
     Attributes:
         job_id: The job ID associated with the tool call.
         operator_id: The operator ID associated with the tool call.
+        cancellation_token: The cancellation token of the job graph which the job belongs to.
     """
 
     job_id: str
     operator_id: str
+    cancellation_token: CancellationToken = field(default_factory=CancellationToken)
 
 
 @dataclass
@@ -38,6 +41,9 @@ class Task:
         insights (Optional[List[Insight]]): The insights from the environment.
         lesson (Optional[str]): The lesson learned from the job execution.
         file_descriptors (Optional[List[FileDescriptor]]): The file descriptors.
+        cancellation_token (CancellationToken): The cancellation token of the job graph which the
+            job belongs to.
+        llm_rounds (int): The number of the LLM calls made by the reasoner for the task.
     """
 
     job: Job
@@ -49,10 +55,13 @@ class Task:
     insights: Optional[List[Insight]] = None
     lesson: Optional[str] = None
     file_descriptors: Optional[List[FileDescriptor]] = None
+    cancellation_token: CancellationToken = field(default_factory=CancellationToken)
+    llm_rounds: int = 0
 
     def get_tool_call_ctx(self) -> ToolCallContext:
         """Get the function call context for the task."""
         return ToolCallContext(
             job_id=self.job.id,
             operator_id=self.operator_config.id if self.operator_config else "unknown_operator_id",
+            cancellation_token=self.cancellation_token,
         )
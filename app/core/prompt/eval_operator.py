@@ -28,6 +28,7 @@ Your evaluation should be based on the following error patterns. Please categori
       *   `INPUT INFORMATION` has malformed data structures, invalid types, or incorrect formats that hinder processing.
       *   `INPUT INFORMATION` is significantly incomplete, making the `JOB TARGET GOAL` impossible to fully achieve *even with perfect execution*.
       *   The `JOB EXECUTION RESULT` shows no signs of execution/reasoning failure itself, but the output is poor *because* of the input limitations.
+      *   Each `JOB INPUT INFORMATION` is labeled by the `input_job_id` which produced it. List the `input_job_id` of every flawed input in `faulty_input_job_ids`, and leave out the valid ones.
     **Special Case:** If the `INPUT INFORMATION` section explicitly states "The execution does not need the input information" or is empty *by design for that specific job*, then **this status (`INPUT_DATA_ERROR`) cannot be assigned.**
 
 3.  JOB_TOO_COMPLICATED_ERROR (The task was fundamentally too complex or outside current capabilities)
@@ -55,6 +56,7 @@ EVAL_OPERATION_OUTPUT_PROMPT = """
   "status": "SUCCESS | EXECUTION_ERROR | INPUT_DATA_ERROR | JOB_TOO_COMPLICATED_ERROR", // uppercase
   "evaluation": "The evaluation of the PREVIOUS INPUT, based on previous instructions.",
   "lesson": "The lesson of the evaluation and the experience learned.",
+  "faulty_input_job_ids": ["The input_job_id of each flawed input, only for INPUT_DATA_ERROR"]
 }
 ```
 
@@ -64,7 +66,8 @@ for example:
 {
   "status": "SUCCESS",
   "evaluation": "The previous input is complete and valid, with no obvious error patterns.",
-  "lesson": "Ensuring information completeness and logical consistency is key in the analysis process."
+  "lesson": "Ensuring information completeness and logical consistency is key in the analysis process.",
+  "faulty_input_job_ids": []
 }
 ```
 </deliverable>
@@ -75,12 +75,19 @@ class DualModelReasoner(Reasoner):
         reasoner_memory.add_message(init_message)
 
         for _ in range(max_reasoning_rounds):
+            # stop reasoning if the job graph is stopped, and cancel the in-flight LLM requests
+            task.cancellation_token.raise_if_cancelled()
+
             # thinker
-            response = await self._thinker_model.generate(
-                sys_prompt=thinker_sys_prompt,
-                messages=reasoner_memory.get_messages(),
-                tool_call_ctx=task.get_tool_call_ctx(),
+            response = await task.cancellation_token.run(
+                self._thinker_model.generate(
+                    sys_prompt=thinker_sys_prompt,
+                    messages=reasoner_memory.get_messages(),
+                    tool_call_ctx=task.get_tool_call_ctx(),
+                    temperature=task.job.temperature,
+                )
             )
+            task.llm_rounds += 1
             response.set_source_type(MessageSourceType.THINKER)
             reasoner_memory.add_message(response)
 
@@ -89,12 +96,16 @@ class DualModelReasoner(Reasoner):
                 print(f"\033[94mThinker:\n{response.get_payload()}\033[0m\n")
 
             # actor
-            response = await self._actor_model.generate(
-                sys_prompt=actor_sys_prompt,
-                messages=reasoner_memory.get_messages(),
-                tools=task.tools,
-                tool_call_ctx=task.get_tool_call_ctx(),
+            response = await task.cancellation_token.run(
+                self._actor_model.generate(
+                    sys_prompt=actor_sys_prompt,
+                    messages=reasoner_memory.get_messages(),
+                    tools=task.tools,
+                    tool_call_ctx=task.get_tool_call_ctx(),
+                    temperature=task.job.temperature,
+                )
             )
+            task.llm_rounds += 1
             response.set_source_type(MessageSourceType.ACTOR)
             reasoner_memory.add_message(response)
 
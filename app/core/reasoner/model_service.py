@@ -33,8 +33,12 @@ class ModelService(ABC):
         messages: List[ModelMessage],
         tools: Optional[List[Tool]] = None,
         tool_call_ctx: Optional[ToolCallContext] = None,
+        temperature: Optional[float] = None,
     ) -> ModelMessage:
-        """Generate a text given a prompt non-streaming"""
+        """Generate a text given a prompt non-streaming
+
+        The temperature overrides the default sampling temperature of the model service, if set.
+        """
 
     async def call_function(
         self,
@@ -47,6 +51,8 @@ class ModelService(ABC):
         Args:
             tools (List[Tool]): The tools to call
             model_response_text (str): The text containing potential function calls
+            tool_call_ctx (Optional[ToolCallContext]): The context of the tool calls. The rest of
+                the tool calls are skipped, once its cancellation token is cancelled.
 
         Returns:
             ModelMessage: Response message containing function results
@@ -59,6 +65,10 @@ class ModelService(ABC):
 
         func_call_results: List[FunctionCallResult] = []
         for func_tuple, err in func_calls:
+            # do not start a new tool call (e.g. a graph DB query), if the job graph is stopped
+            if tool_call_ctx:
+                tool_call_ctx.cancellation_token.raise_if_cancelled()
+
             if err:
                 # handle parsing error
                 func_call_results.append(FunctionCallResult.error(err))
@@ -69,12 +69,19 @@ class MonoModelReasoner(Reasoner):
         reasoner_memory.add_message(init_message)
 
         for _ in range(max_reasoning_rounds):
-            response = await self._model.generate(
-                sys_prompt=sys_prompt,
-                messages=reasoner_memory.get_messages(),
-                tools=task.tools,
-                tool_call_ctx=task.get_tool_call_ctx(),
+            # stop reasoning if the job graph is stopped, and cancel the in-flight LLM requests
+            task.cancellation_token.raise_if_cancelled()
+
+            response = await task.cancellation_token.run(
+                self._model.generate(
+                    sys_prompt=sys_prompt,
+                    messages=reasoner_memory.get_messages(),
+                    tools=task.tools,
+                    tool_call_ctx=task.get_tool_call_ctx(),
+                    temperature=task.job.temperature,
+                )
             )
+            task.llm_rounds += 1
             response.set_source_type(MessageSourceType.MODEL)
             reasoner_memory.add_message(response)
 
@@ -5,9 +5,9 @@ from typing import Any, Dict, List, Optional, Tuple, Union, cast
 from app.core.agent.expert import Expert
 from app.core.agent.leader import Leader
 from app.core.common.singleton import Singleton
-from app.core.common.type import ReasonerType, WorkflowPlatformType
+from app.core.common.type import JobPriority, ReasonerType, WorkflowPlatformType
 from app.core.dal.dao.dao_factory import DaoFactory
-from app.core.dal.database import DbSession
+from app.core.dal.database import ScopedDbSession
 from app.core.model.agentic_config import AgenticConfig, ExpertConfig, LocalToolConfig
 from app.core.model.graph_db_config import GraphDbConfig
 from app.core.model.job import Job
@@ -43,7 +43,7 @@ class AgenticService(metaclass=Singleton):
         self._service_name = service_name or "Chat2Graph"
 
         # initialize the dao
-        DaoFactory.initialize(DbSession())
+        DaoFactory.initialize(ScopedDbSession)
 
         # initialize the services
         ServiceFactory.initialize()
@@ -75,8 +75,8 @@ class AgenticService(metaclass=Singleton):
         self._job_service.save_job(job=job)
         job_wrapper = JobWrapper(job)
 
-        # execute the job
-        job_wrapper.execute()
+        # execute the job, its subjobs are scheduled as the batch jobs
+        job_wrapper.execute(priority=JobPriority.BATCH)
 
         # get the result of the job
         result_message: TextMessage = cast(
@@ -162,7 +162,7 @@ class AgenticService(metaclass=Singleton):
             mas.expert(
                 name=expert_config.profile.name,
                 description=expert_config.profile.desc,
-            ).workflow(
+            ).max_concurrency(expert_config.max_concurrency).workflow(
                 *AgenticService._build_expert_workflow(
                     expert_config=expert_config,
                     agentic_service_config=agentic_service_config,
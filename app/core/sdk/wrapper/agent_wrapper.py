@@ -28,6 +28,7 @@ class AgentWrapper:
         self._profile: Optional[Profile] = None
         self._reasoner: Optional[Reasoner] = None
         self._workflow: Optional[Workflow] = None
+        self._max_concurrency: Optional[int] = None
 
     @property
     def agent(self) -> Agent:
@@ -53,6 +54,14 @@ class AgentWrapper:
         self._reasoner = reasoner
         return self
 
+    def max_concurrency(self, max_concurrency: Optional[int]) -> "AgentWrapper":
+        """Set the max number of the subjobs executed by the expert at the same time. The extra
+        subjobs wait in the job scheduler, without holding the workers."""
+        if max_concurrency is not None and max_concurrency <= 0:
+            raise ValueError("The max concurrency of the expert must be positive.")
+        self._max_concurrency = max_concurrency
+        return self
+
     def workflow(
         self,
         *operator_chain: Union[OperatorWrapper, Tuple[OperatorWrapper, ...]],
@@ -109,5 +118,8 @@ class AgentWrapper:
         if self._type is Expert:
             self._agent = Expert(agent_config=agent_config)
             agent_service.add_expert(self._agent)
+            agent_service.set_expert_concurrency_limit(
+                expert_name=self._profile.name, limit=self._max_concurrency
+            )
 
         return self
@@ -1,7 +1,7 @@
 import time
 from typing import cast
 
-from app.core.common.type import ChatMessageRole
+from app.core.common.type import ChatMessageRole, JobPriority
 from app.core.model.job import Job
 from app.core.model.job_result import JobResult
 from app.core.model.message import ChatMessage, HybridMessage
@@ -26,10 +26,10 @@ class JobWrapper:
         """Get the job id."""
         return self._job.id
 
-    def execute(self):
+    def execute(self, priority: JobPriority = JobPriority.INTERACTIVE):
         """Submit the job."""
         agent_service: AgentService = AgentService.instance
-        agent_service.leader.execute_original_job(original_job=self._job)
+        agent_service.leader.execute_original_job(original_job=self._job, priority=priority)
 
     def get_stream(self):
         """Get the stream of the job."""
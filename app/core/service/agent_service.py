@@ -1,9 +1,14 @@
-from typing import List
+from concurrent.futures import Future
+from typing import Dict, List, Optional
 
 from app.core.agent.agent import AgentConfig
 from app.core.agent.expert import Expert
 from app.core.agent.leader import Leader
+from app.core.common.job_scheduler import JobScheduler, JobSchedulerStats
 from app.core.common.singleton import Singleton
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import JobPriority
+from app.core.model.job import Job
 
 
 class AgentService(metaclass=Singleton):
@@ -12,8 +17,22 @@ class AgentService(metaclass=Singleton):
     def __init__(self):
         self._leaders: List[Leader] = []
 
+        # the process-wide schedulers: the original jobs (leader decomposition and the job graph
+        # coordination) and the subjobs (expert executions) are bounded separately, so that the
+        # coordinators waiting for the subjobs can never occupy all the subjob workers
+        self._job_scheduler: JobScheduler = JobScheduler(
+            max_workers=SystemEnv.MAX_SUBJOB_WORKERS, name="subjob_scheduler"
+        )
+        self._original_job_scheduler: JobScheduler = JobScheduler(
+            max_workers=SystemEnv.MAX_ORIGINAL_JOB_WORKERS, name="original_job_scheduler"
+        )
+
     def set_leadder(self, leader: Leader) -> None:
         """Set the leader. The agent service now manages only one leader."""
+        leader.set_job_schedulers(
+            job_scheduler=self._job_scheduler,
+            original_job_scheduler=self._original_job_scheduler,
+        )
         self._leaders = [leader]
 
     def create_expert(self, expert_config: AgentConfig) -> None:
@@ -24,6 +43,34 @@ class AgentService(metaclass=Singleton):
         """Add an expert to the leader."""
         self.leader.state.add_expert(expert)
 
+    def submit_original_job(
+        self, original_job: Job, priority: JobPriority = JobPriority.INTERACTIVE
+    ) -> Future:
+        """Queue the original job to the leader, and return without waiting for the result."""
+        return self.leader.submit_original_job(original_job=original_job, priority=priority)
+
+    def set_session_weight(self, session_id: str, weight: float) -> None:
+        """Set the share of the workers of the session in the schedulers."""
+        self._job_scheduler.set_session_weight(session_id=session_id, weight=weight)
+        self._original_job_scheduler.set_session_weight(session_id=session_id, weight=weight)
+
+    def set_expert_concurrency_limit(self, expert_name: str, limit: Optional[int]) -> None:
+        """Set the max number of the running subjobs of the expert, or remove the limit if it is
+        None. The subjobs over the limit are throttled in the subjob scheduler."""
+        self._job_scheduler.set_concurrency_limit(key=expert_name, limit=limit)
+
+    def get_scheduler_stats(self) -> Dict[str, JobSchedulerStats]:
+        """Get the queue depth, wait time and worker usage of the schedulers."""
+        return {
+            "subjob": self._job_scheduler.get_stats(),
+            "original_job": self._original_job_scheduler.get_stats(),
+        }
+
+    @property
+    def job_scheduler(self) -> JobScheduler:
+        """Get the scheduler of the subjobs shared by the process."""
+        return self._job_scheduler
+
     @property
     def leader(self) -> Leader:
         """Get the leader. The agent service now manages only one leader."""
@@ -1,8 +1,10 @@
 from copy import deepcopy
-from typing import Any, Dict, List, Optional, Tuple
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from app.core.common.singleton import Singleton
 from app.core.dal.dao.artifact_dao import ArtifactDao
+from app.core.dal.database import after_commit
 from app.core.model.artifact import (
     Artifact,
     ContentType,
@@ -21,6 +23,14 @@ class ArtifactService(metaclass=Singleton):
     def __init__(self):
         self._artifact_dao: ArtifactDao = ArtifactDao.instance
 
+        # the hooks called after an artifact is saved (e.g. to publish the progress events)
+        self._save_hooks: List[Callable[[Artifact], None]] = []
+
+    def add_save_hook(self, hook: Callable[[Artifact], None]) -> None:
+        """Add a hook, which is called with the artifact after it is saved (and committed, if it is
+        saved in a unit of work)."""
+        self._save_hooks.append(hook)
+
     def save_artifact(self, artifact: Artifact) -> str:
         """Create a new artifact or update an existing one.
 
@@ -31,6 +41,8 @@ class ArtifactService(metaclass=Singleton):
             str: ID of the artifact
         """
         artifact_do = self._artifact_dao.save_artifact(artifact)
+        for hook in self._save_hooks:
+            after_commit(partial(hook, artifact))
         return str(artifact_do.id)
 
     def get_artifact(self, artifact_id: str) -> Optional[Artifact]:
@@ -102,6 +114,8 @@ class ArtifactService(metaclass=Singleton):
 
         # save the updated artifact
         self._artifact_dao.save_artifact(artifact)
+        for hook in self._save_hooks:
+            after_commit(partial(hook, artifact))
 
         return artifact
 
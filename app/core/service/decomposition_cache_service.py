@@ -0,0 +1,148 @@
+from collections import OrderedDict
+import copy
+from dataclasses import dataclass
+import hashlib
+import json
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from app.core.common.singleton import Singleton
+from app.core.common.system_env import SystemEnv
+from app.core.dal.dao.decomposition_cache_dao import DecompositionCacheDao
+
+if TYPE_CHECKING:
+    from app.core.agent.agent import Profile
+
+
+@dataclass
+class DecompositionCacheStats:
+    """The snapshot of the decomposition cache metrics.
+
+    Attributes:
+        enabled (bool): Whether the decomposition cache is enabled.
+        size (int): The number of the decompositions cached in memory.
+        capacity (int): The max number of the decompositions cached in memory.
+        ttl (int): The time to live (in seconds) of a decomposition, 0 means never expire.
+        hit_count (int): The number of the lookups served by the cache.
+        miss_count (int): The number of the lookups which fall back to the reasoner.
+        hit_rate (float): hit_count / (hit_count + miss_count).
+    """
+
+    enabled: bool
+    size: int
+    capacity: int
+    ttl: int
+    hit_count: int = 0
+    miss_count: int = 0
+    hit_rate: float = 0.0
+
+
+class DecompositionCacheService(metaclass=Singleton):
+    """Decomposition cache service
+
+    The leader decomposes the same original job into the same subjobs, if the goal, the context
+    and the available experts are unchanged. The validated decompositions are cached by a hash of
+    the normalized request, in memory (LRU with TTL) and in the system database (so that they
+    survive the restarts), so that a repeated job skips the LLM round trips of the decomposition.
+    """
+
+    def __init__(self):
+        self._decomposition_cache_dao: DecompositionCacheDao = DecompositionCacheDao.instance
+
+        # key -> (the job dict, the time it is cached), in the LRU order
+        self._job_dicts: OrderedDict[str, Tuple[Dict[str, Dict[str, str]], float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hit_count: int = 0
+        self._miss_count: int = 0
+
+        self._decomposition_cache_dao.delete_expired(ttl=SystemEnv.DECOMPOSITION_CACHE_TTL)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the decomposition cache is enabled."""
+        return bool(SystemEnv.DECOMPOSITION_CACHE_ENABLED)
+
+    @staticmethod
+    def make_key(goal: str, context: str, expert_profiles: List["Profile"]) -> str:
+        """Make the cache key of a decomposition request.
+
+        The whitespaces of the texts are normalized, and the expert profiles are sorted, so that
+        the equivalent requests share the same key. The case is kept, since the cached subjobs
+        replay the case-sensitive literals of the request (e.g. labels, property values, paths).
+        """
+
+        def normalize(text: str) -> str:
+            return re.sub(r"\s+", " ", text or "").strip()
+
+        request = {
+            "goal": normalize(goal),
+            "context": normalize(context),
+            "experts": sorted(
+                [normalize(profile.name), normalize(profile.description)]
+                for profile in expert_profiles
+            ),
+        }
+        return hashlib.sha256(
+            json.dumps(request, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Dict[str, str]]]:
+        """Get a copy of the cached decomposition, or None if it is not cached or expired."""
+        ttl: int = SystemEnv.DECOMPOSITION_CACHE_TTL
+        with self._lock:
+            cached = self._job_dicts.get(key)
+            if cached and ttl > 0 and cached[1] + ttl < time.time():
+                self._job_dicts.pop(key)
+                cached = None
+            if cached:
+                self._job_dicts.move_to_end(key)
+                job_dict: Optional[Dict[str, Dict[str, str]]] = cached[0]
+            else:
+                result = self._decomposition_cache_dao.get_unexpired(key=key, ttl=ttl)
+                job_dict = dict(result.job_dict) if result else None
+                if result and job_dict:
+                    self._cache(key, job_dict, float(result.timestamp))
+
+            if not job_dict:
+                self._miss_count += 1
+                return None
+            self._hit_count += 1
+
+        self._decomposition_cache_dao.increase_hit_count(key=key)
+        return copy.deepcopy(job_dict)
+
+    def put(self, key: str, job_dict: Dict[str, Dict[str, str]]) -> None:
+        """Cache the validated decomposition, and persist it."""
+        job_dict = copy.deepcopy(job_dict)
+        with self._lock:
+            self._cache(key, job_dict, time.time())
+        self._decomposition_cache_dao.save_job_dict(key=key, job_dict=job_dict)
+
+    def invalidate(self, key: str) -> None:
+        """Drop the decomposition, e.g. it can not be applied to the current experts."""
+        with self._lock:
+            self._job_dicts.pop(key, None)
+        self._decomposition_cache_dao.delete(id=key)
+
+    def get_stats(self) -> DecompositionCacheStats:
+        """Get the snapshot of the decomposition cache metrics."""
+        with self._lock:
+            lookup_count = self._hit_count + self._miss_count
+            return DecompositionCacheStats(
+                enabled=self.enabled,
+                size=len(self._job_dicts),
+                capacity=SystemEnv.DECOMPOSITION_CACHE_SIZE,
+                ttl=SystemEnv.DECOMPOSITION_CACHE_TTL,
+                hit_count=self._hit_count,
+                miss_count=self._miss_count,
+                hit_rate=self._hit_count / lookup_count if lookup_count else 0.0,
+            )
+
+    def _cache(self, key: str, job_dict: Dict[str, Dict[str, str]], cached_at: float) -> None:
+        """Put the decomposition into the in-memory LRU cache. The caller must hold the lock."""
+        self._job_dicts[key] = (job_dict, cached_at)
+        self._job_dicts.move_to_end(key)
+        while len(self._job_dicts) > max(SystemEnv.DECOMPOSITION_CACHE_SIZE, 0):
+            self._job_dicts.popitem(last=False)
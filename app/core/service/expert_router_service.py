@@ -0,0 +1,274 @@
+from collections import deque
+from dataclasses import dataclass, field
+import math
+import re
+import threading
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Set, Tuple
+
+from app.core.common.singleton import Singleton
+from app.core.common.system_env import SystemEnv
+
+if TYPE_CHECKING:
+    from app.core.agent.agent import Profile
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[\u4e00-\u9fff]+")
+_SENTENCE_PATTERN = re.compile(r"[.!?;\n。！？；]")
+_NEGATION_PATTERN = re.compile(r"\b(not|never|no|nor|cannot)\b|n't|不|没有|无法")
+# the words which chain the steps of a multi-step request
+_SEQUENCE_PATTERN = re.compile(r"\b(then|after|afterwards)\b|然后|之后|接着")
+_STOP_WORDS: Set[str] = set(
+    "a an and are as at be by can do does for from he his how i in is it me my of on or please "
+    "run show tell that the this to use what which who with you".split()
+)
+# the well-known terms, which the expert profiles describe by their general names
+_TERM_ALIASES: Dict[str, List[str]] = {
+    "pagerank": ["algorithm", "centrality"],
+    "betweenness": ["algorithm", "centrality"],
+    "closeness": ["algorithm", "centrality"],
+    "louvain": ["algorithm", "community"],
+    "lpa": ["algorithm", "community"],
+    "wcc": ["algorithm", "community"],
+    "kcore": ["algorithm"],
+    "sssp": ["algorithm"],
+    "cypher": ["query"],
+    "gql": ["query"],
+    "gremlin": ["query"],
+}
+
+
+@dataclass
+class ExpertRoutingDecision:
+    """The routing decision of an original job.
+
+    Attributes:
+        job_id (str): The id of the original job.
+        expert_name (Optional[str]): The expert which the job is routed to, or None if the job is
+            decomposed by the leader.
+        confidence (float): The margin of the best expert over the second best one, in [0, 1].
+        fast_path (bool): Whether the decomposition is skipped.
+        routing_latency (float): The time (in seconds) spent on the routing.
+        decomposition_latency (Optional[float]): The time (in seconds) spent on the decomposition
+            by the reasoner, if the job is decomposed.
+        saved_latency (float): The estimated time (in seconds) saved by the fast path.
+    """
+
+    job_id: str
+    expert_name: Optional[str]
+    confidence: float
+    fast_path: bool
+    routing_latency: float
+    decomposition_latency: Optional[float] = None
+    saved_latency: float = 0.0
+
+
+@dataclass
+class ExpertRouterStats:
+    """The snapshot of the expert router metrics.
+
+    Attributes:
+        enabled (bool): Whether the fast-path routing is enabled.
+        confidence_threshold (float): The min confidence to take the fast path.
+        request_count (int): The number of the original jobs seen by the router.
+        fast_path_count (int): The number of the original jobs routed to a single expert.
+        fast_path_rate (float): fast_path_count / request_count.
+        avg_decomposition_latency (float): The average time (in seconds) of the decompositions.
+        saved_latency (float): The total estimated time (in seconds) saved by the fast path.
+        recent_decisions (List[ExpertRoutingDecision]): The latest routing decisions.
+    """
+
+    enabled: bool
+    confidence_threshold: float
+    request_count: int = 0
+    fast_path_count: int = 0
+    fast_path_rate: float = 0.0
+    avg_decomposition_latency: float = 0.0
+    saved_latency: float = 0.0
+    recent_decisions: List[ExpertRoutingDecision] = field(default_factory=list)
+
+
+class ExpertRouterService(metaclass=Singleton):
+    """Expert router service
+
+    Many requests (e.g. "run PageRank") are served by a single expert, so the decomposition by the
+    leader reasoner is a waste of LLM round trips. The router scores the experts by the keywords of
+    the request shared with their profiles (weighted by how distinctive they are among the
+    experts), and routes the request to the best expert directly, if it wins by a clear margin.
+
+    The sentences with negations are left out of the profiles and the requests, since they describe
+    what is not done (e.g. "He does not perform complex graph algorithm analysis"). The requests
+    which match more than one expert, or chain several steps (e.g. "..., then ..."), are left to
+    the decomposition.
+    """
+
+    MAX_RECENT_DECISIONS = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._request_count: int = 0
+        self._fast_path_count: int = 0
+        self._saved_latency: float = 0.0
+        self._decomposition_count: int = 0
+        self._decomposition_latency: float = 0.0
+        self._recent_decisions: Deque[ExpertRoutingDecision] = deque(
+            maxlen=self.MAX_RECENT_DECISIONS
+        )
+
+        # the profiles (name, description) -> the keyword weights of the experts
+        self._profiles_key: Tuple[Tuple[str, str], ...] = ()
+        self._keyword_weights: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the fast-path routing is enabled."""
+        return bool(SystemEnv.EXPERT_ROUTER_ENABLED)
+
+    @staticmethod
+    def tokenize(text: str) -> Set[str]:
+        """Tokenize the text into the keywords: the lowercased words (without the plural suffix)
+        and the bigrams of the Chinese text."""
+        tokens: Set[str] = set()
+        for token in _TOKEN_PATTERN.findall((text or "").lower()):
+            if "\u4e00" <= token[0] <= "\u9fff":
+                tokens.update(token[i : i + 2] for i in range(max(len(token) - 1, 1)))
+                continue
+            if token in _STOP_WORDS:
+                continue
+            if len(token) > 4 and token.endswith("ies"):
+                token = token[:-3] + "y"
+            elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+                token = token[:-1]
+            tokens.add(token)
+            tokens.update(_TERM_ALIASES.get(token, []))
+        return tokens
+
+    @staticmethod
+    def _strip_negated_sentences(text: str) -> str:
+        """Leave out the sentences with negations of the text."""
+        return "\n".join(
+            sentence
+            for sentence in _SENTENCE_PATTERN.split(text or "")
+            if not _NEGATION_PATTERN.search(sentence.lower())
+        )
+
+    def route(self, goal: str, expert_profiles: List["Profile"]) -> Tuple[Optional[str], float]:
+        """Route the request to a single expert.
+
+        Returns:
+            Tuple[Optional[str], float]: The name of the expert, or None if the confidence is
+                below the threshold (or the request is too long, chains several steps, or matches
+                more than one expert to be a single-expert request), and the confidence.
+        """
+        if len(goal) > SystemEnv.EXPERT_ROUTER_MAX_GOAL_LENGTH:
+            return None, 0.0
+        positive_goal = self._strip_negated_sentences(goal)
+        if _SEQUENCE_PATTERN.search(positive_goal.lower()):
+            return None, 0.0
+
+        keyword_weights = self._get_keyword_weights(expert_profiles)
+        goal_tokens = self.tokenize(positive_goal)
+        scores = sorted(
+            (
+                (sum(weights.get(token, 0.0) for token in goal_tokens), name)
+                for name, weights in keyword_weights.items()
+            ),
+            reverse=True,
+        )
+        if not scores or scores[0][0] <= 0:
+            return None, 0.0
+
+        best_score, best_name = scores[0]
+        second_score = scores[1][0] if len(scores) > 1 else 0.0
+        confidence = (best_score - second_score) / best_score
+        if second_score > 0 or confidence < SystemEnv.EXPERT_ROUTER_CONFIDENCE_THRESHOLD:
+            return None, confidence
+        return best_name, confidence
+
+    def record(
+        self,
+        job_id: str,
+        expert_name: Optional[str],
+        confidence: float,
+        routing_latency: float,
+        decomposition_latency: Optional[float] = None,
+    ) -> ExpertRoutingDecision:
+        """Record the routing decision of the original job. The latency saved by the fast path is
+        estimated by the average latency of the decompositions."""
+        with self._lock:
+            fast_path = expert_name is not None
+            decision = ExpertRoutingDecision(
+                job_id=job_id,
+                expert_name=expert_name,
+                confidence=confidence,
+                fast_path=fast_path,
+                routing_latency=routing_latency,
+                decomposition_latency=decomposition_latency,
+            )
+
+            self._request_count += 1
+            if fast_path:
+                self._fast_path_count += 1
+                decision.saved_latency = max(
+                    self._get_avg_decomposition_latency() - routing_latency, 0.0
+                )
+                self._saved_latency += decision.saved_latency
+            elif decomposition_latency is not None:
+                self._decomposition_count += 1
+                self._decomposition_latency += decomposition_latency
+            self._recent_decisions.append(decision)
+            return decision
+
+    def get_stats(self) -> ExpertRouterStats:
+        """Get the snapshot of the expert router metrics."""
+        with self._lock:
+            return ExpertRouterStats(
+                enabled=self.enabled,
+                confidence_threshold=SystemEnv.EXPERT_ROUTER_CONFIDENCE_THRESHOLD,
+                request_count=self._request_count,
+                fast_path_count=self._fast_path_count,
+                fast_path_rate=(
+                    self._fast_path_count / self._request_count if self._request_count else 0.0
+                ),
+                avg_decomposition_latency=self._get_avg_decomposition_latency(),
+                saved_latency=self._saved_latency,
+                recent_decisions=list(self._recent_decisions),
+            )
+
+    def _get_avg_decomposition_latency(self) -> float:
+        """Get the average latency of the decompositions. The caller must hold the lock."""
+        if not self._decomposition_count:
+            return 0.0
+        return self._decomposition_latency / self._decomposition_count
+
+    def _get_keyword_weights(self, expert_profiles: List["Profile"]) -> Dict[str, Dict[str, float]]:
+        """Get the keyword weights (IDF among the experts) of each expert, and rebuild them only
+        when the experts are changed."""
+        profiles_key = tuple((p.name, p.description) for p in expert_profiles)
+        with self._lock:
+            if profiles_key == self._profiles_key:
+                return self._keyword_weights
+
+        expert_keywords: Dict[str, Set[str]] = {}
+        for profile in expert_profiles:
+            expert_keywords[profile.name] = self.tokenize(
+                profile.name + "\n" + self._strip_negated_sentences(profile.description)
+            )
+
+        # the keywords shared by all the experts (e.g. "graph") do not tell the experts apart
+        document_counts: Dict[str, int] = {}
+        for keywords in expert_keywords.values():
+            for keyword in keywords:
+                document_counts[keyword] = document_counts.get(keyword, 0) + 1
+        expert_count = len(expert_keywords)
+        keyword_weights = {
+            name: {
+                keyword: math.log(expert_count / document_counts[keyword])
+                for keyword in keywords
+                if document_counts[keyword] < expert_count
+            }
+            for name, keywords in expert_keywords.items()
+        }
+
+        with self._lock:
+            self._profiles_key = profiles_key
+            self._keyword_weights = keyword_weights
+        return keyword_weights
@@ -6,7 +6,7 @@ from werkzeug.datastructures import FileStorage
 
 from app.core.common.singleton import Singleton
 from app.core.common.system_env import SystemEnv
-from app.core.common.type import FileStorageType, KnowledgeStoreFileStatus
+from app.core.common.type import FileStorageType
 from app.core.dal.dao.file_descriptor_dao import FileDescriptorDao
 from app.core.model.file_descriptor import FileDescriptor
 
@@ -126,15 +126,4 @@ class FileService(metaclass=Singleton):
         Args:
             file_id (str): ID of the file
         """
-        file_descriptor_do = self._file_descriptor_dao.get_by_id(id=file_id)
-        if file_descriptor_do:
-            return FileDescriptor(
-                id=file_id,
-                path=str(file_descriptor_do.path),
-                name=str(file_descriptor_do.name),
-                type=FileStorageType(str(file_descriptor_do.type)),
-                size=str(file_descriptor_do.size),
-                status=KnowledgeStoreFileStatus.SUCCESS,
-                timestamp=int(file_descriptor_do.timestamp),
-            )
-        raise ValueError(f"Cannot find file with ID {id}.")
+        return self._file_descriptor_dao.get_file_descriptor_by_id(id=file_id)
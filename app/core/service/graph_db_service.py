@@ -1,10 +1,11 @@
 import json
-from typing import Any, Dict, List, cast
+from typing import Any, Dict, List, Optional, cast
 
 from app.core.common.singleton import Singleton
 from app.core.common.type import GraphDbType
 from app.core.dal.dao.graph_db_dao import GraphDbDao
 from app.core.model.graph_db_config import GraphDbConfig, Neo4jDbConfig
+from app.core.model.page import Page
 from app.core.toolkit.graph_db.graph_db import GraphDb
 from app.core.toolkit.graph_db.graph_db_factory import GraphDbFactory
 
@@ -113,6 +114,19 @@ class GraphDbService(metaclass=Singleton):
         results = self._graph_db_dao.get_all()
         return [GraphDbConfig.from_do(result) for result in results]
 
+    def get_graph_db_configs_page(
+        self, size: int, cursor: Optional[str] = None
+    ) -> Page[GraphDbConfig]:
+        """Get a page of the GraphDBs, the latest created first."""
+        results, next_cursor = self._graph_db_dao.get_page(
+            size=size, cursor=cursor, order_by="create_time"
+        )
+        return Page(
+            items=[GraphDbConfig.from_do(result) for result in results],
+            next_cursor=next_cursor,
+            total=self._graph_db_dao.get_total_count(),
+        )
+
     def validate_graph_db_connection(self, graph_db_config: GraphDbConfig) -> bool:
         """Validate connection to a graph database."""
         try:
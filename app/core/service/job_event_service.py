@@ -0,0 +1,309 @@
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from itertools import islice
+import threading
+import time
+from typing import Any, Deque, Dict, Generator, Optional, Tuple
+
+from app.core.common.singleton import Singleton
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import JobStatus
+from app.core.dal.dao.job_dao import JobDao
+from app.core.dal.do.job_do import JobDo
+from app.core.model.artifact import Artifact
+from app.core.model.job_event import JobEvent, JobEventBatch, JobEventType
+from app.core.model.job_result import JobResult
+from app.core.model.message import (
+    AgentMessage,
+    ChatMessage,
+    FileMessage,
+    GraphMessage,
+    HybridMessage,
+    Message,
+    MessageType,
+)
+from app.core.service.artifact_service import ArtifactService
+from app.core.service.job_service import JobService
+from app.core.service.message_service import MessageService
+from app.server.manager.view.message_view import MessageViewTransformer
+
+
+@dataclass
+class _JobRoute:
+    """The session and the original job of a job, to route its events to the subscribers.
+
+    Attributes:
+        session_id (str): The session of the job.
+        original_job_id (str): The original job, which is the job itself for an original job.
+        status (Optional[JobStatus]): The latest published status of the job.
+    """
+
+    session_id: str
+    original_job_id: str
+    status: Optional[JobStatus] = None
+
+
+class JobEventService(metaclass=Singleton):
+    """Job event service
+
+    The progress of the jobs (the status transitions, the new chat and agent messages, and the
+    artifact updates) is published as events once the changes are saved by the job, message and
+    artifact services, and kept in a bounded in-memory buffer with monotonically increasing
+    cursors. The frontend follows the events of a session or an original job after a cursor, by
+    the server-sent events or by the long polling, and applies the deltas to the views loaded
+    once, instead of reloading the full conversation views on a timer.
+
+    The events are published in the process which saves the changes, so the subjobs executed by
+    the workers (app.worker) only publish their status transitions polled by the server.
+    """
+
+    def __init__(self):
+        self._job_dao: JobDao = JobDao.instance
+
+        self._events: Deque[JobEvent] = deque(maxlen=SystemEnv.JOB_EVENT_BUFFER_SIZE)
+        # the cursors start from the boot time (in ms), so that a cursor issued before a restart
+        # is always out of the buffer, and the client is told to reload the full views
+        self._cursor: int = int(time.time() * 1000)
+        self._condition = threading.Condition()
+
+        # (the kind, the session id or the original job id) -> the (cursor, timestamp) of the
+        # latest event, in the LRU order, which versions the views for the conditional requests
+        self._versions: OrderedDict[Tuple[str, str], Tuple[int, float]] = OrderedDict()
+        # the version of the views without any event kept, which is increased by the evictions,
+        # so that a version is never reused for a changed view
+        self._base_version: Tuple[int, float] = (self._cursor, time.time())
+
+        # job_id -> the route of the job, in the LRU order
+        self._job_routes: OrderedDict[str, _JobRoute] = OrderedDict()
+        self._job_route_lock = threading.Lock()
+
+        message_service: MessageService = MessageService.instance
+        message_service.add_save_hook(self._publish_message)
+        job_service: JobService = JobService.instance
+        job_service.add_job_result_hook(self._publish_job_result)
+        artifact_service: ArtifactService = ArtifactService.instance
+        artifact_service.add_save_hook(self._publish_artifact)
+
+    def get_cursor(self) -> int:
+        """Get the cursor of the latest event."""
+        with self._condition:
+            return self._cursor
+
+    def publish(
+        self,
+        event_type: JobEventType,
+        job_id: str,
+        data: Dict[str, Any],
+        session_id: Optional[str] = None,
+    ) -> Optional[JobEvent]:
+        """Publish an event of the job, and wake up the waiting subscribers.
+
+        Returns:
+            Optional[JobEvent]: The published event, or None if the job is not found.
+        """
+        route = self._get_job_route(job_id=job_id, session_id=session_id)
+        if not route:
+            return None
+
+        with self._condition:
+            self._cursor += 1
+            event = JobEvent(
+                cursor=self._cursor,
+                type=event_type,
+                session_id=route.session_id,
+                original_job_id=route.original_job_id,
+                job_id=job_id,
+                data=data,
+                timestamp=time.time(),
+            )
+            self._events.append(event)
+            for key in [("session", route.session_id), ("job", route.original_job_id)]:
+                self._versions[key] = (event.cursor, event.timestamp)
+                self._versions.move_to_end(key)
+            while len(self._versions) > SystemEnv.JOB_EVENT_BUFFER_SIZE:
+                _, evicted_version = self._versions.popitem(last=False)
+                self._base_version = max(self._base_version, evicted_version)
+            self._condition.notify_all()
+        return event
+
+    def get_version(
+        self, session_id: Optional[str] = None, original_job_id: Optional[str] = None
+    ) -> Tuple[int, float]:
+        """Get the version of the views of the session or the original job, which is changed
+        once an event of them is published.
+
+        Returns:
+            Tuple[int, float]: The cursor and the timestamp of the latest event.
+        """
+        key = ("session", session_id) if session_id else ("job", str(original_job_id))
+        with self._condition:
+            return self._versions.get(key, self._base_version)
+
+    def get_events(
+        self,
+        since: Optional[int] = None,
+        session_id: Optional[str] = None,
+        original_job_id: Optional[str] = None,
+        timeout: float = 0.0,
+    ) -> JobEventBatch:
+        """Get the events of the session or the original job after the cursor, and wait for the
+        following events up to the timeout if there is none yet.
+
+        Args:
+            since (Optional[int]): The cursor of the latest event received by the client, or None
+                to follow the events from now on.
+            session_id (Optional[str]): The session to filter the events.
+            original_job_id (Optional[str]): The original job to filter the events.
+            timeout (float): The max seconds to wait for the events.
+
+        Returns:
+            JobEventBatch: The events, and the cursor to fetch the following events from.
+        """
+        deadline = time.time() + timeout
+        with self._condition:
+            if since is None:
+                since = self._cursor
+            while True:
+                batch = self._collect_events(since, session_id, original_job_id)
+                remaining = deadline - time.time()
+                if batch.events or batch.reset or remaining <= 0:
+                    return batch
+                # the unmatched events are not scanned again after waking up
+                since = batch.cursor
+                self._condition.wait(remaining)
+
+    def follow_events(
+        self,
+        since: Optional[int] = None,
+        session_id: Optional[str] = None,
+        original_job_id: Optional[str] = None,
+        timeout: float = 0.0,
+    ) -> Generator[JobEventBatch, None, None]:
+        """Follow the events of the session or the original job after the cursor endlessly, and
+        yield the batches (an empty one once the timeout expires without any event)."""
+        if since is None:
+            since = self.get_cursor()
+        while True:
+            batch = self.get_events(
+                since=since,
+                session_id=session_id,
+                original_job_id=original_job_id,
+                timeout=timeout,
+            )
+            yield batch
+            since = batch.cursor
+
+    def _collect_events(
+        self, since: int, session_id: Optional[str], original_job_id: Optional[str]
+    ) -> JobEventBatch:
+        """Collect the matched events after the cursor from the buffer (the lock is held)."""
+        first_cursor = self._events[0].cursor if self._events else self._cursor + 1
+        if since > self._cursor or since < first_cursor - 1:
+            return JobEventBatch(cursor=self._cursor, reset=True)
+
+        # the cursors of the buffered events are consecutive, so the position of the cursor is known
+        return JobEventBatch(
+            events=[
+                event
+                for event in islice(self._events, since - first_cursor + 1, None)
+                if (session_id is None or event.session_id == session_id)
+                and (original_job_id is None or event.original_job_id == original_job_id)
+            ],
+            cursor=self._cursor,
+        )
+
+    def _get_job_route(self, job_id: str, session_id: Optional[str] = None) -> Optional[_JobRoute]:
+        """Get the route of the job from the cache, or from the database."""
+        with self._job_route_lock:
+            route = self._job_routes.get(job_id)
+            if route:
+                self._job_routes.move_to_end(job_id)
+                return route
+
+        job_do: Optional[JobDo] = self._job_dao.get_by_id(id=job_id)
+        if job_do:
+            route = _JobRoute(
+                session_id=str(job_do.session_id),
+                original_job_id=str(job_do.original_job_id or job_do.id),
+            )
+        elif session_id:
+            # the messages of a job not saved yet (e.g. the question of the submitted job)
+            return _JobRoute(session_id=session_id, original_job_id=job_id)
+        else:
+            return None
+
+        with self._job_route_lock:
+            route = self._job_routes.setdefault(job_id, route)
+            self._job_routes.move_to_end(job_id)
+            while len(self._job_routes) > SystemEnv.JOB_EVENT_BUFFER_SIZE:
+                self._job_routes.popitem(last=False)
+        return route
+
+    def _publish_job_result(self, job_result: JobResult) -> None:
+        """Publish the status transition of the job, since its result is saved."""
+        route = self._get_job_route(job_id=job_result.job_id)
+        if not route:
+            return
+        with self._job_route_lock:
+            if route.status == job_result.status:
+                return
+            route.status = job_result.status
+
+        self.publish(
+            event_type=JobEventType.JOB_STATUS,
+            job_id=job_result.job_id,
+            data={
+                "status": job_result.status.value,
+                "duration": job_result.duration,
+                "tokens": job_result.tokens,
+            },
+        )
+
+    def _publish_message(self, message: Message) -> None:
+        """Publish the chat message or the agent (thinking) message of the job, since it is
+        saved."""
+        if isinstance(message, FileMessage) or not isinstance(message, AgentMessage | ChatMessage):
+            # the file messages are the attachments of the questions, and the model messages and
+            # the workflow messages are internal to the agents
+            return
+
+        data: Dict[str, Any] = {"message_type": self._get_message_type(message).value}
+        try:
+            data["message"] = MessageViewTransformer.serialize_message(message)
+        except ValueError:
+            # e.g. an attached file without the descriptor, which is fetched by the message id
+            data["message_id"] = message.get_id()
+
+        self.publish(
+            event_type=JobEventType.MESSAGE,
+            job_id=message.get_job_id(),
+            data=data,
+            session_id=message.get_session_id() if isinstance(message, ChatMessage) else None,
+        )
+
+    def _publish_artifact(self, artifact: Artifact) -> None:
+        """Publish the creation or the update of the artifact of the job, since it is saved. The
+        content is not published, since it can be large (e.g. a graph)."""
+        self.publish(
+            event_type=JobEventType.ARTIFACT,
+            job_id=artifact.source_reference.job_id,
+            data={
+                "id": artifact.id,
+                "content_type": artifact.content_type.value,
+                "status": artifact.status.value,
+                "version": artifact.metadata.version,
+                "description": artifact.metadata.description,
+                "handle": artifact.handle,
+            },
+            session_id=artifact.source_reference.session_id,
+        )
+
+    def _get_message_type(self, message: Message) -> MessageType:
+        """Get the type of the published message."""
+        if isinstance(message, AgentMessage):
+            return MessageType.AGENT_MESSAGE
+        if isinstance(message, HybridMessage):
+            return MessageType.HYBRID_MESSAGE
+        if isinstance(message, GraphMessage):
+            return MessageType.GRAPH_MESSAGE
+        return MessageType.TEXT_MESSAGE
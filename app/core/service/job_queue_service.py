@@ -0,0 +1,216 @@
+from concurrent.futures import Future
+import threading
+from typing import Any, Dict, List, Optional, Set, cast
+
+from app.core.common.cancellation import JobCancelledError
+from app.core.common.singleton import Singleton
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import JobPriority, JobStatus
+from app.core.dal.dao.job_dao import JobDao
+from app.core.dal.do.job_do import JobDo
+from app.core.model.message import AgentMessage, MessageType, WorkflowMessage
+from app.core.service.job_service import JobService
+from app.core.service.message_service import MessageService
+
+
+class JobQueueService(metaclass=Singleton):
+    """Durable subjob queue service
+
+    The ready subjobs are queued in the job table (status `QUEUED`) instead of the threads of the
+    server process, and they are claimed by the expert workers (`python -m app.worker`), which
+    can be run in multiple processes on one or more hosts. A worker holds a lease of the claimed
+    subjob, and extends it by the heartbeats. Once the lease expires (e.g. the worker crashed),
+    the subjob is queued again.
+
+    The leader gets a future of the queued subjob as if it was submitted to the job scheduler, and
+    the future is resolved by a monitor thread, which polls the outputs of the queued subjobs.
+
+    Queue payload of a subjob:
+        workflow_message_ids (List[str]): The outputs of the predecessors (the input).
+        lesson (Optional[str]): The lesson of the input agent message.
+        result_message_id (str): The id of the output agent message of the expert.
+        error (str): The error raised by the execution.
+        cancelled (bool): Whether the execution is cancelled.
+    """
+
+    def __init__(self):
+        self._job_dao: JobDao = JobDao.instance
+        self._job_service: JobService = JobService.instance
+        self._message_service: MessageService = MessageService.instance
+
+        # subjob_id -> the future of the queued subjob, which is resolved by the monitor
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._monitor: Optional[threading.Thread] = None
+
+    def enqueue(
+        self,
+        agent_message: AgentMessage,
+        priority: JobPriority = JobPriority.INTERACTIVE,
+        rank: float = 0.0,
+    ) -> Future:
+        """Queue the subjob with its input agent message, and return the future of the output
+        agent message."""
+        job_id = agent_message.get_job_id()
+        future: Future = Future()
+
+        # the workers load the input workflow messages from the database
+        workflow_messages: List[WorkflowMessage] = agent_message.get_workflow_messages()
+        workflow_message_ids = [message.get_id() for message in workflow_messages]
+        saved_ids = self._message_service.get_messages_by_ids(ids=workflow_message_ids).keys()
+        for workflow_message in workflow_messages:
+            if workflow_message.get_id() not in saved_ids:
+                self._message_service.save_message(message=workflow_message)
+        self._message_service.flush()
+
+        queued = self._job_dao.enqueue_subjob(
+            job_id=job_id,
+            payload={
+                "workflow_message_ids": workflow_message_ids,
+                "lesson": agent_message.get_lesson(),
+            },
+            priority=priority,
+            rank=rank,
+        )
+        if not queued:
+            future.set_exception(JobCancelledError(f"The subjob {job_id} has been stopped."))
+            return future
+
+        with self._lock:
+            self._futures[job_id] = future
+            if not self._monitor:
+                self._monitor = threading.Thread(
+                    target=self._monitor_queued_jobs, name="job_queue_monitor", daemon=True
+                )
+                self._monitor.start()
+        return future
+
+    def claim(self, worker_id: str, limit: int) -> List[AgentMessage]:
+        """Claim the queued subjobs by the worker, and return their input agent messages."""
+        claimed_jobs: List[JobDo] = self._job_dao.claim_subjobs(
+            worker_id=worker_id,
+            lease_duration=SystemEnv.SUBJOB_QUEUE_LEASE_DURATION,
+            limit=limit,
+        )
+
+        agent_messages: List[AgentMessage] = []
+        for job_do in claimed_jobs:
+            payload: Dict[str, Any] = dict(job_do.queue_payload or {})
+            workflow_messages_by_id = self._message_service.get_messages_by_ids(
+                ids=payload.get("workflow_message_ids", [])
+            )
+            agent_messages.append(
+                AgentMessage(
+                    job_id=str(job_do.id),
+                    workflow_messages=[
+                        cast(WorkflowMessage, workflow_messages_by_id[id])
+                        for id in payload.get("workflow_message_ids", [])
+                        if id in workflow_messages_by_id
+                    ],
+                    lesson=payload.get("lesson"),
+                )
+            )
+        return agent_messages
+
+    def heartbeat(self, worker_id: str, job_ids: List[str]) -> Set[str]:
+        """Extend the leases of the subjobs held by the worker.
+
+        Returns:
+            Set[str]: The original job ids of the subjobs, whose job graphs have been stopped or
+                failed, so that the worker cancels the executions.
+        """
+        self._job_dao.renew_leases(
+            worker_id=worker_id,
+            job_ids=job_ids,
+            lease_duration=SystemEnv.SUBJOB_QUEUE_LEASE_DURATION,
+        )
+        return self._get_terminated_original_job_ids(self._job_dao.get_queue_states(job_ids))
+
+    def complete(
+        self,
+        job_id: str,
+        worker_id: str,
+        result: Optional[AgentMessage] = None,
+        error: Optional[str] = None,
+        cancelled: bool = False,
+    ) -> None:
+        """Save the output of the subjob executed by the worker, and release the lease."""
+        output: Dict[str, Any] = {"cancelled": cancelled}
+        if result:
+            output["result_message_id"] = result.get_id()
+        if error:
+            output["error"] = error
+        # the output messages are written before the leader is notified
+        self._message_service.flush()
+        self._job_dao.complete_subjob(job_id=job_id, worker_id=worker_id, output=output)
+
+    def requeue_expired_leases(self) -> int:
+        """Queue the subjobs of the crashed workers again."""
+        return self._job_dao.requeue_expired_leases()
+
+    def _get_terminated_original_job_ids(self, job_dos: List[JobDo]) -> Set[str]:
+        """Get the original jobs of the subjobs, which have been stopped or failed."""
+        original_job_ids = list({str(job_do.original_job_id) for job_do in job_dos})
+        return {
+            str(original_job_do.id)
+            for original_job_do in self._job_dao.get_queue_states(job_ids=original_job_ids)
+            if original_job_do.status in (JobStatus.FAILED.value, JobStatus.STOPPED.value)
+        }
+
+    def _monitor_queued_jobs(self) -> None:
+        """Poll the queued subjobs, and resolve their futures once the outputs are saved."""
+        while True:
+            with self._lock:
+                for job_id in [id for id, future in self._futures.items() if future.done()]:
+                    # the future is cancelled by the leader (the job graph is stopped)
+                    del self._futures[job_id]
+                if not self._futures:
+                    self._monitor = None
+                    return
+                job_ids = list(self._futures.keys())
+
+            try:
+                self.requeue_expired_leases()
+                job_dos = self._job_dao.get_queue_states(job_ids=job_ids)
+
+                # the job graph is stopped or failed by a worker, so stop the leader as well,
+                # before the outputs are handed over to the leader
+                for original_job_id in self._get_terminated_original_job_ids(job_dos):
+                    self._job_service.cancel_job_graph(
+                        original_job_id=original_job_id,
+                        reason=f"The job graph of {original_job_id} is stopped by a worker.",
+                    )
+
+                for job_do in job_dos:
+                    self._resolve(job_do)
+            except Exception as e:
+                # color: orange
+                print(f"\033[38;5;208m[Warning]: Failed to poll the subjob queue: {e}\033[0m")
+
+            threading.Event().wait(SystemEnv.SUBJOB_QUEUE_POLL_INTERVAL)
+
+    def _resolve(self, job_do: JobDo) -> None:
+        """Resolve the future of the subjob, if its output is saved."""
+        payload: Dict[str, Any] = dict(job_do.queue_payload or {})
+        job_id = str(job_do.id)
+        if job_do.lease_owner or "cancelled" not in payload:
+            if not (job_do.status == JobStatus.FINISHED.value and not job_do.lease_owner):
+                return
+            # the worker crashed after the subjob was finished, so take the saved output
+            agent_messages = self._message_service.get_message_by_job_id(
+                job_id=job_id, message_type=MessageType.AGENT_MESSAGE
+            )
+            if not agent_messages:
+                return
+            payload["result_message_id"] = agent_messages[-1].get_id()
+
+        with self._lock:
+            future = self._futures.pop(job_id, None)
+        if not future or not future.set_running_or_notify_cancel():
+            return
+        if payload.get("cancelled"):
+            future.set_exception(JobCancelledError(f"The subjob {job_id} is cancelled."))
+        elif payload.get("error"):
+            future.set_exception(Exception(payload["error"]))
+        else:
+            future.set_result(self._message_service.get_message(id=payload["result_message_id"]))
@@ -1,11 +1,19 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import partial
 import re
-from typing import List, Optional, Set, Tuple, cast
+import threading
+from typing import Callable, Dict, Generator, List, Optional, Set, Tuple, cast
 
 import networkx as nx  # type: ignore
 
+from app.core.common.cancellation import CancellationToken
 from app.core.common.singleton import Singleton
+from app.core.common.system_env import SystemEnv
 from app.core.common.type import ChatMessageRole, JobStatus
 from app.core.dal.dao.job_dao import JobDao
+from app.core.dal.database import after_commit
 from app.core.dal.do.job_do import JobDo
 from app.core.model.job import Job, JobType, SubJob
 from app.core.model.job_graph import JobGraph
@@ -14,20 +22,85 @@ from app.core.model.message import (
     AgentMessage,
     GraphMessage,
     HybridMessage,
+    Message,
     MessageType,
     TextMessage,
 )
+from app.core.model.page import Page
 from app.core.service.message_service import MessageService
 from app.server.manager.view.message_view import MessageView
 
 
+@dataclass
+class _CachedJobGraph:
+    """The job graph of an original job kept in memory, with the changes not persisted yet.
+
+    Attributes:
+        job_graph (JobGraph): The job graph.
+        dirty_subjobs (Dict[str, SubJob]): subjob_id -> the changed subjob (vertex).
+    """
+
+    job_graph: JobGraph
+    dirty_subjobs: Dict[str, SubJob] = field(default_factory=dict)
+
+
+@dataclass
+class _CachedConversationView:
+    """The conversation view of a finished original job kept in memory.
+
+    Attributes:
+        view (MessageView): The conversation view.
+        job_ids (List[str]): The original job and its subjobs, whose changes invalidate the view.
+    """
+
+    view: MessageView
+    job_ids: List[str]
+
+
 class JobService(metaclass=Singleton):
-    """Job service"""
+    """Job service
+
+    The job graphs are cached in memory (LRU), so that they are not parsed from the DAG column on
+    every access. A mutation of the job graph (e.g. `replace_subgraph`) only marks the changed
+    vertices as dirty, and the changed rows are flushed in one transaction at the end of the
+    mutation, so that the database is always the source of truth to recover the job graphs.
+
+    The conversation views of the finished original jobs are cached in memory (LRU) as well, since
+    they are polled by the frontend, and they are invalidated once the status or the messages of
+    the original job or its subjobs are changed.
+    """
 
     def __init__(self):
         self._job_dao: JobDao = JobDao.instance
         self._message_service: MessageService = MessageService.instance
 
+        # original_job_id -> the cancellation token of the executing job graph
+        self._cancellation_tokens: Dict[str, CancellationToken] = {}
+        self._cancellation_lock = threading.Lock()
+
+        # original_job_id -> the cached job graph, in the LRU order
+        self._job_graphs: OrderedDict[str, _CachedJobGraph] = OrderedDict()
+        self._job_graph_lock = threading.RLock()
+
+        # original_job_id -> the cached conversation view, in the LRU order
+        self._conversation_views: OrderedDict[str, _CachedConversationView] = OrderedDict()
+        # job_id -> the original job id of the cached conversation view containing the job
+        self._conversation_view_keys: Dict[str, str] = {}
+        # increased by each invalidation, so that a view built before that is not cached
+        self._conversation_view_generation: int = 0
+        self._conversation_view_lock = threading.Lock()
+        self._message_service.add_save_hook(
+            lambda message: self.invalidate_conversation_view(job_id=message.get_job_id())
+        )
+
+        # the hooks called after a job result is saved (e.g. to publish the progress events)
+        self._job_result_hooks: List[Callable[[JobResult], None]] = []
+
+    def add_job_result_hook(self, hook: Callable[[JobResult], None]) -> None:
+        """Add a hook, which is called with the job result after it is saved (and committed, if it
+        is saved in a unit of work)."""
+        self._job_result_hooks.append(hook)
+
     def save_job(self, job: Job) -> Job:
         """Save a new job."""
         self._job_dao.save_job(job=job)
@@ -88,16 +161,36 @@ class JobService(metaclass=Singleton):
         job_do: Optional[JobDo] = self._job_dao.get_by_id(id=job_id)
         if not job_do:
             raise ValueError(f"Job with id {job_id} not found in the job registry.")
+        return self._parse_into_job_result(job_do)
+
+    def _parse_into_job_result(self, job_do: JobDo) -> JobResult:
+        """Create the job result from the job model."""
         return JobResult(
-            job_id=job_id,
+            job_id=str(job_do.id),
             status=JobStatus[str(job_do.status)],
             duration=float(job_do.duration),
             tokens=int(job_do.tokens),
         )
 
+    def get_subjob_results(self, original_job_id: str) -> Dict[str, JobResult]:
+        """Get the results of all the subjobs of the original job in one query.
+
+        Returns:
+            Dict[str, JobResult]: subjob_id -> subjob result.
+        """
+        return {
+            str(job_do.id): self._parse_into_job_result(job_do)
+            for job_do in self._job_dao.filter_by(original_job_id=original_job_id)
+        }
+
     def save_job_result(self, job_result: JobResult) -> None:
         """Update the job (original job / subjob) result."""
+        # the messages of the job are written before its new state
+        self._message_service.flush()
         self._job_dao.save_job_result(job_result=job_result)
+        after_commit(partial(self.invalidate_conversation_view, job_id=job_result.job_id))
+        for hook in self._job_result_hooks:
+            after_commit(partial(hook, job_result))
 
     def query_original_job_result(self, original_job_id: str) -> JobResult:
         """Query and process the original job result of the multi-agent system.
@@ -134,22 +227,32 @@ class JobService(metaclass=Singleton):
 
         # wait for creating the subjob by leader
         job_graph = self.get_job_graph(original_job_id)
+        vertices = job_graph.vertices()
 
-        # collect and combine the content of the job results and the artifacts
-        # from the job graph vertices
-        multi_agent_payload = ""
-        graph_messages: List[GraphMessage] = []
-        for vertex in job_graph.vertices():
-            subjob_result: JobResult = self.get_job_result(vertex)
-            if not subjob_result.has_result():
+        # the results of the subjobs are fetched in one query
+        subjob_results: Dict[str, JobResult] = self.get_subjob_results(
+            original_job_id=original_job_id
+        )
+        for vertex in vertices:
+            if vertex not in subjob_results or not subjob_results[vertex].has_result():
                 # not all the subjobs have been finished, so return the job result itself
                 return original_job_result
 
+        # the outputs of the agents are fetched in one query, and the workflow messages linked by
+        # the agent messages are not needed to assemble the result
+        agent_messages_by_job_id = self._message_service.get_messages_by_job_ids(
+            job_ids=vertices,
+            message_type=MessageType.AGENT_MESSAGE,
+            load_workflow_messages=False,
+        )
+
+        # collect and combine the content of the job results and the artifacts
+        # from the job graph vertices
+        multi_agent_payload = ""
+        graph_message_ids: List[str] = []
+        for vertex in vertices:
             agent_messages: List[AgentMessage] = cast(
-                List[AgentMessage],
-                self._message_service.get_message_by_job_id(
-                    job_id=subjob_result.job_id, message_type=MessageType.AGENT_MESSAGE
-                ),
+                List[AgentMessage], agent_messages_by_job_id[vertex]
             )
             assert len(agent_messages) == 1, (
                 f"One subjob is assigned to one agent, but {len(agent_messages)} messages found."
@@ -170,16 +273,16 @@ class JobService(metaclass=Singleton):
                     processed_payload = payload.strip()
                 multi_agent_payload += processed_payload + "\n"
 
-            # get the graph messages
-            graph_message_ids = agent_messages[0].get_artifact_ids()
-            graph_messages.extend(
-                [
-                    cast(GraphMessage, self._message_service.get_message(id=id))
-                    for id in graph_message_ids
-                ]
-            )
+            # collect the ids of the graph messages
+            graph_message_ids.extend(agent_messages[0].get_artifact_ids())
 
-        if len(job_graph.vertices()) > 0:
+        # get the graph messages in one query, in the order of the vertices
+        graph_messages_by_id = self._message_service.get_messages_by_ids(ids=graph_message_ids)
+        graph_messages: List[GraphMessage] = [
+            cast(GraphMessage, graph_messages_by_id[id]) for id in graph_message_ids
+        ]
+
+        if len(vertices) > 0:
             # save the original job result
             original_job_result = self.get_job_result(original_job_id)
             if not original_job_result.has_result():
@@ -227,57 +330,200 @@ class JobService(metaclass=Singleton):
 
     def get_conversation_view(self, original_job_id: str) -> MessageView:
         """Get conversation view (including thinking chain) for a specific job."""
-        # get original job
-        original_job = self.get_original_job(original_job_id=original_job_id)
-
-        # get original job result
-        original_job_result = self.query_original_job_result(original_job_id=original_job_id)
+        job_do: Optional[JobDo] = self._job_dao.get_by_id(id=original_job_id)
+        if not job_do:
+            raise ValueError(f"Job with ID {original_job_id} not found")
+        if job_do.category != JobType.JOB.value:
+            raise ValueError(f"Job with id {original_job_id} is a subjob, not an original job.")
+        return self._get_conversation_views(original_job_dos=[job_do])[0]
+
+    def get_conversation_views(self, session_id: str) -> List[MessageView]:
+        """Get the conversation views of all the original jobs of the session, in a constant
+        number of queries (besides the running jobs, whose results may be assembled)."""
+        return self._get_conversation_views(
+            original_job_dos=self._job_dao.filter_by(
+                session_id=session_id, category=JobType.JOB.value
+            )
+        )
 
-        # get the user question message
-        question_message = self._message_service.get_hybrid_message_by_job_id_and_role(
-            job_id=original_job_id,
-            role=ChatMessageRole.USER,
+    def get_conversation_views_page(
+        self, session_id: str, size: int, cursor: Optional[str] = None
+    ) -> Page[MessageView]:
+        """Get the conversation views of a page of the original jobs of the session, the latest
+        page first and the views of the page in the chat order."""
+        question_page = self._message_service.get_question_job_ids_page(
+            session_id=session_id, size=size, cursor=cursor
+        )
+        original_job_ids = list(reversed(question_page.items))
+        job_dos_by_id: Dict[str, JobDo] = {
+            str(job_do.id): job_do for job_do in self._job_dao.filter_by_ids(ids=original_job_ids)
+        }
+        return Page(
+            items=self._get_conversation_views(
+                original_job_dos=[
+                    job_dos_by_id[job_id] for job_id in original_job_ids if job_id in job_dos_by_id
+                ]
+            ),
+            next_cursor=question_page.next_cursor,
+            total=question_page.total,
         )
 
-        # get the AI answer message
-        answer_message = self._message_service.get_hybrid_message_by_job_id_and_role(
-            job_id=original_job_id,
-            role=ChatMessageRole.SYSTEM,
+    def get_conversation_view_data_version(
+        self, session_id: Optional[str] = None, original_job_id: Optional[str] = None
+    ) -> Tuple[str, int]:
+        """Get the version of the conversation views of the session or the original job derived
+        from the database: the statuses of the jobs, and the number and the latest timestamp of
+        their messages. Unlike the job events, it is changed by the other processes as well (e.g.
+        the messages saved by the expert workers).
+
+        Returns:
+            Tuple[str, int]: The version, and the latest timestamp of the messages.
+        """
+        statuses = self._job_dao.get_statuses(
+            session_id=session_id, original_job_id=original_job_id
+        )
+        message_count, latest_timestamp = self._message_service.get_count_and_latest_timestamp(
+            job_ids=[job_id for job_id, _ in statuses]
+        )
+        status_counts: Dict[str, int] = {}
+        for _, status in statuses:
+            status_counts[status] = status_counts.get(status, 0) + 1
+        status_version = ",".join(f"{s}:{c}" for s, c in sorted(status_counts.items()))
+        return f"{status_version}|{message_count}|{latest_timestamp}", latest_timestamp
+
+    def invalidate_conversation_view(self, job_id: Optional[str]) -> None:
+        """Drop the cached conversation view, which the job (the original job or one of its
+        subjobs) belongs to, since the status or the messages of the job are changed."""
+        with self._conversation_view_lock:
+            self._conversation_view_generation += 1
+            original_job_id = self._conversation_view_keys.get(job_id) if job_id else None
+            if original_job_id:
+                self._drop_conversation_view(original_job_id)
+
+    def _get_conversation_views(self, original_job_dos: List[JobDo]) -> List[MessageView]:
+        """Get the conversation views of the original jobs from the cache, and build the missing
+        ones in batch.
+
+        The views of the finished (or failed, stopped) original jobs are cached, until the status
+        or the messages of the original job or its subjobs are changed.
+        """
+        views: Dict[str, MessageView] = {}
+        with self._conversation_view_lock:
+            generation = self._conversation_view_generation
+            for job_do in original_job_dos:
+                cached_view = self._conversation_views.get(str(job_do.id))
+                if cached_view:
+                    self._conversation_views.move_to_end(str(job_do.id))
+                    views[str(job_do.id)] = cached_view.view
+        missing_job_ids = [
+            str(job_do.id) for job_do in original_job_dos if str(job_do.id) not in views
+        ]
+        if not missing_job_ids:
+            return [views[str(job_do.id)] for job_do in original_job_dos]
+
+        # get original job results, and the running jobs may assemble their results
+        original_job_results: Dict[str, JobResult] = {}
+        for job_do in original_job_dos:
+            original_job_id = str(job_do.id)
+            if original_job_id in views:
+                continue
+            original_job_result = self._parse_into_job_result(job_do)
+            if (
+                not original_job_result.has_result()
+                and original_job_result.status != JobStatus.CREATED
+            ):
+                original_job_result = self.query_original_job_result(original_job_id)
+            original_job_results[original_job_id] = original_job_result
+
+        # get the subjobs, their outputs (the thinking chain), and the user question and the AI
+        # answer messages of all the original jobs in batch
+        subjob_dos: List[JobDo] = self._job_dao.filter_by_original_job_ids(
+            original_job_ids=missing_job_ids
+        )
+        agent_messages_by_job_id = self._message_service.get_messages_by_job_ids(
+            job_ids=[str(job_do.id) for job_do in subjob_dos if not job_do.is_legacy],
+            message_type=MessageType.AGENT_MESSAGE,
+            load_workflow_messages=False,
+        )
+        hybrid_messages_by_job_id = self._message_service.get_hybrid_messages_by_job_ids(
+            job_ids=missing_job_ids
         )
+        subjob_dos_by_original_job_id: Dict[str, List[JobDo]] = {
+            original_job_id: [] for original_job_id in missing_job_ids
+        }
+        for job_do in subjob_dos:
+            subjob_dos_by_original_job_id[str(job_do.original_job_id)].append(job_do)
+
+        for original_job_id in missing_job_ids:
+            view = self._build_conversation_view(
+                original_job_result=original_job_results[original_job_id],
+                hybrid_messages=hybrid_messages_by_job_id[original_job_id],
+                subjob_dos=subjob_dos_by_original_job_id[original_job_id],
+                agent_messages_by_job_id=agent_messages_by_job_id,
+            )
+            views[original_job_id] = view
+
+            if original_job_results[original_job_id].has_result():
+                self._cache_conversation_view(
+                    original_job_id=original_job_id,
+                    view=view,
+                    job_ids=[
+                        str(job_do.id) for job_do in subjob_dos_by_original_job_id[original_job_id]
+                    ],
+                    generation=generation,
+                )
+
+        return [views[str(job_do.id)] for job_do in original_job_dos]
+
+    def _build_conversation_view(
+        self,
+        original_job_result: JobResult,
+        hybrid_messages: List[HybridMessage],
+        subjob_dos: List[JobDo],
+        agent_messages_by_job_id: Dict[str, List[Message]],
+    ) -> MessageView:
+        """Build the conversation view of the original job with the loaded messages."""
+        original_job_id = original_job_result.job_id
+
+        # get the user question message, and the AI answer message
+        hybrid_messages_by_role: Dict[ChatMessageRole, HybridMessage] = {
+            cast(TextMessage, message.get_instruction_message()).get_role(): message
+            for message in hybrid_messages
+        }
+        for role in [ChatMessageRole.USER, ChatMessageRole.SYSTEM]:
+            if role not in hybrid_messages_by_role:
+                raise ValueError(
+                    f"Hybrid message not found for job {original_job_id} and role {role.value}."
+                )
 
         # get thinking chain messages
         message_result_pairs: List[
             Tuple[AgentMessage, SubJob, JobResult]
         ] = []  # to sort by timestamp
 
-        subjob_ids = self.get_subjob_ids(original_job_id=original_job.id)
-        for subjob_id in subjob_ids:
+        for job_do in subjob_dos:
             # get the information, whose job is not legacy
-            subjob = self.get_subjob(subjob_id=subjob_id)
-            if not subjob.is_legacy:
-                # get the subjob result
-                subjob_result = self.get_job_result(job_id=subjob_id)
-
-                # get the agent message
-                agent_messages = cast(
-                    List[AgentMessage],
-                    self._message_service.get_message_by_job_id(
-                        job_id=subjob_id, message_type=MessageType.AGENT_MESSAGE
-                    ),
+            if job_do.is_legacy:
+                continue
+            subjob_id = str(job_do.id)
+            subjob = cast(SubJob, self._job_dao.parse_into_job(job_do=job_do))
+            subjob_result = self._parse_into_job_result(job_do)
+
+            # get the agent message
+            agent_messages = cast(List[AgentMessage], agent_messages_by_job_id[subjob_id])
+            if len(agent_messages) == 1:
+                thinking_message = agent_messages[0]
+            elif len(agent_messages) == 0:
+                # handle the unexecuted subjob
+                thinking_message = AgentMessage(
+                    job_id=subjob_id, payload=f"The subjob is {subjob_result.status.value}."
                 )
-                if len(agent_messages) == 1:
-                    thinking_message = agent_messages[0]
-                elif len(agent_messages) == 0:
-                    # handle the unexecuted subjob
-                    thinking_message = AgentMessage(
-                        job_id=subjob_id, payload=f"The subjob is {subjob_result.status.value}."
-                    )
-                else:
-                    raise ValueError(
-                        f"Multiple agent messages found for job ID {subjob_id}: {agent_messages}"
-                    )
-                # store the pair of message and result
-                message_result_pairs.append((thinking_message, subjob, subjob_result))
+            else:
+                raise ValueError(
+                    f"Multiple agent messages found for job ID {subjob_id}: {agent_messages}"
+                )
+            # store the pair of message and result
+            message_result_pairs.append((thinking_message, subjob, subjob_result))
 
         # sort pairs by message timestamp
         message_result_pairs.sort(
@@ -292,36 +538,149 @@ class JobService(metaclass=Singleton):
         subjob_results: List[JobResult] = [pair[2] for pair in message_result_pairs]
 
         return MessageView(
-            question=question_message,
-            answer=answer_message,
+            question=hybrid_messages_by_role[ChatMessageRole.USER],
+            answer=hybrid_messages_by_role[ChatMessageRole.SYSTEM],
             answer_metrics=original_job_result,
             thinking_messages=thinking_messages,
             thinking_subjobs=subjobs,
             thinking_metrics=subjob_results,
         )
 
+    def _cache_conversation_view(
+        self, original_job_id: str, view: MessageView, job_ids: List[str], generation: int
+    ) -> None:
+        """Cache the conversation view of the finished original job, unless a job is changed
+        since the view started to be built (the generation is increased)."""
+        with self._conversation_view_lock:
+            if generation != self._conversation_view_generation:
+                return
+            self._drop_conversation_view(original_job_id)
+            self._conversation_views[original_job_id] = _CachedConversationView(
+                view=view, job_ids=[original_job_id] + job_ids
+            )
+            for job_id in [original_job_id] + job_ids:
+                self._conversation_view_keys[job_id] = original_job_id
+
+            while len(self._conversation_views) > SystemEnv.CONVERSATION_VIEW_CACHE_SIZE:
+                self._drop_conversation_view(next(iter(self._conversation_views)))
+
+    def _drop_conversation_view(self, original_job_id: str) -> None:
+        """Drop the cached conversation view. The caller must hold the conversation view lock."""
+        cached_view = self._conversation_views.pop(original_job_id, None)
+        if cached_view:
+            for job_id in cached_view.job_ids:
+                self._conversation_view_keys.pop(job_id, None)
+
     def get_job_graph(self, original_job_id: str) -> JobGraph:
-        """Get the job graph by the original job id. If the job graph does not exist,
-        create a new one and save it to the database."""
+        """Get (a copy of) the job graph by the original job id. If the job graph does not exist,
+        create a new one."""
+        with self._job_graph_lock:
+            cached_job_graph = self._load_job_graph(original_job_id)
+            return JobGraph(graph=cached_job_graph.job_graph.get_graph().copy())
+
+    def get_critical_path_lengths(
+        self, original_job_id: str, job_graph: JobGraph
+    ) -> Dict[str, float]:
+        """Get the remaining critical path length of each subjob in the job graph.
+
+        The duration of a subjob is estimated by the historical average duration of the finished
+        subjobs of the same expert. The subjobs of the experts without history are estimated by
+        the average of all the experts (or 1.0 if there is no history at all).
+        """
+        expert_durations = self._job_dao.get_average_durations_by_expert()
+        default_duration = (
+            sum(expert_durations.values()) / len(expert_durations) if expert_durations else 1.0
+        )
+
+        durations: Dict[str, float] = {}
+        for job_do in self._job_dao.filter_by(original_job_id=original_job_id):
+            if job_do.expert_id and str(job_do.expert_id) in expert_durations:
+                durations[str(job_do.id)] = expert_durations[str(job_do.expert_id)]
+
+        return job_graph.critical_path_lengths(
+            durations=durations, default_duration=default_duration
+        )
+
+    def register_cancellation_token(self, original_job_id: str) -> CancellationToken:
+        """Get the cancellation token of the job graph, and create it if it does not exist.
+
+        A cancelled token (e.g. the job graph is recovered right after it is stopped, before the
+        stopped execution releases the token) is replaced by a new one, so that the new execution
+        is not cancelled by the previous stop.
+        """
+        with self._cancellation_lock:
+            cancellation_token = self._cancellation_tokens.get(original_job_id)
+            if not cancellation_token or cancellation_token.is_cancelled():
+                cancellation_token = CancellationToken()
+                self._cancellation_tokens[original_job_id] = cancellation_token
+            return cancellation_token
+
+    def get_cancellation_token(self, original_job_id: str) -> Optional[CancellationToken]:
+        """Get the cancellation token of the job graph, or None if it is not being executed."""
+        with self._cancellation_lock:
+            return self._cancellation_tokens.get(original_job_id)
+
+    def cancel_job_graph(self, original_job_id: str, reason: Optional[str] = None) -> None:
+        """Cancel the executing job graph, so that its running subjobs stop at the next check."""
+        with self._cancellation_lock:
+            cancellation_token = self._cancellation_tokens.get(original_job_id)
+        if cancellation_token:
+            cancellation_token.cancel(reason=reason)
+
+    def release_cancellation_token(self, original_job_id: str) -> None:
+        """Release the cancellation token, when the execution of the job graph is over."""
+        with self._cancellation_lock:
+            self._cancellation_tokens.pop(original_job_id, None)
+
+    def set_job_graph(self, original_job_id: str, job_graph: JobGraph) -> None:
+        """Set the job graph by the original job id."""
+        with self._mutate_job_graph(original_job_id) as cached_job_graph:
+            cached_job_graph.job_graph = JobGraph(graph=job_graph.get_graph().copy())
+
+    def _load_job_graph(self, original_job_id: str) -> _CachedJobGraph:
+        """Get the cached job graph, or load it from the database. The caller must hold the
+        job graph lock."""
+        cached_job_graph = self._job_graphs.get(original_job_id)
+        if cached_job_graph:
+            self._job_graphs.move_to_end(original_job_id)
+            return cached_job_graph
+
         job_do = self._job_dao.get_by_id(original_job_id)
         if not job_do:
             raise ValueError(f"Job with ID {original_job_id} not found in the job registry")
-
-        if not job_do.dag:
-            job_graph: JobGraph = JobGraph()
-            self._job_dao.update(id=original_job_id, dag=job_graph.to_json_str())
-        else:
+        if job_do.dag:
             job_graph = JobGraph.from_json_str(str(job_do.dag))
-        return job_graph
+        else:
+            job_graph = JobGraph()
+        cached_job_graph = _CachedJobGraph(job_graph=job_graph)
 
-    def set_job_graph(self, original_job_id: str, job_graph: JobGraph) -> None:
-        """Set the job graph by the original job id."""
-        # save the jobs to the databases
-        original_job: Job = self.get_original_job(original_job_id)
-        original_job.dag = job_graph.to_json_str()
-        self.save_job(original_job)
-        for subjob_id in job_graph.vertices():
-            self.save_job(job=self.get_subjob(subjob_id))
+        self._job_graphs[original_job_id] = cached_job_graph
+        while len(self._job_graphs) > SystemEnv.JOB_GRAPH_CACHE_SIZE:
+            # the evicted job graphs are clean, since the changes are flushed after each mutation
+            self._job_graphs.popitem(last=False)
+        return cached_job_graph
+
+    @contextmanager
+    def _mutate_job_graph(self, original_job_id: str) -> Generator[_CachedJobGraph, None, None]:
+        """Mutate the cached job graph, and flush the changes in one transaction at the end.
+
+        If the mutation (or the flush) fails, the unsaved changes are dropped, and the job graph
+        will be reloaded from the database on next access.
+        """
+        with self._job_graph_lock:
+            cached_job_graph = self._load_job_graph(original_job_id)
+            try:
+                yield cached_job_graph
+
+                self._job_dao.update_job_graph(
+                    original_job_id=original_job_id,
+                    dag=cached_job_graph.job_graph.to_json_str(),
+                    subjobs=list(cached_job_graph.dirty_subjobs.values()),
+                )
+                cached_job_graph.dirty_subjobs.clear()
+            except Exception:
+                self._job_graphs.pop(original_job_id, None)
+                raise
 
     def add_subjob(
         self,
@@ -332,41 +691,35 @@ class JobService(metaclass=Singleton):
         successors: Optional[List[SubJob]] = None,
     ) -> None:
         """Assign a subjob to an expert and return the expert instance."""
-        # add job to the jobs graph
-        job_graph = self.get_job_graph(original_job_id)
-        job_graph.add_vertex(job.id)
-
         job.original_job_id = original_job_id
         job.expert_id = expert_id
 
-        # save the job to the database
+        # save the job to the database, since it may be a new job
         self.save_job(job=job)
 
-        if not predecessors:
-            predecessors = []
-        if not successors:
-            successors = []
-        for predecessor in predecessors:
-            job_graph.add_edge(predecessor.id, job.id)
-            self.save_job(predecessor)
-        for successor in successors:
-            self.save_job(successor)
-            job_graph.add_edge(job.id, successor.id)
+        with self._mutate_job_graph(original_job_id) as cached_job_graph:
+            # add job to the jobs graph
+            job_graph = cached_job_graph.job_graph
+            job_graph.add_vertex(job.id)
 
-        self.set_job_graph(original_job_id, job_graph)
+            for predecessor in predecessors or []:
+                job_graph.add_edge(predecessor.id, job.id)
+                cached_job_graph.dirty_subjobs[predecessor.id] = predecessor
+            for successor in successors or []:
+                job_graph.add_edge(job.id, successor.id)
+                cached_job_graph.dirty_subjobs[successor.id] = successor
 
     def remove_subjob(self, original_job_id: str, job_id: str) -> None:
         """Remove a subjob from the job registry."""
-        # remove the job from the database
-        # and mark the job as a legacy job
-        subjob = self.get_subjob(job_id)
-        subjob.is_legacy = True
-        self.save_job(subjob)
+        with self._mutate_job_graph(original_job_id) as cached_job_graph:
+            # remove the job from the database
+            # and mark the job as a legacy job
+            subjob = self.get_subjob(job_id)
+            subjob.is_legacy = True
+            cached_job_graph.dirty_subjobs[subjob.id] = subjob
 
-        # update the state of the job service
-        job_graph = self.get_job_graph(original_job_id)
-        job_graph.remove_vertex(job_id)
-        self.set_job_graph(original_job_id=original_job_id, job_graph=job_graph)
+            # update the state of the job service
+            cached_job_graph.job_graph.remove_vertex(job_id)
 
     def replace_subgraph(
         self,
@@ -411,20 +764,30 @@ class JobService(metaclass=Singleton):
             old_subgraph (Optional[JobGraph]): The subgraph to be replaced. Must be a connected
                 component of the current jobs DAG with exactly one entry and one exit vertex.
         """
-        job_graph: JobGraph = self.get_job_graph(original_job_id)
+        # the updated jobs are saved to the database at the end of the mutation
+        with self._mutate_job_graph(original_job_id) as cached_job_graph:
+            self._replace_subgraph(
+                cached_job_graph=cached_job_graph,
+                new_subgraph=new_subgraph,
+                old_subgraph=old_subgraph,
+            )
 
+    def _replace_subgraph(
+        self,
+        cached_job_graph: _CachedJobGraph,
+        new_subgraph: JobGraph,
+        old_subgraph: Optional[JobGraph] = None,
+    ) -> None:
+        """Replace the subgraph in the cached job graph, and mark the legacy subjobs as dirty."""
+        job_graph = cached_job_graph.job_graph
         if not old_subgraph:
             job_graph.update(new_subgraph)
-
-            # save the updated jobs to the database
-            self.set_job_graph(original_job_id, job_graph)
             return
 
         if new_subgraph.vertices_count() == 0:
             # if the new subgraph is empty, we can simply remove the old subgraph and return.
             # this will effectively remove the subgraph from the job graph.
             job_graph.remove_vertices(set(old_subgraph.vertices()))
-            self.set_job_graph(original_job_id, job_graph)
             return
 
         old_subgraph_vertices: Set[str] = set(old_subgraph.vertices())
@@ -473,7 +836,7 @@ class JobService(metaclass=Singleton):
         for vertex in old_subgraph_vertices:
             job = self.get_subjob(vertex)
             job.is_legacy = True
-            self._job_dao.save_job(job=job)
+            cached_job_graph.dirty_subjobs[job.id] = job
 
         # add the new subgraph without connecting it to the rest of the graph
         job_graph.update(new_subgraph)
@@ -486,6 +849,3 @@ class JobService(metaclass=Singleton):
             job_graph.add_edge(predecessor, head_vertex)
         for successor in successors:
             job_graph.add_edge(tail_vertex, successor)
-
-        # save the updated jobs to the database
-        self.set_job_graph(original_job_id, job_graph)
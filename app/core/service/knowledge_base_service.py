@@ -1,6 +1,6 @@
 import json
 import os
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy import func
 
@@ -14,6 +14,7 @@ from app.core.common.type import (
 )
 from app.core.dal.dao.file_descriptor_dao import FileDescriptorDao
 from app.core.dal.dao.knowledge_dao import FileKbMappingDao, KnowledgeBaseDao
+from app.core.dal.do.knowledge_do import FileKbMappingDo, KnowledgeBaseDo
 from app.core.knowledge.knowledge_config import KnowledgeConfig
 from app.core.knowledge.knowledge_store_factory import KnowledgeStoreFactory
 from app.core.model.file_descriptor import FileDescriptor
@@ -22,6 +23,7 @@ from app.core.model.knowledge_base import (
     GlobalKnowledgeBase,
     KnowledgeBase,
 )
+from app.core.model.page import Page
 from app.core.service.file_service import FileService
 
 
@@ -177,59 +179,83 @@ class KnowledgeBaseService(metaclass=Singleton):
 
         # get local knowledge bases
         results = self._knowledge_base_dao.filter_by(category=KnowledgeStoreCategory.LOCAL.value)
-        # get global knowledge base
+        return self._get_global_knowledge_base(), self._parse_into_knowledge_bases(results)
+
+    def get_knowledge_bases_page(
+        self, size: int, cursor: Optional[str] = None
+    ) -> Tuple[KnowledgeBase, Page[KnowledgeBase]]:
+        """Get the global knowledge base and a page of the local knowledge bases, the latest
+        first.
+
+        Returns:
+            Tuple[KnowledgeBase, Page[KnowledgeBase]]: A tuple containing global knowledge base
+                and the page of local knowledge bases
+        """
+        results, next_cursor = self._knowledge_base_dao.get_page(
+            size=size, cursor=cursor, category=KnowledgeStoreCategory.LOCAL.value
+        )
+        return self._get_global_knowledge_base(), Page(
+            items=self._parse_into_knowledge_bases(results),
+            next_cursor=next_cursor,
+            total=self._knowledge_base_dao.get_total_count(
+                category=KnowledgeStoreCategory.LOCAL.value
+            ),
+        )
+
+    def _get_global_knowledge_base(self) -> KnowledgeBase:
+        """Get the global knowledge base with its files."""
         mappings = self._file_kb_mapping_dao.filter_by(kb_id=self._global_kb_do.id)
-        global_file_descriptors = [
-            FileDescriptor(
-                id=str(mapping.id),
-                path=None,
-                name=str(mapping.name),
-                type=FileStorageType(mapping.type),
-                size=str(mapping.size),
-                status=KnowledgeStoreFileStatus(mapping.status),
-                timestamp=int(mapping.timestamp),
-            )
-            for mapping in mappings
-        ]
-        global_kb = GlobalKnowledgeBase(
+        return GlobalKnowledgeBase(
             id=str(self._global_kb_do.id),
             name=str(self._global_kb_do.name),
             knowledge_type=str(self._global_kb_do.knowledge_type),
             session_id=str(self._global_kb_do.session_id),
-            file_descriptors=global_file_descriptors,
+            file_descriptors=[self._parse_into_file_descriptor(mapping) for mapping in mappings],
             description=str(self._global_kb_do.description),
             category=str(self._global_kb_do.category),
             timestamp=int(self._global_kb_do.timestamp),
         )
-        # get local knowledge bases
-        local_kbs = []
-        for result in results:
-            mappings = self._file_kb_mapping_dao.filter_by(kb_id=result.id)
-            file_descriptors = [
-                FileDescriptor(
-                    id=str(mapping.id),
-                    path=None,
-                    name=str(mapping.name),
-                    type=FileStorageType(mapping.type),
-                    size=str(mapping.size),
-                    status=KnowledgeStoreFileStatus(mapping.status),
-                    timestamp=int(mapping.timestamp),
-                )
-                for mapping in mappings
-            ]
-            local_kbs.append(
-                KnowledgeBase(
-                    id=str(result.id),
-                    name=str(result.name),
-                    knowledge_type=str(result.knowledge_type),
-                    session_id=str(result.session_id),
-                    file_descriptors=file_descriptors,
-                    description=str(result.description),
-                    category=str(result.category),
-                    timestamp=int(result.timestamp),
-                )
+
+    def _parse_into_knowledge_bases(
+        self, knowledge_base_dos: List[KnowledgeBaseDo]
+    ) -> List[KnowledgeBase]:
+        """Create the local knowledge bases, whose files are loaded in one query."""
+        mappings_by_kb_id: Dict[str, List[FileKbMappingDo]] = {
+            str(knowledge_base_do.id): [] for knowledge_base_do in knowledge_base_dos
+        }
+        for mapping in self._file_kb_mapping_dao.filter_by_kb_ids(
+            kb_ids=list(mappings_by_kb_id.keys())
+        ):
+            mappings_by_kb_id[str(mapping.kb_id)].append(mapping)
+
+        return [
+            KnowledgeBase(
+                id=str(result.id),
+                name=str(result.name),
+                knowledge_type=str(result.knowledge_type),
+                session_id=str(result.session_id),
+                file_descriptors=[
+                    self._parse_into_file_descriptor(mapping)
+                    for mapping in mappings_by_kb_id[str(result.id)]
+                ],
+                description=str(result.description),
+                category=str(result.category),
+                timestamp=int(result.timestamp),
             )
-        return global_kb, local_kbs
+            for result in knowledge_base_dos
+        ]
+
+    def _parse_into_file_descriptor(self, mapping: FileKbMappingDo) -> FileDescriptor:
+        """Create the file descriptor from the file to knowledge base mapping."""
+        return FileDescriptor(
+            id=str(mapping.id),
+            path=None,
+            name=str(mapping.name),
+            type=FileStorageType(mapping.type),
+            size=str(mapping.size),
+            status=KnowledgeStoreFileStatus(mapping.status),
+            timestamp=int(mapping.timestamp),
+        )
 
     def get_knowledge(self, query: str, session_id: Optional[str]) -> Knowledge:
         """Get knowledge by ID."""
@@ -240,11 +266,9 @@ class KnowledgeBaseService(metaclass=Singleton):
         # get local knowledge
         local_chunks = []
         if session_id:
-            kbs = self._knowledge_base_dao.filter_by(session_id=session_id)
-            if len(kbs) == 1:
-                kb = kbs[0]
-                knowledge_base_id = kb.id
-                local_chunks = KnowledgeStoreFactory.get_or_create(str(knowledge_base_id)).retrieve(
+            knowledge_base_id = self._knowledge_base_dao.get_id_by_session_id(session_id)
+            if knowledge_base_id:
+                local_chunks = KnowledgeStoreFactory.get_or_create(knowledge_base_id).retrieve(
                     query
                 )
         return Knowledge(global_chunks, local_chunks)
@@ -1,10 +1,16 @@
-from typing import List, cast
+import asyncio
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple, cast
 
 from app.core.common.singleton import Singleton
+from app.core.common.system_env import SystemEnv
 from app.core.common.type import ChatMessageRole
+from app.core.common.write_behind_buffer import WriteBehindBuffer
 from app.core.dal.dao.message_dao import MessageDao
+from app.core.dal.database import after_commit, in_unit_of_work, run_async, unit_of_work
 from app.core.dal.do.message_do import TextMessageDo
 from app.core.model.message import HybridMessage, Message, MessageType, TextMessage
+from app.core.model.page import Page
 
 
 class MessageService(metaclass=Singleton):
@@ -13,27 +19,164 @@ class MessageService(metaclass=Singleton):
     def __init__(self):
         self._message_dao: MessageDao = MessageDao.instance
 
+        # the hooks called after a message is saved (e.g. to invalidate the cached views)
+        self._save_hooks: List[Callable[[Message], None]] = []
+
+        # the messages (with their rows) to write in batches, if the write-behind is enabled
+        self._write_behind_buffer: WriteBehindBuffer[Tuple[Message, Dict[str, Any]]] = (
+            WriteBehindBuffer(
+                write=self._write_messages,
+                flush_interval=SystemEnv.MESSAGE_WRITE_BEHIND_INTERVAL,
+                flush_size=SystemEnv.MESSAGE_WRITE_BEHIND_SIZE,
+                name="message_write_behind_flusher",
+            )
+        )
+
+    def add_save_hook(self, hook: Callable[[Message], None]) -> None:
+        """Add a hook, which is called with the message after it is saved (and committed, if it is
+        saved in a unit of work)."""
+        self._save_hooks.append(hook)
+
     def save_message(self, message: Message) -> Message:
-        """Save a new message."""
+        """Save a new message.
+
+        If the write-behind is enabled, the message is buffered and written with the other
+        buffered messages in a batch, and the save hooks are called once the batch is committed.
+        The message saved in a unit of work is written at once, to be committed with it.
+        """
+        if SystemEnv.MESSAGE_WRITE_BEHIND_ENABLED and not in_unit_of_work():
+            self._write_behind_buffer.put(
+                message.get_id(), (message, self._message_dao.get_message_row(message))
+            )
+            return message
+
+        # the buffered row is older than the saved one
+        self._write_behind_buffer.discard(message.get_id())
         self._message_dao.save_message(message=message)
+        for hook in self._save_hooks:
+            after_commit(partial(hook, message))
         return message
 
+    async def save_message_async(self, message: Message) -> Message:
+        """Save a new message in the async code (e.g. the operators and the reasoners), whose
+        event loop is not blocked by the database (see `run_async`). The message is buffered, or
+        written in the enclosing unit of work, as `save_message` does."""
+        if SystemEnv.MESSAGE_WRITE_BEHIND_ENABLED or in_unit_of_work():
+            return self.save_message(message=message)
+        return await run_async(self.save_message, message=message)
+
+    def flush(self) -> None:
+        """Write the buffered messages at once. It is called at the state boundaries of the jobs,
+        so that a job is never seen in the new state without its messages, and before the messages
+        are read, so that the saved messages are read back (e.g. to be updated).
+
+        It does nothing in a unit of work, which would wait for the flusher while holding the
+        write lock of the database, so the caller flushes before the unit of work begins.
+        """
+        if not in_unit_of_work():
+            self._write_behind_buffer.flush()
+
+    def _write_messages(self, buffered_messages: List[Tuple[Message, Dict[str, Any]]]) -> None:
+        """Write the buffered messages in a single transaction."""
+        with unit_of_work():
+            for message, row in buffered_messages:
+                self._message_dao.upsert(**row)
+                for hook in self._save_hooks:
+                    after_commit(partial(hook, message))
+
     def get_message(self, id: str) -> Message:
         """Get a message by ID."""
+        self.flush()
         return self._message_dao.get_message(id=id)
 
     def get_message_by_job_id(self, job_id: str, message_type: MessageType) -> List[Message]:
         """Get all messages by job ID."""
+        self.flush()
         # fetch messages by job ID
         results = self._message_dao.filter_by(job_id=job_id, type=message_type.value)
         if not results:
             return []
-        return [self._message_dao.parse_into_message(message_do=result) for result in results]
+        return self._message_dao.parse_into_messages(message_dos=results)
+
+    async def get_message_by_job_id_async(
+        self, job_id: str, message_type: MessageType
+    ) -> List[Message]:
+        """Get all messages by job ID in the async code, whose event loop is not blocked by the
+        database (see `run_async`)."""
+        if self._write_behind_buffer.pending_count():
+            await asyncio.to_thread(self.flush)
+        return await run_async(self.get_message_by_job_id, job_id=job_id, message_type=message_type)
+
+    def get_messages_by_ids(self, ids: List[str]) -> Dict[str, Message]:
+        """Get the messages by the IDs in one query. Returns message_id -> message."""
+        self.flush()
+        return {
+            message.get_id(): message for message in self._message_dao.get_messages_by_ids(ids=ids)
+        }
+
+    def get_messages_by_job_ids(
+        self, job_ids: List[str], message_type: MessageType, load_workflow_messages: bool = True
+    ) -> Dict[str, List[Message]]:
+        """Get the messages of the jobs in one query. Returns job_id -> messages.
+
+        Args:
+            job_ids (List[str]): The job IDs.
+            message_type (MessageType): The type of the messages.
+            load_workflow_messages (bool): Whether to load the workflow messages linked by the
+                agent messages. Set it False, if only the outputs of the agents are needed.
+        """
+        messages_by_job_id: Dict[str, List[Message]] = {job_id: [] for job_id in job_ids}
+        self.flush()
+        results = self._message_dao.filter_by_job_ids(job_ids=job_ids, message_type=message_type)
+        messages = self._message_dao.parse_into_messages(
+            message_dos=results, load_workflow_messages=load_workflow_messages
+        )
+        for result, message in zip(results, messages, strict=True):
+            messages_by_job_id[str(result.job_id)].append(message)
+        return messages_by_job_id
+
+    def get_hybrid_messages_by_job_ids(self, job_ids: List[str]) -> Dict[str, List[HybridMessage]]:
+        """Get the hybrid messages (with their instruction messages and attached messages) of the
+        jobs in a constant number of queries. Returns job_id -> hybrid messages."""
+        hybrid_messages_by_job_id: Dict[str, List[HybridMessage]] = {
+            job_id: [] for job_id in job_ids
+        }
+        self.flush()
+        for hybrid_message in self._message_dao.get_hybrid_messages_by_job_ids(job_ids=job_ids):
+            hybrid_messages_by_job_id[hybrid_message.get_job_id()].append(hybrid_message)
+        return hybrid_messages_by_job_id
+
+    def get_count_and_latest_timestamp(self, job_ids: List[str]) -> Tuple[int, int]:
+        """Get the number and the latest timestamp of the messages of the jobs, including the ones
+        saved by the other processes (e.g. the expert workers)."""
+        self.flush()
+        return self._message_dao.get_count_and_latest_timestamp(job_ids=job_ids)
+
+    def get_question_job_ids_page(
+        self, session_id: str, size: int, cursor: Optional[str] = None
+    ) -> Page[str]:
+        """Get a page of the original jobs of the session, the latest first, by their questions
+        (the user hybrid messages) paged in SQL. Returns the ids of the original jobs."""
+        question_filters = {
+            "session_id": session_id,
+            "type": MessageType.HYBRID_MESSAGE.value,
+            "role": ChatMessageRole.USER.value,
+        }
+        self.flush()
+        results, next_cursor = self._message_dao.get_page(
+            size=size, cursor=cursor, **question_filters
+        )
+        return Page(
+            items=[str(result.job_id) for result in results],
+            next_cursor=next_cursor,
+            total=self._message_dao.get_total_count(**question_filters),
+        )
 
     def get_text_message_by_job_id_and_role(
         self, job_id: str, role: ChatMessageRole
     ) -> TextMessage:
         """Get system text messages by job ID."""
+        self.flush()
         results: List[TextMessageDo] = self._message_dao.get_text_message_by_job_id_and_role(
             job_id=job_id, role=role
         )
@@ -66,6 +209,7 @@ class MessageService(metaclass=Singleton):
         Returns:
             List[TextMessage]: List of TextMessage objects
         """
+        self.flush()
         # fetch filtered messages
         results = self._message_dao.filter_by(
             session_id=session_id, type=MessageType.TEXT_MESSAGE.value
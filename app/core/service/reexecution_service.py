@@ -0,0 +1,180 @@
+from dataclasses import dataclass
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.common.singleton import Singleton
+from app.core.model.job import Job, SubJob
+from app.core.model.message import WorkflowMessage
+
+
+@dataclass
+class OperatorCheckpoint:
+    """The output of an operator in the last execution of the subjob.
+
+    Attributes:
+        message (WorkflowMessage): The output of the operator.
+        llm_rounds (int): The number of the LLM calls to produce the output.
+        duration (float): The time (in seconds) to produce the output.
+    """
+
+    message: WorkflowMessage
+    llm_rounds: int
+    duration: float
+
+
+@dataclass
+class ReexecutionStats:
+    """The snapshot of the partial re-execution metrics.
+
+    Attributes:
+        recovery_count (int): The number of the INPUT_DATA_ERROR recoveries.
+        reexecuted_job_count (int): The number of the predecessors re-executed.
+        skipped_job_count (int): The number of the predecessors which are not re-executed, since
+            their outputs are not blamed by the failed subjob.
+        resumed_operator_count (int): The number of the operator outputs reused by the
+            re-executed predecessors.
+        exhausted_count (int): The number of the job graphs failed by running out of the
+            re-executions.
+        saved_llm_rounds (int): The LLM calls saved, compared with re-executing all the
+            predecessors from the first operator.
+        saved_time (float): The wall time (in seconds) of the operator executions saved.
+    """
+
+    recovery_count: int = 0
+    reexecuted_job_count: int = 0
+    skipped_job_count: int = 0
+    resumed_operator_count: int = 0
+    exhausted_count: int = 0
+    saved_llm_rounds: int = 0
+    saved_time: float = 0.0
+
+
+class ReexecutionService(metaclass=Singleton):
+    """Re-execution service
+
+    When a subjob reports INPUT_DATA_ERROR, the leader re-executes only the predecessors whose
+    outputs are blamed by the subjob, and each of them resumes from the checkpoints of its operator
+    outputs: the operators before the tail operator are not executed again, and the tail operator
+    is re-executed with the lesson of the subjob.
+
+    The checkpoints are kept in memory during the execution of the job graph.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # original_job_id -> job_id -> operator_id -> checkpoint
+        self._checkpoints: Dict[str, Dict[str, Dict[str, OperatorCheckpoint]]] = {}
+        # the jobs to resume in the next execution, and the operators to resume in the current one
+        self._resuming_job_ids: Set[str] = set()
+        self._resumable_operator_ids: Dict[str, Set[str]] = {}  # job_id -> operator ids
+        self._stats = ReexecutionStats()
+
+    def save_checkpoint(
+        self,
+        job: Job,
+        operator_id: str,
+        message: WorkflowMessage,
+        llm_rounds: int,
+        duration: float,
+    ) -> None:
+        """Save the output of the operator executed for the subjob."""
+        if not isinstance(job, SubJob) or not job.original_job_id:
+            return
+        with self._lock:
+            self._checkpoints.setdefault(job.original_job_id, {}).setdefault(job.id, {})[
+                operator_id
+            ] = OperatorCheckpoint(message=message.copy(), llm_rounds=llm_rounds, duration=duration)
+
+    def prepare(self, job: Job, tail_operator_ids: List[str]) -> None:
+        """Prepare the execution of the workflow of the job. The operators before the tail
+        operators are resumed from the checkpoints, if the job is re-executed by the leader.
+        Otherwise, the execution starts from scratch."""
+        if not isinstance(job, SubJob) or not job.original_job_id:
+            return
+        with self._lock:
+            checkpoints = self._checkpoints.get(job.original_job_id, {}).get(job.id, {})
+            if job.id in self._resuming_job_ids:
+                self._resuming_job_ids.discard(job.id)
+                self._resumable_operator_ids[job.id] = set(checkpoints) - set(tail_operator_ids)
+            else:
+                self._resumable_operator_ids.pop(job.id, None)
+                checkpoints.clear()
+
+    def resume(self, job: Job, operator_id: str) -> Optional[WorkflowMessage]:
+        """Get the output of the operator in the last execution, if the operator is resumed."""
+        if not isinstance(job, SubJob) or not job.original_job_id:
+            return None
+        with self._lock:
+            resumable_operator_ids = self._resumable_operator_ids.get(job.id, set())
+            if operator_id not in resumable_operator_ids:
+                return None
+            resumable_operator_ids.discard(operator_id)
+            checkpoint = self._checkpoints[job.original_job_id][job.id][operator_id]
+
+            self._stats.resumed_operator_count += 1
+            self._stats.saved_llm_rounds += checkpoint.llm_rounds
+            self._stats.saved_time += checkpoint.duration
+            return checkpoint.message.copy()
+
+    def plan_recovery(
+        self,
+        original_job_id: str,
+        consumed_job_ids: List[str],
+        faulty_job_ids: List[str],
+    ) -> List[str]:
+        """Plan the re-execution of the predecessors of the subjob with INPUT_DATA_ERROR.
+
+        Args:
+            original_job_id (str): The original job id.
+            consumed_job_ids (List[str]): The predecessors whose outputs were consumed by the
+                failed subjob.
+            faulty_job_ids (List[str]): The predecessors whose outputs are blamed by the
+                evaluator of the failed subjob.
+
+        Returns:
+            List[str]: The predecessors to re-execute. All the consumed ones are re-executed, if
+                the evaluator does not blame any of them.
+        """
+        reexecuted_job_ids = [
+            job_id for job_id in consumed_job_ids if job_id in faulty_job_ids
+        ] or list(consumed_job_ids)
+        skipped_job_ids = [
+            job_id for job_id in consumed_job_ids if job_id not in reexecuted_job_ids
+        ]
+
+        with self._lock:
+            self._stats.recovery_count += 1
+            self._stats.reexecuted_job_count += len(reexecuted_job_ids)
+            self._stats.skipped_job_count += len(skipped_job_ids)
+            for job_id in skipped_job_ids:
+                llm_rounds, duration = self._get_cost(original_job_id, job_id)
+                self._stats.saved_llm_rounds += llm_rounds
+                self._stats.saved_time += duration
+            self._resuming_job_ids.update(reexecuted_job_ids)
+        return reexecuted_job_ids
+
+    def record_exhausted(self) -> None:
+        """Record the job graph failed by running out of the re-executions."""
+        with self._lock:
+            self._stats.exhausted_count += 1
+
+    def clear(self, original_job_id: str) -> None:
+        """Drop the checkpoints, when the execution of the job graph is over."""
+        with self._lock:
+            for job_id in self._checkpoints.pop(original_job_id, {}):
+                self._resuming_job_ids.discard(job_id)
+                self._resumable_operator_ids.pop(job_id, None)
+
+    def get_stats(self) -> ReexecutionStats:
+        """Get the snapshot of the partial re-execution metrics."""
+        with self._lock:
+            return ReexecutionStats(**vars(self._stats))
+
+    def _get_cost(self, original_job_id: str, job_id: str) -> Tuple[int, float]:
+        """Get the LLM calls and the time of the operators in the last execution of the subjob.
+        The caller must hold the lock."""
+        checkpoints = self._checkpoints.get(original_job_id, {}).get(job_id, {}).values()
+        return (
+            sum(checkpoint.llm_rounds for checkpoint in checkpoints),
+            sum(checkpoint.duration for checkpoint in checkpoints),
+        )
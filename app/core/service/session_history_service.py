@@ -0,0 +1,166 @@
+import math
+import re
+import threading
+from typing import Optional, cast
+
+from app.core.common.singleton import Singleton
+from app.core.common.system_env import SystemEnv
+from app.core.dal.dao.seesion_dao import SessionDao
+from app.core.model.message import ChatMessage, HybridMessage, TextMessage
+from app.core.model.session import SessionHistory, SessionHistoryTurn
+from app.core.service.job_service import JobService
+from app.server.manager.view.message_view import MessageView
+
+_CJK_PATTERN = re.compile(r"[\u3000-\u9fff\uff00-\uffef]")
+_SUMMARY_QUESTION_LENGTH = 100
+_SUMMARY_ANSWER_LENGTH = 200
+
+
+class SessionHistoryService(metaclass=Singleton):
+    """Session history service
+
+    The chat history of a session, which is the context of the new jobs of the session, is kept
+    as a rolling artifact in the session row, instead of being rebuilt from the conversation views
+    of all the past jobs on every submission. A finished original job is appended once as a turn
+    (the question, the thinking chain and the answer), and the earliest turns out of the token
+    budget are compacted into a summary (the beginnings of the questions and the answers), whose
+    earliest lines are dropped out of the summary token budget in turn. So the cost of the
+    submission and the tokens of the context stay flat however long the session gets.
+    """
+
+    def __init__(self):
+        self._session_dao: SessionDao = SessionDao.instance
+        self._job_service: JobService = JobService.instance
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Estimate the LLM tokens of the text: about one token per CJK character, and one token
+        per four other characters."""
+        cjk_count = len(_CJK_PATTERN.findall(text))
+        return cjk_count + math.ceil((len(text) - cjk_count) / 4)
+
+    def get_history_context(
+        self, session_id: str, current_question_message: Optional[TextMessage] = None
+    ) -> str:
+        """Append the finished jobs of the session to its history, and format the history as the
+        context of the new job."""
+        with self._lock:
+            history = self._session_dao.get_history(session_id=session_id)
+            if history is None:
+                # the history of the session created by the previous versions is built only once
+                history = SessionHistory()
+                for view in self._job_service.get_conversation_views(session_id=session_id):
+                    if view.answer_metrics.has_result():
+                        self._append_turn(history, view)
+                    else:
+                        history.pending_job_ids.append(view.answer_metrics.job_id)
+                self._session_dao.save_history(session_id=session_id, history=history)
+            elif self._append_finished_jobs(history):
+                self._session_dao.save_history(session_id=session_id, history=history)
+
+        return self._format_history(history, current_question_message)
+
+    def add_pending_job(self, session_id: str, original_job_id: str) -> None:
+        """Add the submitted original job, which is appended to the history once it is finished."""
+        with self._lock:
+            history = self._session_dao.get_history(session_id=session_id) or SessionHistory()
+            history.pending_job_ids.append(original_job_id)
+            self._session_dao.save_history(session_id=session_id, history=history)
+
+    def _append_finished_jobs(self, history: SessionHistory) -> bool:
+        """Append the finished pending jobs to the history, and return whether it is changed."""
+        finished_job_ids = [
+            job_id
+            for job_id in history.pending_job_ids
+            if self._job_service.get_job_result(job_id=job_id).has_result()
+        ]
+        for job_id in finished_job_ids:
+            self._append_turn(history, self._job_service.get_conversation_view(job_id))
+            history.pending_job_ids.remove(job_id)
+        return len(finished_job_ids) > 0
+
+    def _append_turn(self, history: SessionHistory, view: MessageView) -> None:
+        """Append the turn of the finished job, and compact the earliest turns out of the token
+        budget into the summary."""
+        content = self._format_turn(view)
+        question = self._get_text(view.question)
+        answer = self._get_text(view.answer)
+        history.turns.append(
+            SessionHistoryTurn(
+                job_id=view.answer_metrics.job_id,
+                content=content,
+                summary=(
+                    f"- User: {self._truncate(question, _SUMMARY_QUESTION_LENGTH)} "
+                    f"| AI: {self._truncate(answer, _SUMMARY_ANSWER_LENGTH)}"
+                ),
+                tokens=self.estimate_tokens(content),
+            )
+        )
+
+        while sum(turn.tokens for turn in history.turns) > SystemEnv.SESSION_HISTORY_TOKEN_BUDGET:
+            history.summary_lines.append(history.turns.pop(0).summary)
+        while (
+            history.summary_lines
+            and self.estimate_tokens("\n".join(history.summary_lines))
+            > SystemEnv.SESSION_HISTORY_SUMMARY_TOKEN_BUDGET
+        ):
+            history.summary_lines.pop(0)
+            history.omitted_turn_count += 1
+
+    def _format_history(
+        self, history: SessionHistory, current_question_message: Optional[TextMessage]
+    ) -> str:
+        """Format the history into a single, LLM-friendly string."""
+        if not history.turns and not history.summary_lines:
+            return ""
+
+        message_views = [
+            "---- Conversation History of the Given Task ----",
+            "Please select the useful information from the history to assist in accurately "
+            "interpreting the user's intent and decomposing the task appropriately.",
+        ]
+        if history.summary_lines:
+            message_views.append("[Summary of Earlier Conversation]")
+            if history.omitted_turn_count:
+                message_views.append(f"({history.omitted_turn_count} earlier turns omitted)")
+            message_views.extend(history.summary_lines)
+        message_views.extend(turn.content for turn in history.turns)
+
+        if current_question_message:
+            message_views.append("[User Message]")
+            message_views.append(cast(str, current_question_message.get_payload()).strip())
+
+        message_views.append("---- End of Conversation History ----")
+
+        return "\n".join(message_views)
+
+    def _format_turn(self, view: MessageView) -> str:
+        """Format the question, the agent thinking steps and the answer of the job."""
+        # 1. user question
+        message_views = ["[User Message]", self._get_text(view.question)]
+
+        # 2. agent thinking steps (if available)
+        if view.thinking_messages:
+            message_views.append("[AI Thinking Chain]")
+            for j, thinking_msg in enumerate(view.thinking_messages):
+                # Add numbering for clarity within the thinking process
+                message_views.append(f"Step {j + 1}:")
+                thinking_msg_payload = thinking_msg.get_payload() or "(No message)"
+                message_views.append(thinking_msg_payload.strip())
+
+        # 3. ai answer
+        message_views.append("[AI Message]")
+        message_views.append(self._get_text(view.answer))
+        return "\n".join(message_views)
+
+    def _get_text(self, message: ChatMessage) -> str:
+        """Get the text of the chat message."""
+        if isinstance(message, HybridMessage):
+            return cast(str, message.get_instruction_message().get_payload()).strip()
+        return cast(str, message.get_payload()).strip()
+
+    def _truncate(self, text: str, length: int) -> str:
+        """Truncate the text (in one line) to the length."""
+        text = " ".join(text.split())
+        return text if len(text) <= length else text[: length - 3] + "..."
@@ -4,6 +4,7 @@ from uuid import uuid4
 from app.core.common.singleton import Singleton
 from app.core.dal.dao.seesion_dao import SessionDao
 from app.core.dal.do.session_do import SessionDo
+from app.core.model.page import Page
 from app.core.model.session import Session
 
 
@@ -109,6 +110,34 @@ class SessionService(metaclass=Singleton):
             for result in results
         ]
 
+    def get_sessions_page(
+        self, size: int, cursor: Optional[str] = None, offset: int = 0
+    ) -> Page[Session]:
+        """Get a page of the sessions, the latest first.
+
+        Args:
+            size (int): Number of sessions per page
+            cursor (Optional[str]): The cursor of the page, returned with the previous page
+            offset (int): Number of sessions to skip after the cursor
+
+        Returns:
+            Page[Session]: The sessions of the page, the cursor of the next page and the total
+        """
+        results, next_cursor = self._session_dao.get_page(size=size, cursor=cursor, offset=offset)
+        return Page(
+            items=[
+                Session(
+                    id=str(result.id),
+                    name=cast(Optional[str], result.name),
+                    timestamp=cast(Optional[int], result.timestamp),
+                    latest_job_id=cast(Optional[str], result.latest_job_id),
+                )
+                for result in results
+            ],
+            next_cursor=next_cursor,
+            total=self._session_dao.get_total_count(),
+        )
+
     def get_latest_job_id(self, session_id: str) -> str:
         """Get the latest job ID for a session.
 
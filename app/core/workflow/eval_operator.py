@@ -42,7 +42,10 @@ class EvalOperator(Operator):
         # is the output of the evaluated operator
         previous_op_message = workflow_messages[0].scratchpad
 
-        task = self._build_task(
+        # do not start the evaluation, if the job graph is stopped
+        self._get_cancellation_token(job=job).raise_if_cancelled()
+
+        task = await self._build_task(
             job=job,
             workflow_messages=workflow_messages,
             previous_expert_outputs=previous_expert_outputs,
@@ -72,17 +75,17 @@ class EvalOperator(Operator):
                 raise parse_result from e
             result_dict = parse_result
 
-        return WorkflowMessage(
-            payload={
-                "scratchpad": previous_op_message,
-                "status": WorkflowStatus[str(result_dict["status"])],
-                "evaluation": result_dict["evaluation"],
-                "lesson": result_dict["lesson"],
-            },
-            job_id=job.id,
-        )
-
-    def _build_task(
+        payload = {
+            "scratchpad": previous_op_message,
+            "status": WorkflowStatus[str(result_dict["status"])],
+            "evaluation": result_dict["evaluation"],
+            "lesson": result_dict["lesson"],
+        }
+        if payload["status"] == WorkflowStatus.INPUT_DATA_ERROR:
+            payload["faulty_input_job_ids"] = list(result_dict.get("faulty_input_job_ids") or [])
+        return WorkflowMessage(payload=payload, job_id=job.id)
+
+    async def _build_task(
         self,
         job: Job,
         workflow_messages: Optional[List[WorkflowMessage]] = None,
@@ -126,9 +129,12 @@ class EvalOperator(Operator):
             previous_expert_outputs_copy: List[WorkflowMessage] = [
                 msg.copy() for msg in previous_expert_outputs
             ]
+            # label the inputs by the jobs which produced them, so that the evaluator can blame
+            # the flawed inputs, and the leader re-executes only the blamed jobs
             for msg in previous_expert_outputs_copy:
                 msg.scratchpad = (
-                    "\n[JOB INPUT INFORMATION] (data/conditions/limitations):\n" + msg.scratchpad
+                    "\n[JOB INPUT INFORMATION] (data/conditions/limitations) "
+                    f"(input_job_id: {msg.get_job_id()}):\n" + msg.scratchpad
                 )
             merged_workflow_messages.extend(previous_expert_outputs_copy)
 
@@ -141,5 +147,6 @@ class EvalOperator(Operator):
             knowledge=self.get_knowledge(job),
             insights=self.get_env_insights(),
             lesson=lesson,
+            cancellation_token=self._get_cancellation_token(job=job),
         )
         return task
@@ -1,5 +1,7 @@
+import time
 from typing import List, Optional, cast
 
+from app.core.common.cancellation import CancellationToken
 from app.core.env.insight.insight import Insight
 from app.core.model.file_descriptor import FileDescriptor
 from app.core.model.job import Job, SubJob
@@ -8,8 +10,10 @@ from app.core.model.message import FileMessage, HybridMessage, MessageType, Work
 from app.core.model.task import Task
 from app.core.reasoner.reasoner import Reasoner
 from app.core.service.file_service import FileService
+from app.core.service.job_service import JobService
 from app.core.service.knowledge_base_service import KnowledgeBaseService
 from app.core.service.message_service import MessageService
+from app.core.service.reexecution_service import ReexecutionService
 from app.core.service.tool_connection_service import ToolConnectionService
 from app.core.service.toolkit_service import ToolkitService
 from app.core.workflow.operator_config import OperatorConfig
@@ -44,7 +48,16 @@ class Operator:
                 experts in workflow message type.
             lesson (Optional[str]): The lesson learned (provided by the successor expert).
         """
-        task = self._build_task(
+        # do not start the operator, if the job graph is stopped
+        self._get_cancellation_token(job=job).raise_if_cancelled()
+
+        # the subjob is re-executed by the leader, and the output of the operator is reused
+        reexecution_service: ReexecutionService = ReexecutionService.instance
+        resumed_message = reexecution_service.resume(job=job, operator_id=self.get_id())
+        if resumed_message:
+            return resumed_message
+
+        task = await self._build_task(
             job=job,
             workflow_messages=workflow_messages,
             previous_expert_outputs=previous_expert_outputs,
@@ -52,15 +65,24 @@ class Operator:
         )
 
         # infer by the reasoner
+        start_time = time.time()
         result = await reasoner.infer(task=task)
 
         # destroy MCP connections for the operator
         tool_connection_service: ToolConnectionService = ToolConnectionService.instance
         await tool_connection_service.release_connection(call_tool_ctx=task.get_tool_call_ctx())
 
-        return WorkflowMessage(payload={"scratchpad": result}, job_id=job.id)
+        workflow_message = WorkflowMessage(payload={"scratchpad": result}, job_id=job.id)
+        reexecution_service.save_checkpoint(
+            job=job,
+            operator_id=self.get_id(),
+            message=workflow_message,
+            llm_rounds=task.llm_rounds,
+            duration=time.time() - start_time,
+        )
+        return workflow_message
 
-    def _build_task(
+    async def _build_task(
         self,
         job: Job,
         workflow_messages: Optional[List[WorkflowMessage]] = None,
@@ -89,17 +111,17 @@ class Operator:
             original_job_id = job.id
         hybrid_messages: List[HybridMessage] = cast(
             List[HybridMessage],
-            message_service.get_message_by_job_id(
+            await message_service.get_message_by_job_id_async(
                 job_id=original_job_id, message_type=MessageType.HYBRID_MESSAGE
             ),
         )
         for hybrid_message in hybrid_messages:
-            # get the file descriptors from the hybrid message
+            # get the file descriptors from the hybrid message, which are loaded with it
             attached_messages = hybrid_message.get_attached_messages()
             for attached_message in attached_messages:
                 if isinstance(attached_message, FileMessage):
-                    file_descriptor = file_service.get_file_descriptor(
-                        file_id=attached_message.get_file_id()
+                    file_descriptor = attached_message.get_descriptor() or (
+                        file_service.get_file_descriptor(file_id=attached_message.get_file_id())
                     )
                     file_descriptors.append(file_descriptor)
 
@@ -113,9 +135,24 @@ class Operator:
             insights=self.get_env_insights(),
             lesson=lesson,
             file_descriptors=file_descriptors,
+            cancellation_token=self._get_cancellation_token(job=job),
         )
         return task
 
+    def _get_cancellation_token(self, job: Job) -> CancellationToken:
+        """Get the cancellation token of the job, or of the job graph which the job belongs to."""
+        if job.cancellation_token:
+            return job.cancellation_token
+        if isinstance(job, SubJob) and job.original_job_id:
+            original_job_id = job.original_job_id
+        else:
+            original_job_id = job.id
+        job_service: JobService = JobService.instance
+        cancellation_token = job_service.get_cancellation_token(original_job_id=original_job_id)
+
+        # the job is not executed by the leader (e.g. in the tests), so it is never cancelled
+        return cancellation_token or CancellationToken()
+
     def get_knowledge(self, job: Job) -> Knowledge:
         """Get the knowledge from the knowledge base."""
         query = "[JOB TARGET GOAL]:\n" + job.goal + "\n[INPUT INFORMATION]:\n" + job.context
@@ -8,6 +8,7 @@ from app.core.common.type import WorkflowStatus
 from app.core.model.job import Job
 from app.core.model.message import WorkflowMessage
 from app.core.reasoner.reasoner import Reasoner
+from app.core.service.reexecution_service import ReexecutionService
 from app.core.workflow.eval_operator import EvalOperator
 from app.core.workflow.operator import Operator
 
@@ -58,6 +59,17 @@ class Workflow(ABC):
                     self.__workflow = self._build_workflow(reasoner)
                 return self.__workflow
 
+        # resume from the operator outputs of the last execution, if the job is re-executed
+        reexecution_service: ReexecutionService = ReexecutionService.instance
+        reexecution_service.prepare(
+            job=job,
+            tail_operator_ids=[
+                op_id
+                for op_id in self._operator_graph.nodes()
+                if self._operator_graph.out_degree(op_id) == 0
+            ],
+        )
+
         try:
             built_workflow = build_workflow()
             workflow_message = self._execute_workflow(
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any, Dict, List, Optional, cast
 
 from aisuite.client import Client  # type: ignore
@@ -44,6 +45,7 @@ class AiSuiteLlmClient(ModelService):
         messages: List[ModelMessage],
         tools: Optional[List[Tool]] = None,
         tool_call_ctx: Optional[ToolCallContext] = None,
+        temperature: Optional[float] = None,
     ) -> ModelMessage:
         """Generate a text given a prompt."""
         # prepare model request
@@ -51,11 +53,13 @@ class AiSuiteLlmClient(ModelService):
             sys_prompt=sys_prompt, messages=messages, tools=tools
         )
 
-        # generate response using the llm client
-        model_response: Any = self._llm_client.chat.completions.create(
+        # generate response using the llm client, which provides the blocking API only, so that
+        # the request is sent in a thread to keep the event loop (and the cancellation) responsive
+        model_response: Any = await asyncio.to_thread(
+            self._llm_client.chat.completions.create,
             model=self._model_alias,
             messages=aisuite_messages,
-            temperature=SystemEnv.TEMPERATURE,
+            temperature=SystemEnv.TEMPERATURE if temperature is None else temperature,
             max_tokens=self._max_tokens,
             max_completion_tokens=self._max_completion_tokens,
         )
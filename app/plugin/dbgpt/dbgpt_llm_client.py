@@ -50,12 +50,15 @@ class DbgptLlmClient(ModelService):
         messages: List[ModelMessage],
         tools: Optional[List[Tool]] = None,
         tool_call_ctx: Optional[ToolCallContext] = None,
+        temperature: Optional[float] = None,
     ) -> ModelMessage:
         """Generate a text given a prompt."""
         # prepare model request
         model_request: ModelRequest = self._prepare_model_request(
             sys_prompt=sys_prompt, messages=messages, tools=tools
         )
+        if temperature is not None:
+            model_request.temperature = temperature
 
         # generate response using the llm client
         model_response: ModelOutput = await self._llm_client.generate(model_request)
@@ -34,6 +34,7 @@ class LiteLlmClient(ModelService):
         messages: List[ModelMessage],
         tools: Optional[List[Tool]] = None,
         tool_call_ctx: Optional[ToolCallContext] = None,
+        temperature: Optional[float] = None,
     ) -> ModelMessage:
         """Generate a text given a prompt using LiteLLM."""
         # prepare model request
@@ -41,16 +42,17 @@ class LiteLlmClient(ModelService):
             sys_prompt=sys_prompt, messages=messages, tools=tools
         )
 
-        from litellm import completion
+        from litellm import acompletion
         from litellm.litellm_core_utils.streaming_handler import CustomStreamWrapper
         from litellm.types.utils import ModelResponse, StreamingChoices
 
-        model_response: Union[ModelResponse, CustomStreamWrapper] = completion(
+        # use the async request, so that it can be cancelled when the job graph is stopped
+        model_response: Union[ModelResponse, CustomStreamWrapper] = await acompletion(
             model=self._model_alias,
             api_base=self._api_base,
             api_key=self._api_key,
             messages=litellm_messages,
-            temperature=self._temperature,
+            temperature=self._temperature if temperature is None else temperature,
             max_tokens=self._max_tokens,
             max_completion_tokens=self._max_completion_tokens,
             stream=False,
@@ -12,9 +12,11 @@ graph_dbs_bp = Blueprint("graphdbs", __name__)
 
 @graph_dbs_bp.route("/", methods=["GET"])
 def get_all_graph_dbs():
-    """Get all GraphDBs."""
+    """Get all GraphDBs, or a page of them after the `cursor` if the `size` is given."""
     manager = GraphDBManager()
-    graph_dbs, message = manager.get_all_graph_db_configs()
+    size = request.args.get("size", type=int)
+    cursor = request.args.get("cursor", type=str)
+    graph_dbs, message = manager.get_all_graph_db_configs(size=size, cursor=cursor)
     return make_response(data=graph_dbs, message=message)
 
 
@@ -1,6 +1,6 @@
-from flask import Blueprint
+from flask import Blueprint, request
 
-from app.server.common.util import make_response
+from app.server.common.util import make_conditional_response, make_event_stream, make_response
 from app.server.manager.job_manager import JobManager
 
 jobs_bp = Blueprint("jobs", __name__)
@@ -9,11 +9,96 @@ jobs_bp = Blueprint("jobs", __name__)
 @jobs_bp.route("/<string:job_id>/message", methods=["GET"])
 def get_job_message_view(job_id: str):
     """Get message view (including thinking chain) for a specific job.
-    Returns the user's question, AI's answer, and thinking chain messages.
+    Returns the user's question, AI's answer, and thinking chain messages, or 304 Not Modified if
+    the view is not changed since the ETag of the poll.
     """
     manager = JobManager()
 
-    # get message view data for the job
-    message_view_data, message = manager.get_conversation_view(job_id=job_id)
+    def build_response():
+        # get message view data for the job
+        message_view_data, message = manager.get_conversation_view(job_id=job_id)
+        return make_response(data=message_view_data, message=message)
 
-    return make_response(data=message_view_data, message=message)
+    return make_conditional_response(
+        version=manager.get_conversation_view_version(job_id=job_id),
+        build_response=build_response,
+    )
+
+
+@jobs_bp.route("/<string:job_id>/events", methods=["GET"])
+def stream_job_events(job_id: str):
+    """Stream the progress events (the status transitions, the new messages and the artifact
+    updates) of the job and its subjobs as server-sent events, after the `Last-Event-ID` header
+    or the `since` cursor.
+    """
+    manager = JobManager()
+
+    since = request.headers.get("Last-Event-ID", type=int) or request.args.get("since", type=int)
+    batches = manager.follow_events(job_id=job_id, since=since)
+
+    return make_event_stream(batches)
+
+
+@jobs_bp.route("/<string:job_id>/events/poll", methods=["GET"])
+def poll_job_events(job_id: str):
+    """Get the progress events of the job and its subjobs after the `since` cursor, waiting up to
+    `timeout` seconds for them (the long-poll fallback of the server-sent events).
+    """
+    manager = JobManager()
+
+    since = request.args.get("since", type=int)
+    timeout = request.args.get("timeout", type=float)
+    events, message = manager.get_events(job_id=job_id, since=since, timeout=timeout)
+
+    return make_response(data=events, message=message)
+
+
+@jobs_bp.route("/scheduler", methods=["GET"])
+def get_scheduler_stats():
+    """Get the queue depth, wait time and worker usage of the job schedulers."""
+    manager = JobManager()
+
+    stats, message = manager.get_scheduler_stats()
+
+    return make_response(data=stats, message=message)
+
+
+@jobs_bp.route("/decomposition_cache", methods=["GET"])
+def get_decomposition_cache_stats():
+    """Get the size and the hit/miss counters of the decomposition cache."""
+    manager = JobManager()
+
+    stats, message = manager.get_decomposition_cache_stats()
+
+    return make_response(data=stats, message=message)
+
+
+@jobs_bp.route("/expert_router", methods=["GET"])
+def get_expert_router_stats():
+    """Get the fast-path rate, the saved latency and the latest decisions of the expert router."""
+    manager = JobManager()
+
+    stats, message = manager.get_expert_router_stats()
+
+    return make_response(data=stats, message=message)
+
+
+@jobs_bp.route("/dao_cache", methods=["GET"])
+def get_dao_cache_stats():
+    """Get the sizes and the hit rates of the read-through caches of the jobs, the messages and
+    the file descriptors."""
+    manager = JobManager()
+
+    stats, message = manager.get_dao_cache_stats()
+
+    return make_response(data=stats, message=message)
+
+
+@jobs_bp.route("/reexecution", methods=["GET"])
+def get_reexecution_stats():
+    """Get the LLM calls and the time saved by the partial re-executions of the subjobs."""
+    manager = JobManager()
+
+    stats, message = manager.get_reexecution_stats()
+
+    return make_response(data=stats, message=message)
@@ -12,10 +12,13 @@ knowledgebases_bp = Blueprint("knowledgebases", __name__)
 
 @knowledgebases_bp.route("/", methods=["GET"])
 def get_all_knowledge_bases():
-    """Get all knowledge bases."""
+    """Get all knowledge bases, or a page of the local knowledge bases after the `cursor` if the
+    `size` is given."""
     manager = KnowledgeBaseManager()
 
-    knowledge_bases, message = manager.get_all_knowledge_bases()
+    size = request.args.get("size", type=int)
+    cursor = request.args.get("cursor", type=str)
+    knowledge_bases, message = manager.get_all_knowledge_bases(size=size, cursor=cursor)
     return make_response(data=knowledge_bases, message=message)
 
 
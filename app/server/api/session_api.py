@@ -4,7 +4,12 @@ from flask import Blueprint, request
 
 from app.core.model.message import HybridMessage, MessageType
 from app.core.model.session import Session
-from app.server.common.util import ApiException, make_response
+from app.server.common.util import (
+    ApiException,
+    make_conditional_response,
+    make_event_stream,
+    make_response,
+)
 from app.server.manager.session_manager import SessionManager
 from app.server.manager.view.message_view import MessageViewTransformer
 
@@ -13,14 +18,16 @@ sessions_bp = Blueprint("sessions", __name__)
 
 @sessions_bp.route("/", methods=["GET"])
 def get_sessions():
-    """Get all sessions."""
+    """Get all sessions, or a page of them after the `cursor` (or at the `page`) if the `size` is
+    given."""
     manager = SessionManager()
 
     size = request.args.get("size", type=int)
     page = request.args.get("page", type=int)
+    cursor = request.args.get("cursor", type=str)
 
     # Pass these parameters to get_all_sessions
-    sessions, message = manager.get_all_sessions(size=size, page=page)
+    sessions, message = manager.get_all_sessions(size=size, page=page, cursor=cursor)
     return make_response(data=sessions, message=message)
 
 
@@ -127,10 +134,51 @@ def revover_original_job(session_id: str):
 @sessions_bp.route("/<string:session_id>/messages", methods=["GET"])
 def get_conversion_view(session_id: str):
     """Get message view (including thinking chain) for a specific job.
-    Returns the user's question, AI's answer, and thinking chain messages.
+    Returns the user's question, AI's answer, and thinking chain messages, or 304 Not Modified if
+    the views are not changed since the ETag of the poll.
     """
     manager = SessionManager()
 
-    message_view_datas, message = manager.get_conversation_views(session_id=session_id)
+    # the latest `size` jobs before the `cursor` if the `size` is given
+    size = request.args.get("size", type=int)
+    cursor = request.args.get("cursor", type=str)
+
+    def build_response():
+        message_view_datas, message = manager.get_conversation_views(
+            session_id=session_id, size=size, cursor=cursor
+        )
+        return make_response(data=message_view_datas, message=message)
+
+    return make_conditional_response(
+        version=manager.get_conversation_views_version(session_id=session_id),
+        build_response=build_response,
+    )
+
+
+@sessions_bp.route("/<string:session_id>/events", methods=["GET"])
+def stream_session_events(session_id: str):
+    """Stream the progress events (the status transitions, the new messages and the artifact
+    updates) of the jobs of the session as server-sent events, after the `Last-Event-ID` header
+    or the `since` cursor, so that the frontend applies the deltas instead of polling the
+    messages.
+    """
+    manager = SessionManager()
+
+    since = request.headers.get("Last-Event-ID", type=int) or request.args.get("since", type=int)
+    batches = manager.follow_events(session_id=session_id, since=since)
+
+    return make_event_stream(batches)
+
+
+@sessions_bp.route("/<string:session_id>/events/poll", methods=["GET"])
+def poll_session_events(session_id: str):
+    """Get the progress events of the jobs of the session after the `since` cursor, waiting up to
+    `timeout` seconds for them (the long-poll fallback of the server-sent events).
+    """
+    manager = SessionManager()
+
+    since = request.args.get("since", type=int)
+    timeout = request.args.get("timeout", type=float)
+    events, message = manager.get_events(session_id=session_id, since=since, timeout=timeout)
 
-    return make_response(data=message_view_datas, message=message)
+    return make_response(data=events, message=message)
@@ -1,13 +1,15 @@
 import os
+from typing import Optional
 
 from flask import Flask, send_from_directory
 from flask_cors import CORS  # type: ignore
 import pyfiglet  # type: ignore
 
+from app.core.dal.database import ScopedDbSession
 from app.core.dal.init_db import init_db
 from app.core.sdk.agentic_service import AgenticService
 from app.server.api import register_blueprints
-from app.server.common.util import make_error
+from app.server.common.util import compress_response, make_error
 
 
 def create_app():
@@ -41,6 +43,13 @@ def create_app():
 
     register_blueprints(app)
 
+    app.after_request(compress_response)
+
+    @app.teardown_appcontext
+    def remove_db_session(_: Optional[BaseException]):
+        # release the database session (and its connection) of the request thread
+        ScopedDbSession.remove()
+
     @app.errorhandler(Exception)
     def handle_base_exception(e: Exception):
         return make_error(e)
@@ -1,8 +1,27 @@
+from datetime import datetime, timezone
+import gzip
+import hashlib
+import json
 import sys
 import traceback
-from typing import Any, Optional
+from typing import Any, Callable, Generator, Iterable, Optional, Tuple
 
-from flask import jsonify
+from flask import (
+    Response,
+    jsonify,
+    make_response as make_flask_response,
+    request,
+    stream_with_context,
+)
+
+from app.core.common.system_env import SystemEnv
+from app.core.model.job_event import JobEventBatch
+from app.core.model.page import Page
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # brotli is optional, and gzip is negotiated without it
+    brotli = None
 
 
 class ApiException(Exception):
@@ -14,11 +33,106 @@ class ApiException(Exception):
 
 
 def make_response(data: Optional[Any] = None, message: str = "") -> Any:
-    """Create a JSON response."""
+    """Create a JSON response. The items of a page are the data, and the cursor of the next page
+    and the total are returned along with them."""
+    if isinstance(data, Page):
+        return jsonify(
+            {
+                "success": True,
+                "data": data.items,
+                "message": message,
+                "next_cursor": data.next_cursor,
+                "total": data.total,
+            }
+        ), 200
     response = {"success": True, "data": data, "message": message}
     return jsonify(response), 200
 
 
+def make_conditional_response(
+    version: Tuple[int, float, str], build_response: Callable[[], Any]
+) -> Any:
+    """Create a response validated by the version of the requested views (e.g. the cursor and the
+    timestamp of the latest job event, and the version derived from the database), so that an
+    unchanged view is not built again for a poll with the ETag, and 304 Not Modified is returned
+    instead.
+
+    The job events are published in the server process only, so the version derived from the
+    database (e.g. the number and the latest timestamp of the messages) is validated as well, to
+    catch the changes of the other processes (e.g. the messages saved by the expert workers).
+
+    The If-Modified-Since header is not used to validate, since the views can be changed more
+    than once in a second, and the Last-Modified header is informational.
+    """
+    cursor, timestamp, data_version = version
+    # the query (e.g. the page cursor) is versioned along with the view
+    etag = hashlib.md5(f"{request.full_path}|{cursor}|{data_version}".encode()).hexdigest()
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = make_flask_response(build_response())
+    response.set_etag(etag, weak=True)
+    response.last_modified = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+    # the clients revalidate the view on every poll
+    response.cache_control.no_cache = True
+    return response
+
+
+def compress_response(response: Response) -> Response:
+    """Compress the large response by the encoding accepted by the client (brotli if available,
+    or gzip), e.g. the conversation views with the graph JSON."""
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    data = response.get_data()
+    if len(data) < SystemEnv.RESPONSE_COMPRESSION_MIN_SIZE:
+        return response
+
+    if brotli is not None and request.accept_encodings["br"]:
+        response.set_data(brotli.compress(data, quality=SystemEnv.RESPONSE_COMPRESSION_LEVEL))
+        response.headers["Content-Encoding"] = "br"
+    elif request.accept_encodings["gzip"]:
+        response.set_data(
+            gzip.compress(data, compresslevel=SystemEnv.RESPONSE_COMPRESSION_LEVEL, mtime=0)
+        )
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+def make_event_stream(batches: Iterable[JobEventBatch]) -> Any:
+    """Create a server-sent events response, streaming the batches of the job events."""
+
+    def generate() -> Generator[str, None, None]:
+        # the browser reconnects with the Last-Event-ID header, once the connection is lost
+        yield "retry: 3000\n\n"
+        for batch in batches:
+            if batch.reset:
+                yield _format_event("RESET", batch.cursor, {"cursor": batch.cursor})
+            for event in batch.events:
+                yield _format_event(event.type.value, event.cursor, event.to_dict())
+            if not batch.events and not batch.reset:
+                # keep the idle connection alive through the proxies
+                yield ": keep-alive\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _format_event(event: str, id: int, data: Any) -> str:
+    """Format a server-sent event."""
+    return f"id: {id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 def make_error(e: Exception):
     """Create a JSON error response."""
 
@@ -1,6 +1,7 @@
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 from app.core.model.graph_db_config import GraphDbConfig
+from app.core.model.page import Page
 from app.core.service.graph_db_service import GraphDbService
 
 
@@ -59,15 +60,31 @@ class GraphDBManager:
         graph_db = self._graph_db_service.update_graph_db_config(graph_db_config=graph_db_config)
         return graph_db.to_dict(), "GraphDB updated successfully"
 
-    def get_all_graph_db_configs(self) -> Tuple[List[dict], str]:
+    def get_all_graph_db_configs(
+        self, size: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Tuple[Page[dict], str]:
         """Get all GraphDBs.
 
+        Args:
+            size (Optional[int]): Number of GraphDBs per page, the latest created first
+            cursor (Optional[str]): The cursor of the page, returned with the previous page
+
         Returns:
-            Tuple[List[dict], str]: A tuple containing a list of GraphDB details and success message
+            Tuple[Page[dict], str]: A tuple containing the page of GraphDB details and success
+                message
         """
-        graph_db_configs = self._graph_db_service.get_all_graph_db_configs()
-        graph_db_list = [graph_db.to_dict() for graph_db in graph_db_configs]
-        return graph_db_list, "Get all GraphDBs successfully"
+        if size and size > 0:
+            graph_db_page = self._graph_db_service.get_graph_db_configs_page(
+                size=size, cursor=cursor
+            )
+        else:
+            graph_db_configs = self._graph_db_service.get_all_graph_db_configs()
+            graph_db_page = Page(items=graph_db_configs, total=len(graph_db_configs))
+        return Page(
+            items=[graph_db.to_dict() for graph_db in graph_db_page.items],
+            next_cursor=graph_db_page.next_cursor,
+            total=graph_db_page.total,
+        ), "Get all GraphDBs successfully"
 
     def validate_graph_db_connection(self, graph_db_config: GraphDbConfig) -> Tuple[bool, str]:
         """Validate connection to a GraphDB.
@@ -1,6 +1,15 @@
-from typing import Any, Dict, Tuple
+from dataclasses import asdict
+from typing import Any, Dict, Generator, Optional, Tuple
 
+from app.core.common.system_env import SystemEnv
+from app.core.dal.read_through_cache import get_read_through_cache_stats
+from app.core.model.job_event import JobEventBatch
+from app.core.service.agent_service import AgentService
+from app.core.service.decomposition_cache_service import DecompositionCacheService
+from app.core.service.expert_router_service import ExpertRouterService
+from app.core.service.job_event_service import JobEventService
 from app.core.service.job_service import JobService
+from app.core.service.reexecution_service import ReexecutionService
 from app.server.manager.view.message_view import MessageViewTransformer
 
 
@@ -15,3 +24,69 @@ class JobManager:
         return MessageViewTransformer.serialize_conversation_view(
             self._job_service.get_conversation_view(original_job_id=job_id)
         ), "Message view retrieved successfully"
+
+    def get_conversation_view_version(self, job_id: str) -> Tuple[int, float, str]:
+        """Get the version (the cursor and the timestamp of the latest job event, and the version
+        derived from the database) of the message view of the job, to validate the conditional
+        requests."""
+        job_event_service: JobEventService = JobEventService.instance
+        cursor, timestamp = job_event_service.get_version(original_job_id=job_id)
+        data_version, latest_timestamp = self._job_service.get_conversation_view_data_version(
+            original_job_id=job_id
+        )
+        return cursor, max(timestamp, latest_timestamp), data_version
+
+    def get_events(
+        self, job_id: str, since: Optional[int], timeout: Optional[float]
+    ) -> Tuple[Dict[str, Any], str]:
+        """Get the progress events of the original job after the cursor (long polling)."""
+        self._job_service.get_original_job(original_job_id=job_id)
+        job_event_service: JobEventService = JobEventService.instance
+        max_timeout = SystemEnv.JOB_EVENT_POLL_TIMEOUT
+        return job_event_service.get_events(
+            since=since,
+            original_job_id=job_id,
+            timeout=max_timeout if timeout is None else min(max(timeout, 0.0), max_timeout),
+        ).to_dict(), "Job events retrieved successfully"
+
+    def follow_events(
+        self, job_id: str, since: Optional[int]
+    ) -> Generator[JobEventBatch, None, None]:
+        """Follow the progress events of the original job after the cursor (server-sent events)."""
+        self._job_service.get_original_job(original_job_id=job_id)
+        job_event_service: JobEventService = JobEventService.instance
+        return job_event_service.follow_events(
+            since=since, original_job_id=job_id, timeout=SystemEnv.JOB_EVENT_POLL_TIMEOUT
+        )
+
+    def get_scheduler_stats(self) -> Tuple[Dict[str, Any], str]:
+        """Get the queue depth and wait time of the job schedulers."""
+        agent_service: AgentService = AgentService.instance
+        return {
+            name: asdict(stats) for name, stats in agent_service.get_scheduler_stats().items()
+        }, "Scheduler stats retrieved successfully"
+
+    def get_decomposition_cache_stats(self) -> Tuple[Dict[str, Any], str]:
+        """Get the hit/miss counters of the decomposition cache of the leader."""
+        decomposition_cache_service: DecompositionCacheService = DecompositionCacheService.instance
+        return asdict(
+            decomposition_cache_service.get_stats()
+        ), "Decomposition cache stats retrieved successfully"
+
+    def get_expert_router_stats(self) -> Tuple[Dict[str, Any], str]:
+        """Get the fast-path rate and the saved latency of the expert router of the leader."""
+        expert_router_service: ExpertRouterService = ExpertRouterService.instance
+        return asdict(
+            expert_router_service.get_stats()
+        ), "Expert router stats retrieved successfully"
+
+    def get_reexecution_stats(self) -> Tuple[Dict[str, Any], str]:
+        """Get the LLM calls and the time saved by the partial re-executions of the subjobs."""
+        reexecution_service: ReexecutionService = ReexecutionService.instance
+        return asdict(reexecution_service.get_stats()), "Re-execution stats retrieved successfully"
+
+    def get_dao_cache_stats(self) -> Tuple[Dict[str, Any], str]:
+        """Get the sizes and the hit rates of the read-through caches of the DAOs."""
+        return {
+            stats.name: asdict(stats) for stats in get_read_through_cache_stats()
+        }, "DAO cache stats retrieved successfully"
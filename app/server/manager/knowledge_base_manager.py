@@ -1,4 +1,4 @@
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 from app.core.knowledge.knowledge_config import KnowledgeConfig
 from app.core.service.knowledge_base_service import KnowledgeBaseService
@@ -62,20 +62,39 @@ class KnowledgeBaseManager:
         else:
             return {}, f"Knowledge base with ID {id} cleaned successfully"
 
-    def get_all_knowledge_bases(self) -> Tuple[dict, str]:
+    def get_all_knowledge_bases(
+        self, size: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Tuple[dict, str]:
         """
         Get all knowledge bases.
 
+        Args:
+            size (Optional[int]): Number of local knowledge bases per page, the latest first
+            cursor (Optional[str]): The cursor of the page, returned with the previous page
+
         Returns:
-            Tuple[List[dict], str]: A tuple containing a list of knowledge base details and success
+            Tuple[List[dict], str]: A tuple containing a list of knowledge base details (with the
+                cursor of the next page of local knowledge bases and their total) and success
                 message
         """
-        global_knowledge_base, local_knowledge_bases = (
-            self._knowledge_base_service.get_all_knowledge_bases()
-        )
+        next_cursor: Optional[str] = None
+        if size and size > 0:
+            global_knowledge_base, local_knowledge_base_page = (
+                self._knowledge_base_service.get_knowledge_bases_page(size=size, cursor=cursor)
+            )
+            local_knowledge_bases = local_knowledge_base_page.items
+            next_cursor = local_knowledge_base_page.next_cursor
+            total = local_knowledge_base_page.total
+        else:
+            global_knowledge_base, local_knowledge_bases = (
+                self._knowledge_base_service.get_all_knowledge_bases()
+            )
+            total = len(local_knowledge_bases)
         data = self._knowledge_base_view.serialize_knowledge_bases(
             global_knowledge_base, local_knowledge_bases
         )
+        data["next_cursor"] = next_cursor
+        data["total"] = total
 
         return data, "Get all knowledge bases successfully"
 
@@ -1,10 +1,13 @@
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Generator, List, Optional, Tuple
 
 from app.core.common.system_env import SystemEnv
 from app.core.common.type import ChatMessageRole
+from app.core.model.job_event import JobEventBatch
 from app.core.model.message import ChatMessage, HybridMessage, TextMessage
+from app.core.model.page import Page
 from app.core.model.session import Session
 from app.core.sdk.agentic_service import AgenticService
+from app.core.service.job_event_service import JobEventService
 from app.core.service.job_service import JobService
 from app.core.service.knowledge_base_service import KnowledgeBaseService
 from app.core.service.message_service import MessageService
@@ -20,6 +23,7 @@ class SessionManager:
         self._message_service: MessageService = MessageService.instance
         self._session_service: SessionService = SessionService.instance
         self._job_service: JobService = JobService.instance
+        self._job_event_service: JobEventService = JobEventService.instance
         self._knowledgebase_service: KnowledgeBaseService = KnowledgeBaseService.instance
 
         self._message_view: MessageViewTransformer = MessageViewTransformer()
@@ -94,44 +98,52 @@ class SessionManager:
         return data, "Session updated successfully"
 
     def get_all_sessions(
-        self, size: Optional[int] = None, page: Optional[int] = None
-    ) -> Tuple[List[Dict[str, Any]], str]:
+        self, size: Optional[int] = None, page: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Tuple[Page[Dict[str, Any]], str]:
         """Get all sessions.
 
         Args:
             size (Optional[int]): Number of sessions per page
-            page (Optional[int]): Page number for pagination (1-based index)
+            page (Optional[int]): Page number for pagination (1-based index), ignored if the
+                cursor is given
+            cursor (Optional[str]): The cursor of the page, returned with the previous page
 
         Returns:
-            Tuple[List[Dict[str, Any]], str]: A tuple containing a list of session details and
+            Tuple[Page[Dict[str, Any]], str]: A tuple containing the page of session details and
                 success message
         """
-        sessions = self._session_service.get_all_sessions()
-        sessions = sorted(sessions, key=lambda session: session.timestamp or 0, reverse=True)
-        total_sessions = len(sessions)
-
-        if size and page and size > 0 and page >= 1:
-            start_idx = (page - 1) * size
-            if start_idx >= total_sessions:
-                return [], "No more sessions to fetch, since the page index is too high"
-            end_idx = min(start_idx + size, total_sessions)
-            message = f"Fetched {end_idx - start_idx} out of {total_sessions} sessions successfully"
+        if size and size > 0:
+            offset = (page - 1) * size if page and page > 1 and not cursor else 0
+            session_page = self._session_service.get_sessions_page(
+                size=size, cursor=cursor, offset=offset
+            )
+            if not session_page.items and offset > 0:
+                return Page(
+                    total=session_page.total
+                ), "No more sessions to fetch, since the page index is too high"
+            message = (
+                f"Fetched {len(session_page.items)} out of {session_page.total} sessions "
+                "successfully"
+            )
         else:
-            start_idx = 0
-            end_idx = total_sessions
-            message = f"Fetched all {total_sessions} sessions successfully"
-
-        session_list = [
-            {
-                "id": session.id,
-                "name": session.name,
-                "timestamp": session.timestamp,
-                "latest_job_id": session.latest_job_id,
-            }
-            for session in sessions[start_idx:end_idx]
-        ]
-
-        return session_list, message
+            sessions = self._session_service.get_all_sessions()
+            sessions = sorted(sessions, key=lambda session: session.timestamp or 0, reverse=True)
+            session_page = Page(items=sessions, total=len(sessions))
+            message = f"Fetched all {len(sessions)} sessions successfully"
+
+        return Page(
+            items=[
+                {
+                    "id": session.id,
+                    "name": session.name,
+                    "timestamp": session.timestamp,
+                    "latest_job_id": session.latest_job_id,
+                }
+                for session in session_page.items
+            ],
+            next_cursor=session_page.next_cursor,
+            total=session_page.total,
+        ), message
 
     def get_all_job_ids(self, session_id: str) -> Tuple[List[str], str]:
         """Get all job IDs for a session.
@@ -147,27 +159,80 @@ class SessionManager:
         job_list = [job.id for job in jobs]
         return job_list, "Get all job ids successfully"
 
-    def get_conversation_views(self, session_id: str) -> Tuple[List[Dict[str, Any]], str]:
+    def get_conversation_views(
+        self, session_id: str, size: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Tuple[Page[Dict[str, Any]], str]:
         """Get all conversation views for a session.
 
         Args:
             session_id (str): ID of the session
+            size (Optional[int]): Number of the jobs per page, the latest page first
+            cursor (Optional[str]): The cursor of the page, returned with the previous page
 
         Returns:
-            List[Dict[str, Any]]: List of MessageView objects
+            Tuple[Page[Dict[str, Any]], str]: The page of the MessageView objects in the chat
+                order, and success message
         """
-        # get all job ids in the session
-        job_ids: List[str] = self.get_all_job_ids(session_id=session_id)[0]
-
-        # get message view data for the job
-        conversation_views: List[Dict[str, Any]] = []
-        for job_id in job_ids:
-            conversation_view = self._job_service.get_conversation_view(original_job_id=job_id)
-            conversation_views.append(
-                MessageViewTransformer.serialize_conversation_view(conversation_view)
+        if size and size > 0:
+            view_page = self._job_service.get_conversation_views_page(
+                session_id=session_id, size=size, cursor=cursor
             )
+        else:
+            # get message view data for all the jobs in the session in batch
+            views = self._job_service.get_conversation_views(session_id=session_id)
+            view_page = Page(items=views, total=len(views))
+
+        return Page(
+            items=[
+                MessageViewTransformer.serialize_conversation_view(conversation_view)
+                for conversation_view in view_page.items
+            ],
+            next_cursor=view_page.next_cursor,
+            total=view_page.total,
+        ), "Get all conversation views successfully"
+
+    def get_conversation_views_version(self, session_id: str) -> Tuple[int, float, str]:
+        """Get the version (the cursor and the timestamp of the latest job event, and the version
+        derived from the database) of the conversation views of the session, to validate the
+        conditional requests."""
+        cursor, timestamp = self._job_event_service.get_version(session_id=session_id)
+        data_version, latest_timestamp = self._job_service.get_conversation_view_data_version(
+            session_id=session_id
+        )
+        return cursor, max(timestamp, latest_timestamp), data_version
 
-        return conversation_views, "Get all conversation views successfully"
+    def get_events(
+        self, session_id: str, since: Optional[int], timeout: Optional[float]
+    ) -> Tuple[Dict[str, Any], str]:
+        """Get the progress events of the jobs of the session after the cursor (long polling).
+
+        Args:
+            session_id (str): ID of the session
+            since (Optional[int]): The cursor of the latest event received, or None to wait for
+                the events from now on
+            timeout (Optional[float]): The max seconds to wait for the events
+
+        Returns:
+            Tuple[Dict[str, Any], str]: The events, the cursor of the following events, whether
+                the full views have to be reloaded, and success message
+        """
+        self._session_service.get_session(session_id=session_id)
+        max_timeout = SystemEnv.JOB_EVENT_POLL_TIMEOUT
+        return self._job_event_service.get_events(
+            since=since,
+            session_id=session_id,
+            timeout=max_timeout if timeout is None else min(max(timeout, 0.0), max_timeout),
+        ).to_dict(), "Get session events successfully"
+
+    def follow_events(
+        self, session_id: str, since: Optional[int]
+    ) -> Generator[JobEventBatch, None, None]:
+        """Follow the progress events of the jobs of the session after the cursor (server-sent
+        events)."""
+        self._session_service.get_session(session_id=session_id)
+        return self._job_event_service.follow_events(
+            since=since, session_id=session_id, timeout=SystemEnv.JOB_EVENT_POLL_TIMEOUT
+        )
 
     def chat(self, chat_message: ChatMessage) -> Tuple[Dict[str, Any], str]:
         """Create user message and system message return the response data."""
@@ -0,0 +1,157 @@
+import argparse
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+import socket
+import threading
+from typing import Dict
+import uuid
+
+from app.core.common.cancellation import JobCancelledError
+from app.core.common.system_env import SystemEnv
+from app.core.dal.init_db import init_db
+from app.core.model.message import AgentMessage
+from app.core.sdk.agentic_service import AgenticService
+from app.core.service.agent_service import AgentService
+from app.core.service.job_queue_service import JobQueueService
+from app.core.service.job_service import JobService
+
+
+class ExpertWorker:
+    """Expert worker, which claims the subjobs from the durable subjob queue and executes them by
+    the experts of the same agentic config as the server.
+
+    Run as many workers as needed, on one or more hosts sharing the system database:
+        python -m app.worker --config app/core/sdk/chat2graph.yml --concurrency 4
+
+    Attributes:
+        _worker_id (str): The unique id of the worker, which holds the leases.
+        _concurrency (int): The max number of the subjobs executed at the same time.
+    """
+
+    def __init__(self, worker_id: str, concurrency: int):
+        self._worker_id = worker_id
+        self._concurrency = concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="expert_worker"
+        )
+        self._job_queue_service: JobQueueService = JobQueueService.instance
+        self._job_service: JobService = JobService.instance
+
+        # subjob_id -> the original job id of the running subjob
+        self._running_jobs: Dict[str, str] = {}
+        # original_job_id -> the number of its running subjobs, to release the token at last
+        self._token_refs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        """Claim and execute the queued subjobs, until the worker is stopped."""
+        heartbeat = threading.Thread(target=self._heartbeat, name="worker_heartbeat", daemon=True)
+        heartbeat.start()
+        print(f"Expert worker {self._worker_id} started (concurrency: {self._concurrency}).")
+
+        while not self._stopped.is_set():
+            with self._lock:
+                idle_count = self._concurrency - len(self._running_jobs)
+            try:
+                if idle_count > 0:
+                    self._job_queue_service.requeue_expired_leases()
+                    for agent_message in self._job_queue_service.claim(
+                        worker_id=self._worker_id, limit=idle_count
+                    ):
+                        self._submit(agent_message)
+            except Exception as e:
+                # color: orange
+                print(f"\033[38;5;208m[Warning]: Failed to claim the subjobs: {e}\033[0m")
+            self._stopped.wait(SystemEnv.SUBJOB_QUEUE_POLL_INTERVAL)
+
+        self._executor.shutdown(wait=True)
+
+    def stop(self) -> None:
+        """Stop claiming the subjobs. The running subjobs are completed before the worker exits."""
+        self._stopped.set()
+
+    def _submit(self, agent_message: AgentMessage) -> Future:
+        """Execute the claimed subjob with the cancellation token of its job graph."""
+        job_id = agent_message.get_job_id()
+        original_job_id = self._job_service.get_subjob(subjob_id=job_id).original_job_id
+        with self._lock:
+            self._running_jobs[job_id] = original_job_id
+            self._token_refs[original_job_id] = self._token_refs.get(original_job_id, 0) + 1
+            self._job_service.register_cancellation_token(original_job_id=original_job_id)
+        return self._executor.submit(self._execute, agent_message)
+
+    def _execute(self, agent_message: AgentMessage) -> None:
+        """Execute the subjob by the expert, and save the output for the leader."""
+        job_id = agent_message.get_job_id()
+        leader = AgentService.instance.leader
+        try:
+            result = leader.execute_subjob(agent_message=agent_message)
+            self._job_queue_service.complete(
+                job_id=job_id, worker_id=self._worker_id, result=result
+            )
+        except JobCancelledError:
+            self._job_queue_service.complete(
+                job_id=job_id, worker_id=self._worker_id, cancelled=True
+            )
+        except Exception as e:
+            self._job_queue_service.complete(job_id=job_id, worker_id=self._worker_id, error=str(e))
+        finally:
+            with self._lock:
+                original_job_id = self._running_jobs.pop(job_id)
+                self._token_refs[original_job_id] -= 1
+                if self._token_refs[original_job_id] == 0:
+                    del self._token_refs[original_job_id]
+                    self._job_service.release_cancellation_token(original_job_id=original_job_id)
+
+    def _heartbeat(self) -> None:
+        """Renew the leases of the running subjobs, and cancel the ones of the stopped or failed
+        job graphs. So a stop reaches the running subjobs of the worker within a heartbeat interval
+        (SUBJOB_QUEUE_LEASE_DURATION / 3 seconds)."""
+        while not self._stopped.wait(SystemEnv.SUBJOB_QUEUE_LEASE_DURATION / 3):
+            with self._lock:
+                job_ids = list(self._running_jobs.keys())
+            try:
+                for original_job_id in self._job_queue_service.heartbeat(
+                    worker_id=self._worker_id, job_ids=job_ids
+                ):
+                    self._job_service.cancel_job_graph(
+                        original_job_id=original_job_id,
+                        reason=f"The job graph of {original_job_id} has been stopped.",
+                    )
+            except Exception as e:
+                # color: orange
+                print(f"\033[38;5;208m[Warning]: Failed to renew the leases: {e}\033[0m")
+
+
+def main():
+    """Start an expert worker."""
+    parser = argparse.ArgumentParser(description="Chat2Graph expert worker")
+    parser.add_argument(
+        "--config", default="app/core/sdk/chat2graph.yml", help="The agentic config (yaml)."
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=SystemEnv.MAX_SUBJOB_WORKERS,
+        help="The max number of the subjobs executed at the same time.",
+    )
+    parser.add_argument(
+        "--worker-id",
+        default=f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}",
+        help="The unique id of the worker.",
+    )
+    args = parser.parse_args()
+
+    init_db()
+    AgenticService.load(args.config)
+
+    worker = ExpertWorker(worker_id=args.worker_id, concurrency=args.concurrency)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        worker.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from typing import List, Tuple
+
+from app.core.dal.database import async_engine
+from app.core.model.message import MessageType, TextMessage, WorkflowMessage
+from app.core.service.message_service import MessageService
+from test.resource.init_server import init_server
+
+init_server()
+
+OPERATOR_COUNT = 16
+ROUND_COUNT = 10
+HEARTBEAT_INTERVAL = 0.001  # seconds
+STALL_THRESHOLD = 1.0  # milliseconds, the lag of the scheduling of the coroutines
+
+
+async def execute_operator(index: int, use_async: bool) -> None:
+    """Execute an operator, which reads the messages of the job and saves a message each round,
+    by the sync calls (blocking the event loop) or by the async calls."""
+    message_service: MessageService = MessageService.instance
+    job_id = f"benchmark_job_{index}"
+    for round in range(ROUND_COUNT):
+        message = WorkflowMessage(payload={"scratchpad": f"Round {round}. " * 20}, job_id=job_id)
+        if use_async:
+            await message_service.get_message_by_job_id_async(
+                job_id=job_id, message_type=MessageType.TEXT_MESSAGE
+            )
+            await message_service.save_message_async(message=message)
+        else:
+            message_service.get_message_by_job_id(
+                job_id=job_id, message_type=MessageType.TEXT_MESSAGE
+            )
+            message_service.save_message(message=message)
+        # the LLM call of the round
+        await asyncio.sleep(0.002)
+
+
+async def measure(use_async: bool) -> Tuple[float, float, float, float]:
+    """Execute the operators concurrently in an event loop, and get the stall of the event loop
+    by the lag of a heartbeat (milliseconds): the total lag over STALL_THRESHOLD (the time the
+    loop is blocked), the p99 and the max lag, and the duration of the operators (seconds)."""
+    lags: List[float] = []
+    running = True
+
+    async def heartbeat() -> None:
+        while running:
+            start_time = time.perf_counter()
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            lags.append(max(0.0, time.perf_counter() - start_time - HEARTBEAT_INTERVAL) * 1000)
+
+    heartbeat_task = asyncio.create_task(heartbeat())
+    start_time = time.perf_counter()
+    await asyncio.gather(*[execute_operator(i, use_async) for i in range(OPERATOR_COUNT)])
+    duration = time.perf_counter() - start_time
+    running = False
+    await heartbeat_task
+
+    lags.sort()
+    stall = sum(lag for lag in lags if lag > STALL_THRESHOLD)
+    return stall, lags[int(len(lags) * 0.99)], lags[-1], duration
+
+
+def main():
+    """Compare the stall of the event loop of the concurrent async operators, which read and save
+    the messages by the sync DAOs (before) and by the async DAOs (after)."""
+    message_service: MessageService = MessageService.instance
+    for i in range(OPERATOR_COUNT):
+        message_service.save_message(
+            message=TextMessage(payload="Question", job_id=f"benchmark_job_{i}")
+        )
+
+    print(f"async engine: {async_engine.url.drivername if async_engine else 'none (threads)'}")
+    print(
+        f"{'mode':>6} {'stall(ms)':>10} {'p99 lag(ms)':>12} {'max lag(ms)':>12} {'duration(s)':>12}"
+    )
+    for name, use_async in [("sync", False), ("async", True)]:
+        stall, p99, max_lag, duration = asyncio.run(measure(use_async))
+        print(f"{name:>6} {stall:>10.1f} {p99:>12.2f} {max_lag:>12.2f} {duration:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
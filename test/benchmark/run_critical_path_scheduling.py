@@ -0,0 +1,101 @@
+import heapq
+import random
+from typing import Callable, Dict, List, Tuple
+
+from app.core.model.job_graph import JobGraph
+
+
+def generate_random_dag(
+    rng: random.Random, vertex_count: int, edge_probability: float
+) -> Tuple[JobGraph, Dict[str, float]]:
+    """Generate a random job graph, and the duration of each subjob.
+
+    The durations follow a heavy-tailed distribution of the experts: most subjobs are quick
+    (e.g. Q&A), while a few are long (e.g. data importation or graph analysis).
+    """
+    job_graph = JobGraph()
+    vertices = [f"subjob_{i}" for i in range(vertex_count)]
+    for vertex in vertices:
+        job_graph.add_vertex(vertex)
+    for i in range(vertex_count):
+        for j in range(i + 1, vertex_count):
+            if rng.random() < edge_probability:
+                job_graph.add_edge(vertices[i], vertices[j])
+
+    expert_durations = [1.0, 2.0, 4.0, 16.0]
+    durations = {
+        vertex: rng.choices(expert_durations, weights=[8, 4, 2, 1])[0] for vertex in vertices
+    }
+    return job_graph, durations
+
+
+def simulate(
+    job_graph: JobGraph,
+    durations: Dict[str, float],
+    worker_count: int,
+    rank: Callable[[str], float],
+) -> float:
+    """Simulate the execution of the job graph on bounded workers, and return the makespan.
+
+    The ready subjobs are dispatched by the highest rank first (FIFO for the same rank).
+    """
+    waiting: Dict[str, int] = {
+        vertex: len(job_graph.predecessors(vertex)) for vertex in job_graph.vertices()
+    }
+    ready: List[Tuple[float, int, str]] = []
+    sequence = 0
+    for vertex, indegree in waiting.items():
+        if indegree == 0:
+            heapq.heappush(ready, (-rank(vertex), sequence, vertex))
+            sequence += 1
+
+    running: List[Tuple[float, str]] = []  # heap of (finish time, vertex)
+    now = 0.0
+    while ready or running:
+        while ready and len(running) < worker_count:
+            _, _, vertex = heapq.heappop(ready)
+            heapq.heappush(running, (now + durations[vertex], vertex))
+
+        now, finished_vertex = heapq.heappop(running)
+        for successor in job_graph.successors(finished_vertex):
+            waiting[successor] -= 1
+            if waiting[successor] == 0:
+                heapq.heappush(ready, (-rank(successor), sequence, successor))
+                sequence += 1
+    return now
+
+
+def main():
+    """Compare the makespan of FIFO ordering and critical-path ordering of the ready subjobs."""
+    rng = random.Random(2025)
+    trials = 200
+
+    print(f"{'vertices':>8} {'workers':>7} {'fifo':>8} {'critical':>8} {'speedup':>8}")
+    for vertex_count in [10, 30, 100]:
+        for worker_count in [2, 4, 8]:
+            fifo_total = 0.0
+            critical_total = 0.0
+            for _ in range(trials):
+                job_graph, durations = generate_random_dag(
+                    rng, vertex_count, edge_probability=3.0 / vertex_count
+                )
+
+                # the estimations are the averages of the historical durations of the experts
+                critical_path_lengths = job_graph.critical_path_lengths(durations=durations)
+
+                fifo_total += simulate(job_graph, durations, worker_count, rank=lambda _: 0.0)
+                critical_total += simulate(
+                    job_graph,
+                    durations,
+                    worker_count,
+                    rank=lambda v, lengths=critical_path_lengths: lengths[v],
+                )
+
+            print(
+                f"{vertex_count:>8} {worker_count:>7} {fifo_total / trials:>8.2f} "
+                f"{critical_total / trials:>8.2f} {fifo_total / critical_total:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import time
+from typing import Callable, List
+
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import FileStorageType
+from app.core.dal.dao.file_descriptor_dao import FileDescriptorDao
+from app.core.dal.dao.message_dao import MessageDao
+from app.core.dal.read_through_cache import get_read_through_cache_stats
+from app.core.model.job import Job, SubJob
+from app.core.model.message import WorkflowMessage
+from app.core.service.job_service import JobService
+from app.core.service.message_service import MessageService
+from test.resource.init_server import init_server
+
+init_server()
+
+OBJECT_COUNT = 64
+LOOKUP_COUNT = 5000
+
+
+def measure(lookup: Callable[[int], object]) -> float:
+    """Get the average latency (microseconds) of the lookups of the objects, round robin."""
+    start_time = time.perf_counter()
+    for i in range(LOOKUP_COUNT):
+        lookup(i % OBJECT_COUNT)
+    return (time.perf_counter() - start_time) / LOOKUP_COUNT * 1e6
+
+
+def main():
+    """Compare the latency of the hot lookups by the ids (the subjobs, the messages and the file
+    descriptors, which are rarely updated once written), read from the database and parsed each
+    time (before) and read through the cache (after)."""
+    job_service: JobService = JobService.instance
+    message_service: MessageService = MessageService.instance
+    message_dao: MessageDao = MessageDao.instance
+    file_descriptor_dao: FileDescriptorDao = FileDescriptorDao.instance
+
+    original_job = Job(goal="Question")
+    job_service.save_job(original_job)
+    subjobs: List[SubJob] = [
+        SubJob(goal=f"Subjob {i}", original_job_id=original_job.id, expert_id="benchmark_expert")
+        for i in range(OBJECT_COUNT)
+    ]
+    messages: List[WorkflowMessage] = [
+        WorkflowMessage(payload={"scratchpad": f"Thought {i}. " * 50}, job_id=subjob.id)
+        for i, subjob in enumerate(subjobs)
+    ]
+    file_ids: List[str] = []
+    for i, (subjob, message) in enumerate(zip(subjobs, messages, strict=True)):
+        job_service.save_job(subjob)
+        message_service.save_message(message=message)
+        file_descriptor_do = file_descriptor_dao.create(
+            name=f"file_{i}.txt",
+            path=f"/tmp/file_{i}.txt",
+            type=FileStorageType.LOCAL.value,
+            size=1024,
+        )
+        file_ids.append(str(file_descriptor_do.id))
+
+    lookups = {
+        "get_subjob": lambda i: job_service.get_subjob(subjobs[i].id),
+        "get_message": lambda i: message_dao.get_message(messages[i].get_id()),
+        "get_file_descriptor": lambda i: file_descriptor_dao.get_file_descriptor_by_id(file_ids[i]),
+    }
+
+    print(f"{'lookup':>20} {'before(us)':>11} {'after(us)':>10}")
+    for name, lookup in lookups.items():
+        SystemEnv.DAO_CACHE_ENABLED = False
+        before = measure(lookup)
+        SystemEnv.DAO_CACHE_ENABLED = True
+        after = measure(lookup)
+        print(f"{name:>20} {before:>11.1f} {after:>10.1f}")
+
+    for stats in get_read_through_cache_stats():
+        print(
+            f"{stats.name}: {stats.hit_count} hits, {stats.miss_count} misses,"
+            f" hit rate {stats.hit_rate:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
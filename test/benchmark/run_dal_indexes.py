@@ -0,0 +1,159 @@
+import time
+from typing import Callable, Dict, List
+from uuid import uuid4
+
+from sqlalchemy import insert, text
+
+from app.core.common.type import ChatMessageRole, JobStatus
+from app.core.dal.dao.job_dao import JobDao
+from app.core.dal.dao.message_dao import MessageDao
+from app.core.dal.database import Do, engine
+from app.core.dal.do.job_do import JobDo
+from app.core.dal.do.message_do import MessageDo
+from app.core.dal.init_db import init_db
+from app.core.model.job import JobType
+from app.core.model.message import MessageType
+from app.core.service.message_service import MessageService
+from test.resource.init_server import init_server
+
+init_server()
+
+MESSAGE_COUNT = 1_000_000
+SESSION_COUNT = 1_000
+JOBS_PER_SESSION = 10
+SUBJOBS_PER_JOB = 4
+BATCH_SIZE = 50_000
+
+# the indexes added for the hot queries of the data access layer
+INDEX_NAMES = [
+    index.name
+    for table in [JobDo.__table__, MessageDo.__table__]
+    for index in table.indexes  # type: ignore
+    if index.name != "ix_message_session_id_timestamp_id"
+]
+
+
+def insert_rows() -> Dict[str, List[str]]:
+    """Insert the synthetic sessions of jobs, each with its subjobs and the messages of them.
+    Returns the ids of the original jobs of each session."""
+    job_rows: List[dict] = []
+    original_job_ids: Dict[str, List[str]] = {}
+    for _ in range(SESSION_COUNT):
+        session_id = str(uuid4())
+        for _ in range(JOBS_PER_SESSION):
+            job_id = str(uuid4())
+            original_job_ids.setdefault(session_id, []).append(job_id)
+            job_rows.append(
+                {
+                    "id": job_id,
+                    "goal": "question",
+                    "session_id": session_id,
+                    "category": JobType.JOB.value,
+                    "status": JobStatus.FINISHED.value,
+                }
+            )
+            for _ in range(SUBJOBS_PER_JOB):
+                job_rows.append(
+                    {
+                        "id": str(uuid4()),
+                        "goal": "subjob",
+                        "session_id": session_id,
+                        "category": JobType.SUB_JOB.value,
+                        "original_job_id": job_id,
+                        "status": JobStatus.FINISHED.value,
+                    }
+                )
+
+    messages_per_job = MESSAGE_COUNT // len(job_rows)
+    message_types = [MessageType.MODEL_MESSAGE.value, MessageType.AGENT_MESSAGE.value]
+    with engine.begin() as connection:
+        connection.execute(insert(JobDo), job_rows)
+        message_rows: List[dict] = []
+        for i, job_row in enumerate(job_rows):
+            for j in range(messages_per_job):
+                if job_row["category"] == JobType.JOB.value and j < 4:
+                    # the question and the answer, each of a text and a hybrid message
+                    message_type = [MessageType.TEXT_MESSAGE, MessageType.HYBRID_MESSAGE][j % 2]
+                    role = [ChatMessageRole.USER, ChatMessageRole.SYSTEM][j // 2]
+                    extra = {"type": message_type.value, "role": role.value}
+                else:
+                    extra = {"type": message_types[j % 2], "role": None}
+                message_rows.append(
+                    {
+                        "id": str(uuid4()),
+                        "job_id": job_row["id"],
+                        "session_id": job_row["session_id"],
+                        "timestamp": 1_700_000_000 + i,
+                        "payload": "payload",
+                        "related_message_ids": [],
+                        "artifact_ids": [],
+                        **extra,
+                    }
+                )
+                if len(message_rows) >= BATCH_SIZE:
+                    connection.execute(insert(MessageDo), message_rows)
+                    message_rows = []
+        if message_rows:
+            connection.execute(insert(MessageDo), message_rows)
+    return original_job_ids
+
+
+def measure(func: Callable[[], object], repeat: int = 5) -> float:
+    """Get the min latency (in ms) of the function."""
+    latencies = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - start_time) * 1000)
+    return min(latencies)
+
+
+def main():
+    """Compare the latency of the hot queries of the data access layer on a database of 1M
+    messages, without the indexes (as created by the previous versions) and after the migration
+    of `init_db` adds them."""
+    job_dao: JobDao = JobDao.instance
+    message_dao: MessageDao = MessageDao.instance
+    message_service: MessageService = MessageService.instance
+
+    # the tables created by the previous versions, without the indexes
+    with engine.begin() as connection:
+        for index_name in INDEX_NAMES:
+            connection.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+    original_job_ids = insert_rows()
+    session_id = list(original_job_ids.keys())[SESSION_COUNT // 2]
+    job_ids = original_job_ids[session_id]
+    queries: Dict[str, Callable[[], object]] = {
+        "subjobs of a job": lambda: job_dao.filter_by(original_job_id=job_ids[0]),
+        "jobs of a session": lambda: job_dao.filter_by(
+            session_id=session_id, category=JobType.JOB.value
+        ),
+        "queued subjobs": lambda: job_dao.claim_subjobs(
+            worker_id="benchmark", lease_duration=30, limit=10
+        ),
+        "messages of a job": lambda: message_service.get_message_by_job_id(
+            job_id=job_ids[0], message_type=MessageType.AGENT_MESSAGE
+        ),
+        "hybrid views of jobs": lambda: message_dao.get_hybrid_messages_by_job_ids(job_ids),
+        "questions page": lambda: message_service.get_question_job_ids_page(
+            session_id=session_id, size=5
+        ),
+        "text messages": lambda: message_service.filter_text_messages_by_session(session_id),
+    }
+
+    without_indexes = {name: measure(query) for name, query in queries.items()}
+
+    start_time = time.perf_counter()
+    init_db()
+    migration_s = time.perf_counter() - start_time
+    with_indexes = {name: measure(query) for name, query in queries.items()}
+
+    print(f"messages: {message_dao.count()}, jobs: {job_dao.count()}")
+    print(f"migration (init_db): {migration_s:.2f} s, tables: {len(Do.metadata.sorted_tables)}")
+    print(f"{'query':>22} {'no index(ms)':>13} {'index(ms)':>10}")
+    for name in queries:
+        print(f"{name:>22} {without_indexes[name]:>13.2f} {with_indexes[name]:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+from functools import partial
+import time
+from typing import Any, Callable, Dict, List, Tuple
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from app.core.dal.dao.artifact_dao import ArtifactDao
+from app.core.dal.dao.dao import Dao
+from app.core.dal.dao.job_dao import JobDao
+from app.core.dal.dao.message_dao import MessageDao
+from app.core.dal.database import engine, writer_engine
+from app.core.model.artifact import Artifact, ContentType, SourceReference
+from app.core.model.job import SubJob
+from app.core.model.message import AgentMessage
+from test.resource.init_server import init_server
+
+init_server()
+
+WRITE_COUNT = 2_000
+
+# the number of the executed statements (the round trips)
+statement_count = 0
+
+
+def count_statement(*_: Any) -> None:
+    """Count the executed statement."""
+    global statement_count
+    statement_count += 1
+
+
+# the statements are executed by the reader and the writer connections of the tuned SQLite
+for bound_engine in {engine, writer_engine}:
+    event.listen(bound_engine, "before_cursor_execute", count_statement)
+
+
+def legacy_save(dao: Dao, values: Dict[str, Any]) -> Any:
+    """Save the row as the previous versions did: create it and read it back, or update it and
+    refresh it if the creation failed by the duplicate id."""
+    try:
+        with dao.new_session() as s:
+            s.add(dao._model(**values))
+        return dao.get_by_id(values["id"])
+    except IntegrityError:
+        dao.session.rollback()
+        update_values = {key: value for key, value in values.items() if key != "id"}
+        result = dao.update(id=values["id"], **update_values)
+        dao.session.refresh(result)
+        return result
+
+
+def measure(writes: List[Callable[[], Any]]) -> Tuple[float, float]:
+    """Get the throughput (writes per second) of the writes, and the statements per write."""
+    start_count = statement_count
+    start_time = time.perf_counter()
+    for write in writes:
+        write()
+    throughput = len(writes) / (time.perf_counter() - start_time)
+    return throughput, (statement_count - start_count) / len(writes)
+
+
+def main():
+    """Compare the throughput of the hot save paths (the messages, the subjobs and the artifacts),
+    by creating or updating the rows after the failed creations (legacy), and by the upserts."""
+    message_dao: MessageDao = MessageDao.instance
+    job_dao: JobDao = JobDao.instance
+    artifact_dao: ArtifactDao = ArtifactDao.instance
+    session_id = str(uuid4())
+    original_job_id = str(uuid4())
+
+    def message_values() -> Dict[str, Any]:
+        message_do = message_dao.parse_into_message_do(
+            AgentMessage(job_id=original_job_id, payload="Thinking " * 20)
+        )
+        return {c.name: getattr(message_do, c.name) for c in message_do.__table__.columns}
+
+    def subjob() -> SubJob:
+        return SubJob(
+            goal="Subjob",
+            session_id=session_id,
+            original_job_id=original_job_id,
+            expert_id="benchmark_expert",
+        )
+
+    def artifact() -> Artifact:
+        return Artifact(
+            id=str(uuid4()),
+            content_type=ContentType.TEXT,
+            content="content " * 20,
+            source_reference=SourceReference(job_id=original_job_id, session_id=session_id),
+        )
+
+    print(
+        f"{'row':>9} {'write':>7} {'legacy(w/s)':>12} {'stmts':>6} {'upsert(w/s)':>12} {'stmts':>6}"
+    )
+    for name, new_row, legacy_write, upsert_write in [
+        (
+            "message",
+            message_values,
+            lambda values: legacy_save(message_dao, values),
+            lambda values: message_dao.upsert(**values),
+        ),
+        (
+            "subjob",
+            subjob,
+            # the legacy subjob was read before it was created or updated
+            lambda job: (job_dao.get_by_id(job.id), legacy_save(job_dao, job_dao_values(job))),
+            lambda job: job_dao.save_job(job),
+        ),
+        (
+            "artifact",
+            artifact,
+            lambda artifact: legacy_save(artifact_dao, artifact_do_values(artifact_dao, artifact)),
+            lambda artifact: artifact_dao.save_artifact(artifact),
+        ),
+    ]:
+        legacy_rows = [new_row() for _ in range(WRITE_COUNT)]
+        upsert_rows = [new_row() for _ in range(WRITE_COUNT)]
+        for write in ["insert", "update"]:
+            legacy_throughput, legacy_statements = measure(
+                [partial(legacy_write, row) for row in legacy_rows]
+            )
+            upsert_throughput, upsert_statements = measure(
+                [partial(upsert_write, row) for row in upsert_rows]
+            )
+            print(
+                f"{name:>9} {write:>7} {legacy_throughput:>12.0f} {legacy_statements:>6.1f}"
+                f" {upsert_throughput:>12.0f} {upsert_statements:>6.1f}"
+            )
+
+
+def job_dao_values(job: SubJob) -> Dict[str, Any]:
+    """Get the columns of the subjob."""
+    return {"id": job.id, "category": "SUB_JOB", **JobDao.instance._subjob_columns(job)}
+
+
+def artifact_do_values(artifact_dao: ArtifactDao, artifact: Artifact) -> Dict[str, Any]:
+    """Get the columns of the artifact."""
+    artifact_do = artifact_dao.parse_into_artifact_do(artifact)
+    return {c.name: getattr(artifact_do, c.name) for c in artifact_do.__table__.columns}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.core.common.job_scheduler import JobScheduler
+
+# expert name -> (the duration in seconds of a subjob, whether it holds a graph db connection)
+EXPERTS: Dict[str, Tuple[float, bool]] = {
+    "Extraction Expert": (0.2, True),
+    "Analysis Expert": (0.3, True),
+    "Q&A Expert": (0.02, False),
+}
+
+
+class GraphDbConnections:
+    """The simulated connections to the graph database, opened by the heavy subjobs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open_count = 0
+        self.max_open_count = 0
+
+    def open(self) -> None:
+        """Open a connection."""
+        with self._lock:
+            self.open_count += 1
+            self.max_open_count = max(self.max_open_count, self.open_count)
+
+    def close(self) -> None:
+        """Close a connection."""
+        with self._lock:
+            self.open_count -= 1
+
+
+def p99(latencies: List[float]) -> float:
+    """Get the 99th percentile of the latencies."""
+    latencies = sorted(latencies)
+    return latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]
+
+
+def run(
+    max_concurrency: Optional[int], worker_count: int, subjob_count: int, seed: int
+) -> Tuple[int, Dict[str, float]]:
+    """Submit a burst of mixed subjobs to the scheduler, and return the max number of the open
+    graph db connections and the p99 latency (from submission to completion) of each expert."""
+    rng = random.Random(seed)
+    scheduler = JobScheduler(max_workers=worker_count, name="benchmark_scheduler")
+    for expert_name, (_, uses_graph_db) in EXPERTS.items():
+        if uses_graph_db and max_concurrency is not None:
+            scheduler.set_concurrency_limit(expert_name, max_concurrency)
+
+    connections = GraphDbConnections()
+    latencies: Dict[str, List[float]] = {expert_name: [] for expert_name in EXPERTS}
+    lock = threading.Lock()
+
+    def execute(expert_name: str, submitted_at: float) -> None:
+        duration, uses_graph_db = EXPERTS[expert_name]
+        if uses_graph_db:
+            connections.open()
+        try:
+            time.sleep(duration)
+        finally:
+            if uses_graph_db:
+                connections.close()
+        with lock:
+            latencies[expert_name].append(time.time() - submitted_at)
+
+    # a burst of heavy subjobs (e.g. a bulk import), mixed with a steady stream of Q&A subjobs
+    futures = []
+    for i in range(subjob_count):
+        expert_name = rng.choices(list(EXPERTS), weights=[3, 2, 5])[0]
+        futures.append(
+            scheduler.submit(
+                execute,
+                expert_name,
+                time.time(),
+                session_id=f"session_{i % 8}",
+                concurrency_key=expert_name,
+            )
+        )
+        time.sleep(0.002)
+    for future in futures:
+        future.result()
+
+    return connections.max_open_count, {
+        expert_name: p99(expert_latencies)
+        for expert_name, expert_latencies in latencies.items()
+        if expert_latencies
+    }
+
+
+def main():
+    """Compare the graph db connections and the p99 subjob latencies with and without the
+    per-expert concurrency limits under mixed traffic."""
+    worker_count = 16
+    subjob_count = 200
+
+    print(f"{'limit':>9} {'max conns':>9} " + " ".join(f"{name:>18}" for name in EXPERTS))
+    for max_concurrency in [None, 4, 2]:
+        max_open_count, p99_latencies = run(
+            max_concurrency, worker_count=worker_count, subjob_count=subjob_count, seed=2025
+        )
+        print(
+            f"{str(max_concurrency or 'none'):>9} {max_open_count:>9} "
+            + " ".join(f"{p99_latencies.get(name, 0.0):>17.3f}s" for name in EXPERTS)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import time
+from typing import Any, List, Optional, Tuple
+from uuid import uuid4
+
+from app.core.agent.agent import AgentConfig, Profile
+from app.core.agent.leader import Leader
+from app.core.model.job import Job, SubJob
+from app.core.model.job_graph import JobGraph
+from app.core.model.message import WorkflowMessage
+from app.core.reasoner.reasoner import Reasoner
+from app.core.service.job_service import JobService
+from app.core.service.reasoner_service import ReasonerService
+from app.core.workflow.workflow import Workflow
+from test.resource.init_server import init_server
+
+init_server()
+
+STEP_SECONDS = 0.05
+
+
+class SleepWorkflow(Workflow):
+    """Workflow that simulates an expert by sleeping for a fixed time."""
+
+    def __init__(self, seconds: float):
+        super().__init__()
+        self._seconds = seconds
+
+    def _build_workflow(self, reasoner: Reasoner) -> Any:
+        return None
+
+    def _execute_workflow(
+        self,
+        workflow: Any,
+        job: Job,
+        workflow_messages: Optional[List[WorkflowMessage]] = None,
+        lesson: Optional[str] = None,
+    ) -> WorkflowMessage:
+        time.sleep(self._seconds)
+        return WorkflowMessage(payload={"scratchpad": job.goal}, job_id=job.id)
+
+
+def build_leader() -> Leader:
+    """Build a leader with a single sleeping expert."""
+    reasoner = ReasonerService.instance.get_reasoner()
+    leader = Leader(
+        agent_config=AgentConfig(
+            profile=Profile(name="Benchmark Leader"),
+            reasoner=reasoner,
+            workflow=SleepWorkflow(STEP_SECONDS),
+        )
+    )
+    leader.state.create_expert(
+        agent_config=AgentConfig(
+            profile=Profile(name="Sleep Expert", description="Sleeps for a while."),
+            reasoner=reasoner,
+            workflow=SleepWorkflow(STEP_SECONDS),
+        )
+    )
+    return leader
+
+
+def build_job_graph(leader: Leader, edges: List[Tuple[int, int]], vertex_count: int) -> str:
+    """Persist a synthetic job graph, and return the original job id."""
+    job_service: JobService = JobService.instance
+    expert_id = leader.state.get_expert_by_name("Sleep Expert").get_id()
+
+    original_job = Job(id="benchmark_job_" + str(uuid4()), goal="Benchmark job graph")
+    job_service.save_job(job=original_job)
+
+    job_graph = JobGraph()
+    subjob_ids: List[str] = []
+    for i in range(vertex_count):
+        subjob = SubJob(
+            id=f"benchmark_subjob_{i}_{uuid4()}",
+            session_id=original_job.session_id,
+            goal=f"Subjob {i}",
+            original_job_id=original_job.id,
+            expert_id=expert_id,
+        )
+        job_service.save_job(job=subjob)
+        job_graph.add_vertex(subjob.id)
+        subjob_ids.append(subjob.id)
+    for u, v in edges:
+        job_graph.add_edge(subjob_ids[u], subjob_ids[v])
+    job_service.replace_subgraph(original_job_id=original_job.id, new_subgraph=job_graph)
+    return original_job.id
+
+
+def run_case(
+    leader: Leader, name: str, edges: List[Tuple[int, int]], vertex_count: int, depth: int
+) -> None:
+    """Run one synthetic job graph and print its end-to-end latency."""
+    original_job_id = build_job_graph(leader, edges, vertex_count)
+
+    start_time = time.time()
+    leader.execute_job_graph(original_job_id=original_job_id)
+    latency = time.time() - start_time
+
+    ideal_latency = depth * STEP_SECONDS
+    overhead_per_level = (latency - ideal_latency) / depth
+    print(
+        f"{name:<16} vertices={vertex_count:<4} depth={depth:<4} "
+        f"latency={latency:.3f}s ideal={ideal_latency:.3f}s "
+        f"overhead/level={overhead_per_level * 1000:.1f}ms"
+    )
+
+
+def main():
+    """Measure the end-to-end latency of the job graph scheduler on deep and wide job graphs.
+
+    The legacy polling scheduler slept 0.5s whenever no subjob had finished, which added up to
+    half a second to every level of the job graph. The overhead per level printed below should
+    stay in the order of milliseconds (the cost of the DB round-trips of the subjob).
+    """
+    leader = build_leader()
+
+    for depth in [5, 20, 50]:
+        # deep: a chain of subjobs
+        edges = [(i, i + 1) for i in range(depth - 1)]
+        run_case(leader, "deep-chain", edges, vertex_count=depth, depth=depth)
+
+    for width in [5, 20, 50]:
+        # wide: one head subjob, `width` parallel subjobs, and one tail subjob
+        edges = [(0, i) for i in range(1, width + 1)]
+        edges += [(i, width + 1) for i in range(1, width + 1)]
+        run_case(leader, "wide-fan", edges, vertex_count=width + 2, depth=3)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+from functools import partial
+import time
+from typing import Any, Callable, List, Tuple
+
+from sqlalchemy import event
+
+from app.core.common.type import ChatMessageRole, FileStorageType
+from app.core.dal.dao.file_descriptor_dao import FileDescriptorDao
+from app.core.dal.dao.message_dao import MessageDao
+from app.core.dal.database import engine, writer_engine
+from app.core.dal.do.message_do import MessageDo
+from app.core.model.message import (
+    AgentMessage,
+    FileMessage,
+    HybridMessage,
+    Message,
+    MessageType,
+    TextMessage,
+    WorkflowMessage,
+)
+from app.core.service.message_service import MessageService
+from test.resource.init_server import init_server
+
+init_server()
+
+ATTACHMENT_COUNTS = [1, 10, 100]
+LOAD_COUNT = 20
+
+# the number of the executed statements (the round trips)
+statement_count = 0
+
+
+def count_statement(*_: Any) -> None:
+    """Count the executed statement."""
+    global statement_count
+    statement_count += 1
+
+
+# the statements are executed by the reader and the writer connections of the tuned SQLite
+for bound_engine in {engine, writer_engine}:
+    event.listen(bound_engine, "before_cursor_execute", count_statement)
+
+
+def legacy_load(id: str) -> Message:
+    """Load the message as the previous versions did: walk the related messages one by one (the
+    workflow messages of the agent messages), and load the descriptor of each attached file
+    message by a query of its own."""
+    message_dao: MessageDao = MessageDao.instance
+    file_descriptor_dao: FileDescriptorDao = FileDescriptorDao.instance
+    message_do: MessageDo = message_dao.get_by_id(id=id)
+    message_type = MessageType(str(message_do.type))
+
+    if message_type == MessageType.AGENT_MESSAGE:
+        return AgentMessage(
+            id=str(message_do.id),
+            job_id=str(message_do.job_id),
+            payload=str(message_do.payload),
+            workflow_messages=[
+                legacy_load(str(wf_id)) for wf_id in list(message_do.related_message_ids)
+            ],
+        )
+    if message_type == MessageType.HYBRID_MESSAGE:
+        instruction_message = message_dao.parse_into_message(
+            message_do=message_dao.get_text_message_by_job_id_and_role(
+                job_id=str(message_do.job_id), role=ChatMessageRole(str(message_do.role))
+            )[0]
+        )
+        attached_dos = (
+            message_dao.session.query(MessageDo)
+            .filter(MessageDo.id.in_(list(message_do.related_message_ids)))
+            .all()
+        )
+        return HybridMessage(
+            instruction_message=instruction_message,
+            job_id=str(message_do.job_id),
+            attached_messages=[
+                FileMessage(
+                    id=str(attached_do.id),
+                    file_id=str(list(attached_do.related_message_ids)[0]),
+                    session_id=str(attached_do.session_id),
+                    descriptor=file_descriptor_dao.parse_into_file_descriptor(
+                        file_descriptor_dao.get_by_id(str(list(attached_do.related_message_ids)[0]))
+                    ),
+                )
+                for attached_do in attached_dos
+            ],
+        )
+    return message_dao.parse_into_message(message_do=message_do)
+
+
+def measure(load: Callable[[], Any]) -> Tuple[float, float]:
+    """Get the statements per load and the average latency (milliseconds) of the loads."""
+    start_count = statement_count
+    start_time = time.perf_counter()
+    for _ in range(LOAD_COUNT):
+        load()
+    latency = (time.perf_counter() - start_time) / LOAD_COUNT * 1000
+    return (statement_count - start_count) / LOAD_COUNT, latency
+
+
+def save_agent_message(attachment_count: int) -> str:
+    """Save an agent message, with the workflow messages of the rounds."""
+    message_service: MessageService = MessageService.instance
+    workflow_messages: List[WorkflowMessage] = [
+        WorkflowMessage(payload={"scratchpad": f"Round {i}. " * 20}, job_id="benchmark_job")
+        for i in range(attachment_count)
+    ]
+    for workflow_message in workflow_messages:
+        message_service.save_message(message=workflow_message)
+    agent_message = AgentMessage(
+        job_id="benchmark_job", payload="Output", workflow_messages=workflow_messages
+    )
+    message_service.save_message(message=agent_message)
+    return agent_message.get_id()
+
+
+def save_hybrid_message(attachment_count: int) -> str:
+    """Save a hybrid message, with the attached file messages."""
+    message_service: MessageService = MessageService.instance
+    file_descriptor_dao: FileDescriptorDao = FileDescriptorDao.instance
+    job_id = f"benchmark_hybrid_job_{attachment_count}"
+    file_messages: List[FileMessage] = []
+    for i in range(attachment_count):
+        file_descriptor_do = file_descriptor_dao.create(
+            name=f"file_{i}.txt",
+            path=f"/tmp/file_{i}.txt",
+            type=FileStorageType.LOCAL.value,
+            size=1024,
+        )
+        file_message = FileMessage(
+            file_id=str(file_descriptor_do.id), session_id="benchmark_session"
+        )
+        message_service.save_message(message=file_message)
+        file_messages.append(file_message)
+    instruction_message = TextMessage(
+        payload="Question",
+        job_id=job_id,
+        session_id="benchmark_session",
+        role=ChatMessageRole.USER,
+    )
+    message_service.save_message(message=instruction_message)
+    hybrid_message = HybridMessage(
+        instruction_message=instruction_message,
+        attached_messages=file_messages,
+        job_id=job_id,
+        session_id="benchmark_session",
+        role=ChatMessageRole.USER,
+    )
+    message_service.save_message(message=hybrid_message)
+    return hybrid_message.get_id()
+
+
+def main():
+    """Compare the statements and the latency of loading an agent message with its workflow
+    messages, and a hybrid message with its attached file messages, by the recursive walk of the
+    related rows (before) and by the level-by-level IN queries (after)."""
+    message_dao: MessageDao = MessageDao.instance
+
+    print(
+        f"{'message':>8} {'attachments':>12} {'before(stmts)':>14} {'after(stmts)':>13}"
+        f" {'before(ms)':>11} {'after(ms)':>10}"
+    )
+    for name, save in [("agent", save_agent_message), ("hybrid", save_hybrid_message)]:
+        for attachment_count in ATTACHMENT_COUNTS:
+            id = save(attachment_count)
+            before_statements, before_latency = measure(partial(legacy_load, id))
+            after_statements, after_latency = measure(partial(message_dao.get_message, id))
+            print(
+                f"{name:>8} {attachment_count:>12} {before_statements:>14.1f}"
+                f" {after_statements:>13.1f} {before_latency:>11.2f} {after_latency:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
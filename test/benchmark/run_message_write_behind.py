@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+from typing import List, Tuple
+
+from sqlalchemy import event
+
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import JobStatus
+from app.core.dal.database import writer_engine
+from app.core.model.job import Job, SubJob
+from app.core.model.job_result import JobResult
+from app.core.model.message import AgentMessage, WorkflowMessage
+from app.core.service.job_service import JobService
+from app.core.service.message_service import MessageService
+from test.resource.init_server import init_server
+
+init_server()
+
+SUBJOB_COUNT = 256
+ROUND_COUNT = 20
+LLM_LATENCY = 0.002  # seconds, the latency of the fake LLM per round
+
+# the number of the committed transactions
+commit_count = 0
+
+
+@event.listens_for(writer_engine, "commit")
+def count_commit(*_) -> None:
+    """Count the committed transaction."""
+    global commit_count
+    commit_count += 1
+
+
+def execute_subjob(subjob: SubJob) -> None:
+    """Execute the subjob by the fake LLM, which saves a message each round."""
+    job_service: JobService = JobService.instance
+    message_service: MessageService = MessageService.instance
+
+    job_service.save_job_result(JobResult(job_id=subjob.id, status=JobStatus.RUNNING))
+    for round in range(ROUND_COUNT):
+        time.sleep(LLM_LATENCY)
+        message_service.save_message(
+            message=WorkflowMessage(
+                payload={"scratchpad": f"Thought of round {round}. " * 10}, job_id=subjob.id
+            )
+        )
+    message_service.save_message(message=AgentMessage(job_id=subjob.id, payload="Output"))
+    job_service.save_job_result(JobResult(job_id=subjob.id, status=JobStatus.FINISHED))
+
+
+def measure(workers: int) -> Tuple[float, float, int]:
+    """Execute the subjobs in parallel, and get the commits per subjob, the subjobs per second and
+    the number of the failed subjobs (e.g. by the database is locked)."""
+    job_service: JobService = JobService.instance
+    original_job = Job(goal="Question")
+    job_service.save_job(original_job)
+    subjobs: List[SubJob] = [
+        SubJob(goal=f"Subjob {i}", original_job_id=original_job.id, expert_id="benchmark_expert")
+        for i in range(SUBJOB_COUNT)
+    ]
+    for subjob in subjobs:
+        job_service.save_job(subjob)
+
+    start_count = commit_count
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(execute_subjob, subjob) for subjob in subjobs]
+    throughput = SUBJOB_COUNT / (time.perf_counter() - start_time)
+    failed_count = len([future for future in futures if future.exception()])
+    return (commit_count - start_count) / SUBJOB_COUNT, throughput, failed_count
+
+
+def main():
+    """Compare the commits per subjob and the throughput of the parallel subjobs, which save a
+    message each reasoning round, with the messages committed one by one (before) and written
+    behind in batches (after)."""
+    print(
+        f"{'workers':>8} {'write-behind':>13} {'commits/subjob':>15} {'subjobs/s':>10}"
+        f" {'failed':>7}"
+    )
+    for workers in [1, 4, 16]:
+        for write_behind in [False, True]:
+            SystemEnv.MESSAGE_WRITE_BEHIND_ENABLED = write_behind
+            commits, throughput, failed_count = measure(workers)
+            print(
+                f"{workers:>8} {str(write_behind):>13} {commits:>15.1f} {throughput:>10.1f}"
+                f" {failed_count:>7}"
+            )
+    SystemEnv.MESSAGE_WRITE_BEHIND_ENABLED = False
+
+
+if __name__ == "__main__":
+    main()
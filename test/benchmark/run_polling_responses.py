@@ -0,0 +1,109 @@
+import time
+from typing import Dict, Optional, Tuple
+
+from flask import Flask
+
+from app.core.common.type import ChatMessageRole, JobStatus
+from app.core.model.job import Job
+from app.core.model.job_result import JobResult
+from app.core.model.message import GraphMessage, HybridMessage, TextMessage
+from app.core.service.job_service import JobService
+from app.core.service.message_service import MessageService
+from app.core.service.session_service import SessionService
+from app.server.api import register_blueprints
+from app.server.common.util import compress_response
+from test.resource.init_server import init_server
+
+init_server()
+
+JOB_COUNT = 10
+VERTEX_COUNT = 300
+POLL_COUNT = 50
+
+
+def save_finished_job(session_id: str, index: int) -> Job:
+    """Persist a finished original job, whose answer is attached with a graph."""
+    job_service: JobService = JobService.instance
+    message_service: MessageService = MessageService.instance
+
+    job = Job(goal=f"Question {index}", session_id=session_id)
+    job_service.save_job(job=job)
+    graph_message = GraphMessage(
+        payload={
+            "vertices": [
+                {"id": str(i), "label": "Person", "properties": {"name": f"person {i}"}}
+                for i in range(VERTEX_COUNT)
+            ],
+            "edges": [
+                {"source": str(i), "target": str((i * 7 + 1) % VERTEX_COUNT), "label": "knows"}
+                for i in range(VERTEX_COUNT * 2)
+            ],
+        },
+        job_id=job.id,
+        session_id=session_id,
+    )
+    message_service.save_message(message=graph_message)
+    for role, payload in [
+        (ChatMessageRole.USER, f"Question {index}: who knows whom?"),
+        (ChatMessageRole.SYSTEM, f"Answer {index}: the graph is imported."),
+    ]:
+        text_message = TextMessage(payload=payload, job_id=job.id, session_id=session_id, role=role)
+        message_service.save_message(message=text_message)
+        message_service.save_message(
+            message=HybridMessage(
+                instruction_message=text_message,
+                attached_messages=[graph_message] if role == ChatMessageRole.SYSTEM else [],
+                job_id=job.id,
+                session_id=session_id,
+                role=role,
+            )
+        )
+    job_service.save_job_result(JobResult(job_id=job.id, status=JobStatus.FINISHED))
+    return job
+
+
+def poll(
+    client, url: str, headers: Dict[str, str], etag: Optional[str] = None
+) -> Tuple[int, float, Optional[str]]:
+    """Poll the url, and return the bytes sent, the server CPU time (ms) per poll and the ETag."""
+    if etag:
+        headers = {**headers, "If-None-Match": etag}
+    start_time = time.process_time()
+    for _ in range(POLL_COUNT):
+        response = client.get(url, headers=headers)
+    cpu_ms = (time.process_time() - start_time) * 1000 / POLL_COUNT
+    return len(response.get_data()), cpu_ms, response.headers.get("ETag")
+
+
+def main():
+    """Compare the bytes sent and the server CPU time per poll of the polled views: the full
+    uncompressed payload (before), the compressed payload of a changed view, and the 304 Not
+    Modified of an unchanged view (after)."""
+    app = Flask(__name__)
+    register_blueprints(app)
+    app.after_request(compress_response)
+    client = app.test_client()
+
+    session_id = SessionService.instance.create_session(name="benchmark").id
+    jobs = [save_finished_job(session_id, i) for i in range(JOB_COUNT)]
+
+    print(f"{'endpoint':>20} {'mode':>16} {'bytes':>10} {'cpu/poll(ms)':>13}")
+    for name, url in [
+        ("session messages", f"/api/sessions/{session_id}/messages"),
+        ("job message", f"/api/jobs/{jobs[-1].id}/message"),
+    ]:
+        identity_bytes, identity_ms, etag = poll(client, url, {"Accept-Encoding": "identity"})
+        gzip_bytes, gzip_ms, _ = poll(client, url, {"Accept-Encoding": "gzip"})
+        not_modified_bytes, not_modified_ms, _ = poll(
+            client, url, {"Accept-Encoding": "gzip"}, etag=etag
+        )
+        for mode, sent_bytes, cpu_ms in [
+            ("before", identity_bytes, identity_ms),
+            ("gzip (changed)", gzip_bytes, gzip_ms),
+            ("304 (unchanged)", not_modified_bytes, not_modified_ms),
+        ]:
+            print(f"{name:>20} {mode:>16} {sent_bytes:>10} {cpu_ms:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
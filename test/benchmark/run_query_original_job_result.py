@@ -0,0 +1,149 @@
+import time
+from typing import Any, List, Tuple, cast
+
+from sqlalchemy import event
+
+from app.core.common.type import JobStatus
+from app.core.dal.database import engine
+from app.core.model.job import Job, SubJob
+from app.core.model.job_graph import JobGraph
+from app.core.model.message import AgentMessage, GraphMessage, MessageType, WorkflowMessage
+from app.core.service.job_service import JobService
+from app.core.service.message_service import MessageService
+from test.resource.init_server import init_server
+
+init_server()
+
+
+class QueryCounter:
+    """Count the SELECT statements sent to the database."""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.count += 1
+
+
+def build_finished_job_graph(subjob_count: int) -> str:
+    """Persist a finished job graph (a chain of subjobs with one artifact each), and return the
+    original job id."""
+    job_service: JobService = JobService.instance
+    message_service: MessageService = MessageService.instance
+
+    original_job = Job(goal="Benchmark query original job result")
+    job_service.save_job(job=original_job)
+
+    job_graph = JobGraph()
+    previous_subjob_id = None
+    for i in range(subjob_count):
+        subjob = SubJob(
+            goal=f"Subjob {i}", original_job_id=original_job.id, expert_id="benchmark_expert"
+        )
+        job_service.save_job(job=subjob)
+        job_graph.add_vertex(subjob.id)
+        if previous_subjob_id:
+            job_graph.add_edge(previous_subjob_id, subjob.id)
+        previous_subjob_id = subjob.id
+
+        workflow_message = WorkflowMessage(payload={"scratchpad": f"{i}"}, job_id=subjob.id)
+        message_service.save_message(message=workflow_message)
+        graph_message = GraphMessage(
+            payload={"vertices": [], "edges": []},
+            job_id=subjob.id,
+            session_id=original_job.session_id,
+        )
+        message_service.save_message(message=graph_message)
+        message_service.save_message(
+            message=AgentMessage(
+                job_id=subjob.id,
+                payload=f"<final_output>Result {i}</final_output>",
+                workflow_messages=[workflow_message],
+                artifact_ids=[graph_message.get_id()],
+            )
+        )
+
+        subjob_result = job_service.get_job_result(job_id=subjob.id)
+        subjob_result.status = JobStatus.FINISHED
+        job_service.save_job_result(job_result=subjob_result)
+
+    job_service.replace_subgraph(original_job_id=original_job.id, new_subgraph=job_graph)
+    return original_job.id
+
+
+def collect_per_vertex(original_job_id: str) -> Tuple[str, List[GraphMessage]]:
+    """The legacy access pattern: the job result, the agent message (with its workflow messages)
+    and each graph message are queried one by one for every vertex."""
+    job_service: JobService = JobService.instance
+    message_service: MessageService = MessageService.instance
+
+    payload = ""
+    graph_messages: List[GraphMessage] = []
+    for vertex in job_service.get_job_graph(original_job_id).vertices():
+        job_service.get_job_result(vertex)
+        agent_message = cast(
+            AgentMessage,
+            message_service.get_message_by_job_id(
+                job_id=vertex, message_type=MessageType.AGENT_MESSAGE
+            )[0],
+        )
+        payload += str(agent_message.get_payload()) + "\n"
+        graph_messages.extend(
+            cast(GraphMessage, message_service.get_message(id=id))
+            for id in agent_message.get_artifact_ids()
+        )
+    return payload, graph_messages
+
+
+def mark_original_job_running(original_job_id: str) -> None:
+    """Mark the original job as running, so that `query_original_job_result` assembles the result
+    again, as if it was polled before the original job is marked as finished."""
+    job_service: JobService = JobService.instance
+    original_job_result = job_service.get_job_result(job_id=original_job_id)
+    original_job_result.status = JobStatus.RUNNING
+    job_service.save_job_result(job_result=original_job_result)
+
+
+def main():
+    """Compare the SELECT count of assembling the original job result per vertex and batched.
+
+    The per-vertex pattern issues O(V) queries, while the batched `query_original_job_result`
+    issues a constant number of queries (subjob results, agent messages, graph messages, and the
+    lookups of the answer messages to save), regardless of the size of the job graph.
+    """
+    job_service: JobService = JobService.instance
+    counter = QueryCounter()
+
+    print(
+        f"{'subjobs':>8} {'per-vertex':>12} {'batched':>8} {'per-vertex(s)':>14} {'batched(s)':>11}"
+    )
+    for subjob_count in [10, 100, 1000]:
+        original_job_id = build_finished_job_graph(subjob_count)
+
+        counter.count = 0
+        start_time = time.time()
+        collect_per_vertex(original_job_id)
+        per_vertex_time = time.time() - start_time
+        per_vertex_count = counter.count
+
+        # warm up: create the answer messages
+        mark_original_job_running(original_job_id)
+        job_service.query_original_job_result(original_job_id=original_job_id)
+
+        mark_original_job_running(original_job_id)
+        counter.count = 0
+        start_time = time.time()
+        job_service.query_original_job_result(original_job_id=original_job_id)
+        batched_time = time.time() - start_time
+        batched_count = counter.count
+
+        print(
+            f"{subjob_count:>8} {per_vertex_count:>12} {batched_count:>8} "
+            f"{per_vertex_time:>14.3f} {batched_time:>11.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
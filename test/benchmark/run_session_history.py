@@ -0,0 +1,105 @@
+import time
+
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import ChatMessageRole, JobStatus
+from app.core.dal.dao.seesion_dao import SessionDao
+from app.core.model.job import Job, SubJob
+from app.core.model.job_result import JobResult
+from app.core.model.message import AgentMessage, HybridMessage, TextMessage
+from app.core.service.job_service import JobService
+from app.core.service.message_service import MessageService
+from app.core.service.session_history_service import SessionHistoryService
+from app.core.service.session_service import SessionService
+from test.resource.init_server import init_server
+
+init_server()
+
+
+def save_finished_job(session_id: str, index: int, subjob_count: int = 3) -> Job:
+    """Persist a finished original job with the question, the thinking chain and the answer."""
+    job_service: JobService = JobService.instance
+    message_service: MessageService = MessageService.instance
+
+    original_job = Job(goal=f"Question {index}", session_id=session_id)
+    job_service.save_job(job=original_job)
+    for role, payload in [
+        (ChatMessageRole.USER, f"Question {index}: how many vertices are in the graph?"),
+        (ChatMessageRole.SYSTEM, f"Answer {index}: " + "the graph has many vertices. " * 20),
+    ]:
+        text_message = TextMessage(
+            payload=payload, job_id=original_job.id, session_id=session_id, role=role
+        )
+        message_service.save_message(message=text_message)
+        message_service.save_message(
+            message=HybridMessage(
+                instruction_message=text_message,
+                job_id=original_job.id,
+                session_id=session_id,
+                role=role,
+            )
+        )
+
+    for i in range(subjob_count):
+        subjob = SubJob(
+            goal=f"Subjob {i}",
+            session_id=session_id,
+            original_job_id=original_job.id,
+            expert_id="benchmark_expert",
+        )
+        job_service.save_job(job=subjob)
+        message_service.save_message(
+            message=AgentMessage(
+                job_id=subjob.id, payload="The expert reasons about the graph. " * 20, timestamp=i
+            )
+        )
+        job_service.save_job_result(JobResult(job_id=subjob.id, status=JobStatus.FINISHED))
+    job_service.save_job_result(JobResult(job_id=original_job.id, status=JobStatus.FINISHED))
+    return original_job
+
+
+def main():
+    """Compare the latency and the tokens of the context of a new job, by rebuilding the history
+    from all the past jobs (the legacy pattern, emulated by an unlimited token budget and an
+    empty history artifact) and by the rolling history appended once per finished job."""
+    session_dao: SessionDao = SessionDao.instance
+    session_history_service: SessionHistoryService = SessionHistoryService.instance
+    token_budget = SystemEnv.SESSION_HISTORY_TOKEN_BUDGET
+    summary_token_budget = SystemEnv.SESSION_HISTORY_SUMMARY_TOKEN_BUDGET
+
+    print(
+        f"{'jobs':>6} {'rebuild(s)':>11} {'rebuild tokens':>15} "
+        f"{'rolling(s)':>11} {'rolling tokens':>15}"
+    )
+    for job_count in [10, 50, 200]:
+        session_id = SessionService.instance.create_session(name="benchmark").id
+        for i in range(job_count):
+            save_finished_job(session_id, i)
+
+        # the legacy pattern: all the past jobs are loaded and formatted on every submission
+        SystemEnv.SESSION_HISTORY_TOKEN_BUDGET = 10**9
+        SystemEnv.SESSION_HISTORY_SUMMARY_TOKEN_BUDGET = 10**9
+        start_time = time.time()
+        context = session_history_service.get_history_context(session_id=session_id)
+        rebuild_time = time.time() - start_time
+        rebuild_tokens = session_history_service.estimate_tokens(context)
+
+        # the rolling history: only the latest finished job is appended on the submission
+        SystemEnv.SESSION_HISTORY_TOKEN_BUDGET = token_budget
+        SystemEnv.SESSION_HISTORY_SUMMARY_TOKEN_BUDGET = summary_token_budget
+        session_dao.update(id=session_id, history=None)
+        session_history_service.get_history_context(session_id=session_id)
+        job = save_finished_job(session_id, job_count)
+        session_history_service.add_pending_job(session_id=session_id, original_job_id=job.id)
+        start_time = time.time()
+        context = session_history_service.get_history_context(session_id=session_id)
+        rolling_time = time.time() - start_time
+        rolling_tokens = session_history_service.estimate_tokens(context)
+
+        print(
+            f"{job_count:>6} {rebuild_time:>11.3f} {rebuild_tokens:>15} "
+            f"{rolling_time:>11.3f} {rolling_tokens:>15}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import time
+from typing import Callable
+from uuid import uuid4
+
+from sqlalchemy import insert
+
+from app.core.dal.dao.seesion_dao import SessionDao
+from app.core.dal.do.session_do import SessionDo
+from app.core.service.session_service import SessionService
+from test.resource.init_server import init_server
+
+init_server()
+
+SESSION_COUNTS = [1_000, 10_000, 100_000]
+PAGE_SIZE = 10
+
+
+def insert_sessions(count: int) -> None:
+    """Insert the synthetic sessions in bulk, a few created in each second."""
+    session_dao: SessionDao = SessionDao.instance
+    with session_dao.new_session() as s:
+        s.execute(
+            insert(SessionDo),
+            [
+                {"id": str(uuid4()), "name": f"Session {i}", "timestamp": 1_700_000_000 + i // 3}
+                for i in range(count)
+            ],
+        )
+    session_dao.session.expire_all()
+
+
+def measure(func: Callable[[], object], repeat: int = 3) -> float:
+    """Get the min latency (in ms) of the function."""
+    latencies = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - start_time) * 1000)
+    return min(latencies)
+
+
+def legacy_page(page: int) -> list:
+    """Get the page as the previous versions did: load all the sessions and slice them."""
+    sessions = SessionService.instance.get_all_sessions()
+    sessions = sorted(sessions, key=lambda session: session.timestamp or 0, reverse=True)
+    return sessions[(page - 1) * PAGE_SIZE : page * PAGE_SIZE]
+
+
+def main():
+    """Compare the latency of a page of the sessions at the first, the middle and the last
+    position, by loading all the sessions (legacy), by the SQL offset and by the keyset cursor."""
+    session_service: SessionService = SessionService.instance
+
+    print(
+        f"{'sessions':>9} {'page':>7} {'legacy(ms)':>11} {'offset(ms)':>11} {'keyset(ms)':>11}"
+        f" {'total(ms)':>10}"
+    )
+    inserted_count = SessionDao.instance.count()
+    for session_count in SESSION_COUNTS:
+        insert_sessions(session_count - inserted_count)
+        inserted_count = session_count
+        page_count = session_count // PAGE_SIZE
+
+        for page in [1, page_count // 2, page_count]:
+            offset = (page - 1) * PAGE_SIZE
+            # the cursor of the previous page, which the client got along with it
+            cursor = (
+                session_service.get_sessions_page(
+                    size=PAGE_SIZE, offset=offset - PAGE_SIZE
+                ).next_cursor
+                if page > 1
+                else None
+            )
+            legacy_ms = measure(lambda page=page: legacy_page(page), repeat=1)
+            offset_ms = measure(
+                lambda offset=offset: session_service.get_sessions_page(
+                    size=PAGE_SIZE, offset=offset
+                )
+            )
+            keyset_ms = measure(
+                lambda cursor=cursor: session_service.get_sessions_page(
+                    size=PAGE_SIZE, cursor=cursor
+                )
+            )
+            # the total count is cached, so it is only counted by the first call
+            total_ms = measure(lambda: SessionDao.instance.get_total_count())
+            print(
+                f"{session_count:>9} {page:>7} {legacy_ms:>11.2f} {offset_ms:>11.2f}"
+                f" {keyset_ms:>11.2f} {total_ms:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import List
+
+WORKER_COUNTS = [1, 8, 32]
+SUBJOBS_PER_WORKER = 16
+MESSAGES_PER_SUBJOB = 5
+
+
+def measure_profile() -> None:
+    """Execute the subjobs in parallel (each saves its status and messages, and reads them back),
+    while a poller reads the job results, and print the throughput, the latency of the poller and
+    the number of the subjobs failed by "database is locked". The database is configured by the
+    environment variables (DATABASE_URL, SQLITE_TUNING_ENABLED)."""
+    from app.core.common.type import JobStatus
+    from app.core.dal.database import SQLITE_TUNED
+    from app.core.model.job import Job, SubJob
+    from app.core.model.job_result import JobResult
+    from app.core.model.message import AgentMessage, MessageType
+    from app.core.service.job_service import JobService
+    from app.core.service.message_service import MessageService
+    from test.resource.init_server import init_server
+
+    init_server()
+    job_service: JobService = JobService.instance
+    message_service: MessageService = MessageService.instance
+
+    def execute_subjob(subjob: SubJob) -> None:
+        job_service.save_job(subjob)
+        job_service.save_job_result(JobResult(job_id=subjob.id, status=JobStatus.RUNNING))
+        for i in range(MESSAGES_PER_SUBJOB):
+            message_service.save_message(
+                message=AgentMessage(job_id=subjob.id, payload=f"Output {i}. " * 20)
+            )
+            message_service.get_message_by_job_id(
+                job_id=subjob.id, message_type=MessageType.AGENT_MESSAGE
+            )
+        job_service.save_job_result(JobResult(job_id=subjob.id, status=JobStatus.FINISHED))
+
+    def poll(polling: threading.Event, original_job_id: str, poll_latencies: List[float]) -> None:
+        """Poll the progress (e.g. the polled views of the clients), until the subjobs are done."""
+        while not polling.is_set():
+            start_time = time.perf_counter()
+            try:
+                job_service.get_subjob_results(original_job_id=original_job_id)
+                poll_latencies.append((time.perf_counter() - start_time) * 1000)
+            except Exception:
+                poll_latencies.append(float("inf"))
+            time.sleep(0.005)
+
+    for workers in WORKER_COUNTS:
+        original_job = Job(goal="Question")
+        job_service.save_job(original_job)
+        subjobs: List[SubJob] = [
+            SubJob(goal=f"Subjob {i}", original_job_id=original_job.id, expert_id="benchmark")
+            for i in range(workers * SUBJOBS_PER_WORKER)
+        ]
+
+        polling = threading.Event()
+        poll_latencies: List[float] = []
+        poller = threading.Thread(target=poll, args=(polling, original_job.id, poll_latencies))
+        poller.start()
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(execute_subjob, subjob) for subjob in subjobs]
+        duration = time.perf_counter() - start_time
+        polling.set()
+        poller.join()
+
+        failed_count = len([future for future in futures if future.exception()])
+        poll_latencies.sort()
+        p99 = poll_latencies[int(len(poll_latencies) * 0.99)] if poll_latencies else 0.0
+        print(
+            f"{str(SQLITE_TUNED):>6} {workers:>8} {len(subjobs) / duration:>10.1f}"
+            f" {p99:>13.2f} {failed_count:>7}",
+            flush=True,
+        )
+
+
+def main():
+    """Compare the concurrent subjobs on SQLite with the default rollback journal (before), and
+    with the tuning profile (after): the WAL journal, synchronous=NORMAL, the busy timeout, and a
+    single writer connection with the pooled reader connections. Each profile runs in a process
+    of its own, on a new database file."""
+    if sys.argv[1:] == ["measure"]:
+        measure_profile()
+        return
+
+    print(f"{'tuned':>6} {'workers':>8} {'subjobs/s':>10} {'poll p99(ms)':>13} {'failed':>7}")
+    for tuned in ["false", "true"]:
+        with tempfile.TemporaryDirectory() as app_root:
+            env = {
+                **os.environ,
+                "SQLITE_TUNING_ENABLED": tuned,
+                "APP_ROOT": app_root,
+                "DATABASE_URL": f"sqlite:///{app_root}/chat2graph.db",
+            }
+            subprocess.run(
+                [sys.executable, "-m", "test.benchmark.run_sqlite_tuning", "measure"],
+                env=env,
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ from typing import cast
 from app.core.agent.agent import AgentConfig, Profile
 from app.core.agent.leader import Leader
 from app.core.dal.dao.dao_factory import DaoFactory
-from app.core.dal.database import DbSession
+from app.core.dal.database import ScopedDbSession
 from app.core.model.job import Job, SubJob
 from app.core.model.job_graph import JobGraph
 from app.core.model.message import AgentMessage, MessageType
@@ -20,7 +20,7 @@ from app.core.workflow.operator import Operator
 from app.core.workflow.operator_config import OperatorConfig
 from app.plugin.dbgpt.dbgpt_workflow import DbgptWorkflow
 
-DaoFactory.initialize(DbSession())
+DaoFactory.initialize(ScopedDbSession)
 ServiceFactory.initialize()
 
 
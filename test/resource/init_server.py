@@ -1,5 +1,5 @@
 from app.core.dal.dao.dao_factory import DaoFactory
-from app.core.dal.database import DbSession
+from app.core.dal.database import ScopedDbSession
 from app.core.dal.init_db import init_db
 from app.core.service.service_factory import ServiceFactory
 
@@ -10,7 +10,7 @@ def init_server():
     init_db()
     
     # Initialize the DAO factory with a database session
-    DaoFactory.initialize(DbSession())
+    DaoFactory.initialize(ScopedDbSession)
     
     # Initialize the service factory
     ServiceFactory.initialize()
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from typing import List
+from uuid import uuid4
+
+import pytest
+
+from app.core.dal.dao.async_dao import AsyncDao
+from app.core.dal.dao.job_dao import JobDao
+from app.core.dal.dao.message_dao import MessageDao
+from app.core.dal.database import run_async
+from app.core.dal.do.job_do import JobDo
+from app.core.model.job import Job, JobType
+from app.core.model.message import Message, MessageType, TextMessage
+from app.core.service.message_service import MessageService
+from test.resource.init_server import init_server
+
+init_server()
+
+
+async def test_async_dao_interface():
+    """Test the async DAO creates, reads, updates and deletes the rows as the DAO does."""
+    job_dao: JobDao = JobDao.instance
+    async_job_dao: AsyncDao[JobDo] = AsyncDao(job_dao)
+    job = Job(goal="Question")
+    # the goal is unique to the run, so the rows left by the previous runs are not filtered
+    edited_goal = f"Edited {uuid4()}"
+
+    await async_job_dao.upsert(
+        id=job.id, goal=job.goal, category=JobType.JOB.value, session_id="test_session_id"
+    )
+    assert (await async_job_dao.get_by_id(job.id)).goal == "Question"
+    await async_job_dao.update(id=job.id, goal=edited_goal)
+    assert [job_do.id for job_do in await async_job_dao.filter_by(goal=edited_goal)] == [job.id]
+    # the cached job of the DAO is invalidated by the async DAO
+    assert job_dao.get_job_by_id(job.id).goal == edited_goal
+    assert (await async_job_dao.run(job_dao.get_job_by_id, id=job.id)).goal == edited_goal
+
+    await async_job_dao.delete(id=job.id)
+    assert await async_job_dao.get_by_id(job.id) is None
+
+
+async def test_run_async_not_blocking_event_loop():
+    """Test the event loop runs the other coroutines, while the DAOs are awaited."""
+    message_dao: MessageDao = MessageDao.instance
+    message = TextMessage(payload="Question", session_id="test_session_id", job_id=str(uuid4()))
+    message_dao.save_message(message=message)
+    ticks: List[float] = []
+
+    async def tick() -> None:
+        for _ in range(10):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    def get_message_slowly() -> Message:
+        time.sleep(0.1)
+        return message_dao.get_message(id=message.get_id())
+
+    ticker = asyncio.create_task(tick())
+    result = await run_async(get_message_slowly)
+    await ticker
+
+    assert result.get_payload() == "Question"
+    assert max(b - a for a, b in zip(ticks, ticks[1:], strict=False)) < 0.1
+
+
+async def test_save_message_async_in_unit_of_work():
+    """Test the message saved by the async code is committed before the save hooks are called,
+    and the writes of a failed call are rolled back together."""
+    message_service: MessageService = MessageService.instance
+    saved_ids: List[str] = []
+
+    def save_hook(message: Message) -> None:
+        saved_ids.append(message.get_id())
+
+    message_service.add_save_hook(save_hook)
+    try:
+        await _save_messages_async(message_service, job_id=str(uuid4()))
+    finally:
+        message_service._save_hooks.remove(save_hook)
+    assert len(saved_ids) == 1
+
+
+async def _save_messages_async(message_service: MessageService, job_id: str) -> None:
+    """Save a message of the job by the async code, and fail to save another one."""
+    message = TextMessage(payload="Answer", session_id="test_session_id", job_id=job_id)
+    await message_service.save_message_async(message=message)
+    messages = await message_service.get_message_by_job_id_async(
+        job_id=job_id, message_type=MessageType.TEXT_MESSAGE
+    )
+    assert [m.get_payload() for m in messages] == ["Answer"]
+
+    def save_and_fail() -> None:
+        message_service.save_message(
+            message=TextMessage(payload="Rolled back", session_id="test_session_id", job_id=job_id)
+        )
+        raise ValueError("Failed to save the messages")
+
+    with pytest.raises(ValueError):
+        await run_async(save_and_fail)
+    messages = await message_service.get_message_by_job_id_async(
+        job_id=job_id, message_type=MessageType.TEXT_MESSAGE
+    )
+    assert [m.get_payload() for m in messages] == ["Answer"]
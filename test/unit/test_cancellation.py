@@ -0,0 +1,77 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.common.cancellation import CancellationToken, JobCancelledError
+
+
+def test_cancellation_token_raise_if_cancelled():
+    """Test the token raises with the reason only after it is cancelled."""
+    token = CancellationToken()
+    token.raise_if_cancelled()
+    assert not token.is_cancelled()
+
+    token.cancel(reason="Stopped by the user.")
+    token.cancel(reason="Cancelled twice.")
+
+    assert token.is_cancelled()
+    assert token.reason == "Stopped by the user."
+    with pytest.raises(JobCancelledError, match="Stopped by the user."):
+        token.raise_if_cancelled()
+
+
+@pytest.mark.asyncio
+async def test_cancellation_token_run_returns_result():
+    """Test the awaitable is awaited as usual, if the token is not cancelled."""
+    token = CancellationToken(poll_interval=0.01)
+
+    async def generate() -> str:
+        await asyncio.sleep(0.05)
+        return "response"
+
+    assert await token.run(generate()) == "response"
+
+
+@pytest.mark.asyncio
+async def test_cancellation_token_run_cancels_in_flight_request():
+    """Test the in-flight awaitable is cancelled soon after the token is cancelled by a thread."""
+    token = CancellationToken(poll_interval=0.05)
+    request_cancelled = asyncio.Event()
+
+    async def slow_generate() -> str:
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            request_cancelled.set()
+            raise
+        return "response"
+
+    # the leader cancels the token from another thread
+    threading.Timer(0.1, token.cancel, kwargs={"reason": "Stopped."}).start()
+
+    start_time = time.time()
+    with pytest.raises(JobCancelledError):
+        await token.run(slow_generate())
+
+    assert time.time() - start_time < 1.0
+    assert request_cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_cancellation_token_run_cancelled_before_start():
+    """Test the awaitable is not started at all, if the token has been cancelled."""
+    token = CancellationToken()
+    token.cancel()
+    started = []
+
+    async def generate() -> None:
+        started.append(True)
+
+    coroutine = generate()
+    with pytest.raises(JobCancelledError):
+        await token.run(coroutine)
+    coroutine.close()
+
+    assert not started
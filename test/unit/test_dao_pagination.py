@@ -0,0 +1,110 @@
+from uuid import uuid4
+
+import pytest
+
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import ChatMessageRole
+from app.core.dal.dao.seesion_dao import SessionDao
+from app.core.model.job import Job
+from app.core.model.message import HybridMessage, TextMessage
+from app.core.service.job_service import JobService
+from app.core.service.message_service import MessageService
+from app.core.service.session_service import SessionService
+from test.resource.init_server import init_server
+
+init_server()
+
+
+def test_sessions_paged_by_keyset_cursor():
+    """Test the sessions are paged by the (timestamp, id) cursors without duplicates or gaps, and
+    the total count is cached until a session is created."""
+    session_dao: SessionDao = SessionDao.instance
+    session_service: SessionService = SessionService.instance
+    # the sessions left by the previous runs share the timestamps, so check the ones of this run
+    name_prefix = f"test paged session {uuid4()}"
+    for i in range(7):
+        # the sessions created in the same second are ordered by the ids
+        session_dao.create(name=f"{name_prefix} {i}", timestamp=4102444800 + i // 2)
+
+    ttl = SystemEnv.TOTAL_COUNT_CACHE_TTL
+    try:
+        SystemEnv.TOTAL_COUNT_CACHE_TTL = 3600
+        total = session_dao.get_total_count()
+
+        pages = []
+        cursor = None
+        while True:
+            page = session_service.get_sessions_page(size=3, cursor=cursor)
+            pages.append(page)
+            cursor = page.next_cursor
+            if not cursor:
+                break
+        sessions = [session for page in pages for session in page.items]
+        test_sessions = [session for session in sessions if session.name.startswith(name_prefix)]
+
+        assert [len(page.items) for page in pages][:2] == [3, 3]
+        assert len(sessions) == total == len({session.id for session in sessions})
+        assert test_sessions == sorted(
+            test_sessions, key=lambda session: (session.timestamp, session.id), reverse=True
+        )
+        assert {session.name for session in test_sessions} == {
+            f"{name_prefix} {i}" for i in range(7)
+        }
+        assert all(page.total == total for page in pages)
+
+        # the page number based pagination is kept for compatibility
+        assert session_service.get_sessions_page(size=3, offset=3).items == pages[1].items
+
+        session_service.create_session(name=f"{name_prefix} 7")
+        assert session_service.get_sessions_page(size=3).total == total + 1
+    finally:
+        SystemEnv.TOTAL_COUNT_CACHE_TTL = ttl
+
+    with pytest.raises(ValueError):
+        session_service.get_sessions_page(size=3, cursor="invalid cursor")
+
+
+def test_conversation_views_paged_by_questions():
+    """Test the conversation views of a session are paged by the questions, the latest page
+    first and the views of the page in the chat order."""
+    job_service: JobService = JobService.instance
+    message_service: MessageService = MessageService.instance
+    session_id = SessionService.instance.create_session(name="test paged views").id
+
+    job_ids = []
+    for i in range(5):
+        job = Job(goal=f"question {i}", session_id=session_id)
+        job_service.save_job(job)
+        for role, payload in [
+            (ChatMessageRole.USER, f"question {i}"),
+            (ChatMessageRole.SYSTEM, f"answer {i}"),
+        ]:
+            text_message = TextMessage(
+                payload=payload, job_id=job.id, session_id=session_id, role=role, timestamp=1000 + i
+            )
+            message_service.save_message(message=text_message)
+            message_service.save_message(
+                message=HybridMessage(
+                    instruction_message=text_message,
+                    job_id=job.id,
+                    session_id=session_id,
+                    role=role,
+                    timestamp=1000 + i,
+                )
+            )
+        job_ids.append(job.id)
+
+    page = job_service.get_conversation_views_page(session_id=session_id, size=2)
+    assert [view.answer_metrics.job_id for view in page.items] == job_ids[3:]
+    assert page.total == 5
+
+    page = job_service.get_conversation_views_page(
+        session_id=session_id, size=2, cursor=page.next_cursor
+    )
+    assert [view.answer_metrics.job_id for view in page.items] == job_ids[1:3]
+
+    page = job_service.get_conversation_views_page(
+        session_id=session_id, size=2, cursor=page.next_cursor
+    )
+    assert [view.answer_metrics.job_id for view in page.items] == job_ids[:1]
+    assert page.next_cursor is None
@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import text
+
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import JobStatus
+from app.core.dal.database import SQLITE_TUNED, ScopedDbSession, engine, unit_of_work, writer_engine
+from app.core.model.job import Job, SubJob
+from app.core.model.job_result import JobResult
+from app.core.service.job_service import JobService
+from test.resource.init_server import init_server
+
+init_server()
+
+pytestmark = pytest.mark.skipif(not SQLITE_TUNED, reason="The SQLite tuning profile is disabled.")
+
+
+def test_sqlite_tuning_profile():
+    """Test the reader and the writer connections are tuned, and there is a single writer."""
+    for bound_engine in [engine, writer_engine]:
+        with bound_engine.connect() as connection:
+            assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            # NORMAL
+            assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+            assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == int(
+                SystemEnv.SQLITE_BUSY_TIMEOUT * 1000
+            )
+    assert writer_engine is not engine
+    assert writer_engine.pool.size() == 1
+
+
+def test_session_reads_own_writes_by_writer():
+    """Test the session reads by the reader connections, until it writes in the transaction."""
+    job_service: JobService = JobService.instance
+    job = Job(goal="Question")
+    job_service.save_job(job)
+
+    with unit_of_work() as session:
+        assert session.get_bind() is engine
+        job_service.save_job_result(JobResult(job_id=job.id, status=JobStatus.RUNNING))
+        assert session.get_bind() is writer_engine
+        assert job_service.get_job_result(job.id).status == JobStatus.RUNNING
+    assert ScopedDbSession().get_bind() is engine
+
+
+def test_concurrent_writers_not_locked():
+    """Test the parallel writers of the threads queue for the writer connection, while the readers
+    read the committed rows."""
+    job_service: JobService = JobService.instance
+    original_job = Job(goal="Question")
+    job_service.save_job(original_job)
+    subjobs = [
+        SubJob(goal=f"Subjob {i}", original_job_id=original_job.id, expert_id="test_expert")
+        for i in range(64)
+    ]
+
+    def execute_subjob(subjob: SubJob) -> JobStatus:
+        job_service.save_job(subjob)
+        with unit_of_work():
+            job_service.save_job_result(JobResult(job_id=subjob.id, status=JobStatus.RUNNING))
+            job_service.save_job_result(JobResult(job_id=subjob.id, status=JobStatus.FINISHED))
+        with engine.connect() as connection:
+            connection.execute(text("SELECT count(*) FROM job")).scalar()
+        return job_service.get_job_result(subjob.id).status
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        statuses = list(executor.map(execute_subjob, subjobs))
+    assert statuses == [JobStatus.FINISHED] * len(subjobs)
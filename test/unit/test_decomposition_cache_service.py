@@ -0,0 +1,62 @@
+from app.core.agent.agent import Profile
+from app.core.service.decomposition_cache_service import DecompositionCacheService
+from test.resource.init_server import init_server
+
+init_server()
+
+
+def _job_dict():
+    return {
+        "subtask_1": {
+            "goal": "Query the graph",
+            "context": "The graph is in the database.",
+            "dependencies": [],
+            "assigned_expert": "Query Expert",
+            "thinking": "Query first.",
+            "completion_criteria": "The result is returned.",
+        }
+    }
+
+
+def test_decomposition_cache_key_normalization():
+    """Test the equivalent requests share the key, and the case-sensitive literals and the expert
+    set change the key."""
+    experts = [
+        Profile(name="Query Expert", description="Query"),
+        Profile(name="Q&A Expert", description="QA"),
+    ]
+
+    key = DecompositionCacheService.make_key("Count  the Person nodes", "ctx", experts)
+
+    assert key == DecompositionCacheService.make_key(
+        " Count the\nPerson nodes ", "ctx", experts[::-1]
+    )
+    assert key != DecompositionCacheService.make_key("Count the person nodes", "ctx", experts)
+    assert key != DecompositionCacheService.make_key("Count the Person nodes", "CTX", experts)
+    assert key != DecompositionCacheService.make_key("Count the Person nodes", "ctx", experts[:1])
+
+
+def test_decomposition_cache_hit_miss_and_persistence():
+    """Test the cached decomposition is returned as a copy, and reloaded from the database."""
+    cache: DecompositionCacheService = DecompositionCacheService.instance
+    key = DecompositionCacheService.make_key("test decomposition cache", "", [])
+    stats = cache.get_stats()
+
+    assert cache.get(key) is None
+    cache.put(key, _job_dict())
+
+    job_dict = cache.get(key)
+    assert job_dict == _job_dict()
+    job_dict["subtask_1"]["goal"] = "changed"
+    assert cache.get(key) == _job_dict()
+
+    # drop the in-memory cache, and reload the decomposition from the database
+    cache._job_dicts.clear()
+    assert cache.get(key) == _job_dict()
+
+    new_stats = cache.get_stats()
+    assert new_stats.hit_count - stats.hit_count == 3
+    assert new_stats.miss_count - stats.miss_count == 1
+
+    cache.invalidate(key)
+    assert cache.get(key) is None
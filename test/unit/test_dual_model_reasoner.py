@@ -102,6 +102,7 @@ async def test_infer_multiple_rounds(mock_reasoner: DualModelReasoner, task: Tas
         messages: List[ModelMessage],
         tools: Optional[List[Tool]] = None,
         tool_call_ctx: Optional[ToolCallContext] = None,
+        temperature: Optional[float] = None,
     ) -> ModelMessage:
         nonlocal round_count
         round_count += 1
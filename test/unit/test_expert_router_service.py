@@ -0,0 +1,103 @@
+from app.core.agent.agent import Profile
+from app.core.model.agentic_config import AgenticConfig
+from app.core.service.expert_router_service import ExpertRouterService
+from test.resource.init_server import init_server
+
+init_server()
+
+EXPERT_PROFILES = [
+    Profile(
+        name="Design Expert",
+        description="He designs the graph schema, and creates the vertex and edge labels.",
+    ),
+    Profile(
+        name="Query Expert",
+        description=(
+            "He writes the graph query statements, and returns the data of the graph. "
+            "He does not perform graph algorithm analysis."
+        ),
+    ),
+    Profile(
+        name="Analysis Expert",
+        description=(
+            "He executes the graph algorithms (community detection, centrality calculation) "
+            "on the graph."
+        ),
+    ),
+]
+
+
+def test_expert_router_route():
+    """Test the request is routed to the expert only when the expert wins by a clear margin."""
+    router: ExpertRouterService = ExpertRouterService.instance
+
+    # the negated sentence of the query expert is not a match
+    assert router.route("Run PageRank", EXPERT_PROFILES)[0] == "Analysis Expert"
+    assert router.route("Create the vertex labels of the schema", EXPERT_PROFILES)[0] == (
+        "Design Expert"
+    )
+
+    # the negated sentence of the request is not a match
+    assert (
+        router.route(
+            "Do not run any algorithm. Just query the data of the people named Bob", EXPERT_PROFILES
+        )[0]
+        == "Query Expert"
+    )
+
+    # the multi-step request, the multi-expert request and the request without keywords are
+    # decomposed
+    assert router.route("Design the schema, then run the query", EXPERT_PROFILES)[0] is None
+    assert (
+        router.route(
+            "Query the graph with cypher and compute community detection with louvain",
+            EXPERT_PROFILES,
+        )[0]
+        is None
+    )
+    assert router.route("Hello", EXPERT_PROFILES) == (None, 0.0)
+
+
+def test_expert_router_route_with_builtin_experts():
+    """Test the negated and the multi-step requests are not routed to a single builtin expert."""
+    router: ExpertRouterService = ExpertRouterService.instance
+    agentic_config = AgenticConfig.from_yaml("app/core/sdk/chat2graph.yml")
+    expert_profiles = [
+        Profile(name=expert.profile.name, description=expert.profile.desc)
+        for expert in agentic_config.experts
+    ]
+
+    assert router.route(
+        "Please do not run any algorithm, just query the people named Bob", expert_profiles
+    ) == (None, 0.0)
+    assert (
+        router.route(
+            "Query the graph with cypher for all persons, then compute community detection with "
+            "louvain",
+            expert_profiles,
+        )[0]
+        is None
+    )
+
+
+def test_expert_router_stats():
+    """Test the saved latency of the fast path is estimated by the decomposition latency."""
+    router: ExpertRouterService = ExpertRouterService.instance
+    stats = router.get_stats()
+
+    router.record(
+        job_id="job_1",
+        expert_name=None,
+        confidence=0.1,
+        routing_latency=0.0,
+        decomposition_latency=2.0,
+    )
+    decision = router.record(
+        job_id="job_2", expert_name="Query Expert", confidence=1.0, routing_latency=0.0
+    )
+
+    new_stats = router.get_stats()
+    assert new_stats.request_count == stats.request_count + 2
+    assert new_stats.fast_path_count == stats.fast_path_count + 1
+    assert decision.saved_latency > 0
+    assert new_stats.recent_decisions[-1] == decision
@@ -1,3 +1,6 @@
+import asyncio
+from concurrent.futures import Future
+import time
 from typing import Any, List, Optional
 from unittest.mock import AsyncMock
 from uuid import uuid4
@@ -7,10 +10,14 @@ import pytest
 from app.core.agent.agent import AgentConfig, Profile
 from app.core.agent.builtin_leader_state import BuiltinLeaderState
 from app.core.agent.leader import Leader
+from app.core.common.cancellation import JobCancelledError
 from app.core.common.singleton import AbcSingleton
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import JobStatus, WorkflowStatus
 from app.core.model.job import Job, SubJob
 from app.core.model.job_graph import JobGraph
 from app.core.model.message import AgentMessage, WorkflowMessage
+from app.core.model.task import Task
 from app.core.prompt.job_decomposition import JOB_DECOMPOSITION_OUTPUT_SCHEMA
 from app.core.reasoner.mono_model_reasoner import MonoModelReasoner
 from app.core.reasoner.reasoner import Reasoner
@@ -257,3 +264,161 @@ Analyzing the task...
     assert job_graph.vertices() == []
     # no edges should be present since there are no vertices
     assert len(job_graph.edges()) == 0
+
+
+@pytest.mark.asyncio
+async def test_execute_hedged_decomposition(leader: Leader, mock_reasoner: AsyncMock):
+    """Test the first valid one of the hedged attempts wins, and the slower attempts are
+    cancelled."""
+    valid_response = """<decomposition>
+    {
+        "subtask_1": {
+            "goal": "Query the graph.",
+            "context": "The graph is in the database.",
+            "completion_criteria": "The result is returned.",
+            "dependencies": [],
+            "assigned_expert": "Hedge Expert",
+            "thinking": "Query it."
+        }
+    }
+    </decomposition>"""
+    hedge_temperatures = leader._get_hedge_temperatures(3)
+    temperatures: List[float] = []
+    cancelled_attempts: List[bool] = []
+
+    async def infer(task: Task) -> str:
+        temperatures.append(task.job.temperature)
+        if task.job.temperature == hedge_temperatures[0]:
+            # the attempt of the base temperature is invalid
+            return "No subtasks found."
+        if task.job.temperature == hedge_temperatures[-1]:
+            # the attempt of the highest temperature is slow, and it will be cancelled
+            try:
+                await task.cancellation_token.run(asyncio.sleep(10))
+            except JobCancelledError:
+                cancelled_attempts.append(True)
+                raise
+        # the valid attempt returns after all the attempts are started
+        while len(temperatures) < len(hedge_temperatures):
+            await asyncio.sleep(0.01)
+        return valid_response
+
+    mock_reasoner.infer.side_effect = infer
+    leader.state.create_expert(
+        AgentConfig(
+            profile=Profile(name="Hedge Expert", description="Query expert"),
+            reasoner=mock_reasoner,
+            workflow=MockWorkflow(),
+        )
+    )
+
+    job_service: JobService = JobService.instance
+    original_job = Job(goal="test hedged decomposition")
+    job_service.save_job(original_job)
+
+    SystemEnv.DECOMPOSITION_HEDGE_COUNT = 3
+    submitted_count = leader._job_scheduler.get_stats().submitted_count
+    try:
+        start_time = time.time()
+        job_graph = leader.execute(AgentMessage(job_id=original_job.id))
+        assert time.time() - start_time < 5
+    finally:
+        SystemEnv.DECOMPOSITION_HEDGE_COUNT = 1
+
+    # the attempts are bounded by the job scheduler shared with the subjobs
+    assert leader._job_scheduler.get_stats().submitted_count == submitted_count + 3
+    assert len(job_graph.vertices()) == 1
+    assert sorted(temperatures) == hedge_temperatures
+    time.sleep(0.5)
+    assert cancelled_attempts == [True]
+
+
+def test_execute_fast_path_routing(leader: Leader, mock_reasoner: AsyncMock):
+    """Test the simple job is assigned to the routed expert without the decomposition."""
+    for name, description in [
+        ("Router Query Expert", "He writes and executes the graph query statements."),
+        ("Router Analysis Expert", "He executes the graph algorithms, e.g. centrality."),
+    ]:
+        leader.state.create_expert(
+            AgentConfig(
+                profile=Profile(name=name, description=description),
+                reasoner=mock_reasoner,
+                workflow=MockWorkflow(),
+            )
+        )
+
+    job_service: JobService = JobService.instance
+    original_job = Job(goal="Run PageRank")
+    job_service.save_job(original_job)
+
+    SystemEnv.EXPERT_ROUTER_ENABLED = True
+    try:
+        job_graph = leader.execute(AgentMessage(job_id=original_job.id))
+    finally:
+        SystemEnv.EXPERT_ROUTER_ENABLED = False
+
+    mock_reasoner.infer.assert_not_called()
+    assert len(job_graph.vertices()) == 1
+    subjob = job_service.get_subjob(job_graph.vertices()[0])
+    assert subjob.assigned_expert_name == "Router Analysis Expert"
+
+
+def test_execute_job_graph_bounds_reexecution_of_root_subjob(
+    leader: Leader, mock_reasoner: AsyncMock, monkeypatch: pytest.MonkeyPatch
+):
+    """Test the subjob without predecessors, which keeps reporting INPUT_DATA_ERROR, is
+    re-executed at most MAX_REEXECUTION_COUNT times before the job graph fails."""
+    leader.state.create_expert(
+        AgentConfig(
+            profile=Profile(name="Reexecution Expert", description="Query expert"),
+            reasoner=mock_reasoner,
+            workflow=MockWorkflow(),
+        )
+    )
+    job_service: JobService = JobService.instance
+    original_job = Job(goal="test bounded re-execution")
+    job_service.save_job(original_job)
+    subjob = SubJob(
+        goal="query the graph",
+        original_job_id=original_job.id,
+        expert_id=leader.state.get_expert_by_name("Reexecution Expert").get_id(),
+    )
+    job_service.save_job(subjob)
+    job_service.add_subjob(
+        original_job_id=original_job.id,
+        job=subjob,
+        expert_id=subjob.expert_id,
+        predecessors=[],
+        successors=[],
+    )
+
+    submitted_messages: List[AgentMessage] = []
+
+    def submit_subjob(subjob: SubJob, agent_message: AgentMessage, **kwargs: Any) -> Future:
+        submitted_messages.append(agent_message)
+        future: Future = Future()
+        future.set_result(
+            AgentMessage(
+                job_id=subjob.id,
+                workflow_messages=[
+                    WorkflowMessage(
+                        payload={
+                            "status": WorkflowStatus.INPUT_DATA_ERROR,
+                            "evaluation": "The input is invalid.",
+                            "lesson": "Check the input.",
+                        },
+                        job_id=subjob.id,
+                    )
+                ],
+                lesson="Check the input.",
+            )
+        )
+        return future
+
+    monkeypatch.setattr(leader, "_submit_subjob", submit_subjob)
+    leader.execute_job_graph(original_job_id=original_job.id)
+
+    # the first execution and the bounded re-executions
+    assert len(submitted_messages) == SystemEnv.MAX_REEXECUTION_COUNT + 1
+    assert submitted_messages[-1].get_lesson() is not None
+    assert job_service.get_job_result(job_id=subjob.id).status == JobStatus.FAILED
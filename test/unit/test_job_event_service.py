@@ -0,0 +1,125 @@
+import threading
+import time
+
+from app.core.common.type import ChatMessageRole, JobStatus
+from app.core.model.job import Job, SubJob
+from app.core.model.job_event import JobEventType
+from app.core.model.job_result import JobResult
+from app.core.model.message import AgentMessage, TextMessage
+from app.core.service.job_event_service import JobEventService
+from app.core.service.job_service import JobService
+from app.core.service.message_service import MessageService
+from app.core.service.session_service import SessionService
+from test.resource.init_server import init_server
+
+init_server()
+
+
+def test_job_events_published_and_followed_by_cursor():
+    """Test the status transitions and the messages of the subjobs are routed to the session and
+    the original job, and followed after the cursors."""
+    job_service: JobService = JobService.instance
+    message_service: MessageService = MessageService.instance
+    job_event_service: JobEventService = JobEventService.instance
+    session_id = SessionService.instance.create_session(name="test job events").id
+    other_session_id = SessionService.instance.create_session(name="test other job events").id
+
+    cursor = job_event_service.get_cursor()
+    original_job = Job(goal="Question", session_id=session_id)
+    job_service.save_job(original_job)
+    subjob = SubJob(
+        goal="Subjob",
+        session_id=session_id,
+        original_job_id=original_job.id,
+        expert_id="test_expert",
+    )
+    job_service.save_job(subjob)
+    message_service.save_message(
+        message=TextMessage(
+            payload="Question",
+            job_id=original_job.id,
+            session_id=session_id,
+            role=ChatMessageRole.USER,
+        )
+    )
+    job_service.save_job_result(JobResult(job_id=subjob.id, status=JobStatus.RUNNING))
+    # the same status is not a transition
+    job_service.save_job_result(JobResult(job_id=subjob.id, status=JobStatus.RUNNING, tokens=1))
+    message_service.save_message(message=AgentMessage(job_id=subjob.id, payload="Thinking"))
+    job_service.save_job_result(JobResult(job_id=subjob.id, status=JobStatus.FINISHED))
+    job_service.save_job(Job(goal="Other question", session_id=other_session_id))
+
+    batch = job_event_service.get_events(since=cursor, session_id=session_id)
+    assert not batch.reset
+    assert [(event.type, event.job_id) for event in batch.events] == [
+        (JobEventType.MESSAGE, original_job.id),
+        (JobEventType.JOB_STATUS, subjob.id),
+        (JobEventType.MESSAGE, subjob.id),
+        (JobEventType.JOB_STATUS, subjob.id),
+    ]
+    assert all(event.original_job_id == original_job.id for event in batch.events)
+    assert batch.events[2].data["message"]["payload"] == "Thinking"
+    assert batch.events[3].data["status"] == JobStatus.FINISHED.value
+
+    # only the events after the cursor are fetched
+    batch = job_event_service.get_events(
+        since=batch.events[1].cursor, original_job_id=original_job.id
+    )
+    assert [event.type for event in batch.events] == [
+        JobEventType.MESSAGE,
+        JobEventType.JOB_STATUS,
+    ]
+    assert job_event_service.get_events(since=batch.cursor, session_id=session_id).events == []
+
+    # a cursor out of the buffer (e.g. issued before a restart) requires reloading the views
+    assert job_event_service.get_events(since=1, session_id=session_id).reset
+    assert job_event_service.get_events(since=batch.cursor + 1000, session_id=session_id).reset
+
+
+def test_job_events_long_poll_woken_up_by_new_event():
+    """Test the long poll waits for the event of its session, and times out without one."""
+    job_service: JobService = JobService.instance
+    job_event_service: JobEventService = JobEventService.instance
+    session_id = SessionService.instance.create_session(name="test job events long poll").id
+    original_job = Job(goal="Question", session_id=session_id)
+    job_service.save_job(original_job)
+
+    start_time = time.time()
+    batch = job_event_service.get_events(session_id=session_id, timeout=0.2)
+    assert batch.events == []
+    assert time.time() - start_time >= 0.2
+
+    def finish_job() -> None:
+        time.sleep(0.2)
+        job_service.save_job_result(JobResult(job_id=original_job.id, status=JobStatus.FINISHED))
+
+    thread = threading.Thread(target=finish_job)
+    thread.start()
+    start_time = time.time()
+    batch = job_event_service.get_events(since=batch.cursor, session_id=session_id, timeout=10)
+    thread.join()
+
+    assert [event.data["status"] for event in batch.events] == [JobStatus.FINISHED.value]
+    assert time.time() - start_time < 5
+
+
+def test_view_versions_changed_by_events():
+    """Test the versions of the views of a session and its original jobs are changed only by
+    their own events, which validate the conditional requests of the polled views."""
+    job_service: JobService = JobService.instance
+    job_event_service: JobEventService = JobEventService.instance
+    session_id = SessionService.instance.create_session(name="test view versions").id
+    original_job = Job(goal="Question", session_id=session_id)
+    other_job = Job(goal="Other question", session_id=session_id)
+    job_service.save_job(original_job)
+    job_service.save_job(other_job)
+
+    session_version = job_event_service.get_version(session_id=session_id)
+    job_version = job_event_service.get_version(original_job_id=original_job.id)
+    job_service.save_job_result(JobResult(job_id=other_job.id, status=JobStatus.FINISHED))
+
+    assert job_event_service.get_version(session_id=session_id) > session_version
+    assert job_event_service.get_version(original_job_id=original_job.id) == job_version
+
+    job_service.save_job_result(JobResult(job_id=original_job.id, status=JobStatus.FINISHED))
+    assert job_event_service.get_version(original_job_id=original_job.id) > job_version
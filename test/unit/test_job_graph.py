@@ -0,0 +1,21 @@
+from app.core.model.job_graph import JobGraph
+
+
+def test_critical_path_lengths():
+    """Test the remaining critical path length of each vertex.
+
+    graph structure:
+        a(1) → b(5) → d(1)
+          ↘  c(2)  ↗
+    """
+    job_graph = JobGraph()
+    for vertex in ["a", "b", "c", "d"]:
+        job_graph.add_vertex(vertex)
+    job_graph.add_edge("a", "b")
+    job_graph.add_edge("a", "c")
+    job_graph.add_edge("b", "d")
+    job_graph.add_edge("c", "d")
+
+    lengths = job_graph.critical_path_lengths(durations={"b": 5.0, "c": 2.0})
+
+    assert lengths == {"a": 7.0, "b": 6.0, "c": 3.0, "d": 1.0}
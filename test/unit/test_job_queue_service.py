@@ -0,0 +1,80 @@
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import JobStatus, WorkflowStatus
+from app.core.model.job import Job, SubJob
+from app.core.model.message import AgentMessage, WorkflowMessage
+from app.core.service.job_queue_service import JobQueueService
+from app.core.service.job_service import JobService
+from app.core.service.message_service import MessageService
+from test.resource.init_server import init_server
+
+init_server()
+
+
+def _queue_subjob() -> AgentMessage:
+    job_service: JobService = JobService.instance
+    original_job = Job(goal="test job queue")
+    job_service.save_job(original_job)
+    subjob = SubJob(goal="queued subjob", original_job_id=original_job.id, expert_id="expert_id")
+    job_service.save_job(subjob)
+
+    # the predecessor output is not saved yet, so it is saved by the queue for the workers
+    pred_message = WorkflowMessage(payload={"scratchpad": "pred"}, job_id=subjob.id)
+    return AgentMessage(job_id=subjob.id, workflow_messages=[pred_message], lesson="lesson")
+
+
+def test_job_queue_claim_and_complete():
+    """Test a queued subjob is claimed by only one worker, and the output resolves the future."""
+    job_queue_service: JobQueueService = JobQueueService.instance
+    message_service: MessageService = MessageService.instance
+    agent_message = _queue_subjob()
+    job_id = agent_message.get_job_id()
+
+    future = job_queue_service.enqueue(agent_message=agent_message, rank=1.0)
+    assert JobService.instance.get_job_result(job_id).status == JobStatus.QUEUED
+
+    claimed = [
+        m for m in job_queue_service.claim("worker_1", limit=100) if m.get_job_id() == job_id
+    ]
+    assert len(claimed) == 1
+    assert claimed[0].get_lesson() == "lesson"
+    assert claimed[0].get_workflow_result_message().scratchpad == "pred"
+    assert not job_queue_service.claim("worker_2", limit=100)
+
+    result = AgentMessage(
+        job_id=job_id,
+        payload="result",
+        workflow_messages=[
+            WorkflowMessage(payload={"scratchpad": "result"}, job_id=job_id),
+        ],
+    )
+    result.get_workflow_result_message().status = WorkflowStatus.SUCCESS
+    message_service.save_message(message=result.get_workflow_result_message())
+    message_service.save_message(message=result)
+    job_queue_service.complete(job_id=job_id, worker_id="worker_1", result=result)
+
+    assert future.result(timeout=10).get_id() == result.get_id()
+
+
+def test_job_queue_requeue_expired_lease():
+    """Test the subjob of a crashed worker (its lease expired) is claimed by another worker."""
+    job_queue_service: JobQueueService = JobQueueService.instance
+    agent_message = _queue_subjob()
+    job_id = agent_message.get_job_id()
+    future = job_queue_service.enqueue(agent_message=agent_message)
+
+    lease_duration = SystemEnv.SUBJOB_QUEUE_LEASE_DURATION
+    try:
+        # the lease of the crashed worker expires immediately
+        SystemEnv.SUBJOB_QUEUE_LEASE_DURATION = -1.0
+        assert job_id in [m.get_job_id() for m in job_queue_service.claim("crashed", limit=100)]
+    finally:
+        SystemEnv.SUBJOB_QUEUE_LEASE_DURATION = lease_duration
+
+    job_queue_service.requeue_expired_leases()
+    assert job_id in [m.get_job_id() for m in job_queue_service.claim("worker", limit=100)]
+
+    # the output of the crashed worker is discarded, since it no longer holds the lease
+    job_queue_service.complete(job_id=job_id, worker_id="crashed", error="lost")
+    job_queue_service.complete(job_id=job_id, worker_id="worker", error="failed")
+
+    assert str(future.exception(timeout=10)) == "failed"
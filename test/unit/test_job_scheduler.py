@@ -0,0 +1,151 @@
+import threading
+import time
+from typing import List
+
+from app.core.common.job_scheduler import JobScheduler
+from app.core.common.type import JobPriority
+
+
+def _block_worker(scheduler: JobScheduler) -> threading.Event:
+    """Occupy the only worker of the scheduler until the returned event is set."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait()
+
+    scheduler.submit(blocker, session_id="blocker")
+    assert started.wait(timeout=5)
+    return release
+
+
+def test_job_scheduler_submit_returns_future():
+    """Test the submission returns a future immediately, and the result is set by a worker."""
+    scheduler = JobScheduler(max_workers=2)
+
+    future = scheduler.submit(lambda x, y=0: x + y, 1, y=2, session_id="session")
+
+    assert future.result(timeout=5) == 3
+    stats = scheduler.get_stats()
+    assert stats.submitted_count == 1
+    assert stats.worker_count == 1
+
+
+def test_job_scheduler_worker_cap():
+    """Test the number of the concurrent jobs never exceeds the worker cap."""
+    scheduler = JobScheduler(max_workers=3)
+    lock = threading.Lock()
+    running = [0]
+    max_running = [0]
+
+    def job():
+        with lock:
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+
+    futures = [scheduler.submit(job, session_id=f"session_{i % 4}") for i in range(30)]
+    for future in futures:
+        future.result(timeout=5)
+
+    assert max_running[0] <= 3
+    assert scheduler.get_stats().worker_count <= 3
+
+
+def test_job_scheduler_fairness_across_sessions():
+    """Test a burst of jobs of one session does not starve the other session."""
+    scheduler = JobScheduler(max_workers=1)
+    release = _block_worker(scheduler)
+
+    order: List[str] = []
+    futures = [scheduler.submit(order.append, "a", session_id="session_a") for _ in range(5)]
+    futures += [scheduler.submit(order.append, "b", session_id="session_b") for _ in range(2)]
+
+    stats = scheduler.get_stats()
+    assert stats.queue_depth == 7
+    assert stats.queue_depth_by_session == {"session_a": 5, "session_b": 2}
+
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    # the jobs of the two sessions are interleaved, instead of the FIFO order
+    assert order[:4] == ["a", "b", "a", "b"]
+
+
+def test_job_scheduler_priority_and_weight():
+    """Test the interactive jobs go first, and the weighted session gets more turns."""
+    scheduler = JobScheduler(max_workers=1)
+    scheduler.set_session_weight("heavy", 2.0)
+    release = _block_worker(scheduler)
+
+    order: List[str] = []
+    futures = [
+        scheduler.submit(order.append, "batch", session_id="light", priority=JobPriority.BATCH)
+    ]
+    futures += [scheduler.submit(order.append, "heavy", session_id="heavy") for _ in range(4)]
+    futures += [scheduler.submit(order.append, "light", session_id="light") for _ in range(2)]
+
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    assert order[-1] == "batch"
+    assert order[:3].count("heavy") == 2
+    assert scheduler.get_stats().max_wait_time > 0
+
+
+def test_job_scheduler_rank_in_session():
+    """Test the jobs of the same session are dispatched by rank, and FIFO for the same rank."""
+    scheduler = JobScheduler(max_workers=1)
+    release = _block_worker(scheduler)
+
+    order: List[str] = []
+    futures = [
+        scheduler.submit(order.append, "short_1", session_id="session", rank=1.0),
+        scheduler.submit(order.append, "long", session_id="session", rank=10.0),
+        scheduler.submit(order.append, "short_2", session_id="session", rank=1.0),
+    ]
+
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    assert order == ["long", "short_1", "short_2"]
+
+
+def test_job_scheduler_concurrency_limit():
+    """Test the jobs over the concurrency limit of their key are throttled without holding the
+    workers, so the jobs of the other keys are not starved."""
+    scheduler = JobScheduler(max_workers=4)
+    scheduler.set_concurrency_limit("heavy", 1)
+    release = threading.Event()
+    heavy_started = threading.Event()
+
+    def heavy():
+        heavy_started.set()
+        release.wait()
+
+    heavy_futures = [
+        scheduler.submit(heavy, session_id="session", concurrency_key="heavy") for _ in range(3)
+    ]
+    assert heavy_started.wait(timeout=5)
+
+    # the light job is executed while the heavy ones are running or throttled
+    light_future = scheduler.submit(lambda: "light", session_id="session", concurrency_key="light")
+    assert light_future.result(timeout=5) == "light"
+
+    stats = scheduler.get_stats()
+    assert stats.running_count_by_key == {"heavy": 1}
+    assert stats.throttled_count_by_key == {"heavy": 2}
+    assert stats.queue_depth == 2
+
+    release.set()
+    for future in heavy_futures:
+        future.result(timeout=5)
+    stats = scheduler.get_stats()
+    assert stats.running_count_by_key == {}
+    assert stats.throttled_count_by_key == {}
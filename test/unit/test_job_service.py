@@ -0,0 +1,213 @@
+from typing import List
+from uuid import uuid4
+
+from sqlalchemy import event
+
+from app.core.common.type import ChatMessageRole, JobStatus
+from app.core.dal.dao.job_dao import JobDao
+from app.core.dal.dao.message_dao import MessageDao
+from app.core.dal.database import engine
+from app.core.model.job import Job, SubJob
+from app.core.model.job_graph import JobGraph
+from app.core.model.job_result import JobResult
+from app.core.model.message import AgentMessage, HybridMessage, TextMessage
+from app.core.service.job_service import JobService
+from app.core.service.message_service import MessageService
+from test.resource.init_server import init_server
+
+init_server()
+
+
+def test_job_graph_cache_write_through():
+    """Test the mutations of the cached job graph are persisted, and survive the cache eviction."""
+    job_service: JobService = JobService.instance
+
+    original_job = Job(goal="test job graph cache")
+    job_service.save_job(original_job)
+    subjobs = [
+        SubJob(goal=f"subjob {i}", original_job_id=original_job.id, expert_id="test_expert_id")
+        for i in range(3)
+    ]
+    for subjob in subjobs:
+        job_service.save_job(subjob)
+
+    # a -> b -> c
+    job_graph = JobGraph()
+    for subjob in subjobs:
+        job_graph.add_vertex(subjob.id)
+    job_graph.add_edge(subjobs[0].id, subjobs[1].id)
+    job_graph.add_edge(subjobs[1].id, subjobs[2].id)
+    job_service.replace_subgraph(original_job_id=original_job.id, new_subgraph=job_graph)
+
+    # the returned job graph is a copy, so that the changes do not leak into the cache
+    job_service.get_job_graph(original_job.id).remove_vertex(subjobs[0].id)
+    assert job_service.get_job_graph(original_job.id).vertices_count() == 3
+
+    # replace b with x: a -> x -> c
+    new_subjob = SubJob(goal="subjob x", original_job_id=original_job.id, expert_id="expert_id")
+    job_service.save_job(new_subjob)
+    old_subgraph = JobGraph()
+    old_subgraph.add_vertex(subjobs[1].id)
+    new_subgraph = JobGraph()
+    new_subgraph.add_vertex(new_subjob.id)
+    job_service.replace_subgraph(
+        original_job_id=original_job.id, new_subgraph=new_subgraph, old_subgraph=old_subgraph
+    )
+
+    # drop the cache, and reload the job graph from the database
+    job_service._job_graphs.clear()
+    reloaded_job_graph = job_service.get_job_graph(original_job.id)
+
+    assert set(reloaded_job_graph.vertices()) == {subjobs[0].id, new_subjob.id, subjobs[2].id}
+    assert set(reloaded_job_graph.edges()) == {
+        (subjobs[0].id, new_subjob.id),
+        (new_subjob.id, subjobs[2].id),
+    }
+    assert job_service.get_subjob(subjobs[1].id).is_legacy
+    assert not job_service.get_subjob(subjobs[0].id).is_legacy
+
+
+def _save_finished_original_job(session_id: str, subjob_count: int) -> Job:
+    """Save a finished original job with the question, the answer and the thinking chain."""
+    job_service: JobService = JobService.instance
+    message_service: MessageService = MessageService.instance
+
+    original_job = Job(goal="test conversation view", session_id=session_id)
+    job_service.save_job(original_job)
+    for role in [ChatMessageRole.USER, ChatMessageRole.SYSTEM]:
+        text_message = TextMessage(
+            payload=f"{role.value} message",
+            job_id=original_job.id,
+            session_id=session_id,
+            role=role,
+        )
+        message_service.save_message(message=text_message)
+        message_service.save_message(
+            message=HybridMessage(
+                instruction_message=text_message,
+                job_id=original_job.id,
+                session_id=session_id,
+                role=role,
+            )
+        )
+
+    for i in range(subjob_count):
+        subjob = SubJob(
+            goal=f"subjob {i}",
+            session_id=session_id,
+            original_job_id=original_job.id,
+            expert_id="expert_id",
+        )
+        job_service.save_job(subjob)
+        message_service.save_message(
+            message=AgentMessage(job_id=subjob.id, payload=f"thinking {i}", timestamp=i)
+        )
+        job_service.save_job_result(JobResult(job_id=subjob.id, status=JobStatus.FINISHED))
+    job_service.save_job_result(JobResult(job_id=original_job.id, status=JobStatus.FINISHED))
+    return original_job
+
+
+def test_conversation_views_batched_and_cached():
+    """Test the conversation views of a session are built in a constant number of queries, and
+    the cached views are invalidated once the messages of the jobs are changed."""
+    job_service: JobService = JobService.instance
+    statements: List[str] = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    short_session_id = str(uuid4())
+    long_session_id = str(uuid4())
+    _save_finished_original_job(session_id=short_session_id, subjob_count=1)
+    original_jobs = [
+        _save_finished_original_job(session_id=long_session_id, subjob_count=3) for _ in range(5)
+    ]
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        job_service.get_conversation_views(session_id=short_session_id)
+        short_session_query_count = len(statements)
+        statements.clear()
+        views = job_service.get_conversation_views(session_id=long_session_id)
+        assert len(statements) == short_session_query_count
+
+        assert [view.answer_metrics.job_id for view in views] == [job.id for job in original_jobs]
+        assert [m.get_payload() for m in views[0].thinking_messages] == [
+            "thinking 0",
+            "thinking 1",
+            "thinking 2",
+        ]
+
+        # the views of the finished jobs are served by the cache
+        statements.clear()
+        job_service.get_conversation_views(session_id=long_session_id)
+        assert len(statements) == 1
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statement)
+
+    # the thinking message of a subjob is changed, so the view is rebuilt
+    subjob = views[0].thinking_subjobs[0]
+    MessageService.instance.save_message(
+        message=AgentMessage(
+            id=views[0].thinking_messages[0].get_id(),
+            job_id=subjob.id,
+            payload="updated",
+            timestamp=0,
+        )
+    )
+    view = job_service.get_conversation_view(original_job_id=original_jobs[0].id)
+    assert view.thinking_messages[0].get_payload() == "updated"
+
+
+def test_conversation_view_data_version_changed_by_other_processes():
+    """Test the version of the views derived from the database is changed by the messages and the
+    statuses saved without the job events (e.g. by the expert workers)."""
+    job_service: JobService = JobService.instance
+    session_id = str(uuid4())
+    original_job = _save_finished_original_job(session_id=session_id, subjob_count=2)
+    subjob_id = job_service.get_subjob_ids(original_job_id=original_job.id)[0]
+
+    job_version, _ = job_service.get_conversation_view_data_version(original_job_id=original_job.id)
+    session_version, _ = job_service.get_conversation_view_data_version(session_id=session_id)
+    unchanged_version, _ = job_service.get_conversation_view_data_version(
+        original_job_id=original_job.id
+    )
+    assert unchanged_version == job_version
+
+    # the worker saves the thinking message of the subjob by the DAO of its own process
+    MessageDao.instance.save_message(
+        message=AgentMessage(job_id=subjob_id, payload="thinking by the worker")
+    )
+    new_job_version, latest_timestamp = job_service.get_conversation_view_data_version(
+        original_job_id=original_job.id
+    )
+    new_session_version, _ = job_service.get_conversation_view_data_version(session_id=session_id)
+    assert new_job_version != job_version
+    assert new_session_version != session_version
+    assert latest_timestamp > 0
+
+    # the worker changes the status of the subjob
+    JobDao.instance.update(id=subjob_id, status=JobStatus.FAILED.value)
+    failed_job_version, _ = job_service.get_conversation_view_data_version(
+        original_job_id=original_job.id
+    )
+    assert failed_job_version != new_job_version
+
+
+def test_cancelled_token_replaced_on_register():
+    """Test the job graph recovered right after it is stopped starts with a new token, while the
+    running executions share the token which is not cancelled."""
+    job_service: JobService = JobService.instance
+    original_job_id = str(uuid4())
+
+    cancellation_token = job_service.register_cancellation_token(original_job_id=original_job_id)
+    assert job_service.register_cancellation_token(original_job_id) is cancellation_token
+
+    job_service.cancel_job_graph(original_job_id=original_job_id, reason="Stopped by the user.")
+    recovered_token = job_service.register_cancellation_token(original_job_id=original_job_id)
+    assert cancellation_token.is_cancelled()
+    assert recovered_token is not cancellation_token
+    assert not recovered_token.is_cancelled()
+    assert job_service.get_cancellation_token(original_job_id) is recovered_token
+
+    job_service.release_cancellation_token(original_job_id=original_job_id)
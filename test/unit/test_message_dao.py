@@ -0,0 +1,119 @@
+from functools import partial
+from typing import Callable, List, Tuple, TypeVar
+from uuid import uuid4
+
+from sqlalchemy import event
+
+from app.core.common.type import ChatMessageRole, FileStorageType
+from app.core.dal.dao.file_descriptor_dao import FileDescriptorDao
+from app.core.dal.dao.message_dao import MessageDao
+from app.core.dal.database import engine, writer_engine
+from app.core.model.message import (
+    AgentMessage,
+    FileMessage,
+    HybridMessage,
+    TextMessage,
+    WorkflowMessage,
+)
+from app.core.service.message_service import MessageService
+from test.resource.init_server import init_server
+
+init_server()
+
+T = TypeVar("T")
+
+
+def _count_queries(get: Callable[[], T]) -> Tuple[int, T]:
+    """Get the number of the statements executed by the call, and the result of the call."""
+    statements: List[str] = []
+
+    def count_statement(_conn, _cursor, statement, *_) -> None:
+        statements.append(statement)
+
+    for bound_engine in {engine, writer_engine}:
+        event.listen(bound_engine, "before_cursor_execute", count_statement)
+    try:
+        result = get()
+    finally:
+        for bound_engine in {engine, writer_engine}:
+            event.remove(bound_engine, "before_cursor_execute", count_statement)
+    return len(statements), result
+
+
+def test_agent_message_loaded_with_workflow_messages_in_one_query():
+    """Test the workflow messages of an agent message are loaded by one query, in their order."""
+    message_service: MessageService = MessageService.instance
+    message_dao: MessageDao = MessageDao.instance
+    workflow_messages = [
+        WorkflowMessage(payload={"scratchpad": f"Round {i}"}, job_id="test_job_id")
+        for i in range(10)
+    ]
+    for workflow_message in workflow_messages:
+        message_service.save_message(message=workflow_message)
+    agent_message = AgentMessage(
+        job_id="test_job_id", payload="Output", workflow_messages=workflow_messages
+    )
+    message_service.save_message(message=agent_message)
+
+    query_count, message = _count_queries(partial(message_dao.get_message, agent_message.get_id()))
+    # the agent message and the workflow messages
+    assert query_count == 2
+    assert [m.scratchpad for m in message.get_workflow_messages()] == [
+        f"Round {i}" for i in range(10)
+    ]
+
+
+def test_hybrid_message_loaded_level_by_level():
+    """Test the instruction message, the attached file messages and their file descriptors of a
+    hybrid message are loaded by one query of each level, regardless of the attachments."""
+    message_service: MessageService = MessageService.instance
+    message_dao: MessageDao = MessageDao.instance
+    file_descriptor_dao: FileDescriptorDao = FileDescriptorDao.instance
+
+    query_counts: List[int] = []
+    for attachment_count in [1, 10]:
+        # the instruction message is looked up by the job, so the job is new in each run
+        job_id = f"test_hybrid_job_{uuid4()}"
+        file_messages: List[FileMessage] = []
+        for i in range(attachment_count):
+            file_descriptor_do = file_descriptor_dao.create(
+                name=f"file_{i}.txt",
+                path=f"/tmp/file_{i}.txt",
+                type=FileStorageType.LOCAL.value,
+                size=1024,
+            )
+            file_message = FileMessage(
+                file_id=str(file_descriptor_do.id), session_id="test_session_id"
+            )
+            message_service.save_message(message=file_message)
+            file_messages.append(file_message)
+        instruction_message = TextMessage(
+            payload="Question",
+            job_id=job_id,
+            session_id="test_session_id",
+            role=ChatMessageRole.USER,
+        )
+        message_service.save_message(message=instruction_message)
+        hybrid_message = HybridMessage(
+            instruction_message=instruction_message,
+            attached_messages=file_messages,
+            job_id=job_id,
+            session_id="test_session_id",
+            role=ChatMessageRole.USER,
+        )
+        message_service.save_message(message=hybrid_message)
+
+        query_count, message = _count_queries(
+            partial(message_dao.get_message, hybrid_message.get_id())
+        )
+        query_counts.append(query_count)
+        attached_messages = message.get_attached_messages()
+        assert message.get_instruction_message().get_payload() == "Question"
+        assert [m.get_id() for m in attached_messages] == [m.get_id() for m in file_messages]
+        assert [m.get_file_id() for m in attached_messages] == [
+            m.get_file_id() for m in file_messages
+        ]
+        assert all(m.get_descriptor().name.startswith("file_") for m in attached_messages)
+
+    # the hybrid message, the instruction messages, the attached messages and the descriptors
+    assert query_counts == [4, 4]
@@ -0,0 +1,110 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from typing import List
+
+import pytest
+from sqlalchemy import event
+
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import JobStatus
+from app.core.common.write_behind_buffer import WriteBehindBuffer
+from app.core.dal.dao.message_dao import MessageDao
+from app.core.dal.database import writer_engine
+from app.core.model.job import Job, SubJob
+from app.core.model.job_result import JobResult
+from app.core.model.message import AgentMessage, MessageType, WorkflowMessage
+from app.core.service.job_service import JobService
+from app.core.service.message_service import MessageService
+from test.resource.init_server import init_server
+
+init_server()
+
+
+def test_write_behind_buffer_batches():
+    """Test the buffer writes the items in batches by the flush size, coalesces the items put
+    again, and keeps the items of a failed write."""
+    batches: List[List[str]] = []
+    written = threading.Event()
+    fail = False
+
+    def write(items: List[str]) -> None:
+        if fail:
+            raise ValueError("Failed to write")
+        batches.append(items)
+        written.set()
+
+    buffer: WriteBehindBuffer[str] = WriteBehindBuffer(write=write, flush_interval=60, flush_size=3)
+    buffer.put("a", "a1")
+    buffer.put("b", "b1")
+    buffer.put("a", "a2")
+    assert buffer.pending_count() == 2
+    assert batches == []
+
+    buffer.put("c", "c1")
+    assert written.wait(timeout=5)
+    assert batches == [["a2", "b1", "c1"]]
+
+    fail = True
+    buffer.put("d", "d1")
+    with pytest.raises(ValueError):
+        buffer.flush()
+    assert buffer.pending_count() == 1
+
+    fail = False
+    buffer.flush()
+    assert batches == [["a2", "b1", "c1"], ["d1"]]
+    assert buffer.pending_count() == 0
+
+
+def test_message_write_behind_flushed_at_job_state_boundary():
+    """Test the messages of the parallel subjobs are written in a few transactions, and they are
+    written before the subjobs are finished."""
+    job_service: JobService = JobService.instance
+    message_service: MessageService = MessageService.instance
+    message_dao: MessageDao = MessageDao.instance
+    original_job = Job(goal="Question")
+    job_service.save_job(original_job)
+    subjobs = [
+        SubJob(goal=f"Subjob {i}", original_job_id=original_job.id, expert_id="test_expert")
+        for i in range(16)
+    ]
+    for subjob in subjobs:
+        job_service.save_job(subjob)
+
+    commit_count = 0
+
+    def count_commit(_) -> None:
+        nonlocal commit_count
+        commit_count += 1
+
+    def execute_subjob(subjob: SubJob) -> List[str]:
+        messages = [
+            WorkflowMessage(payload={"scratchpad": f"Round {round}"}, job_id=subjob.id)
+            for round in range(4)
+        ] + [AgentMessage(job_id=subjob.id, payload="Output")]
+        for message in messages:
+            message_service.save_message(message=message)
+        job_service.save_job_result(JobResult(job_id=subjob.id, status=JobStatus.FINISHED))
+        return [message.get_id() for message in messages]
+
+    event.listen(writer_engine, "commit", count_commit)
+    SystemEnv.MESSAGE_WRITE_BEHIND_ENABLED = True
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            message_ids = list(executor.map(execute_subjob, subjobs))
+    finally:
+        SystemEnv.MESSAGE_WRITE_BEHIND_ENABLED = False
+        event.remove(writer_engine, "commit", count_commit)
+
+    # 5 messages and 1 result of each subjob, which were committed one by one
+    assert commit_count < len(subjobs) * 6
+    for subjob, ids in zip(subjobs, message_ids, strict=True):
+        assert job_service.get_job_result(subjob.id).status == JobStatus.FINISHED
+        # read by the dao, which does not flush the buffered messages
+        assert len(message_dao.get_messages_by_ids(ids=ids)) == 5
+    assert (
+        message_service.get_message_by_job_id(
+            job_id=subjobs[0].id, message_type=MessageType.AGENT_MESSAGE
+        )[0].get_payload()
+        == "Output"
+    )
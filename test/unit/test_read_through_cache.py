@@ -0,0 +1,98 @@
+from typing import List
+
+import pytest
+
+from app.core.common.system_env import SystemEnv
+from app.core.dal.dao.job_dao import JobDao
+from app.core.dal.dao.message_dao import MessageDao
+from app.core.dal.database import unit_of_work
+from app.core.dal.read_through_cache import ReadThroughCache
+from app.core.model.job import Job
+from app.core.model.message import TextMessage
+from app.core.service.message_service import MessageService
+from test.resource.init_server import init_server
+
+init_server()
+
+
+def test_read_through_cache_lru_and_stats():
+    """Test the cache loads the missing objects once, evicts the least recently used object, and
+    does not cache the objects which are not found or not cacheable."""
+    loads: List[str] = []
+
+    def load(key: str):
+        loads.append(key)
+        return None if key == "missing" else {"key": key}
+
+    cache: ReadThroughCache[dict] = ReadThroughCache(
+        name="test", capacity=2, cacheable=lambda value: value["key"] != "volatile"
+    )
+    assert cache.get("a", lambda: load("a")) == {"key": "a"}
+    assert cache.get("b", lambda: load("b")) == {"key": "b"}
+    # the hit returns a copy, so the changes of the callers are not cached
+    cache.get("a", lambda: load("a"))["key"] = "changed"
+    assert cache.get("a", lambda: load("a")) == {"key": "a"}
+    # "b" is the least recently used one
+    cache.get("c", lambda: load("c"))
+    cache.get("b", lambda: load("b"))
+    cache.get("missing", lambda: load("missing"))
+    cache.get("missing", lambda: load("missing"))
+    cache.get("volatile", lambda: load("volatile"))
+    cache.get("volatile", lambda: load("volatile"))
+    assert loads == ["a", "b", "c", "b", "missing", "missing", "volatile", "volatile"]
+
+    stats = cache.get_stats()
+    assert (stats.size, stats.capacity, stats.hit_count, stats.miss_count) == (2, 2, 2, 8)
+    assert stats.hit_rate == pytest.approx(2 / 10)
+
+
+def test_dao_cache_invalidated_by_writes():
+    """Test the cached messages are dropped by the updates, and the cache is bypassed in a unit of
+    work, so that the rolled back writes are not cached."""
+    message_dao: MessageDao = MessageDao.instance
+    message_service: MessageService = MessageService.instance
+    message = TextMessage(payload="Question", session_id="test_session_id", job_id="test_job_id")
+    message_service.save_message(message=message)
+
+    assert message_dao.get_message(message.get_id()).get_payload() == "Question"
+    message_service.save_message(
+        message=TextMessage(
+            id=message.get_id(),
+            payload="Edited",
+            session_id="test_session_id",
+            job_id="test_job_id",
+        )
+    )
+    assert message_dao.get_message(message.get_id()).get_payload() == "Edited"
+
+    with pytest.raises(ValueError):
+        with unit_of_work():
+            message_service.save_message(
+                message=TextMessage(
+                    id=message.get_id(),
+                    payload="Rolled back",
+                    session_id="test_session_id",
+                    job_id="test_job_id",
+                )
+            )
+            assert message_dao.get_message(message.get_id()).get_payload() == "Rolled back"
+            raise ValueError("Failed to execute the job")
+    assert message_dao.get_message(message.get_id()).get_payload() == "Edited"
+
+
+def test_dao_cache_disabled():
+    """Test the DAO reads the database each time, if the cache is disabled (e.g. the database is
+    written by the other processes)."""
+    job_dao: JobDao = JobDao.instance
+    job = Job(goal="Question")
+    job_dao.save_job(job)
+
+    SystemEnv.DAO_CACHE_ENABLED = False
+    try:
+        job_dao.get_job_by_id(job.id)
+        # written by the other process
+        job_dao.session.query(job_dao._model).filter_by(id=job.id).update({"goal": "Edited"})
+        job_dao.session.commit()
+        assert job_dao.get_job_by_id(job.id).goal == "Edited"
+    finally:
+        SystemEnv.DAO_CACHE_ENABLED = True
@@ -0,0 +1,86 @@
+from app.core.model.job import SubJob
+from app.core.model.message import WorkflowMessage
+from app.core.service.reexecution_service import ReexecutionService
+from test.resource.init_server import init_server
+
+init_server()
+
+
+def _subjob(original_job_id: str) -> SubJob:
+    return SubJob(goal="subjob", original_job_id=original_job_id, expert_id="expert_id")
+
+
+def test_reexecution_resumes_from_checkpoints():
+    """Test the re-executed subjob reuses the outputs of the operators before the tail operator,
+    and the subjob executed from scratch does not."""
+    reexecution_service: ReexecutionService = ReexecutionService.instance
+    subjob = _subjob("test_resume_original_job")
+    stats = reexecution_service.get_stats()
+
+    # the first execution: analysis -> modeling (tail)
+    reexecution_service.prepare(job=subjob, tail_operator_ids=["modeling"])
+    for operator_id in ["analysis", "modeling"]:
+        assert reexecution_service.resume(job=subjob, operator_id=operator_id) is None
+        reexecution_service.save_checkpoint(
+            job=subjob,
+            operator_id=operator_id,
+            message=WorkflowMessage(payload={"scratchpad": operator_id}, job_id=subjob.id),
+            llm_rounds=4,
+            duration=2.0,
+        )
+
+    # the successor blames the output of the subjob
+    assert reexecution_service.plan_recovery(
+        original_job_id="test_resume_original_job",
+        consumed_job_ids=[subjob.id],
+        faulty_job_ids=[subjob.id],
+    ) == [subjob.id]
+    reexecution_service.prepare(job=subjob, tail_operator_ids=["modeling"])
+
+    resumed_message = reexecution_service.resume(job=subjob, operator_id="analysis")
+    assert resumed_message is not None and resumed_message.scratchpad == "analysis"
+    assert reexecution_service.resume(job=subjob, operator_id="modeling") is None
+
+    new_stats = reexecution_service.get_stats()
+    assert new_stats.resumed_operator_count == stats.resumed_operator_count + 1
+    assert new_stats.saved_llm_rounds == stats.saved_llm_rounds + 4
+
+    # the retry of the expert (not the re-execution by the leader) starts from scratch
+    reexecution_service.prepare(job=subjob, tail_operator_ids=["modeling"])
+    assert reexecution_service.resume(job=subjob, operator_id="analysis") is None
+
+
+def test_reexecution_skips_unblamed_predecessors():
+    """Test only the blamed predecessors are re-executed, and all the consumed predecessors are
+    re-executed if none of them is blamed."""
+    reexecution_service: ReexecutionService = ReexecutionService.instance
+    original_job_id = "test_skip_original_job"
+    blamed_subjob, valid_subjob = _subjob(original_job_id), _subjob(original_job_id)
+    reexecution_service.save_checkpoint(
+        job=valid_subjob,
+        operator_id="query",
+        message=WorkflowMessage(payload={"scratchpad": "valid"}, job_id=valid_subjob.id),
+        llm_rounds=3,
+        duration=1.0,
+    )
+    stats = reexecution_service.get_stats()
+
+    consumed_job_ids = [blamed_subjob.id, valid_subjob.id]
+    assert reexecution_service.plan_recovery(
+        original_job_id=original_job_id,
+        consumed_job_ids=consumed_job_ids,
+        faulty_job_ids=[blamed_subjob.id, "unknown_job_id"],
+    ) == [blamed_subjob.id]
+    assert (
+        reexecution_service.plan_recovery(
+            original_job_id=original_job_id, consumed_job_ids=consumed_job_ids, faulty_job_ids=[]
+        )
+        == consumed_job_ids
+    )
+
+    new_stats = reexecution_service.get_stats()
+    assert new_stats.skipped_job_count == stats.skipped_job_count + 1
+    assert new_stats.saved_llm_rounds == stats.saved_llm_rounds + 3
+
+    reexecution_service.clear(original_job_id=original_job_id)
+    assert not reexecution_service._checkpoints.get(original_job_id)
@@ -0,0 +1,75 @@
+from app.core.common.system_env import SystemEnv
+from app.core.common.type import ChatMessageRole, JobStatus
+from app.core.model.job import Job
+from app.core.model.job_result import JobResult
+from app.core.model.message import HybridMessage, TextMessage
+from app.core.service.job_service import JobService
+from app.core.service.message_service import MessageService
+from app.core.service.session_history_service import SessionHistoryService
+from app.core.service.session_service import SessionService
+from test.resource.init_server import init_server
+
+init_server()
+
+
+def _submit_job(session_id: str, question: str, answer: str) -> Job:
+    """Save an original job with the question and the answer, which is not finished yet."""
+    job_service: JobService = JobService.instance
+    message_service: MessageService = MessageService.instance
+
+    original_job = Job(goal=question, session_id=session_id)
+    job_service.save_job(original_job)
+    for role, payload in [(ChatMessageRole.USER, question), (ChatMessageRole.SYSTEM, answer)]:
+        text_message = TextMessage(
+            payload=payload, job_id=original_job.id, session_id=session_id, role=role
+        )
+        message_service.save_message(message=text_message)
+        message_service.save_message(
+            message=HybridMessage(
+                instruction_message=text_message,
+                job_id=original_job.id,
+                session_id=session_id,
+                role=role,
+            )
+        )
+    return original_job
+
+
+def test_session_history_appended_once_per_finished_job():
+    """Test a job is appended to the history once it is finished, and the earliest turns are
+    compacted into the summary within the token budget."""
+    job_service: JobService = JobService.instance
+    session_history_service: SessionHistoryService = SessionHistoryService.instance
+    session_id = SessionService.instance.create_session(name="test session history").id
+
+    token_budget = SystemEnv.SESSION_HISTORY_TOKEN_BUDGET
+    summary_token_budget = SystemEnv.SESSION_HISTORY_SUMMARY_TOKEN_BUDGET
+    try:
+        SystemEnv.SESSION_HISTORY_TOKEN_BUDGET = 200
+        SystemEnv.SESSION_HISTORY_SUMMARY_TOKEN_BUDGET = 100
+
+        assert session_history_service.get_history_context(session_id=session_id) == ""
+
+        context_tokens = []
+        for i in range(20):
+            job = _submit_job(session_id, question=f"question {i}", answer=f"answer {i} " * 40)
+            session_history_service.add_pending_job(session_id=session_id, original_job_id=job.id)
+
+            # the running job is not in the history
+            assert f"question {i}" not in session_history_service.get_history_context(session_id)
+
+            job_service.save_job_result(JobResult(job_id=job.id, status=JobStatus.FINISHED))
+            context = session_history_service.get_history_context(session_id=session_id)
+            context_tokens.append(session_history_service.estimate_tokens(context))
+
+            # the latest turn is kept in full
+            assert (f"answer {i} " * 40).strip() in context
+
+        assert "[Summary of Earlier Conversation]" in context
+        assert "- User: question 18 | AI: answer 18" in context
+        assert "earlier turns omitted" in context
+        assert context.count("[User Message]\nquestion 19") == 1
+        assert max(context_tokens[10:]) <= 200 + 100 + 100
+    finally:
+        SystemEnv.SESSION_HISTORY_TOKEN_BUDGET = token_budget
+        SystemEnv.SESSION_HISTORY_SUMMARY_TOKEN_BUDGET = summary_token_budget
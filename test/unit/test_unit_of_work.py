@@ -0,0 +1,132 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import pytest
+
+from app.core.common.type import JobStatus
+from app.core.dal.database import unit_of_work
+from app.core.model.artifact import Artifact, ContentType, SourceReference
+from app.core.model.job import Job, SubJob
+from app.core.model.job_event import JobEventType
+from app.core.model.job_result import JobResult
+from app.core.model.message import AgentMessage, MessageType
+from app.core.service.artifact_service import ArtifactService
+from app.core.service.job_event_service import JobEventService
+from app.core.service.job_service import JobService
+from app.core.service.message_service import MessageService
+from app.core.service.session_service import SessionService
+from test.resource.init_server import init_server
+
+init_server()
+
+
+def test_parallel_subjobs_committed_in_units_of_work():
+    """Test the parallel subjobs save their status, result and messages in the sessions of their
+    threads, each in a single transaction, and the failed ones are rolled back as a whole."""
+    job_service: JobService = JobService.instance
+    message_service: MessageService = MessageService.instance
+    job_event_service: JobEventService = JobEventService.instance
+    session_id = SessionService.instance.create_session(name="test unit of work").id
+    original_job = Job(goal="Question", session_id=session_id)
+    job_service.save_job(original_job)
+
+    subjobs: List[SubJob] = []
+    for i in range(32):
+        subjob = SubJob(
+            goal=f"Subjob {i}",
+            session_id=session_id,
+            original_job_id=original_job.id,
+            expert_id="test_expert",
+        )
+        job_service.save_job(subjob)
+        subjobs.append(subjob)
+    # the subjobs are loaded by the session of the main thread before they are executed
+    assert all(
+        result.status == JobStatus.CREATED
+        for result in job_service.get_subjob_results(original_job_id=original_job.id).values()
+    )
+    cursor = job_event_service.get_cursor()
+
+    def execute_subjob(index: int) -> None:
+        subjob = subjobs[index]
+        job_service.save_job_result(JobResult(job_id=subjob.id, status=JobStatus.RUNNING))
+        with unit_of_work():
+            message_service.save_message(
+                message=AgentMessage(job_id=subjob.id, payload=f"Output {index}")
+            )
+            job_service.save_job_result(
+                JobResult(job_id=subjob.id, status=JobStatus.FINISHED, duration=1.0)
+            )
+            # the writes are visible in the unit of work before they are committed
+            assert job_service.get_job_result(job_id=subjob.id).status == JobStatus.FINISHED
+            if index % 4 == 0:
+                raise ValueError(f"Subjob {index} failed to save its output")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(execute_subjob, i) for i in range(len(subjobs))]
+    for i, future in enumerate(futures):
+        if i % 4 == 0:
+            with pytest.raises(ValueError):
+                future.result()
+        else:
+            future.result()
+
+    # the main thread reads the rows committed by the other threads, not the loaded objects
+    results = job_service.get_subjob_results(original_job_id=original_job.id)
+    for i, subjob in enumerate(subjobs):
+        messages = message_service.get_message_by_job_id(
+            job_id=subjob.id, message_type=MessageType.AGENT_MESSAGE
+        )
+        if i % 4 == 0:
+            assert results[subjob.id].status == JobStatus.RUNNING
+            assert messages == []
+        else:
+            assert results[subjob.id].status == JobStatus.FINISHED
+            assert [message.get_payload() for message in messages] == [f"Output {i}"]
+
+    # the events of the rolled back writes are not published
+    finished_job_ids = {
+        event.job_id
+        for event in job_event_service.get_events(since=cursor, session_id=session_id).events
+        if event.type == JobEventType.JOB_STATUS and event.data["status"] == "FINISHED"
+    }
+    assert finished_job_ids == {subjob.id for i, subjob in enumerate(subjobs) if i % 4 != 0}
+
+
+def test_saved_twice_in_unit_of_work_by_upserts():
+    """Test the message, the job and the artifact saved again in a unit of work are updated by the
+    upserts, without failing the transaction by the duplicate ids."""
+    job_service: JobService = JobService.instance
+    message_service: MessageService = MessageService.instance
+    artifact_service: ArtifactService = ArtifactService.instance
+    session_id = SessionService.instance.create_session(name="test upserts").id
+    job = Job(goal="Question", session_id=session_id)
+    message = AgentMessage(job_id=job.id, payload="Thinking")
+    artifact = Artifact(
+        content_type=ContentType.TEXT,
+        content="draft",
+        source_reference=SourceReference(job_id=job.id, session_id=session_id),
+    )
+
+    with unit_of_work():
+        job_service.save_job(job)
+        message_service.save_message(message=message)
+        artifact.id = artifact_service.save_artifact(artifact)
+        job_service.save_job_result(JobResult(job_id=job.id, status=JobStatus.FINISHED))
+
+        job.goal = "Updated question"
+        job_service.save_job(job)
+        message_service.save_message(
+            message=AgentMessage(id=message.get_id(), job_id=job.id, payload="Answer")
+        )
+        artifact.content = "final"
+        artifact_service.save_artifact(artifact)
+
+    assert job_service.get_original_job(job.id).goal == "Updated question"
+    # the result is not reset by saving the job again
+    assert job_service.get_job_result(job.id).status == JobStatus.FINISHED
+    assert message_service.get_message(message.get_id()).get_payload() == "Answer"
+    saved_artifact = artifact_service.get_artifact(artifact.id)
+    assert saved_artifact is not None
+    assert saved_artifact.content == "final"
+    assert saved_artifact.metadata.version == artifact.metadata.version + 1